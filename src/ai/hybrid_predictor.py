@@ -23,6 +23,9 @@ class HybridPricePredictor:
         self.traditional_model = RandomForestClassifier()
         self.llm_client = get_llm_client()
         
+        # Same indicators and news reuse the LLM answer for 5 minutes
+        self.llm_cache_ttl = 300
+        
         # Placeholder for model training (pseudo-code)
         # self._train_model(training_data)
     
@@ -56,7 +59,8 @@ class HybridPricePredictor:
             llm_analysis = await self.llm_client.analyze_json(
                 prompt=context_prompt,
                 system_prompt="""Analyze technical indicators and news to predict price movements.""",
-                schema=self._get_expected_llm_schema()
+                schema=self._get_expected_llm_schema(),
+                cache_ttl=self.llm_cache_ttl
             )
             
             # Combine results
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache for Robot-Crypt
+In-memory LRU + on-disk store for LLM completions, with single-flight coalescing
+
+Keys are SHA-256 hashes of provider, model, temperature, max_tokens and the
+whitespace-normalized messages (``analyze_json`` puts the expected schema in
+the system prompt, so it is part of the key). Each caller states
+how old a cached answer may be (``ttl``), so the same prompt can be reused
+for minutes by one module and never by another. Identical prompts that are
+already in flight wait for the first request instead of calling the provider
+again.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def env_number(name: str, default: float, cast: Callable[[Any], float] = float) -> float:
+    """Read a numeric environment variable, falling back to ``default`` when invalid"""
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return cast(raw)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid value for {name}: {raw!r}, using {default}")
+        return default
+
+
+def make_cache_key(provider: str,
+                   model: str,
+                   temperature: float,
+                   messages: List[Dict[str, str]],
+                   max_tokens: Optional[int] = None) -> str:
+    """
+    Build the cache key for a completion request
+
+    Message content is compared with whitespace collapsed, so prompts that only
+    differ in indentation or line breaks share an entry.
+    """
+    normalized = [
+        {"role": message.get("role", "user"), "content": " ".join(str(message.get("content", "")).split())}
+        for message in messages
+    ]
+    raw = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "temperature": round(float(temperature), 4),
+            "max_tokens": max_tokens,
+            "messages": normalized
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Cache de respostas de LLM em memória (LRU) e em disco (SQLite)"""
+
+    def __init__(self,
+                 max_entries: int = 512,
+                 cache_dir: Optional[str] = None,
+                 max_age: float = 86400.0):
+        """
+        Args:
+            max_entries: Responses kept in memory (0 disables the memory layer)
+            cache_dir: Directory of the SQLite store (None = memory only)
+            max_age: Seconds a response is kept on disk, whatever the callers' TTLs
+        """
+        self.max_entries = max(0, int(max_entries))
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+
+        # key -> (created_at, payload)
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes = 0
+
+        self.stats = {
+            "requests": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "errors": 0,
+            "tokens_saved": 0,
+            "cost_saved": 0.0
+        }
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        """Build the cache from LLM_CACHE_* environment variables"""
+        enabled = str(os.getenv("LLM_CACHE_ENABLED", "true")).lower() in ["true", "1", "yes", "y"]
+        cache_dir = os.getenv("LLM_CACHE_DIR", os.path.join("data", "llm_cache"))
+        return cls(
+            max_entries=env_number("LLM_CACHE_SIZE", 512, int) if enabled else 0,
+            cache_dir=cache_dir if enabled and cache_dir else None,
+            max_age=env_number("LLM_CACHE_MAX_AGE", 86400.0)
+        )
+
+    async def get_or_create(self,
+                            key: str,
+                            ttl: float,
+                            factory: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], str]:
+        """
+        Return a cached payload younger than ``ttl`` or produce it with ``factory``
+
+        Concurrent calls with the same key share one ``factory`` call, even when
+        ``ttl`` is 0 (nothing is read from or written to the cache then).
+
+        Args:
+            key: Key from ``make_cache_key``
+            ttl: Maximum age in seconds accepted by this caller (<= 0 skips the cache)
+            factory: Coroutine function producing a JSON-serializable payload
+
+        Returns:
+            (payload, source) where source is "memory", "disk", "coalesced" or "miss"
+        """
+        self.stats["requests"] += 1
+
+        if ttl > 0:
+            payload = self._memory_get(key, ttl)
+            if payload is not None:
+                return self._hit(payload, "memory")
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            payload = await asyncio.shield(inflight)
+            return self._hit(payload, "coalesced")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if ttl > 0 and self.cache_dir:
+                stored = await asyncio.to_thread(self._disk_get, key, ttl)
+                if stored is not None:
+                    created_at, payload = stored
+                    self._memory_put(key, created_at, payload)
+                    future.set_result(payload)
+                    return self._hit(payload, "disk")
+
+            try:
+                payload = await factory()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                future.set_exception(e)
+                # Mark as retrieved so asyncio does not warn when nobody was waiting
+                future.exception()
+                raise
+
+            self.stats["misses"] += 1
+            if ttl > 0:
+                created_at = time.time()
+                self._memory_put(key, created_at, payload)
+                if self.cache_dir:
+                    await asyncio.to_thread(self._disk_put, key, created_at, payload)
+            future.set_result(payload)
+            return payload, "miss"
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key: Optional[str]):
+        """Drop a response (e.g. one that could not be parsed)"""
+        if not key:
+            return
+        self._memory.pop(key, None)
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._db.commit()
+
+    def clear(self):
+        """Drop every cached response (memory and disk)"""
+        self._memory.clear()
+        if self.cache_dir:
+            with self._db_lock:
+                db = self._connect()
+                if db is not None:
+                    db.execute("DELETE FROM llm_responses")
+                    db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit counters and the tokens/cost not spent thanks to the cache"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["coalesced"]
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "cost_saved": round(self.stats["cost_saved"], 6),
+            "hit_rate": round(hits / requests, 4) if requests else 0.0,
+            "memory_entries": len(self._memory),
+            "inflight": len(self._inflight),
+            "disk_enabled": bool(self.cache_dir)
+        }
+
+    def close(self):
+        """Close the disk store"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _hit(self, payload: Dict[str, Any], source: str) -> Tuple[Dict[str, Any], str]:
+        self.stats["coalesced" if source == "coalesced" else f"{source}_hits"] += 1
+        self.stats["tokens_saved"] += int(payload.get("tokens_used") or 0)
+        self.stats["cost_saved"] += float(payload.get("cost_estimate") or 0.0)
+        return payload, source
+
+    def _memory_get(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created_at, payload = entry
+        if time.time() - created_at >= ttl:
+            return None
+        self._memory.move_to_end(key)
+        return payload
+
+    def _memory_put(self, key: str, created_at: float, payload: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite store on first use (caller holds ``_db_lock``)"""
+        if self._db is None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._db = sqlite3.connect(
+                    os.path.join(self.cache_dir, "llm_responses.sqlite3"),
+                    check_same_thread=False
+                )
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_responses ("
+                    "key TEXT PRIMARY KEY, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+                self._db.execute("DELETE FROM llm_responses WHERE created_at < ?",
+                                 (time.time() - self.max_age,))
+                self._db.commit()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"LLM disk cache disabled: {e}")
+                self.cache_dir = None
+                self._db = None
+        return self._db
+
+    def _disk_get(self, key: str, ttl: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT created_at, payload FROM llm_responses WHERE key = ? AND created_at > ?",
+                    (key, time.time() - min(ttl, self.max_age))
+                ).fetchone()
+                return (row[0], json.loads(row[1])) if row else None
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"LLM disk cache read failed: {e}")
+                return None
+
+    def _disk_put(self, key: str, created_at: float, payload: Dict[str, Any]):
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, created_at, payload) VALUES (?, ?, ?)",
+                    (key, created_at, json.dumps(payload, default=str))
+                )
+                self._writes += 1
+                if self._writes % 500 == 0:
+                    db.execute("DELETE FROM llm_responses WHERE created_at < ?",
+                               (time.time() - self.max_age,))
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache write failed: {e}")
@@ -26,6 +26,7 @@ except ImportError:
     GEMINI_AVAILABLE = False
 
 from src.core.config import settings
+from src.ai.llm_cache import LLMResponseCache, env_number, make_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -46,12 +47,13 @@ class LLMResponse:
 class LLMClient:
     """Cliente unificado para múltiplos provedores de LLM"""
     
-    def __init__(self, provider: str = None):
+    def __init__(self, provider: str = None, response_cache: Optional[LLMResponseCache] = None):
         """
         Initialize LLM client
         
         Args:
             provider: 'openai', 'gemini', or 'auto' for automatic selection
+            response_cache: Response cache (default: built from LLM_CACHE_* env vars)
         """
         self.logger = logging.getLogger("robot-crypt.llm_client")
         
@@ -59,6 +61,10 @@ class LLMClient:
         self.provider = provider or os.getenv("AI_PROVIDER", "auto")
         self.model = os.getenv("AI_MODEL", "")
         
+        # Response cache; callers opt in per request with cache_ttl
+        self.response_cache = response_cache or LLMResponseCache.from_env()
+        self.default_cache_ttl = env_number("LLM_CACHE_TTL", 0.0)
+        
         # Token counting
         self.token_counter = None
         
@@ -129,15 +135,22 @@ class LLMClient:
                    messages: Union[str, List[Dict[str, str]]], 
                    system_prompt: Optional[str] = None,
                    temperature: float = 0.1,
-                   max_tokens: Optional[int] = None) -> LLMResponse:
+                   max_tokens: Optional[int] = None,
+                   cache_ttl: Optional[float] = None) -> LLMResponse:
         """
         Send chat completion request
         
+        Identical requests already in flight share one provider call. With a
+        positive ``cache_ttl`` an answer to the same request that is younger than
+        ``cache_ttl`` seconds is returned from the cache (metadata["cache"] tells
+        where it came from).
+        
         Args:
             messages: Message string or list of messages
             system_prompt: Optional system prompt
             temperature: Model temperature (0-1)
             max_tokens: Maximum tokens to generate
+            cache_ttl: Maximum age in seconds of a cached answer (default: LLM_CACHE_TTL, 0 = no cache)
             
         Returns:
             LLMResponse object
@@ -154,18 +167,56 @@ class LLMClient:
                 if system_prompt and (not formatted_messages or formatted_messages[0]["role"] != "system"):
                     formatted_messages.insert(0, {"role": "system", "content": system_prompt})
             
-            # Route to appropriate provider
-            if self.provider == "openai" and self.openai_client:
-                return await self._openai_chat(formatted_messages, temperature, max_tokens)
-            elif self.provider == "gemini" and self.gemini_client:
-                return await self._gemini_chat(formatted_messages, temperature, max_tokens)
-            else:
-                raise ValueError(f"Provider {self.provider} not available")
+            ttl = self.default_cache_ttl if cache_ttl is None else cache_ttl
+            cache_key = make_cache_key(self.provider, self.model, temperature, formatted_messages, max_tokens)
+            fresh = {}
+            
+            async def complete() -> Dict[str, Any]:
+                fresh["response"] = await self._dispatch_chat(formatted_messages, temperature, max_tokens)
+                return self._response_to_payload(fresh["response"])
+            
+            payload, source = await self.response_cache.get_or_create(cache_key, ttl, complete)
+            
+            response = fresh.get("response") or self._payload_to_response(payload)
+            response.metadata = {**(response.metadata or {}), "cache": source, "cache_key": cache_key}
+            return response
                 
         except Exception as e:
             self.logger.error(f"Chat completion failed: {e}")
             raise
     
+    async def _dispatch_chat(self, messages: List[Dict], temperature: float, max_tokens: Optional[int]) -> LLMResponse:
+        """Route the request to the configured provider"""
+        if self.provider == "openai" and self.openai_client:
+            return await self._openai_chat(messages, temperature, max_tokens)
+        elif self.provider == "gemini" and self.gemini_client:
+            return await self._gemini_chat(messages, temperature, max_tokens)
+        else:
+            raise ValueError(f"Provider {self.provider} not available")
+    
+    @staticmethod
+    def _response_to_payload(response: LLMResponse) -> Dict[str, Any]:
+        """Serializable form of a response for the cache"""
+        return {
+            "content": response.content,
+            "model": response.model,
+            "provider": response.provider,
+            "tokens_used": response.tokens_used,
+            "cost_estimate": response.cost_estimate,
+            "timestamp": response.timestamp.isoformat(),
+            "confidence": response.confidence,
+            # Provider objects in metadata (e.g. Gemini safety ratings) are stored as text
+            "metadata": json.loads(json.dumps(response.metadata or {}, default=str))
+        }
+    
+    @staticmethod
+    def _payload_to_response(payload: Dict[str, Any]) -> LLMResponse:
+        """Rebuild a response served from the cache"""
+        data = dict(payload)
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        data["metadata"] = dict(data.get("metadata") or {})
+        return LLMResponse(**data)
+    
     async def _openai_chat(self, messages: List[Dict], temperature: float, max_tokens: Optional[int]) -> LLMResponse:
         """OpenAI chat completion"""
         try:
@@ -287,7 +338,8 @@ class LLMClient:
     async def analyze_json(self, 
                           prompt: str, 
                           system_prompt: Optional[str] = None,
-                          schema: Optional[Dict] = None) -> Dict[str, Any]:
+                          schema: Optional[Dict] = None,
+                          cache_ttl: Optional[float] = None) -> Dict[str, Any]:
         """
         Request structured JSON response
         
@@ -295,6 +347,7 @@ class LLMClient:
             prompt: User prompt
             system_prompt: System prompt
             schema: Expected JSON schema
+            cache_ttl: Maximum age in seconds of a cached answer (see ``chat``)
             
         Returns:
             Parsed JSON response
@@ -310,7 +363,8 @@ class LLMClient:
             response = await self.chat(
                 messages=prompt,
                 system_prompt=full_system_prompt,
-                temperature=0.1
+                temperature=0.1,
+                cache_ttl=cache_ttl
             )
             
             # Try to parse JSON
@@ -325,7 +379,12 @@ class LLMClient:
                     content = content[:-3]
                 content = content.strip()
                 
-                return json.loads(content)
+                try:
+                    return json.loads(content)
+                except json.JSONDecodeError:
+                    # Do not serve an unparseable answer from the cache
+                    self.response_cache.invalidate((response.metadata or {}).get("cache_key"))
+                    raise
                 
         except Exception as e:
             self.logger.error(f"JSON analysis failed: {e}")
@@ -355,7 +414,7 @@ class LLMClient:
         
         try:
             # Test with simple request
-            response = await self.chat("Test connection. Respond with 'OK'.")
+            response = await self.chat("Test connection. Respond with 'OK'.", cache_ttl=0)
             if "OK" in response.content.upper():
                 status["status"] = "healthy"
             else:
@@ -366,6 +425,10 @@ class LLMClient:
             status["error"] = str(e)
         
         return status
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hits, coalesced requests and tokens/cost saved"""
+        return self.response_cache.get_stats()
 
 
 # Global instance
@@ -113,6 +113,7 @@ class LLMNewsAnalyzer:
             # Get LLM analysis
             response = await self.llm_client.analyze_json(
                 prompt=prompt,
+                cache_ttl=self.cache_duration.total_seconds(),
                 system_prompt=self.system_prompt,
                 schema=self._get_analysis_schema()
             )
@@ -175,6 +176,7 @@ class LLMNewsAnalyzer:
             
             response = await self.llm_client.analyze_json(
                 prompt=prompt,
+                cache_ttl=self.cache_duration.total_seconds(),
                 system_prompt=self.system_prompt,
                 schema={
                     "sentiment_score": "number",
@@ -245,6 +247,7 @@ class LLMNewsAnalyzer:
             
             response = await self.llm_client.analyze_json(
                 prompt=prompt,
+                cache_ttl=self.cache_duration.total_seconds(),
                 system_prompt=self.system_prompt,
                 schema={
                     "events": [
@@ -402,17 +405,20 @@ class LLMNewsAnalyzer:
     
     def _cache_analysis(self, cache_key: str, analysis: NewsAnalysis):
         """Armazena análise no cache"""
+        self.analysis_cache.pop(cache_key, None)
         self.analysis_cache[cache_key] = {
             "analysis": analysis,
             "timestamp": datetime.now()
         }
         
-        # Clean old cache entries
+        # Entries are kept in insertion order, so expired ones are at the front;
+        # drop them without rebuilding the dict
         cutoff_time = datetime.now() - self.cache_duration
-        self.analysis_cache = {
-            k: v for k, v in self.analysis_cache.items()
-            if v["timestamp"] > cutoff_time
-        }
+        while self.analysis_cache:
+            oldest_key = next(iter(self.analysis_cache))
+            if self.analysis_cache[oldest_key]["timestamp"] > cutoff_time:
+                break
+            del self.analysis_cache[oldest_key]
     
     async def get_market_sentiment_summary(self, symbols: List[str]) -> Dict[str, Any]:
         """
@@ -449,6 +455,7 @@ class LLMNewsAnalyzer:
             
             response = await self.llm_client.analyze_json(
                 prompt=prompt,
+                cache_ttl=self.cache_duration.total_seconds(),
                 system_prompt=self.system_prompt,
                 schema={
                     "overall_sentiment": "string",
@@ -13,9 +13,20 @@ import aiohttp
 from .news_analyzer import CryptoNewsItem, LLMNewsAnalyzer
 from src.api.external.news_api_client import NewsAPIClient
 from src.api.external.cryptopanic_client import CryptoPanicAPIClient
+from src.analysis.keyword_matcher import KeywordMatcher, COIN_NAMES
+from src.contextual_analysis.sentiment_service import dedupe_articles
 
 logger = logging.getLogger(__name__)
 
+# Names match in any case; tickers only as whole uppercase words ("ETH", not "Ethics" or "link")
+SYMBOL_MATCHER = KeywordMatcher(
+    {
+        'name': COIN_NAMES,
+        'ticker': {symbol: [symbol] for symbol in COIN_NAMES}
+    },
+    case_sensitive=('ticker',)
+)
+
 
 class NewsIntegrator:
     """Integrador de notícias para análise de IA"""
@@ -116,14 +127,8 @@ class NewsIntegrator:
                 elif isinstance(result, Exception):
                     self.logger.warning(f"News source error: {result}")
             
-            # Remove duplicatas baseado no título
-            seen_titles = set()
-            unique_news = []
-            
-            for item in news_items:
-                if item.title not in seen_titles:
-                    seen_titles.add(item.title)
-                    unique_news.append(item)
+            # Remove duplicatas entre fontes (mesma URL ou título quase idêntico)
+            unique_news = dedupe_articles(news_items)
             
             # Cache result
             self.news_cache[cache_key] = (datetime.now(), unique_news)
@@ -218,30 +223,9 @@ class NewsIntegrator:
             return []
     
     def _extract_symbols_from_text(self, text: str) -> List[str]:
-        """Extrai símbolos de criptomoedas do texto"""
-        symbols = []
-        text_upper = text.upper()
-        
-        # Common crypto symbols and names
-        crypto_map = {
-            'BITCOIN': 'BTC',
-            'ETHEREUM': 'ETH', 
-            'BINANCE COIN': 'BNB',
-            'CARDANO': 'ADA',
-            'SOLANA': 'SOL',
-            'DOGECOIN': 'DOGE',
-            'SHIBA INU': 'SHIB',
-            'POLYGON': 'MATIC',
-            'AVALANCHE': 'AVAX',
-            'CHAINLINK': 'LINK'
-        }
-        
-        # Check for crypto names and symbols
-        for name, symbol in crypto_map.items():
-            if name in text_upper or symbol in text_upper:
-                symbols.append(symbol)
-        
-        return list(set(symbols))  # Remove duplicates
+        """Extrai símbolos de criptomoedas do texto (nomes e tickers como palavras inteiras)"""
+        matches = SYMBOL_MATCHER.match(text)
+        return list(dict.fromkeys(matches.labels('name') + matches.labels('ticker')))
     
     def _create_sample_news(self) -> List[CryptoNewsItem]:
         """Cria notícias de exemplo quando fontes não estão disponíveis"""
@@ -69,6 +69,7 @@ class AdvancedPatternDetector:
             # Obtém análise do LLM
             response = await self.llm_client.analyze_json(
                 prompt=prompt,
+                cache_ttl=self.cache_duration.total_seconds(),
                 system_prompt=self._get_pattern_system_prompt(),
                 schema=self._get_pattern_schema()
             )
@@ -156,6 +157,7 @@ class AdvancedPatternDetector:
             
             response = await self.llm_client.analyze_json(
                 prompt=prompt,
+                cache_ttl=self.cache_duration.total_seconds(),
                 system_prompt="You are a technical analysis expert specializing in breakout detection.",
                 schema={
                     "breakout_probability": "number",
@@ -402,14 +404,17 @@ class AdvancedPatternDetector:
     
     def _cache_patterns(self, cache_key: str, patterns: List[Dict[str, Any]]):
         """Armazena padrões no cache"""
+        self.pattern_cache.pop(cache_key, None)
         self.pattern_cache[cache_key] = {
             "patterns": patterns,
             "timestamp": datetime.now()
         }
         
-        # Limpa cache antigo
+        # Entradas ficam em ordem de inserção, então as expiradas estão no início;
+        # remove-as sem reconstruir o dicionário
         cutoff_time = datetime.now() - self.cache_duration
-        self.pattern_cache = {
-            k: v for k, v in self.pattern_cache.items()
-            if v["timestamp"] > cutoff_time
-        }
+        while self.pattern_cache:
+            oldest_key = next(iter(self.pattern_cache))
+            if self.pattern_cache[oldest_key]["timestamp"] > cutoff_time:
+                break
+            del self.pattern_cache[oldest_key]
@@ -20,6 +20,8 @@ class TradingAssistant:
     def __init__(self):
         self.llm_client = get_llm_client()
         self.conversation_history = []
+        # Same question with the same context reuses the LLM answer for 1 minute
+        self.llm_cache_ttl = 60
         self.logger = logging.getLogger("robot-crypt.trading_assistant")
     
     async def chat_analysis(self, user_question: str, current_portfolio: Dict[str, Any]) -> Dict[str, Any]:
@@ -50,7 +52,8 @@ class TradingAssistant:
             response = await self.llm_client.analyze_json(
                 prompt=user_question,
                 system_prompt=system_prompt,
-                schema=self._get_response_schema()
+                schema=self._get_response_schema(),
+                cache_ttl=self.llm_cache_ttl
             )
             
             # Add assistant response to history
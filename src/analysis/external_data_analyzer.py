@@ -13,6 +13,21 @@ from pathlib import Path
 from ..core.config import Config
 import numpy as np
 from ..utils.utils import setup_logger
+from .keyword_matcher import KeywordMatcher
+
+# Palavras positivas e negativas para análise simplificada de sentimento
+SENTIMENT_WORDS = {
+    'positive': [
+        'bullish', 'growth', 'positive', 'gain', 'rally', 'surge', 'rise',
+        'up', 'higher', 'success', 'profit', 'good', 'strong', 'opportunity',
+        'recovery', 'breakthrough', 'adoption', 'support', 'advance'
+    ],
+    'negative': [
+        'bearish', 'crash', 'decline', 'drop', 'fall', 'loss', 'negative',
+        'down', 'lower', 'fail', 'risk', 'bad', 'weak', 'threat', 'crisis',
+        'recession', 'ban', 'sell-off', 'dump', 'bubble'
+    ]
+}
 
 class ExternalDataAnalyzer:
     """
@@ -66,6 +81,10 @@ class ExternalDataAnalyzer:
             'regulatory': 0.9,
             'geopolitical': 0.5
         }
+        
+        # Matcher único para tipos de evento e sentimento (uma passagem por notícia)
+        self.keyword_matcher = KeywordMatcher({'event': self.keywords, 'sentiment': SENTIMENT_WORDS},
+                                              inflected=('event', 'sentiment'))
 
     def _load_cache(self, cache_file):
         """Carrega cache de dados do arquivo"""
@@ -170,7 +189,9 @@ class ExternalDataAnalyzer:
         processed_news = []
         for article in all_articles:
             # Calcular relevância e classificar tipo de evento
-            event_type, relevance_score = self._classify_news(article)
+            text = f"{article.get('title') or ''} {article.get('description') or ''}"
+            matches = self.keyword_matcher.match(text)
+            event_type, relevance_score = self._classify_news(article, matches)
             
             # Formatar e adicionar à lista
             processed_article = {
@@ -181,7 +202,7 @@ class ExternalDataAnalyzer:
                 'published_at': article.get('publishedAt', ''),
                 'event_type': event_type,
                 'relevance_score': relevance_score,
-                'sentiment': self._analyze_sentiment(article.get('title', '') + ' ' + article.get('description', ''))
+                'sentiment': self._analyze_sentiment(text, matches)
             }
             processed_news.append(processed_article)
         
@@ -194,26 +215,23 @@ class ExternalDataAnalyzer:
         
         return processed_news
 
-    def _classify_news(self, article):
+    def _classify_news(self, article, matches=None):
         """Classifica o tipo de notícia e calcula sua relevância
         
         Args:
             article (dict): Artigo de notícia
+            matches (KeywordMatches): Resultado do matcher para o artigo (opcional)
             
         Returns:
             tuple: (tipo_evento, pontuação_relevância)
         """
-        title = article.get('title', '').lower()
-        description = article.get('description', '').lower() if article.get('description') else ''
-        content = title + ' ' + description
+        if matches is None:
+            matches = self.keyword_matcher.match(f"{article.get('title') or ''} {article.get('description') or ''}")
         
         # Verificar qual tipo de evento corresponde melhor
         event_scores = {}
         for event_type, keywords in self.keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword.lower() in content:
-                    score += 1
+            score = matches.count('event', event_type, distinct=True)
             
             # Normalizar pontuação
             if score > 0:
@@ -230,32 +248,22 @@ class ExternalDataAnalyzer:
         
         return max_type, max_score
 
-    def _analyze_sentiment(self, text):
+    def _analyze_sentiment(self, text, matches=None):
         """Análise básica de sentimento para texto
         
         Args:
             text (str): Texto para análise
+            matches (KeywordMatches): Resultado do matcher para o texto (opcional)
             
         Returns:
             float: Pontuação de sentimento (-1.0 a 1.0)
         """
-        # Palavras positivas e negativas para análise simplificada
-        positive_words = [
-            'bullish', 'growth', 'positive', 'gain', 'rally', 'surge', 'rise',
-            'up', 'higher', 'success', 'profit', 'good', 'strong', 'opportunity',
-            'recovery', 'breakthrough', 'adoption', 'support', 'advance'
-        ]
-        
-        negative_words = [
-            'bearish', 'crash', 'decline', 'drop', 'fall', 'loss', 'negative',
-            'down', 'lower', 'fail', 'risk', 'bad', 'weak', 'threat', 'crisis',
-            'recession', 'ban', 'sell-off', 'dump', 'bubble'
-        ]
+        if matches is None:
+            matches = self.keyword_matcher.match(text)
         
-        # Contar ocorrências
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        # Contar palavras distintas de cada polaridade
+        positive_count = matches.count('sentiment', 'positive', distinct=True)
+        negative_count = matches.count('sentiment', 'negative', distinct=True)
         
         # Calcular sentimento normalizado
         total = positive_count + negative_count
@@ -541,12 +549,11 @@ class ExternalDataAnalyzer:
         Returns:
             float: Score de impacto (0-1) para a categoria
         """
-        category_keywords = self.keywords[category]
         relevant_news = []
         
         for news in news_data:
             text = f"{news.get('title', '')} {news.get('description', '')}"
-            if any(keyword.lower() in text.lower() for keyword in category_keywords):
+            if self.keyword_matcher.match(text).count('event', category):
                 relevance = self._calculate_news_relevance(news)
                 relevant_news.append((news, relevance))
         
@@ -570,7 +577,7 @@ class ExternalDataAnalyzer:
         factors = {
             'recency': self._calculate_recency_score(news.get('publishedAt')),
             'source_quality': self._get_source_quality_score(news.get('source', {}).get('name')),
-            'sentiment': self._analyze_sentiment(news.get('title', '') + news.get('description', ''))
+            'sentiment': self._relevance_sentiment(news.get('title', '') + news.get('description', ''))
         }
         
         # Pesos dos fatores
@@ -605,8 +612,8 @@ class ExternalDataAnalyzer:
         }
         return trusted_sources.get(source_name, 0.5)
 
-    def _analyze_sentiment(self, text):
-        """Análise básica de sentimento do texto
+    def _relevance_sentiment(self, text):
+        """Análise básica de sentimento do texto para o cálculo de relevância
         Retorna score entre 0 (muito negativo) e 1 (muito positivo)
         """
         # Palavras-chave positivas e negativas
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Motor incremental (streaming) de indicadores técnicos
+
+Mantém o estado de cada indicador de ``TechnicalIndicators.calculate_all_indicators``
+(somas móveis, estado das EMAs, janelas de mínimo/máximo) por (símbolo, intervalo) e
+atualiza tudo em O(1) a cada vela, produzindo o mesmo dicionário ``latest_data``.
+
+As fórmulas replicam exatamente o cálculo em lote: RSI e ATR usam médias móveis
+simples (como em ``calculate_rsi``/``calculate_atr``), EMAs usam ``adjust=False`` e o
+desvio padrão das Bandas de Bollinger usa ``ddof=1``.
+
+A vela mais recente é tratada como "aberta": atualizações com o mesmo ``open_time``
+substituem seu valor sem alterar o estado confirmado; quando chega uma vela com
+``open_time`` posterior, a anterior é confirmada no estado.
+"""
+import math
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from src.analysis.technical_indicators import TechnicalIndicators, OHLCV_COLUMNS
+
+logger = logging.getLogger("robot-crypt")
+
+NAN = float('nan')
+
+
+class _RollingWindow:
+    """Janela móvel de tamanho fixo com média e desvio padrão em O(1)
+
+    Guarda apenas os ``size - 1`` últimos valores confirmados; o valor da vela aberta
+    entra no cálculo via ``mean_with``/``std_with`` sem alterar o estado. Assim como
+    ``pandas.Series.rolling``, o resultado é NaN enquanto a janela não estiver cheia
+    ou se contiver algum NaN.
+    """
+
+    # Recalcula as somas a partir da janela a cada N inserções para evitar deriva numérica
+    RESYNC_EVERY = 10000
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.nan_count = 0
+        self.shift = None  # Deslocamento para reduzir cancelamento numérico na variância
+        self._pushes = 0
+
+    def _apply(self, x, sign):
+        if math.isnan(x):
+            self.nan_count += sign
+            return
+        if self.shift is None:
+            self.shift = x
+        d = x - self.shift
+        self.sum += sign * d
+        self.sumsq += sign * d * d
+
+    def push(self, x):
+        """Confirma um novo valor na janela"""
+        if self.size <= 1:
+            return
+        self.values.append(x)
+        self._apply(x, 1)
+        if len(self.values) > self.size - 1:
+            self._apply(self.values.popleft(), -1)
+
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            self.sum = self.sumsq = 0.0
+            self.nan_count = 0
+            for value in self.values:
+                self._apply(value, 1)
+
+    def _totals_with(self, x):
+        if len(self.values) + 1 < self.size or self.nan_count or math.isnan(x):
+            return None
+        shift = self.shift if self.shift is not None else x
+        d = x - shift
+        return shift, self.sum + d, self.sumsq + d * d
+
+    def mean_with(self, x):
+        """Média da janela terminando no valor ``x`` (não confirmado)"""
+        totals = self._totals_with(x)
+        if totals is None:
+            return NAN
+        shift, total, _ = totals
+        return shift + total / self.size
+
+    def std_with(self, x):
+        """Desvio padrão amostral (ddof=1) da janela terminando em ``x``"""
+        totals = self._totals_with(x)
+        if totals is None or self.size < 2:
+            return NAN
+        _, total, total_sq = totals
+        variance = (total_sq - total * total / self.size) / (self.size - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class _RollingExtreme:
+    """Mínimo ou máximo móvel em O(1) amortizado (deque monotônica)"""
+
+    def __init__(self, size, mode='min'):
+        self.size = size
+        self.is_min = mode == 'min'
+        self.items = deque()  # (índice, valor) com valores monotônicos
+        self.count = 0        # Número de valores confirmados
+
+    def _better(self, a, b):
+        return a <= b if self.is_min else a >= b
+
+    def _evict(self):
+        # A janela da próxima vela (índice self.count) começa em count - size + 1
+        start = self.count - self.size + 1
+        while self.items and self.items[0][0] < start:
+            self.items.popleft()
+
+    def push(self, x):
+        """Confirma um novo valor"""
+        while self.items and self._better(x, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.count, x))
+        self.count += 1
+        self._evict()
+
+    def value_with(self, x):
+        """Extremo da janela terminando no valor ``x`` (não confirmado)"""
+        if self.count + 1 < self.size:
+            return NAN
+        if not self.items:
+            return x
+        front = self.items[0][1]
+        return front if self._better(front, x) else x
+
+
+class _EMA:
+    """Média móvel exponencial equivalente a ``ewm(span, adjust=False)``"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def value_with(self, x):
+        if self.value is None:
+            return x
+        return self.alpha * x + (1.0 - self.alpha) * self.value
+
+    def push(self, x):
+        self.value = self.value_with(x)
+
+
+class IncrementalIndicatorEngine:
+    """Estado incremental dos indicadores de um par (símbolo, intervalo)
+
+    Args:
+        symbol (str): Par de moedas (ex: 'BTCUSDT')
+        interval (str): Intervalo das velas (ex: '1h')
+    """
+
+    def __init__(self, symbol=None, interval=None):
+        self.symbol = symbol
+        self.interval = interval
+        # O motor não é thread-safe; o registro serializa o acesso por motor
+        self.lock = threading.Lock()
+
+        # Estado confirmado (velas fechadas)
+        self.prev_close = None
+        self.candles_committed = 0
+        self.ema_fast = _EMA(12)
+        self.ema_slow = _EMA(26)
+        self.macd_signal = _EMA(9)
+        self.ema_9 = _EMA(9)
+        self.ema_21 = _EMA(21)
+        self.rsi_ups = _RollingWindow(14)
+        self.rsi_downs = _RollingWindow(14)
+        self.bollinger = _RollingWindow(20)
+        self.stoch_low = _RollingExtreme(14, 'min')
+        self.stoch_high = _RollingExtreme(14, 'max')
+        self.stoch_k = _RollingWindow(3)
+        self.sma_50 = _RollingWindow(50)
+        self.sma_200 = _RollingWindow(200)
+        self.atr = _RollingWindow(14)
+
+        # Vela aberta (ainda não confirmada) e valores derivados
+        self._open_candle = None
+        self._open_values = None
+        self._open_inputs = None
+        self._previous_values = None
+
+    @staticmethod
+    def _parse_kline(kline):
+        if isinstance(kline, dict):
+            return (
+                int(kline['open_time']),
+                float(kline['open']),
+                float(kline['high']),
+                float(kline['low']),
+                float(kline['close']),
+                float(kline['volume'])
+            )
+        return (int(kline[0]), float(kline[1]), float(kline[2]), float(kline[3]),
+                float(kline[4]), float(kline[5]))
+
+    def _compute(self, candle):
+        """Calcula os indicadores da vela aberta sem alterar o estado confirmado"""
+        _, _, high, low, close, _ = candle
+
+        if self.prev_close is None:
+            delta = NAN
+            true_range = high - low
+        else:
+            delta = close - self.prev_close
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        up = NAN if math.isnan(delta) else max(delta, 0.0)
+        down = NAN if math.isnan(delta) else abs(min(delta, 0.0))
+        avg_up = self.rsi_ups.mean_with(up)
+        avg_down = self.rsi_downs.mean_with(down)
+        if math.isnan(avg_up) or math.isnan(avg_down) or (avg_up == 0 and avg_down == 0):
+            rsi = NAN
+        elif avg_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100.0 - (100.0 / (1.0 + avg_up / avg_down))
+
+        fast = self.ema_fast.value_with(close)
+        slow = self.ema_slow.value_with(close)
+        macd = fast - slow
+        signal = self.macd_signal.value_with(macd)
+
+        middle = self.bollinger.mean_with(close)
+        std = self.bollinger.std_with(close)
+
+        low_min = self.stoch_low.value_with(low)
+        high_max = self.stoch_high.value_with(high)
+        span = high_max - low_min
+        if math.isnan(span) or span == 0:
+            stoch_k = NAN
+        else:
+            stoch_k = 100.0 * ((close - low_min) / span)
+        stoch_d = self.stoch_k.mean_with(stoch_k)
+
+        values = {
+            'close': close,
+            'rsi': rsi,
+            'macd': macd,
+            'signal': signal,
+            'histogram': macd - signal,
+            'bb_upper': middle + std * 2,
+            'bb_middle': middle,
+            'bb_lower': middle - std * 2,
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'ema_9': self.ema_9.value_with(close),
+            'ema_21': self.ema_21.value_with(close),
+            'sma_50': self.sma_50.mean_with(close),
+            'sma_200': self.sma_200.mean_with(close),
+            'atr': self.atr.mean_with(true_range)
+        }
+        inputs = {
+            'close': close, 'high': high, 'low': low, 'up': up, 'down': down,
+            'macd': macd, 'stoch_k': stoch_k, 'true_range': true_range
+        }
+        return values, inputs
+
+    def _commit_open_candle(self):
+        """Confirma a vela aberta no estado incremental"""
+        inputs = self._open_inputs
+        close = inputs['close']
+
+        self.rsi_ups.push(inputs['up'])
+        self.rsi_downs.push(inputs['down'])
+        self.ema_fast.push(close)
+        self.ema_slow.push(close)
+        self.macd_signal.push(inputs['macd'])
+        self.ema_9.push(close)
+        self.ema_21.push(close)
+        self.bollinger.push(close)
+        self.stoch_low.push(inputs['low'])
+        self.stoch_high.push(inputs['high'])
+        self.stoch_k.push(inputs['stoch_k'])
+        self.sma_50.push(close)
+        self.sma_200.push(close)
+        self.atr.push(inputs['true_range'])
+
+        self.prev_close = close
+        self.candles_committed += 1
+        self._previous_values = self._open_values
+
+    def update(self, kline):
+        """
+        Processa uma vela nova ou a atualização da vela aberta
+
+        Args:
+            kline (list | dict): Vela no formato da Binance ou dicionário OHLCV com 'open_time'
+
+        Returns:
+            bool: True se a vela foi aplicada, False se era mais antiga que a vela aberta
+        """
+        candle = self._parse_kline(kline)
+
+        if self._open_candle is not None:
+            if candle[0] < self._open_candle[0]:
+                logger.debug(f"Vela antiga ignorada para {self.symbol} {self.interval}: {candle[0]}")
+                return False
+            if candle[0] > self._open_candle[0]:
+                self._commit_open_candle()
+
+        self._open_candle = candle
+        self._open_values, self._open_inputs = self._compute(candle)
+        return True
+
+    def update_many(self, klines):
+        """Aplica uma sequência de velas em ordem (ex: aquecimento com histórico REST)"""
+        for kline in klines:
+            self.update(kline)
+        return self
+
+    @classmethod
+    def from_klines(cls, klines, symbol=None, interval=None):
+        """Cria um motor já aquecido com o histórico de velas"""
+        return cls(symbol, interval).update_many(klines)
+
+    @property
+    def candle_count(self):
+        """Número total de velas conhecidas (confirmadas + aberta)"""
+        return self.candles_committed + (1 if self._open_candle is not None else 0)
+
+    def latest_data(self):
+        """
+        Retorna o dicionário no mesmo formato de ``TechnicalIndicators.calculate_all_indicators``
+
+        Returns:
+            dict: Indicadores da vela mais recente com sinais técnicos, ou {} se
+                  houver menos de duas velas
+        """
+        if self._open_candle is None or self._previous_values is None:
+            return {}
+
+        price = dict(zip(OHLCV_COLUMNS, self._open_candle[1:]))
+        timestamp = datetime.fromtimestamp(self._open_candle[0] / 1000)
+
+        latest = TechnicalIndicators.build_latest_data(
+            timestamp, price, self._open_values, self._previous_values
+        )
+        latest['technical_signals'] = TechnicalIndicators.analyze_signals(latest)
+        return latest
+
+
+class IncrementalIndicatorRegistry:
+    """Registro thread-safe de motores incrementais por (símbolo, intervalo)"""
+
+    def __init__(self):
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol, interval):
+        """Retorna (criando se necessário) o motor do par"""
+        key = (symbol, interval)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = IncrementalIndicatorEngine(symbol, interval)
+                self._engines[key] = engine
+            return engine
+
+    def update(self, symbol, interval, kline):
+        """Aplica uma vela ao motor do par e retorna o ``latest_data`` atualizado"""
+        engine = self.get(symbol, interval)
+        with engine.lock:
+            engine.update(kline)
+            return engine.latest_data()
+
+    def update_many(self, symbol, interval, klines):
+        """Aplica velas em ordem ao motor do par, sem montar o ``latest_data``"""
+        engine = self.get(symbol, interval)
+        with engine.lock:
+            engine.update_many(klines)
+
+    def latest_data(self, symbol, interval):
+        """Retorna o ``latest_data`` do par, ou {} se ele ainda não tem velas"""
+        with self._lock:
+            engine = self._engines.get((symbol, interval))
+        if engine is None:
+            return {}
+        with engine.lock:
+            return engine.latest_data()
+
+    def reset(self, symbol=None, interval=None):
+        """Descarta o estado de um par (ou de todos, sem argumentos)"""
+        with self._lock:
+            if symbol is None:
+                self._engines.clear()
+            else:
+                self._engines.pop((symbol, interval), None)
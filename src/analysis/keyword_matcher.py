@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Casamento de várias tabelas de palavras-chave em uma única passagem pelo texto
+
+As palavras-chave (categorias, polaridade, nomes e tickers de moedas) são quebradas
+em tokens e indexadas pelo primeiro token uma única vez. Cada texto é tokenizado por
+uma regex compilada e percorrido uma vez: para cada token há uma consulta ao índice
+e, só em caso de acerto, a comparação dos tokens seguintes das expressões com várias
+palavras. O casamento respeita limites de palavra ("eth" não casa dentro de
+"ethics" nem "up" dentro de "support"). Tabelas em ``inflected`` também casam as
+flexões comuns em inglês da última palavra de cada expressão ("crash" casa
+"crashes"/"crashed", "fall" casa "falling"/"fell"), geradas na construção do índice.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Sequências de letras/dígitos; hífens, pontuação e "$" separam palavras
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Nomes das moedas mais comuns por símbolo
+COIN_NAMES = {
+    'BTC': ['bitcoin'],
+    'ETH': ['ethereum'],
+    'BNB': ['binance coin'],
+    'ADA': ['cardano'],
+    'SOL': ['solana'],
+    'DOGE': ['dogecoin'],
+    'SHIB': ['shiba inu'],
+    'MATIC': ['polygon'],
+    'AVAX': ['avalanche'],
+    'LINK': ['chainlink']
+}
+
+# Moedas de cotação removidas de pares como "BTCUSDT"
+QUOTE_ASSETS = ('USDT', 'BUSD', 'USDC', 'FDUSD', 'BRL')
+
+VOWELS = frozenset('aeiou')
+
+# Formas irregulares das palavras de polaridade mais comuns
+IRREGULAR_FORMS = {
+    'fall': ('fell', 'fallen'),
+    'rise': ('rose', 'risen'),
+    'sell': ('sold',),
+    'win': ('won',),
+    'lose': ('lost',),
+    'grow': ('grew', 'grown'),
+    'buy': ('bought',),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra o texto em palavras (letras e dígitos), preservando maiúsculas"""
+    return TOKEN_PATTERN.findall(text) if text else []
+
+
+def inflections(word: str) -> Set[str]:
+    """
+    Flexões regulares (plural, 3ª pessoa, passado, gerúndio) de uma palavra em inglês
+
+    Gera também as variantes com consoante dobrada ("drop" -> "dropped") e as formas
+    irregulares de IRREGULAR_FORMS. Palavras com dígitos ou uma letra não flexionam.
+    """
+    if len(word) < 2 or not word.isalpha():
+        return set()
+    forms = set(IRREGULAR_FORMS.get(word, ()))
+    stem = word[:-1]
+    if word[-1] == 'y' and word[-2] not in VOWELS:
+        forms.update((stem + 'ies', stem + 'ied', word + 'ing'))
+    elif word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        forms.update((word + 'es', word + 'ed', word + 'ing'))
+    elif word[-1] == 'e':
+        forms.update((word + 's', word + 'd', (word if word.endswith('ee') else stem) + 'ing'))
+    else:
+        forms.update((word + 's', word + 'ed', word + 'ing'))
+        # Consoante final dobrada: "drop" -> "dropped", "ban" -> "banning"
+        if word[-1] not in VOWELS | {'w', 'x', 'y'} and word[-2] in VOWELS \
+                and (len(word) == 2 or word[-3] not in VOWELS):
+            forms.update((word + word[-1] + 'ed', word + word[-1] + 'ing'))
+    forms.discard(word)
+    return forms
+
+
+@dataclass
+class KeywordMatches:
+    """Resultado de ``KeywordMatcher.match`` para um texto"""
+    # tabela -> rótulo -> ocorrências
+    counts: Dict[str, Counter] = field(default_factory=dict)
+    # tabela -> rótulo -> palavras-chave distintas encontradas
+    keywords: Dict[str, Dict[str, Set[str]]] = field(default_factory=dict)
+    # tabela -> rótulos na ordem da primeira ocorrência
+    order: Dict[str, List[str]] = field(default_factory=dict)
+    token_count: int = 0
+
+    def count(self, table: str, label: str, distinct: bool = False) -> int:
+        """Ocorrências de um rótulo (ou palavras-chave distintas com ``distinct``)"""
+        if distinct:
+            return len(self.keywords.get(table, {}).get(label, ()))
+        return self.counts.get(table, Counter())[label]
+
+    def labels(self, table: str) -> List[str]:
+        """Rótulos da tabela encontrados no texto, na ordem em que aparecem"""
+        return list(self.order.get(table, ()))
+
+
+class KeywordMatcher:
+    """
+    Matcher compilado para várias tabelas de palavras-chave
+
+    ``tables`` mapeia o nome da tabela para ``{rótulo: [palavras-chave]}``, por exemplo
+    ``{'sentiment': {'positive': [...], 'negative': [...]}, 'symbol': {'BTC': ['bitcoin']}}``.
+    Tabelas em ``case_sensitive`` só casam com a grafia exata (útil para tickers como
+    "LINK", que em minúsculas é uma palavra comum). Tabelas em ``inflected`` casam
+    também as flexões da última palavra de cada expressão (ver ``inflections``),
+    como o antigo casamento por substring fazia para "crashes" ou "losses".
+    """
+
+    def __init__(self, tables: Mapping[str, Mapping[str, Iterable[str]]],
+                 case_sensitive: Iterable[str] = (), inflected: Iterable[str] = ()):
+        self.tables = {name: {label: list(words) for label, words in table.items()}
+                       for name, table in tables.items()}
+        self.case_sensitive = frozenset(case_sensitive)
+        self.inflected = frozenset(inflected) - self.case_sensitive
+
+        # primeiro token -> [(tokens restantes, ((tabela, rótulo, palavra-chave), ...))]
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], Tuple[Tuple[str, str, str], ...]]]] = {}
+        self._exact_index: Dict[str, List[Tuple[Tuple[str, ...], Tuple[Tuple[str, str, str], ...]]]] = {}
+
+        phrases: Dict[Tuple[bool, Tuple[str, ...]], List[Tuple[str, str, str]]] = {}
+        for name, table in self.tables.items():
+            exact = name in self.case_sensitive
+            for label, words in table.items():
+                for word in words:
+                    tokens = tuple(tokenize(word if exact else word.lower()))
+                    if not tokens:
+                        continue
+                    phrases.setdefault((exact, tokens), []).append((name, label, word))
+                    if name in self.inflected:
+                        for form in inflections(tokens[-1]):
+                            phrases.setdefault((exact, tokens[:-1] + (form,)), []).append((name, label, word))
+
+        for (exact, tokens), entries in phrases.items():
+            index = self._exact_index if exact else self._index
+            index.setdefault(tokens[0], []).append((tokens[1:], tuple(entries)))
+
+    def match(self, text: str) -> KeywordMatches:
+        """
+        Encontra todas as palavras-chave de todas as tabelas em uma passagem
+
+        Args:
+            text: Texto a analisar (título, descrição, etc.)
+
+        Returns:
+            KeywordMatches com ocorrências, palavras-chave distintas e ordem por tabela
+        """
+        tokens = tokenize(text)
+        lowered = [token.lower() for token in tokens] if self._index else tokens
+        result = KeywordMatches(token_count=len(tokens))
+        index, exact_index = self._index, self._exact_index
+
+        for i in range(len(tokens)):
+            candidates = index.get(lowered[i]) if index else None
+            if candidates:
+                self._collect(result, candidates, lowered, i)
+            candidates = exact_index.get(tokens[i]) if exact_index else None
+            if candidates:
+                self._collect(result, candidates, tokens, i)
+
+        return result
+
+    @staticmethod
+    def _collect(result: KeywordMatches, candidates, tokens: List[str], i: int):
+        for rest, entries in candidates:
+            if rest and tuple(tokens[i + 1:i + 1 + len(rest)]) != rest:
+                continue
+            for name, label, word in entries:
+                counts = result.counts.get(name)
+                if counts is None:
+                    counts = result.counts[name] = Counter()
+                    result.keywords[name] = {}
+                    result.order[name] = []
+                if label not in counts:
+                    result.order[name].append(label)
+                counts[label] += 1
+                result.keywords[name].setdefault(label, set()).add(word)
+
+
+def symbol_table(symbols: Iterable[str],
+                 names: Optional[Mapping[str, Iterable[str]]] = None) -> Dict[str, List[str]]:
+    """
+    Monta ``{símbolo: [palavras-chave]}`` com o ticker e os nomes de cada símbolo
+
+    Pares de negociação como "BTCUSDT" ou "BTC/USDT" viram o ativo base ("BTC").
+
+    Args:
+        symbols: Tickers ou pares de negociação
+        names: Nomes por símbolo (default: COIN_NAMES)
+    """
+    names = COIN_NAMES if names is None else names
+    table: Dict[str, List[str]] = {}
+    for symbol in symbols:
+        base = re.split(r"[/\-]", symbol.upper())[0]
+        for quote in QUOTE_ASSETS:
+            if base.endswith(quote) and len(base) > len(quote):
+                base = base[:-len(quote)]
+                break
+        table.setdefault(base, [base, *names.get(base, ())])
+    return table
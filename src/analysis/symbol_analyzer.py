@@ -9,6 +9,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 
 from src.database.postgres_manager import PostgresManager
@@ -89,7 +90,8 @@ class SymbolAnalyzer:
             'min_confidence_threshold': 0.6,
             'signal_expiry_minutes': 15,
             'volatility_window': 20,
-            'volume_threshold_multiplier': 1.5
+            'volume_threshold_multiplier': 1.5,
+            'fetch_workers': 8  # Buscas simultâneas na API em analyze_symbols
         }
 
     def analyze_symbol(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Dict[str, Any]:
@@ -113,8 +115,13 @@ class SymbolAnalyzer:
                 self.logger.error(f"Não foi possível obter dados de mercado para {symbol}")
                 return {}
             
-            # 2. Processar dados e calcular indicadores
-            processed_data = self.process_data(market_data)
+            # 2. Processar dados e calcular indicadores (mantidos pelo feed WebSocket
+            # quando disponível; senão recalculados sobre a janela inteira)
+            streamed = self._streamed_indicators(symbol, timeframe)
+            if streamed:
+                processed_data = self._build_processed_data(market_data, streamed)
+            else:
+                processed_data = self.process_data(market_data)
             if not processed_data:
                 self.logger.error(f"Erro no processamento de dados para {symbol}")
                 return {}
@@ -154,6 +161,96 @@ class SymbolAnalyzer:
             self.logger.error(f"Erro na análise de {symbol}: {str(e)}")
             return {}
 
+    def analyze_symbols(self, symbols: List[str], timeframe: str = '1h', limit: int = 100) -> Dict[str, Dict[str, Any]]:
+        """
+        Análise de vários símbolos em lote
+        
+        Os candles são buscados em paralelo, os indicadores técnicos são calculados
+        em uma única passada sobre o painel símbolo x tempo e todas as análises e
+        sinais são gravados no banco em um INSERT de várias linhas por tabela.
+        
+        Args:
+            symbols: Símbolos dos pares de trading
+            timeframe: Timeframe para análise
+            limit: Número de candles para análise
+            
+        Returns:
+            Dict símbolo -> análise no mesmo formato de ``analyze_symbol``
+            ({} para símbolos sem dados ou com erro)
+        """
+        results = {symbol: {} for symbol in symbols}
+        
+        try:
+            self.logger.info(f"Iniciando análise em lote de {len(symbols)} símbolos ({timeframe})")
+            
+            # 1. Buscar dados de mercado de todos os símbolos
+            market_data = self.fetch_market_data_batch(symbols, timeframe, limit)
+            
+            # 2. Indicadores técnicos: os mantidos pelo feed WebSocket são usados como
+            # estão e os demais são calculados de uma vez; um símbolo com dados
+            # inválidos é descartado sem derrubar o lote
+            technical = {}
+            klines = {}
+            for symbol, data in market_data.items():
+                if not data:
+                    continue
+                streamed = self._streamed_indicators(symbol, timeframe)
+                if streamed:
+                    technical[symbol] = streamed
+                    continue
+                try:
+                    klines[symbol] = self._to_klines(data)
+                except Exception as e:
+                    self.logger.error(f"Dados de mercado inválidos para {symbol}: {str(e)}")
+                    market_data[symbol] = []
+            if klines:
+                technical.update(self.technical.calculate_all_indicators_batch(klines))
+            
+            all_signals = []
+            for symbol in symbols:
+                try:
+                    if not market_data.get(symbol):
+                        self.logger.error(f"Não foi possível obter dados de mercado para {symbol}")
+                        continue
+                    
+                    processed_data = self._build_processed_data(market_data[symbol], technical.get(symbol))
+                    if not processed_data:
+                        self.logger.error(f"Erro no processamento de dados para {symbol}")
+                        continue
+                    
+                    # 3. Sinais, risco e oportunidade (por símbolo, mesmo formato de analyze_symbol)
+                    signals = self.generate_signals(symbol, processed_data)
+                    risk_analysis = self.analyze_risk(symbol, processed_data)
+                    opportunity_analysis = self.analyze_opportunity(symbol, processed_data)
+                    
+                    results[symbol] = {
+                        'symbol': symbol,
+                        'timeframe': timeframe,
+                        'timestamp': datetime.now().isoformat(),
+                        'market_data': processed_data,
+                        'signals': signals,
+                        'risk_analysis': risk_analysis,
+                        'opportunity_analysis': opportunity_analysis,
+                        'summary': self._create_analysis_summary(processed_data, signals, risk_analysis, opportunity_analysis)
+                    }
+                    all_signals.extend(signals)
+                    
+                except Exception as e:
+                    self.logger.error(f"Erro na análise de {symbol}: {str(e)}")
+                    results[symbol] = {}
+            
+            # 4. Gravar análises e sinais em lote
+            self.record_analyses_batch({symbol: analysis for symbol, analysis in results.items() if analysis})
+            self.record_signals_batch(all_signals)
+            
+            analyzed = sum(1 for analysis in results.values() if analysis)
+            self.logger.info(f"Análise em lote finalizada: {analyzed}/{len(symbols)} símbolos, {len(all_signals)} sinais gerados")
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Erro na análise em lote: {str(e)}")
+            return results
+
     def fetch_market_data(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> List[Dict]:
         """
         Busca dados de mercado do banco de dados ou API
@@ -181,7 +278,7 @@ class SymbolAnalyzer:
             if api_data:
                 # Salva os dados no banco para uso futuro
                 self.db.save_price_history_batch(symbol, api_data, timeframe)
-                return api_data
+                return self._klines_to_market_data(symbol, api_data, timeframe)
             
             return []
             
@@ -189,6 +286,107 @@ class SymbolAnalyzer:
             self.logger.error(f"Erro ao buscar dados de mercado para {symbol}: {str(e)}")
             return []
 
+    def fetch_market_data_batch(self, symbols: List[str], timeframe: str = '1h', limit: int = 100) -> Dict[str, List[Dict]]:
+        """
+        Busca dados de mercado de vários símbolos
+        
+        O banco é consultado símbolo a símbolo (o cursor do PostgresManager não é
+        compartilhado entre threads); os símbolos sem dados suficientes no banco
+        são buscados da API em paralelo.
+        
+        Args:
+            symbols: Símbolos dos pares
+            timeframe: Timeframe dos dados
+            limit: Quantidade de dados
+            
+        Returns:
+            Dict símbolo -> lista de dados OHLCV ([] se indisponível)
+        """
+        market_data = {symbol: [] for symbol in symbols}
+        missing = []
+        
+        for symbol in symbols:
+            try:
+                db_data = self.db.get_price_history(symbol, timeframe, limit)
+                if db_data and len(db_data) >= limit * 0.8:
+                    market_data[symbol] = db_data
+                else:
+                    missing.append(symbol)
+            except Exception as e:
+                self.logger.error(f"Erro ao buscar dados de mercado para {symbol}: {str(e)}")
+                missing.append(symbol)
+        
+        if not missing:
+            return market_data
+        
+        self.logger.info(f"Buscando dados da API da Binance para {len(missing)} símbolos")
+        
+        def fetch(symbol):
+            try:
+                return self.binance.get_klines(symbol, timeframe, limit)
+            except Exception as e:
+                self.logger.error(f"Erro ao buscar dados da API para {symbol}: {str(e)}")
+                return []
+        
+        workers = max(1, min(self.config['fetch_workers'], len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            api_results = list(executor.map(fetch, missing))
+        
+        for symbol, api_data in zip(missing, api_results):
+            if api_data:
+                try:
+                    self.db.save_price_history_batch(symbol, api_data, timeframe)
+                except Exception as e:
+                    self.logger.error(f"Erro ao salvar histórico de preços de {symbol}: {str(e)}")
+                try:
+                    market_data[symbol] = self._klines_to_market_data(symbol, api_data, timeframe)
+                except Exception as e:
+                    self.logger.error(f"Dados da API inválidos para {symbol}: {str(e)}")
+        
+        return market_data
+
+    @staticmethod
+    def _klines_to_market_data(symbol: str, klines: List, timeframe: str) -> List[Dict]:
+        """
+        Converte klines brutas da Binance para o formato de ``get_price_history``
+        
+        Dicionários já no formato OHLCV são mantidos como estão.
+        """
+        market_data = []
+        for kline in klines:
+            if isinstance(kline, dict):
+                market_data.append(kline)
+                continue
+            market_data.append({
+                'symbol': symbol,
+                'open_time': datetime.fromtimestamp(int(kline[0]) / 1000),
+                'open': float(kline[1]),
+                'high': float(kline[2]),
+                'low': float(kline[3]),
+                'close': float(kline[4]),
+                'volume': float(kline[5]),
+                'interval': timeframe
+            })
+        return market_data
+
+    def _streamed_indicators(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """
+        Indicadores mantidos incrementalmente pelo feed WebSocket do cliente
+        
+        Returns:
+            Mesmo formato de ``calculate_all_indicators``, ou None se o cliente não
+            tiver feed ativo para o par (o chamador recalcula a partir das velas)
+        """
+        get_indicators = getattr(self.binance, 'get_indicators', None)
+        if get_indicators is None:
+            return None
+        try:
+            indicators = get_indicators(symbol, timeframe)
+        except Exception as e:
+            self.logger.debug(f"Indicadores do feed indisponíveis para {symbol}: {str(e)}")
+            return None
+        return indicators if isinstance(indicators, dict) and indicators else None
+
     def process_data(self, market_data: List[Dict]) -> Dict[str, Any]:
         """
         Processa dados de mercado e calcula indicadores técnicos
@@ -203,22 +401,40 @@ class SymbolAnalyzer:
             if not market_data:
                 return {}
             
-            # Converte dados para formato de klines para análise técnica
-            klines = []
-            for data in market_data:
-                kline = [
-                    int(data['open_time'].timestamp() * 1000) if hasattr(data['open_time'], 'timestamp') else data['open_time'],
-                    str(data['open']),
-                    str(data['high']),
-                    str(data['low']),
-                    str(data['close']),
-                    str(data['volume'])
-                ]
-                klines.append(kline)
-            
             # Calcula todos os indicadores técnicos
-            technical_analysis = self.technical.calculate_all_indicators(klines)
+            technical_analysis = self.technical.calculate_all_indicators(self._to_klines(market_data))
+            return self._build_processed_data(market_data, technical_analysis)
             
+        except Exception as e:
+            self.logger.error(f"Erro no processamento de dados: {str(e)}")
+            return {}
+
+    def _to_klines(self, market_data: List[Dict]) -> List[List]:
+        """Converte dados OHLCV para o formato de klines usado na análise técnica"""
+        return [
+            [
+                int(data['open_time'].timestamp() * 1000) if hasattr(data['open_time'], 'timestamp') else data['open_time'],
+                str(data['open']),
+                str(data['high']),
+                str(data['low']),
+                str(data['close']),
+                str(data['volume'])
+            ]
+            for data in market_data
+        ]
+
+    def _build_processed_data(self, market_data: List[Dict], technical_analysis: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Monta os dados processados a partir dos indicadores técnicos já calculados
+        
+        Args:
+            market_data: Lista de dados OHLCV
+            technical_analysis: Resultado de ``calculate_all_indicators``
+            
+        Returns:
+            Dados processados com indicadores ({} se não houver indicadores)
+        """
+        try:
             if not technical_analysis:
                 self.logger.warning("Não foi possível calcular indicadores técnicos")
                 return {}
@@ -739,19 +955,7 @@ class SymbolAnalyzer:
             
             for signal in signals:
                 # Converte TradingSignal para formato do banco
-                indicators_data = signal.indicators_data.copy()
-                indicators_data['strength'] = signal.strength
-                indicators_data['source'] = signal.source
-                
-                signal_id = self.db.save_trading_signal(
-                    symbol=signal.symbol,
-                    signal_type=signal.signal_type,
-                    strength=signal.strength,
-                    price=signal.price,
-                    source=signal.source,
-                    reasoning=signal.reasoning,
-                    indicators_data=indicators_data
-                )
+                signal_id = self.db.save_trading_signal(**self._signal_record(signal))
                 
                 if signal_id:
                     self.logger.debug(f"Sinal {signal.signal_type} para {signal.symbol} registrado (ID: {signal_id})")
@@ -764,6 +968,93 @@ class SymbolAnalyzer:
             self.logger.error(f"Erro ao registrar sinais: {str(e)}")
             return False
 
+    def _signal_record(self, signal: TradingSignal) -> Dict[str, Any]:
+        """Converte TradingSignal para os argumentos de ``save_trading_signal``"""
+        indicators_data = signal.indicators_data.copy()
+        indicators_data['strength'] = signal.strength
+        indicators_data['source'] = signal.source
+        
+        return {
+            'symbol': signal.symbol,
+            'signal_type': signal.signal_type,
+            'strength': signal.strength,
+            'price': signal.price,
+            'source': signal.source,
+            'reasoning': signal.reasoning,
+            'indicators_data': indicators_data
+        }
+
+    def record_signals_batch(self, signals: List[TradingSignal]) -> bool:
+        """
+        Registra sinais de vários símbolos no banco em um único lote
+        
+        Args:
+            signals: Lista de sinais para registrar
+            
+        Returns:
+            True se sucesso, False caso contrário
+        """
+        try:
+            if not signals:
+                return True
+            
+            saved = self.db.save_batch('trading_signal', [self._signal_record(signal) for signal in signals])
+            if saved != len(signals):
+                self.logger.warning(f"Falha ao registrar lote de sinais ({saved}/{len(signals)})")
+                return False
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar sinais: {str(e)}")
+            return False
+
+    def record_analyses_batch(self, analyses: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Registra análises de vários símbolos no banco em um único lote
+        
+        Args:
+            analyses: Dict símbolo -> dados da análise
+            
+        Returns:
+            True se sucesso, False caso contrário
+        """
+        try:
+            if not analyses:
+                return True
+            
+            records = [
+                {
+                    'symbol': symbol,
+                    'analysis_type': 'complete_technical_analysis',
+                    'data': self._serializable(analysis)
+                }
+                for symbol, analysis in analyses.items()
+            ]
+            saved = self.db.save_batch('analysis', records)
+            if saved != len(records):
+                self.logger.warning(f"Falha ao registrar lote de análises ({saved}/{len(records)})")
+                return False
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar análises: {str(e)}")
+            return False
+
+    def _serializable(self, obj):
+        """Converte datetime (e TradingSignal) em tipos serializáveis em JSON"""
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        elif isinstance(obj, TradingSignal):
+            return self._serializable(asdict(obj))
+        elif isinstance(obj, dict):
+            return {key: self._serializable(value) for key, value in obj.items()}
+        elif isinstance(obj, list):
+            return [self._serializable(item) for item in obj]
+        else:
+            return obj
+
     def record_analysis(self, symbol: str, analysis: Dict[str, Any]) -> bool:
         """
         Registra análise completa no banco de dados
@@ -777,17 +1068,7 @@ class SymbolAnalyzer:
         """
         try:
             # Converte datetime objects para strings para serialização
-            def convert_datetime_to_string(obj):
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                elif isinstance(obj, dict):
-                    return {key: convert_datetime_to_string(value) for key, value in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_datetime_to_string(item) for item in obj]
-                else:
-                    return obj
-            
-            serializable_analysis = convert_datetime_to_string(analysis)
+            serializable_analysis = self._serializable(analysis)
             
             analysis_id = self.db.save_analysis(
                 symbol=symbol,
@@ -2,6 +2,7 @@
 """
 Módulo de indicadores técnicos avançados para análise de mercado
 """
+import time
 import numpy as np
 import pandas as pd
 import logging
@@ -9,42 +10,89 @@ from datetime import datetime
 
 logger = logging.getLogger("robot-crypt")
 
+# Colunas numéricas produzidas por TechnicalIndicators.prepare_data
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
 class TechnicalIndicators:
     """
     Classe para cálculo de indicadores técnicos avançados para análise de mercado
     """
     
     @staticmethod
-    def prepare_data(klines):
+    def allocate_buffer(capacity=1000):
+        """
+        Aloca um buffer reutilizável para ``prepare_data(klines, out=buffer)``
+        
+        Args:
+            capacity (int): Número máximo de velas que o buffer comporta
+            
+        Returns:
+            numpy.ndarray: Matriz float64 (capacity x 5) para open, high, low, close e volume
+        """
+        return np.empty((capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+    
+    @staticmethod
+    def _local_datetime_index(open_times_ms):
+        """
+        Converte open_time (ms desde epoch) em DatetimeIndex no horário local, com o
+        mesmo resultado de ``datetime.fromtimestamp`` mas sem iterar linha a linha
+        
+        O deslocamento UTC é consultado uma vez por intervalo de 15 minutos presente
+        na janela (mudanças de horário ocorrem em múltiplos de 15 minutos), de modo
+        que janelas que atravessam uma ou mais mudanças de horário de verão também
+        ficam corretas.
+        """
+        open_times_ms = np.asarray(open_times_ms, dtype=np.int64)
+        quarters, inverse = np.unique(open_times_ms // 900_000, return_inverse=True)
+        offsets = np.fromiter(
+            (time.localtime(quarter * 900).tm_gmtoff for quarter in quarters.tolist()),
+            dtype=np.int64, count=len(quarters)
+        )
+        local_ns = (open_times_ms + offsets[inverse.ravel()] * 1000) * 1_000_000
+        return pd.DatetimeIndex(local_ns.astype('datetime64[ns]'), name='timestamp')
+    
+    @staticmethod
+    def prepare_data(klines, out=None):
         """
         Prepara os dados de velas da Binance para cálculo de indicadores
         
+        A conversão é colunar: open_time e as colunas OHLCV são convertidas de uma vez
+        para int64/float64, sem criar um dicionário por vela.
+        
         Args:
-            klines (list): Lista de velas no formato da API da Binance
+            klines (list | numpy.ndarray): Lista de velas no formato da API da Binance
+                ou matriz numérica com as colunas [open_time, open, high, low, close, volume, ...]
+            out (numpy.ndarray, optional): Buffer float64 (n x 5) pré-alocado, ver
+                ``allocate_buffer``. Quando informado, o DataFrame retornado é uma view
+                sobre o buffer e será sobrescrito na próxima chamada com o mesmo buffer.
             
         Returns:
             pandas.DataFrame: DataFrame com dados OHLCV
         """
         try:
-            # Extrair dados das velas
-            data = []
-            for k in klines:
+            if isinstance(klines, np.ndarray):
+                open_times = klines[:, 0]
+                values = klines[:, 1:6]
+            else:
                 # Formato padrão da API da Binance:
                 # [open_time, open, high, low, close, volume, ...]
-                data.append({
-                    'timestamp': datetime.fromtimestamp(int(k[0]) / 1000),
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5])
-                })
-            
-            # Criar DataFrame
-            df = pd.DataFrame(data)
-            df.set_index('timestamp', inplace=True)
-            
-            return df
+                columns = list(zip(*klines))
+                open_times = columns[0]
+                values = np.array(columns[1:6], dtype=np.float64).T
+            
+            n = len(open_times)
+            if n == 0:
+                return pd.DataFrame()
+            
+            if out is not None and out.shape[0] >= n and out.shape[1] >= len(OHLCV_COLUMNS):
+                block = out[:n, :len(OHLCV_COLUMNS)]
+                block[:] = values
+            else:
+                block = np.asarray(values, dtype=np.float64)
+            
+            index = TechnicalIndicators._local_datetime_index(open_times)
+            
+            return pd.DataFrame(block, index=index, columns=OHLCV_COLUMNS, copy=False)
         except Exception as e:
             logger.error(f"Erro ao preparar dados para indicadores: {str(e)}")
             return pd.DataFrame()  # Retorna DataFrame vazio em caso de erro
@@ -234,8 +282,8 @@ class TechnicalIndicators:
             high_close = abs(df['high'] - df['close'].shift())
             low_close = abs(df['low'] - df['close'].shift())
             
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
+            # Máximo elemento a elemento ignorando NaN (funciona também para painéis tempo x símbolo)
+            true_range = np.fmax(np.fmax(high_low, high_close), low_close)
             
             # Calcula o ATR
             atr = true_range.rolling(window=period).mean()
@@ -354,77 +402,13 @@ class TechnicalIndicators:
                 logger.warning("Dados vazios ou inválidos para cálculo de indicadores")
                 return {}
             
-            # Calcula indicadores
-            rsi = TechnicalIndicators.calculate_rsi(df)
-            macd, signal, histogram = TechnicalIndicators.calculate_macd(df)
-            upper_band, middle_band, lower_band = TechnicalIndicators.calculate_bollinger_bands(df)
-            stoch_k, stoch_d = TechnicalIndicators.calculate_stochastic_oscillator(df)
-            ema_9 = TechnicalIndicators.calculate_ema(df, 9)
-            ema_21 = TechnicalIndicators.calculate_ema(df, 21)
-            sma_50 = TechnicalIndicators.calculate_sma(df, 50)
-            sma_200 = TechnicalIndicators.calculate_sma(df, 200)
-            atr = TechnicalIndicators.calculate_atr(df)
-            
-            # Obtém os valores mais recentes
-            latest_data = {
-                'timestamp': df.index[-1].isoformat(),
-                'price': {
-                    'open': float(df['open'].iloc[-1]),
-                    'high': float(df['high'].iloc[-1]),
-                    'low': float(df['low'].iloc[-1]),
-                    'close': float(df['close'].iloc[-1]),
-                    'volume': float(df['volume'].iloc[-1])
-                },
-                'indicators': {
-                    'rsi': {
-                        'current': float(rsi.iloc[-1]),
-                        'previous': float(rsi.iloc[-2]),
-                        'overbought': rsi.iloc[-1] > 70,
-                        'oversold': rsi.iloc[-1] < 30,
-                        'crossed_up_30': rsi.iloc[-2] < 30 and rsi.iloc[-1] > 30,
-                        'crossed_down_70': rsi.iloc[-2] > 70 and rsi.iloc[-1] < 70
-                    },
-                    'macd': {
-                        'macd': float(macd.iloc[-1]),
-                        'signal': float(signal.iloc[-1]),
-                        'histogram': float(histogram.iloc[-1]),
-                        'crossed_up': macd.iloc[-2] < signal.iloc[-2] and macd.iloc[-1] > signal.iloc[-1],
-                        'crossed_down': macd.iloc[-2] > signal.iloc[-2] and macd.iloc[-1] < signal.iloc[-1]
-                    },
-                    'bollinger_bands': {
-                        'upper': float(upper_band.iloc[-1]),
-                        'middle': float(middle_band.iloc[-1]),
-                        'lower': float(lower_band.iloc[-1]),
-                        'bandwidth': float((upper_band.iloc[-1] - lower_band.iloc[-1]) / middle_band.iloc[-1]),
-                        'above_upper': df['close'].iloc[-1] > upper_band.iloc[-1],
-                        'below_lower': df['close'].iloc[-1] < lower_band.iloc[-1]
-                    },
-                    'stochastic': {
-                        'k': float(stoch_k.iloc[-1]),
-                        'd': float(stoch_d.iloc[-1]),
-                        'overbought': stoch_k.iloc[-1] > 80,
-                        'oversold': stoch_k.iloc[-1] < 20,
-                        'crossed_up': stoch_k.iloc[-2] < stoch_d.iloc[-2] and stoch_k.iloc[-1] > stoch_d.iloc[-1],
-                        'crossed_down': stoch_k.iloc[-2] > stoch_d.iloc[-2] and stoch_k.iloc[-1] < stoch_d.iloc[-1]
-                    },
-                    'moving_averages': {
-                        'ema_9': float(ema_9.iloc[-1]),
-                        'ema_21': float(ema_21.iloc[-1]),
-                        'sma_50': float(sma_50.iloc[-1]),
-                        'sma_200': float(sma_200.iloc[-1]),
-                        'ema_9_crossed_up_ema_21': ema_9.iloc[-2] < ema_21.iloc[-2] and ema_9.iloc[-1] > ema_21.iloc[-1],
-                        'ema_9_crossed_down_ema_21': ema_9.iloc[-2] > ema_21.iloc[-2] and ema_9.iloc[-1] < ema_21.iloc[-1],
-                        'price_above_sma_200': df['close'].iloc[-1] > sma_200.iloc[-1],
-                        'golden_cross': sma_50.iloc[-2] < sma_200.iloc[-2] and sma_50.iloc[-1] > sma_200.iloc[-1],
-                        'death_cross': sma_50.iloc[-2] > sma_200.iloc[-2] and sma_50.iloc[-1] < sma_200.iloc[-1]
-                    },
-                    'atr': {
-                        'current': float(atr.iloc[-1]),
-                        'relative': float(atr.iloc[-1] / df['close'].iloc[-1])  # ATR relativo ao preço
-                    }
-                },
-                'calculated_at': datetime.now().isoformat()
-            }
+            # Calcula indicadores e obtém os valores mais recentes (última e penúltima vela)
+            series = TechnicalIndicators._indicator_series(df)
+            current = {name: values.iloc[-1] for name, values in series.items()}
+            previous = {name: values.iloc[-2] for name, values in series.items()}
+            price = {column: float(df[column].iloc[-1]) for column in OHLCV_COLUMNS}
+            
+            latest_data = TechnicalIndicators.build_latest_data(df.index[-1], price, current, previous)
             
             # Adiciona análise técnica agregada (possíveis sinais)
             latest_data['technical_signals'] = TechnicalIndicators.analyze_signals(latest_data)
@@ -435,6 +419,173 @@ class TechnicalIndicators:
             logger.error(f"Erro ao calcular todos os indicadores: {str(e)}")
             return {}
     
+    @staticmethod
+    def _indicator_series(df):
+        """
+        Calcula as séries de indicadores usadas por ``build_latest_data``
+        
+        Args:
+            df (pandas.DataFrame | dict): Dados OHLCV; cada coluna pode ser uma Series
+                (um símbolo) ou um DataFrame tempo x símbolo (painel)
+            
+        Returns:
+            dict: Nome do indicador -> Series/DataFrame
+        """
+        rsi = TechnicalIndicators.calculate_rsi(df)
+        macd, signal, histogram = TechnicalIndicators.calculate_macd(df)
+        upper_band, middle_band, lower_band = TechnicalIndicators.calculate_bollinger_bands(df)
+        stoch_k, stoch_d = TechnicalIndicators.calculate_stochastic_oscillator(df)
+        
+        return {
+            'close': df['close'],
+            'rsi': rsi,
+            'macd': macd,
+            'signal': signal,
+            'histogram': histogram,
+            'bb_upper': upper_band,
+            'bb_middle': middle_band,
+            'bb_lower': lower_band,
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'ema_9': TechnicalIndicators.calculate_ema(df, 9),
+            'ema_21': TechnicalIndicators.calculate_ema(df, 21),
+            'sma_50': TechnicalIndicators.calculate_sma(df, 50),
+            'sma_200': TechnicalIndicators.calculate_sma(df, 200),
+            'atr': TechnicalIndicators.calculate_atr(df)
+        }
+    
+    @staticmethod
+    def calculate_all_indicators_batch(klines_by_symbol):
+        """
+        Calcula todos os indicadores para vários símbolos em uma única passada vetorizada
+        
+        As velas de cada símbolo são alinhadas pela vela mais recente em matrizes
+        tempo x símbolo (com NaN antes do início de séries mais curtas) e cada
+        indicador é calculado uma vez sobre o painel inteiro.
+        
+        Args:
+            klines_by_symbol (dict): Símbolo -> lista de velas no formato da API da Binance
+            
+        Returns:
+            dict: Símbolo -> mesmo dicionário de ``calculate_all_indicators``
+                ({} para símbolos sem dados suficientes)
+        """
+        results = {symbol: {} for symbol in klines_by_symbol}
+        try:
+            frames = {}
+            for symbol, klines in klines_by_symbol.items():
+                if klines is not None and len(klines) >= 2:
+                    df = TechnicalIndicators.prepare_data(klines)
+                    if len(df) >= 2:
+                        frames[symbol] = df
+            
+            if not frames:
+                return results
+            
+            symbols = list(frames)
+            length = max(len(df) for df in frames.values())
+            block = np.full((len(OHLCV_COLUMNS), length, len(symbols)), np.nan)
+            for k, symbol in enumerate(symbols):
+                values = frames[symbol].to_numpy()
+                block[:, length - len(values):, k] = values.T
+            panel = {
+                column: pd.DataFrame(block[i], columns=symbols)
+                for i, column in enumerate(OHLCV_COLUMNS)
+            }
+            
+            series = TechnicalIndicators._indicator_series(panel)
+            names = list(series)
+            current = np.vstack([series[name].iloc[-1].to_numpy() for name in names])
+            previous = np.vstack([series[name].iloc[-2].to_numpy() for name in names])
+            
+            for k, symbol in enumerate(symbols):
+                df = frames[symbol]
+                price = {column: float(df[column].iloc[-1]) for column in OHLCV_COLUMNS}
+                latest_data = TechnicalIndicators.build_latest_data(
+                    df.index[-1], price,
+                    dict(zip(names, current[:, k])), dict(zip(names, previous[:, k]))
+                )
+                latest_data['technical_signals'] = TechnicalIndicators.analyze_signals(latest_data)
+                results[symbol] = latest_data
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Erro ao calcular indicadores em lote: {str(e)}")
+            return results
+    
+    @staticmethod
+    def build_latest_data(timestamp, price, current, previous):
+        """
+        Monta o dicionário ``latest_data`` consumido por ``analyze_signals``
+        
+        Args:
+            timestamp (datetime): Horário de abertura da vela mais recente
+            price (dict): OHLCV da vela mais recente
+            current (dict): Valores dos indicadores na vela mais recente
+            previous (dict): Valores dos indicadores na vela anterior
+            
+        Returns:
+            dict: Estrutura com preço, indicadores e cruzamentos
+        """
+        cur = {name: np.float64(value) for name, value in current.items()}
+        prev = {name: np.float64(value) for name, value in previous.items()}
+        close = cur['close']
+        
+        return {
+            'timestamp': timestamp.isoformat(),
+            'price': price,
+            'indicators': {
+                'rsi': {
+                    'current': float(cur['rsi']),
+                    'previous': float(prev['rsi']),
+                    'overbought': cur['rsi'] > 70,
+                    'oversold': cur['rsi'] < 30,
+                    'crossed_up_30': prev['rsi'] < 30 and cur['rsi'] > 30,
+                    'crossed_down_70': prev['rsi'] > 70 and cur['rsi'] < 70
+                },
+                'macd': {
+                    'macd': float(cur['macd']),
+                    'signal': float(cur['signal']),
+                    'histogram': float(cur['histogram']),
+                    'crossed_up': prev['macd'] < prev['signal'] and cur['macd'] > cur['signal'],
+                    'crossed_down': prev['macd'] > prev['signal'] and cur['macd'] < cur['signal']
+                },
+                'bollinger_bands': {
+                    'upper': float(cur['bb_upper']),
+                    'middle': float(cur['bb_middle']),
+                    'lower': float(cur['bb_lower']),
+                    'bandwidth': float((cur['bb_upper'] - cur['bb_lower']) / cur['bb_middle']),
+                    'above_upper': close > cur['bb_upper'],
+                    'below_lower': close < cur['bb_lower']
+                },
+                'stochastic': {
+                    'k': float(cur['stoch_k']),
+                    'd': float(cur['stoch_d']),
+                    'overbought': cur['stoch_k'] > 80,
+                    'oversold': cur['stoch_k'] < 20,
+                    'crossed_up': prev['stoch_k'] < prev['stoch_d'] and cur['stoch_k'] > cur['stoch_d'],
+                    'crossed_down': prev['stoch_k'] > prev['stoch_d'] and cur['stoch_k'] < cur['stoch_d']
+                },
+                'moving_averages': {
+                    'ema_9': float(cur['ema_9']),
+                    'ema_21': float(cur['ema_21']),
+                    'sma_50': float(cur['sma_50']),
+                    'sma_200': float(cur['sma_200']),
+                    'ema_9_crossed_up_ema_21': prev['ema_9'] < prev['ema_21'] and cur['ema_9'] > cur['ema_21'],
+                    'ema_9_crossed_down_ema_21': prev['ema_9'] > prev['ema_21'] and cur['ema_9'] < cur['ema_21'],
+                    'price_above_sma_200': close > cur['sma_200'],
+                    'golden_cross': prev['sma_50'] < prev['sma_200'] and cur['sma_50'] > cur['sma_200'],
+                    'death_cross': prev['sma_50'] > prev['sma_200'] and cur['sma_50'] < cur['sma_200']
+                },
+                'atr': {
+                    'current': float(cur['atr']),
+                    'relative': float(cur['atr'] / close)  # ATR relativo ao preço
+                }
+            },
+            'calculated_at': datetime.now().isoformat()
+        }
+    
     @staticmethod
     def analyze_signals(data):
         """
@@ -5,13 +5,23 @@ Analytics Module for Advanced Trading Analytics and Reporting
 from .advanced_analytics import AdvancedAnalytics
 from .ml_models import MLModels
 from .backtesting_engine import BacktestingEngine
+from .parameter_sweep import ParameterSweep
+from .walk_forward import WalkForwardAnalyzer
 from .risk_analytics import RiskAnalytics
+from .streaming_risk import StreamingRiskEngine
+from .monte_carlo import MonteCarloSimulator
 from .report_generator import ReportGenerator
+from .compute_jobs import ComputeJobManager
 
 __all__ = [
     'AdvancedAnalytics',
     'MLModels',
     'BacktestingEngine',
+    'ParameterSweep',
+    'WalkForwardAnalyzer',
     'RiskAnalytics',
-    'ReportGenerator'
+    'StreamingRiskEngine',
+    'MonteCarloSimulator',
+    'ReportGenerator',
+    'ComputeJobManager'
 ]
@@ -247,11 +247,7 @@ class BacktestingEngine:
         self.reset()
         
         # Filtrar dados por período
-        data_subset = self.data.copy()
-        if start_date:
-            data_subset = data_subset[data_subset.index >= start_date]
-        if end_date:
-            data_subset = data_subset[data_subset.index <= end_date]
+        data_subset = self._slice_data(start_date, end_date)
         
         # Executar estratégia para cada timestamp
         for timestamp in data_subset.index:
@@ -280,13 +276,169 @@ class BacktestingEngine:
         
         return self.results
     
-    def _calculate_performance_metrics(self) -> Dict[str, Any]:
+    def _slice_data(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """Filtra os dados carregados pelo período informado"""
+        data_subset = self.data
+        if start_date:
+            data_subset = data_subset[data_subset.index >= start_date]
+        if end_date:
+            data_subset = data_subset[data_subset.index <= end_date]
+        return data_subset.copy()
+    
+    def run_vectorized_backtest(self, signal_strategy: Callable, start_date: Optional[str] = None,
+                                end_date: Optional[str] = None, position_size: float = 0.95,
+                                **strategy_params) -> Dict[str, Any]:
+        """
+        Executa backtesting vetorizado
+        
+        A estratégia recebe o DataFrame completo e devolve a posição-alvo para cada
+        barra: 1 (comprado), 0 (zerado) ou NaN (manter a posição anterior). Fills,
+        comissões, caixa e curva de patrimônio são calculados com operações de array,
+        com a mesma semântica de ``run_backtest`` para estratégias long-only que
+        compram ``position_size`` do caixa e vendem a posição inteira no fechamento.
+        
+        Args:
+            signal_strategy: Função (data, **params) -> array/Series de posições-alvo
+            start_date: Data de início
+            end_date: Data de fim
+            position_size: Fração do caixa usada em cada compra
+            **strategy_params: Parâmetros da estratégia
+            
+        Returns:
+            Resultados do backtesting (mesmo formato de ``run_backtest``)
+        """
+        # Assim como as estratégias por barra (que leem engine.data), os sinais são
+        # calculados sobre todo o histórico e depois recortados para o período
+        target = signal_strategy(self.data, **strategy_params)
+        return self.backtest_positions(target, start_date, end_date, position_size)
+    
+    def backtest_positions(self, target: Union[np.ndarray, pd.Series], start_date: Optional[str] = None,
+                           end_date: Optional[str] = None, position_size: float = 0.95) -> Dict[str, Any]:
+        """
+        Executa backtesting vetorizado a partir de posições-alvo já calculadas
+        
+        Permite reutilizar os sinais de uma estratégia (calculados uma vez sobre
+        todo o histórico) em vários períodos, como nas janelas de walk-forward.
+        
+        Args:
+            target: Posição-alvo por barra de ``self.data`` (1, 0 ou NaN)
+            start_date: Data de início
+            end_date: Data de fim
+            position_size: Fração do caixa usada em cada compra
+            
+        Returns:
+            Resultados do backtesting (mesmo formato de ``run_backtest``)
+        """
+        self.reset()
+        
+        target = np.asarray(target, dtype=np.float64)
+        if target.shape[0] != len(self.data):
+            raise ValueError("A estratégia vetorizada deve retornar uma posição por barra")
+        
+        data_subset = self._slice_data(start_date, end_date)
+        if data_subset.empty:
+            return {}
+        target = target[self.data.index.get_indexer(data_subset.index)]
+        
+        closes = data_subset['close'].to_numpy(dtype=np.float64)
+        history, entries, exits, quantities = self._simulate_long_only(closes, target, position_size)
+        history.index = data_subset.index
+        history.index.name = 'timestamp'
+        
+        # Registra os trades (um por entrada/saída, não por barra)
+        index = data_subset.index
+        for i, (entry, quantity) in enumerate(zip(entries, quantities)):
+            fills = [(entry, OrderType.BUY)]
+            if i < len(exits):
+                fills.append((exits[i], OrderType.SELL))
+            for bar, order_type in fills:
+                price = closes[bar]
+                self.trades.append(Trade(
+                    timestamp=index[bar],
+                    symbol=self.symbol,
+                    order_type=order_type,
+                    quantity=quantity,
+                    price=price,
+                    commission=quantity * price * self.commission,
+                    order_id=f"{len(self.trades)+1:06d}"
+                ))
+        
+        # Estado final do engine
+        self.current_timestamp = index[-1]
+        self.cash = float(history['cash'].iloc[-1])
+        final_quantity = quantities[-1] if len(entries) > len(exits) else 0.0
+        if final_quantity > 0:
+            self.positions[self.symbol] = Position(self.symbol, final_quantity, closes[entries[-1]], index[entries[-1]])
+        
+        self.results = self._calculate_performance_metrics(history)
+        return self.results
+    
+    def _simulate_long_only(self, closes: np.ndarray, target: np.ndarray,
+                            position_size: float) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Simula uma estratégia long-only all-in a partir das posições-alvo
+        
+        A cada ciclo compra/venda o caixa é multiplicado por
+        g = (1 - f(1+c)) + f(1-c) * p_saida / p_entrada, então o caixa antes de cada
+        entrada é um produto acumulado, sem laço por barra.
+        
+        Returns:
+            (histórico, índices de entrada, índices de saída, quantidades)
+        """
+        n = len(closes)
+        c = self.commission
+        # Compras que excedem o caixa são rejeitadas em place_order; limita a fração
+        f = min(position_size, 1.0 / (1.0 + c))
+        
+        # Posição mantida por barra: NaN herda o valor anterior, início zerado
+        held = pd.Series(target).ffill().fillna(0.0).to_numpy() > 0
+        changes = np.diff(held.astype(np.int8), prepend=np.int8(0))
+        entries = np.flatnonzero(changes == 1)
+        exits = np.flatnonzero(changes == -1)
+        
+        entry_prices = closes[entries]
+        exit_prices = closes[exits]
+        closed = len(exits)
+        
+        growth = (1.0 - f * (1.0 + c)) + f * (1.0 - c) * exit_prices / entry_prices[:closed]
+        cash_before_entry = self.initial_capital * np.concatenate(([1.0], np.cumprod(growth)))[:len(entries)]
+        quantities = cash_before_entry * f / entry_prices
+        cash_in_position = cash_before_entry * (1.0 - f * (1.0 + c))
+        cash_after_exit = cash_in_position[:closed] + quantities[:closed] * exit_prices * (1.0 - c)
+        
+        # Caixa e quantidade por barra: valores definidos nos pontos de troca e propagados
+        cash = np.full(n, np.nan)
+        quantity = np.full(n, np.nan)
+        cash[0] = self.initial_capital
+        quantity[0] = 0.0
+        cash[entries] = cash_in_position
+        quantity[entries] = quantities
+        cash[exits] = cash_after_exit
+        quantity[exits] = 0.0
+        cash = pd.Series(cash).ffill().to_numpy()
+        quantity = pd.Series(quantity).ffill().to_numpy()
+        
+        portfolio_value = cash + quantity * closes
+        history = pd.DataFrame({
+            'portfolio_value': portfolio_value,
+            'cash': cash,
+            'positions_value': portfolio_value - cash,
+            'returns': (portfolio_value / self.initial_capital - 1) * 100
+        })
+        return history, entries, exits, quantities
+    
+    def _calculate_performance_metrics(self, history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """Calcula métricas de performance"""
-        if not self.portfolio_history:
+        if history is not None:
+            df = history
+        elif not self.portfolio_history:
             return {}
+        else:
+            df = pd.DataFrame(self.portfolio_history)
+            df.set_index('timestamp', inplace=True)
         
-        df = pd.DataFrame(self.portfolio_history)
-        df.set_index('timestamp', inplace=True)
+        if df.empty:
+            return {}
         
         # Retornos
         df['daily_returns'] = df['portfolio_value'].pct_change()
@@ -684,3 +836,66 @@ def rsi_strategy(engine: BacktestingEngine, current_data: pd.Series,
     elif current_rsi > overbought and current_position.quantity > 0:
         # Sinal de venda - RSI em sobrecompra
         engine.place_order(OrderType.SELL, current_position.quantity)
+
+
+# Estratégias vetorizadas (para run_vectorized_backtest)
+def simple_ma_signals(data: pd.DataFrame, short_window: int = 10, long_window: int = 30) -> np.ndarray:
+    """
+    Versão vetorizada de ``simple_ma_strategy``
+    
+    Args:
+        data: DataFrame com dados OHLCV
+        short_window: Janela da média móvel curta
+        long_window: Janela da média móvel longa
+        
+    Returns:
+        Posição-alvo por barra (1 comprado, 0 zerado, NaN manter)
+    """
+    closes = data['close']
+    short_ma = closes.rolling(window=short_window).mean().to_numpy()
+    long_ma = closes.rolling(window=long_window).mean().to_numpy()
+    
+    target = np.full(len(data), np.nan)
+    target[short_ma > long_ma] = 1.0
+    target[short_ma < long_ma] = 0.0
+    target[:long_window] = np.nan  # Mesmo aquecimento da versão por barra
+    return target
+
+
+def rsi_signals(data: pd.DataFrame, rsi_period: int = 14, oversold: float = 30,
+                overbought: float = 70) -> np.ndarray:
+    """
+    Versão vetorizada de ``rsi_strategy``
+    
+    Args:
+        data: DataFrame com dados OHLCV
+        rsi_period: Período do RSI
+        oversold: Nível de sobrevenda
+        overbought: Nível de sobrecompra
+        
+    Returns:
+        Posição-alvo por barra (1 comprado, 0 zerado, NaN manter)
+    """
+    delta = data['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    rs = gain / loss
+    rsi = (100 - (100 / (1 + rs))).to_numpy()
+    
+    target = np.full(len(data), np.nan)
+    target[rsi < oversold] = 1.0
+    target[rsi > overbought] = 0.0
+    target[:rsi_period] = np.nan
+    return target
+
+
+# Estratégias disponíveis por nome (por barra e vetorizadas)
+STRATEGIES = {
+    'simple_ma': simple_ma_strategy,
+    'rsi': rsi_strategy
+}
+
+VECTORIZED_STRATEGIES = {
+    'simple_ma': simple_ma_signals,
+    'rsi': rsi_signals
+}
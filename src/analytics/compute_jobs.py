@@ -0,0 +1,627 @@
+"""
+Compute Jobs - Execução de cálculos pesados de analytics fora do event loop
+
+Backtests, simulações Monte Carlo, treinamento de modelos e relatórios rodam em um
+``ProcessPoolExecutor``; o handler apenas submete o job e aguarda (ou não) o
+resultado sem bloquear o event loop. Resultados ficam em cache pelo hash da
+configuração da requisição, e requisições idênticas em andamento compartilham o
+mesmo job. O progresso publicado pelos workers chega ao processo principal por uma
+fila e é repassado aos listeners registrados (ex.: WebSocketManager).
+
+Os workers são criados com ``spawn`` (ANALYTICS_JOB_START_METHOD): o processo da API
+tem várias threads e um ``fork`` pode herdar locks ocupados e travar.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+import pandas as pd
+
+from .backtesting_engine import BacktestingEngine, STRATEGIES, VECTORIZED_STRATEGIES
+from .parameter_sweep import ParameterSweep
+from .ml_models import MLModels
+from .report_generator import ReportGenerator
+from .risk_analytics import RiskAnalytics
+
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('pending', 'running', 'completed', 'failed', 'cancelled')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+# Estado de cada processo worker (preenchido em _init_worker/_run_job)
+_worker_state: Dict[str, Any] = {'queue': None, 'cancelled': None, 'job_id': None}
+
+
+class JobCancelled(Exception):
+    """Levantada por ``report_progress`` quando o job corrente foi cancelado"""
+
+
+def _init_worker(progress_queue, cancelled):
+    """Inicializador do pool: guarda a fila de progresso e os cancelamentos do processo principal"""
+    _worker_state['queue'] = progress_queue
+    _worker_state['cancelled'] = cancelled
+
+
+def report_progress(progress: float, stage: Optional[str] = None):
+    """
+    Publica o progresso do job corrente
+
+    Deve ser chamada dentro do worker; fora de um job é ignorada. É também o ponto
+    de cancelamento: se o job foi cancelado, levanta ``JobCancelled`` e o worker
+    fica livre para o próximo job.
+
+    Args:
+        progress: Fração concluída (0 a 1)
+        stage: Descrição curta da etapa atual
+
+    Raises:
+        JobCancelled: Se o job corrente foi cancelado
+    """
+    queue, job_id = _worker_state['queue'], _worker_state['job_id']
+    if queue is None or job_id is None:
+        return
+    try:
+        cancelled = bool(_worker_state['cancelled'] is not None and _worker_state['cancelled'].get(job_id))
+    except Exception:
+        cancelled = False
+    if cancelled:
+        raise JobCancelled(job_id)
+    try:
+        queue.put_nowait((job_id, min(max(float(progress), 0.0), 1.0), stage))
+    except Exception:
+        pass
+
+
+def _run_job(job_id: str, func: Callable, args: tuple, kwargs: Dict[str, Any]):
+    """Executa a função do job no worker, identificando-o para report_progress"""
+    _worker_state['job_id'] = job_id
+    try:
+        report_progress(0.0, 'running')
+        return func(*args, **kwargs)
+    finally:
+        _worker_state['job_id'] = None
+
+
+def config_hash(kind: str, config: Dict[str, Any]) -> str:
+    """Hash estável (SHA-256) do tipo de job e da configuração da requisição"""
+    payload = json.dumps({'kind': kind, 'config': config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ComputeJobManager:
+    """
+    Gerencia jobs de cálculo executados em um pool de processos
+
+    O pool é criado no primeiro ``submit``. Jobs pendentes podem ser cancelados.
+    Um job em execução para na próxima chamada a ``report_progress`` (o processo
+    não é morto); até lá continua ocupando o worker, mas já fica marcado como
+    cancelado e seu resultado não é entregue.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 cache_size: Optional[int] = None,
+                 cache_ttl: Optional[float] = None,
+                 max_jobs: Optional[int] = None):
+        """
+        Args:
+            max_workers: Processos do pool (default: ANALYTICS_JOB_WORKERS ou núcleos - 1)
+            cache_size: Resultados mantidos em cache (default: ANALYTICS_JOB_CACHE_SIZE ou 128)
+            cache_ttl: Validade dos resultados em cache, em segundos
+                (default: ANALYTICS_JOB_CACHE_TTL ou 3600)
+            max_jobs: Jobs finalizados mantidos para consulta (default: ANALYTICS_JOB_RETENTION ou 500)
+        """
+        self.max_workers = int(max_workers or os.getenv('ANALYTICS_JOB_WORKERS', '0')) \
+            or max(1, (os.cpu_count() or 2) - 1)
+        self.cache_size = int(cache_size if cache_size is not None
+                              else os.getenv('ANALYTICS_JOB_CACHE_SIZE', '128'))
+        self.cache_ttl = float(cache_ttl if cache_ttl is not None
+                               else os.getenv('ANALYTICS_JOB_CACHE_TTL', '3600'))
+        self.max_jobs = int(max_jobs or os.getenv('ANALYTICS_JOB_RETENTION', '500'))
+
+        self._lock = threading.RLock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._progress_queue = None
+        self._progress_thread: Optional[threading.Thread] = None
+        self._sync_manager = None
+        # job_id -> True para jobs cancelados (compartilhado com os workers)
+        self._cancelled = None
+
+        # job_id -> estado do job (inclui o resultado quando concluído)
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        # hash da configuração -> job em andamento
+        self._inflight: Dict[str, str] = {}
+        # hash da configuração -> (armazenado em, resultado)
+        self._cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        self._stats = {
+            'submitted': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0
+        }
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Registra um callback chamado a cada mudança de estado ou progresso
+
+        O callback recebe o estado do job (sem o resultado) e pode ser chamado
+        de qualquer thread.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Remove um callback registrado"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def submit(self, kind: str, config: Dict[str, Any], func: Callable, *args,
+               owner: Optional[int] = None, use_cache: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Submete um job ao pool
+
+        ``func`` e os argumentos precisam ser picklable. Se a mesma configuração já
+        tiver resultado em cache, o job nasce concluído; se estiver em andamento, o
+        job existente é reaproveitado.
+
+        Args:
+            kind: Tipo do job (ex.: 'backtest', 'monte_carlo')
+            config: Configuração da requisição (define a chave do cache)
+            func: Função executada no worker
+            owner: Usuário dono do job (recebe as notificações de progresso)
+            use_cache: Consultar e reaproveitar resultados/jobs idênticos
+
+        Returns:
+            Estado do job
+        """
+        key = config_hash(kind, config)
+        cached_snapshot = None
+
+        with self._lock:
+            self._stats['submitted'] += 1
+
+            if use_cache:
+                job_id = self._inflight.get(key)
+                if job_id is not None:
+                    self._stats['coalesced'] += 1
+                    job = self._jobs[job_id]
+                    if owner is not None and owner not in job['owners']:
+                        job['owners'].append(owner)
+                    return self._snapshot(job)
+
+                cached = self._cache_get(key)
+                if cached is not None:
+                    self._stats['cache_hits'] += 1
+                    job = self._new_job(kind, key, owner)
+                    now = datetime.now().isoformat()
+                    job.update({'status': 'completed', 'progress': 1.0, 'cached': True,
+                                'started_at': now, 'finished_at': now, 'result': cached})
+                    self._prune()
+                    cached_snapshot = self._snapshot(job)
+                    listeners = list(self._listeners)
+
+            if cached_snapshot is None:
+                job = self._new_job(kind, key, owner)
+                job_id = job['job_id']
+                future = self._ensure_executor().submit(_run_job, job_id, func, args, kwargs)
+                self._futures[job_id] = future
+                if use_cache:
+                    self._inflight[key] = job_id
+                snapshot = self._snapshot(job)
+                listeners = list(self._listeners)
+
+        if cached_snapshot is not None:
+            self._notify(listeners, cached_snapshot)
+            return cached_snapshot
+
+        self._notify(listeners, snapshot)
+        # Registrado antes de qualquer wait(): o estado é atualizado antes de acordar quem espera
+        future.add_done_callback(lambda f: self._on_done(job_id, f, use_cache))
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado do job (sem o resultado) ou None se não existir"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def get_result(self, job_id: str) -> Any:
+        """
+        Resultado de um job concluído
+
+        Raises:
+            KeyError: Job inexistente
+            ValueError: Job ainda não concluído com sucesso
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job['status'] != 'completed':
+                raise ValueError(f"Job {job_id} está {job['status']}")
+            return job['result']
+
+    def list_jobs(self, owner: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Lista os jobs (mais recentes primeiro), opcionalmente de um usuário"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if owner is None or owner in job['owners']]
+            return [self._snapshot(job) for job in reversed(jobs)]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancela um job pendente ou em execução
+
+        Returns:
+            Estado do job, ou None se não existir
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] in FINISHED_STATUSES:
+                return self._snapshot(job)
+
+            job['status'] = 'cancelled'
+            job['finished_at'] = datetime.now().isoformat()
+            self._stats['cancelled'] += 1
+            # Novas requisições idênticas não devem se juntar a um job cancelado
+            if self._inflight.get(job['config_hash']) == job_id:
+                del self._inflight[job['config_hash']]
+
+            # Só tem efeito se o job ainda não começou a executar; um job em
+            # execução vê o cancelamento no próximo report_progress
+            future = self._futures.get(job_id)
+            if future is not None and not future.cancel() and self._cancelled is not None:
+                self._cancelled[job_id] = True
+            snapshot = self._snapshot(job)
+            listeners = list(self._listeners)
+
+        self._notify(listeners, snapshot)
+        return snapshot
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Aguarda o término do job sem bloquear o event loop
+
+        Args:
+            job_id: ID do job
+            timeout: Tempo máximo de espera em segundos (None = até terminar)
+
+        Returns:
+            Estado do job ao fim da espera (pode ainda estar em andamento)
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and not future.done():
+            await asyncio.wait({asyncio.wrap_future(future)}, timeout=timeout)
+        return self.get(job_id)
+
+    def clear_cache(self):
+        """Descarta todos os resultados em cache"""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores e ocupação de jobs e cache"""
+        with self._lock:
+            statuses = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                statuses[job['status']] += 1
+            return {
+                **self._stats,
+                'jobs': statuses,
+                'cache_entries': len(self._cache),
+                'max_workers': self.max_workers
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Encerra o pool (cancelando jobs pendentes) e a thread de progresso"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            progress_queue, self._progress_queue = self._progress_queue, None
+            progress_thread, self._progress_thread = self._progress_thread, None
+            sync_manager, self._sync_manager = self._sync_manager, None
+            self._cancelled = None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if sync_manager is not None:
+            sync_manager.shutdown()
+        if progress_queue is not None:
+            progress_queue.put(None)
+            if progress_thread is not None:
+                progress_thread.join(timeout=5)
+            progress_queue.close()
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        """Cria o pool e a thread leitora de progresso no primeiro uso"""
+        if self._executor is None:
+            context = multiprocessing.get_context(os.getenv('ANALYTICS_JOB_START_METHOD', 'spawn'))
+            self._progress_queue = context.Queue()
+            self._sync_manager = context.Manager()
+            self._cancelled = self._sync_manager.dict()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress_queue, self._cancelled)
+            )
+            self._progress_thread = threading.Thread(
+                target=self._progress_loop, args=(self._progress_queue,),
+                name='compute-jobs-progress', daemon=True
+            )
+            self._progress_thread.start()
+            logger.info(f"Pool de compute jobs iniciado com {self.max_workers} processos")
+        return self._executor
+
+    def _progress_loop(self, progress_queue):
+        """Aplica o progresso publicado pelos workers ao estado dos jobs"""
+        while True:
+            try:
+                item = progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+
+            job_id, progress, stage = item
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] in FINISHED_STATUSES:
+                    continue
+                if job['status'] == 'pending':
+                    job['status'] = 'running'
+                    job['started_at'] = datetime.now().isoformat()
+                job['progress'] = progress
+                if stage:
+                    job['stage'] = stage
+                snapshot = self._snapshot(job)
+                listeners = list(self._listeners)
+            self._notify(listeners, snapshot)
+
+    def _on_done(self, job_id: str, future: Future, cached: bool):
+        """Registra o resultado (ou erro) de um job ao término do future"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            self._futures.pop(job_id, None)
+            if job is None:
+                return
+            if self._inflight.get(job['config_hash']) == job_id:
+                del self._inflight[job['config_hash']]
+            if self._cancelled is not None:
+                try:
+                    self._cancelled.pop(job_id, None)
+                except Exception:
+                    pass
+
+            if future.cancelled():
+                if job['status'] != 'cancelled':
+                    job['status'] = 'cancelled'
+                    self._stats['cancelled'] += 1
+            else:
+                error = future.exception()
+                if error is not None:
+                    if job['status'] != 'cancelled':
+                        job['status'] = 'failed'
+                        job['error'] = str(error)
+                        self._stats['failed'] += 1
+                else:
+                    result = future.result()
+                    # O trabalho foi feito: guarda em cache mesmo que o job tenha sido cancelado
+                    if cached:
+                        self._cache_put(job['config_hash'], result)
+                    if job['status'] != 'cancelled':
+                        job.update({'status': 'completed', 'progress': 1.0, 'result': result})
+                        self._stats['completed'] += 1
+
+            if job['finished_at'] is None:
+                job['finished_at'] = datetime.now().isoformat()
+            self._prune()
+            snapshot = self._snapshot(job)
+            listeners = list(self._listeners)
+
+        self._notify(listeners, snapshot)
+
+    def _new_job(self, kind: str, key: str, owner: Optional[int]) -> Dict[str, Any]:
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'kind': kind,
+            'config_hash': key,
+            'status': 'pending',
+            'progress': 0.0,
+            'stage': None,
+            'cached': False,
+            'owners': [owner] if owner is not None else [],
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None,
+            'result': None
+        }
+        self._jobs[job['job_id']] = job
+        return job
+
+    @staticmethod
+    def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = {k: v for k, v in job.items() if k != 'result'}
+        snapshot['owners'] = list(job['owners'])
+        return snapshot
+
+    def _cache_get(self, key: str) -> Any:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: str, result: Any):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _prune(self):
+        """Descarta os jobs finalizados mais antigos além de ``max_jobs``"""
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def _notify(self, listeners: List[Callable[[Dict[str, Any]], None]], snapshot: Dict[str, Any]):
+        for callback in listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning(f"Erro no listener de compute jobs: {e}")
+
+
+# Funções executadas nos workers (precisam ser picklable)
+
+def run_backtest_job(data: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa um backtest (iterativo ou vetorizado) a partir da configuração da requisição"""
+    engine = BacktestingEngine(
+        initial_capital=config.get('initial_capital', 10000),
+        commission=config.get('commission', 0.001)
+    )
+    engine.add_data(data, config.get('symbol', 'BTCUSDT'))
+
+    strategy_type = config.get('strategy', 'simple_ma')
+    strategies = VECTORIZED_STRATEGIES if config.get('vectorized', False) else STRATEGIES
+    if strategy_type not in strategies:
+        raise ValueError(f"Estratégia {strategy_type} não suportada")
+
+    run = engine.run_vectorized_backtest if config.get('vectorized', False) else engine.run_backtest
+    report_progress(0.1, 'backtest')
+    return run(
+        strategies[strategy_type],
+        start_date=config.get('start_date'),
+        end_date=config.get('end_date'),
+        **config.get('strategy_params', {})
+    )
+
+
+def run_sweep_job(data: pd.DataFrame, config: Dict[str, Any],
+                  combinations: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Executa uma busca de parâmetros publicando o progresso a cada combinação
+
+    Roda em sequência dentro do worker (``max_workers=1``): o paralelismo vem do
+    pool de compute jobs, e um pool aninhado por busca multiplicaria os processos
+    (ANALYTICS_JOB_WORKERS x processos da busca). O ``max_workers`` da requisição
+    é ignorado.
+    """
+    sweep = ParameterSweep(
+        data,
+        symbol=config.get('symbol', 'BTCUSDT'),
+        initial_capital=config.get('initial_capital', 10000),
+        commission=config.get('commission', 0.001),
+        max_workers=1
+    )
+    report_progress(0.0, 'sweep')
+    return sweep.run(
+        config.get('strategy', 'simple_ma'),
+        combinations=combinations,
+        vectorized=config.get('vectorized', True),
+        rank_by=config.get('rank_by', 'sharpe_ratio'),
+        progress_callback=lambda done, total: report_progress(done / total, 'sweep'),
+        start_date=config.get('start_date'),
+        end_date=config.get('end_date')
+    )
+
+
+def run_monte_carlo_job(returns: pd.Series, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa a simulação Monte Carlo publicando o progresso a cada lote"""
+    return RiskAnalytics().monte_carlo_simulation(
+        returns,
+        num_simulations=config.get('num_simulations', 1000),
+        time_horizon=config.get('time_horizon', 252),
+        mode=config.get('mode', 'normal'),
+        seed=config.get('seed'),
+        sample_paths=min(config.get('sample_paths', 20), 1000),
+        block_size=config.get('block_size', 1),
+        progress_callback=lambda done, total: report_progress(done / total, 'simulation')
+    )
+
+
+def train_model_job(data: pd.DataFrame, config: Dict[str, Any], models_dir: str = "models/") -> Dict[str, Any]:
+    """Prepara features e treina um modelo; o modelo é salvo em ``models_dir``"""
+    ml_models = MLModels(models_dir=models_dir)
+    report_progress(0.05, 'features')
+    X, y = ml_models.prepare_features(
+        data,
+        config.get('target_column', 'close'),
+        config.get('feature_columns'),
+        config.get('lag_features', 5)
+    )
+    if len(X) == 0:
+        raise ValueError("Não foi possível preparar features")
+
+    report_progress(0.2, 'training')
+    return ml_models.train_model(
+        X, y,
+        model_name=config.get('model_name', 'random_forest'),
+        test_size=config.get('test_size', 0.2),
+        cv_folds=config.get('cv_folds', 5),
+        feature_selection=config.get('feature_selection', True),
+        hyperparameter_tuning=config.get('hyperparameter_tuning', True)
+    )
+
+
+def generate_report_job(data: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Gera o relatório completo de analytics"""
+    report_progress(0.1, 'report')
+    return ReportGenerator().generate_comprehensive_report(
+        data=data,
+        returns_column=config.get('returns_column', 'returns'),
+        price_column=config.get('price_column', 'close'),
+        title=config.get('title', 'Relatório de Analytics'),
+        format_type=config.get('format', 'html')
+    )
+
+
+# Gerenciador compartilhado pela aplicação
+_shared_manager: Optional[ComputeJobManager] = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_compute_job_manager() -> ComputeJobManager:
+    """Retorna o gerenciador de jobs da aplicação (o pool só é criado no primeiro job)"""
+    global _shared_manager
+
+    if _shared_manager is None:
+        with _shared_manager_lock:
+            if _shared_manager is None:
+                _shared_manager = ComputeJobManager()
+    return _shared_manager
+
+
+def shutdown_compute_job_manager(wait: bool = True):
+    """Encerra o gerenciador compartilhado (shutdown da aplicação)"""
+    global _shared_manager
+
+    manager, _shared_manager = _shared_manager, None
+    if manager is not None:
+        manager.shutdown(wait=wait)
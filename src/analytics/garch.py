@@ -0,0 +1,231 @@
+"""
+GARCH(1,1) - Estimação de volatilidade condicional por máxima verossimilhança
+"""
+
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Union, Iterable
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+
+logger = logging.getLogger(__name__)
+
+# Mínimo de observações para ajustar o modelo
+MIN_OBSERVATIONS = 30
+
+# Limite de persistência (alpha + beta) para manter o processo estacionário
+MAX_PERSISTENCE = 0.999
+
+# Ponto de partida quando não há warm start (valores típicos de séries financeiras)
+DEFAULT_START = (0.05, 0.90)
+
+ArrayLike = Union[pd.Series, np.ndarray, Iterable[float]]
+
+
+@dataclass
+class GarchParams:
+    """Parâmetros de um GARCH(1,1): σ²(t) = ω + α·ε²(t-1) + β·σ²(t-1)"""
+    omega: float
+    alpha: float
+    beta: float
+    mu: float = 0.0
+
+    @property
+    def persistence(self) -> float:
+        return self.alpha + self.beta
+
+    @property
+    def long_run_variance(self) -> float:
+        return self.omega / max(1.0 - self.persistence, 1e-12)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {**asdict(self), 'persistence': self.persistence}
+
+
+@dataclass
+class GarchFit:
+    """Resultado de um ajuste GARCH(1,1)"""
+    params: GarchParams
+    log_likelihood: float
+    conditional_variance: np.ndarray
+    last_residual: float
+    converged: bool
+    n_obs: int
+
+    @property
+    def conditional_volatility(self) -> np.ndarray:
+        return np.sqrt(self.conditional_variance)
+
+    def forecast_variance(self, horizon: int = 1) -> np.ndarray:
+        """
+        Previsão de variância para os próximos ``horizon`` períodos
+
+        σ²(T+1) = ω + α·ε²(T) + β·σ²(T) e, a partir daí, decaimento geométrico
+        para a variância de longo prazo: σ²(T+h) = V + (α+β)^(h-1)·(σ²(T+1) - V)
+
+        Args:
+            horizon: Número de passos à frente
+
+        Returns:
+            Array com a variância prevista para cada passo
+        """
+        p = self.params
+        next_variance = p.omega + p.alpha * self.last_residual ** 2 + p.beta * self.conditional_variance[-1]
+        decay = p.persistence ** np.arange(horizon)
+        return p.long_run_variance + decay * (next_variance - p.long_run_variance)
+
+    def forecast(self, horizon: int = 1) -> np.ndarray:
+        """Previsão de volatilidade (desvio padrão) para os próximos ``horizon`` períodos"""
+        return np.sqrt(self.forecast_variance(horizon))
+
+
+def garch_variance(residuals: np.ndarray, omega: float, alpha: float, beta: float,
+                   initial_variance: Optional[float] = None) -> np.ndarray:
+    """
+    Recursão da variância condicional do GARCH(1,1)
+
+    A recursão é um filtro IIR de primeira ordem (y[t] = x[t] + β·y[t-1]), então
+    roda inteira em C via ``scipy.signal.lfilter``, sem laço Python por elemento.
+
+    Args:
+        residuals: Retornos sem a média (ε)
+        omega: Termo constante
+        alpha: Peso do choque anterior
+        beta: Peso da variância anterior
+        initial_variance: σ²(0) (padrão: variância amostral)
+
+    Returns:
+        Array com σ²(t) para cada observação
+    """
+    residuals = np.asarray(residuals, dtype=float)
+    if initial_variance is None:
+        initial_variance = residuals.var()
+
+    drive = np.empty_like(residuals)
+    drive[0] = initial_variance
+    drive[1:] = omega + alpha * residuals[:-1] ** 2
+    return lfilter([1.0], [1.0, -beta], drive)
+
+
+def _to_params(x: np.ndarray, variance: float, mu: float) -> GarchParams:
+    """Converte (persistência, fração alpha) em parâmetros com variance targeting"""
+    persistence, share = float(x[0]), float(x[1])
+    alpha = persistence * share
+    beta = persistence - alpha
+    return GarchParams(omega=variance * (1.0 - persistence), alpha=alpha, beta=beta, mu=mu)
+
+
+def _negative_log_likelihood(x: np.ndarray, residuals: np.ndarray, variance: float) -> float:
+    """Log-verossimilhança gaussiana negativa (sem a constante)"""
+    params = _to_params(x, variance, 0.0)
+    sigma2 = garch_variance(residuals, params.omega, params.alpha, params.beta, variance)
+    sigma2 = np.maximum(sigma2, 1e-300)
+    return 0.5 * float(np.sum(np.log(sigma2) + residuals ** 2 / sigma2))
+
+
+class Garch11:
+    """
+    Estimador GARCH(1,1) por máxima verossimilhança
+
+    Usa variance targeting (ω = V·(1 - α - β), com V a variância amostral) e
+    otimiza (α + β, α / (α + β)) com limites simples, o que mantém o processo
+    estacionário sem restrições não lineares. Os parâmetros do último ajuste
+    de cada chave (ex.: símbolo) servem de ponto de partida no ajuste seguinte.
+    """
+
+    def __init__(self, max_iter: int = 200):
+        """
+        Args:
+            max_iter: Máximo de iterações do otimizador por ajuste
+        """
+        self.max_iter = max_iter
+        self._warm_starts: Dict[str, np.ndarray] = {}
+
+    def fit(self, returns: ArrayLike, key: Optional[str] = None) -> Optional[GarchFit]:
+        """
+        Ajusta o modelo a uma série de retornos
+
+        Args:
+            returns: Série de retornos (NaN são descartados)
+            key: Identificador para warm start entre chamadas (ex.: símbolo)
+
+        Returns:
+            GarchFit, ou None se houver menos de MIN_OBSERVATIONS retornos ou
+            variância nula
+        """
+        values = np.asarray(returns, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) < MIN_OBSERVATIONS:
+            return None
+
+        mu = float(values.mean())
+        residuals = values - mu
+        variance = float(residuals.var())
+        if variance <= 0:
+            return None
+
+        start = self._warm_starts.get(key) if key is not None else None
+        if start is None:
+            alpha, beta = DEFAULT_START
+            start = np.array([alpha + beta, alpha / (alpha + beta)])
+
+        # Escalar os resíduos deixa o problema bem condicionado (σ² ≈ 1)
+        scale = np.sqrt(variance)
+        scaled = residuals / scale
+        result = minimize(
+            _negative_log_likelihood, start, args=(scaled, 1.0), method='L-BFGS-B',
+            bounds=[(1e-4, MAX_PERSISTENCE), (1e-4, 1.0 - 1e-4)],
+            options={'maxiter': self.max_iter}
+        )
+
+        if key is not None:
+            self._warm_starts[key] = result.x
+
+        params = _to_params(result.x, variance, mu)
+        sigma2 = garch_variance(residuals, params.omega, params.alpha, params.beta, variance)
+        n = len(residuals)
+        log_likelihood = -float(result.fun) - 0.5 * n * (np.log(2 * np.pi) + np.log(variance))
+
+        return GarchFit(
+            params=params,
+            log_likelihood=log_likelihood,
+            conditional_variance=sigma2,
+            last_residual=float(residuals[-1]),
+            converged=bool(result.success),
+            n_obs=n
+        )
+
+    def fit_many(self, returns: Union[pd.DataFrame, Dict[str, ArrayLike]]) -> Dict[str, Optional[GarchFit]]:
+        """
+        Ajusta o modelo para vários símbolos de uma vez
+
+        Cada coluna (ou item do dicionário) é ajustada com o warm start da
+        própria chave; séries curtas resultam em None.
+
+        Args:
+            returns: DataFrame com um símbolo por coluna ou dict símbolo -> retornos
+
+        Returns:
+            Dict símbolo -> GarchFit
+        """
+        items = returns.items() if isinstance(returns, (pd.DataFrame, dict)) else returns
+        return {symbol: self.fit(series, key=str(symbol)) for symbol, series in items}
+
+    def forecast(self, returns: ArrayLike, horizon: int = 1, key: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Ajusta e devolve a previsão de volatilidade para ``horizon`` passos
+
+        Args:
+            returns: Série de retornos
+            horizon: Número de passos à frente
+            key: Identificador para warm start
+
+        Returns:
+            Array de volatilidades previstas, ou None se não foi possível ajustar
+        """
+        fit = self.fit(returns, key=key)
+        return fit.forecast(horizon) if fit else None
@@ -0,0 +1,164 @@
+"""
+Monte Carlo - Simulação vetorizada de trajetórias de patrimônio em lotes
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Callable
+
+
+# Modos de geração de retornos suportados
+SIMULATION_MODES = ('normal', 'gbm', 'bootstrap')
+
+# Percentis reportados do valor final
+DEFAULT_PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+# Elementos (caminhos x passos) por lote: ~32 MB em float64
+DEFAULT_CHUNK_ELEMENTS = 4_000_000
+
+
+class MonteCarloSimulator:
+    """
+    Simulador Monte Carlo baseado em ``numpy.random.Generator``
+
+    As trajetórias são geradas em lotes de ``chunk_size`` caminhos; de cada lote
+    só são mantidos o valor final e o drawdown máximo de cada caminho (O(N) em vez
+    de O(N x T)), além de uma pequena amostra de trajetórias completas. Média,
+    probabilidade de perda, percentis, VaR e CVaR são calculados sobre esses
+    vetores ao final.
+
+    Modos:
+        - ``normal``: retornos simples ~ N(média, desvio) (comportamento original)
+        - ``gbm``: movimento browniano geométrico com drift/volatilidade dos log-retornos
+        - ``bootstrap``: reamostragem dos retornos históricos (em blocos circulares
+          de ``block_size`` barras para preservar autocorrelação)
+    """
+
+    def __init__(self, returns: pd.Series, mode: str = 'normal', seed: Optional[int] = None,
+                 block_size: int = 1):
+        """
+        Inicializa o simulador
+
+        Args:
+            returns: Série de retornos históricos (simples)
+            mode: Modo de geração ('normal', 'gbm', 'bootstrap')
+            seed: Semente do gerador (None = aleatória)
+            block_size: Tamanho do bloco no modo bootstrap
+        """
+        if mode not in SIMULATION_MODES:
+            raise ValueError(f"Modo {mode} não reconhecido")
+
+        self.returns = np.asarray(pd.Series(returns).dropna(), dtype=np.float64)
+        if len(self.returns) == 0:
+            raise ValueError("Série de retornos vazia")
+
+        self.mode = mode
+        self.seed = seed
+        self.block_size = max(1, int(block_size))
+        self.rng = np.random.default_rng(seed)
+
+        # Parâmetros históricos (ddof=1, como pandas.Series.std)
+        self.mean_return = float(self.returns.mean())
+        self.volatility = float(self.returns.std(ddof=1)) if len(self.returns) > 1 else 0.0
+        log_returns = np.log1p(self.returns)
+        self.log_drift = float(log_returns.mean())
+        self.log_volatility = float(log_returns.std(ddof=1)) if len(log_returns) > 1 else 0.0
+
+    def _draw_chunk(self, num_paths: int, time_horizon: int) -> np.ndarray:
+        """Gera um lote de trajetórias de valor acumulado (partindo de 1)"""
+        if self.mode == 'normal':
+            paths = self.rng.standard_normal((num_paths, time_horizon))
+            paths *= self.volatility
+            paths += 1.0 + self.mean_return
+            return np.cumprod(paths, axis=1, out=paths)
+
+        if self.mode == 'gbm':
+            paths = self.rng.standard_normal((num_paths, time_horizon))
+            paths *= self.log_volatility
+            paths += self.log_drift
+            np.cumsum(paths, axis=1, out=paths)
+            return np.exp(paths, out=paths)
+
+        # Bootstrap em blocos circulares
+        n = len(self.returns)
+        num_blocks = -(-time_horizon // self.block_size)
+        starts = self.rng.integers(0, n, size=(num_paths, num_blocks, 1))
+        indices = (starts + np.arange(self.block_size)).reshape(num_paths, -1)[:, :time_horizon] % n
+        paths = self.returns[indices]
+        paths += 1.0
+        return np.cumprod(paths, axis=1, out=paths)
+
+    def run(self, num_simulations: int = 1000, time_horizon: int = 252, sample_paths: int = 100,
+            chunk_size: Optional[int] = None,
+            percentiles: Optional[List[float]] = None,
+            progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Executa a simulação
+
+        Args:
+            num_simulations: Número de trajetórias
+            time_horizon: Horizonte temporal (passos)
+            sample_paths: Quantidade de trajetórias completas devolvidas como amostra
+            chunk_size: Trajetórias por lote (None = automático, ~32 MB por lote)
+            percentiles: Percentis do valor final
+            progress_callback: Chamada com (trajetórias concluídas, total) a cada lote
+
+        Returns:
+            Dict com estatísticas resumidas e amostra de trajetórias
+        """
+        if num_simulations <= 0 or time_horizon <= 0:
+            raise ValueError("num_simulations e time_horizon devem ser positivos")
+
+        percentiles = percentiles or DEFAULT_PERCENTILES
+        chunk_size = chunk_size or max(1, DEFAULT_CHUNK_ELEMENTS // time_horizon)
+        sample_paths = max(0, min(sample_paths, num_simulations))
+
+        final_values = np.empty(num_simulations, dtype=np.float64)
+        max_drawdowns = np.empty(num_simulations, dtype=np.float64)
+        sample = np.empty((sample_paths, time_horizon), dtype=np.float64)
+
+        done = 0
+        while done < num_simulations:
+            size = min(chunk_size, num_simulations - done)
+            paths = self._draw_chunk(size, time_horizon)
+
+            final_values[done:done + size] = paths[:, -1]
+
+            # Drawdown máximo de cada caminho (valor inicial 1 incluído no pico)
+            ratio = np.maximum.accumulate(paths, axis=1)
+            np.maximum(ratio, 1.0, out=ratio)
+            np.divide(paths, ratio, out=ratio)
+            max_drawdowns[done:done + size] = ratio.min(axis=1) - 1.0
+
+            # Os caminhos são i.i.d., então os primeiros já são uma amostra aleatória
+            if done < sample_paths:
+                taken = min(size, sample_paths - done)
+                sample[done:done + taken] = paths[:taken]
+
+            done += size
+            if progress_callback:
+                progress_callback(done, num_simulations)
+
+        percentile_values = np.percentile(final_values, percentiles)
+        var_95, var_99 = (float(v) for v in np.percentile(final_values, [5, 1]))
+        tail_95 = final_values[final_values <= var_95]
+        expected_value = float(final_values.mean())
+
+        return {
+            'num_simulations': num_simulations,
+            'time_horizon_days': time_horizon,
+            'mode': self.mode,
+            'seed': self.seed,
+            'expected_final_value': expected_value,
+            'expected_return_pct': (expected_value - 1) * 100,
+            'std_final_value': float(final_values.std()),
+            'loss_probability_pct': float(np.mean(final_values < 1) * 100),
+            'var_95_pct': (var_95 - 1) * 100,
+            'var_99_pct': (var_99 - 1) * 100,
+            'cvar_95_pct': (float(tail_95.mean()) - 1) * 100 if len(tail_95) else (var_95 - 1) * 100,
+            'percentiles': dict(zip(percentiles, percentile_values)),
+            'max_drawdown_percentiles_pct': dict(zip([5, 50, 95], np.percentile(max_drawdowns, [5, 50, 95]) * 100)),
+            'sample_size': sample_paths,
+            'simulation_paths': sample,
+            'sample_final_values': sample[:, -1].copy()
+        }
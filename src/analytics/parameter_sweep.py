@@ -0,0 +1,346 @@
+"""
+Parameter Sweep - Busca de parâmetros (grid/aleatória) em paralelo para o BacktestingEngine
+"""
+
+import os
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtesting_engine import BacktestingEngine, STRATEGIES, VECTORIZED_STRATEGIES
+
+
+# Métricas extraídas de cada backtest para a tabela de resultados
+SWEEP_METRICS = [
+    'sharpe_ratio',
+    'max_drawdown_pct',
+    'total_return_pct',
+    'annualized_return_pct',
+    'sortino_ratio',
+    'win_rate_pct',
+    'num_trades',
+    'final_value'
+]
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class SharedOHLCV:
+    """
+    Dados OHLCV em memória compartilhada
+
+    O índice (inteiros desde epoch) e as colunas OHLCV são gravados uma única vez em um
+    bloco ``multiprocessing.shared_memory``; os workers apenas anexam o bloco e
+    montam um DataFrame somente leitura sobre ele, sem cópia nem pickle por tarefa.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        missing = [col for col in OHLCV_COLUMNS if col not in data.columns]
+        if missing:
+            raise ValueError(f"Dados devem conter: {OHLCV_COLUMNS}")
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError("Dados devem ter índice DatetimeIndex")
+
+        self.rows = len(data)
+        self.unit = data.index.unit
+        self.tz = str(data.index.tz) if data.index.tz is not None else None
+        self.index_name = data.index.name
+
+        width = len(OHLCV_COLUMNS) + 1
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, self.rows * width * 8))
+        block = np.ndarray((self.rows, width), dtype=np.float64, buffer=self._shm.buf)
+        block[:, 1:] = data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        block[:, :1].view(np.int64)[:, 0] = data.index.asi8
+
+    @property
+    def descriptor(self) -> Tuple[str, int, str, Optional[str], Optional[str]]:
+        """Informações (picklable) para anexar o bloco em outro processo"""
+        return self._shm.name, self.rows, self.unit, self.tz, self.index_name
+
+    @staticmethod
+    def attach(descriptor: Tuple[str, int, str, Optional[str], Optional[str]]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        """
+        Anexa o bloco compartilhado e monta o DataFrame OHLCV
+
+        Returns:
+            (SharedMemory, DataFrame) - o bloco deve ser mantido vivo enquanto o DataFrame for usado
+        """
+        name, rows, unit, tz, index_name = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        block = np.ndarray((rows, len(OHLCV_COLUMNS) + 1), dtype=np.float64, buffer=shm.buf)
+        block.flags.writeable = False
+
+        index = pd.DatetimeIndex(block[:, 0].view(np.int64).astype(f'datetime64[{unit}]'), name=index_name)
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        frame = pd.DataFrame(block[:, 1:], index=index, columns=OHLCV_COLUMNS, copy=False)
+        return shm, frame
+
+    def close(self):
+        """Libera o bloco compartilhado"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+# Estado de cada processo worker (preenchido em _init_worker)
+_worker_state: Dict[str, Any] = {}
+
+
+def _build_engine(data: pd.DataFrame, symbol: str, initial_capital: float,
+                  commission: float) -> BacktestingEngine:
+    """Cria um engine que usa ``data`` diretamente (add_data copiaria o bloco compartilhado)"""
+    engine = BacktestingEngine(initial_capital=initial_capital, commission=commission)
+    engine.data = data
+    engine.symbol = symbol
+    return engine
+
+
+def _init_worker(descriptor, strategy: Callable, vectorized: bool, symbol: str,
+                 initial_capital: float, commission: float, backtest_kwargs: Dict[str, Any]):
+    """Inicializador do pool: anexa os dados compartilhados uma vez por processo"""
+    shm, data = SharedOHLCV.attach(descriptor)
+    _worker_state.update({
+        'shm': shm,
+        'engine': _build_engine(data, symbol, initial_capital, commission),
+        'strategy': strategy,
+        'vectorized': vectorized,
+        'backtest_kwargs': backtest_kwargs
+    })
+
+
+def _run_with_engine(engine: BacktestingEngine, strategy: Callable, vectorized: bool,
+                     params: Dict[str, Any], backtest_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa um backtest e extrai as métricas da combinação"""
+    row = dict(params)
+    try:
+        if vectorized:
+            results = engine.run_vectorized_backtest(strategy, **backtest_kwargs, **params)
+        else:
+            results = engine.run_backtest(strategy, **backtest_kwargs, **params)
+        for metric in SWEEP_METRICS:
+            row[metric] = float(results[metric]) if metric in results else np.nan
+        row['error'] = None
+    except Exception as e:
+        for metric in SWEEP_METRICS:
+            row[metric] = np.nan
+        row['error'] = str(e)
+    return row
+
+
+def _run_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Tarefa executada no worker para um lote de combinações de parâmetros"""
+    state = _worker_state
+    return [_run_with_engine(state['engine'], state['strategy'], state['vectorized'],
+                             params, state['backtest_kwargs'])
+            for params in chunk]
+
+
+class ParameterSweep:
+    """
+    Busca de parâmetros em paralelo sobre o BacktestingEngine
+
+    Cada combinação de parâmetros é um backtest independente; as combinações são
+    distribuídas por um pool de processos que compartilha os dados OHLCV em modo
+    somente leitura (ver ``SharedOHLCV``).
+    """
+
+    def __init__(self, data: pd.DataFrame, symbol: str = "BTCUSDT",
+                 initial_capital: float = 10000.0, commission: float = 0.001,
+                 max_workers: Optional[int] = None):
+        """
+        Inicializa a busca
+
+        Args:
+            data: DataFrame com dados OHLCV
+            symbol: Símbolo do ativo
+            initial_capital: Capital inicial de cada backtest
+            commission: Comissão por operação
+            max_workers: Número de processos (None = número de CPUs; 1 = no próprio processo)
+        """
+        # Reaproveita a validação/normalização de índice do engine
+        engine = BacktestingEngine(initial_capital=initial_capital, commission=commission)
+        engine.add_data(data, symbol)
+
+        self.data = engine.data
+        self.symbol = symbol
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger("robot-crypt")
+        self.results = pd.DataFrame()
+
+    @staticmethod
+    def grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Gera todas as combinações de uma grade de parâmetros
+
+        Args:
+            param_grid: Parâmetro -> lista de valores
+
+        Returns:
+            Lista de combinações
+        """
+        names = list(param_grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+    @staticmethod
+    def random_search(param_distributions: Dict[str, Any], n_iter: int = 50,
+                      seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Sorteia combinações de parâmetros
+
+        Cada distribuição pode ser uma lista (escolha uniforme), uma tupla
+        ``(min, max)`` (inteiros se ambos forem int, senão uniforme contínua) ou
+        uma função ``rng -> valor``.
+
+        Args:
+            param_distributions: Parâmetro -> distribuição
+            n_iter: Número de combinações sorteadas
+            seed: Semente do gerador
+
+        Returns:
+            Lista de combinações sem repetições
+        """
+        rng = np.random.default_rng(seed)
+        combinations = []
+        seen = set()
+
+        # Limita as tentativas para grades discretas menores que n_iter
+        for _ in range(n_iter * 10):
+            if len(combinations) >= n_iter:
+                break
+
+            params = {}
+            for name, dist in param_distributions.items():
+                if callable(dist):
+                    value = dist(rng)
+                elif isinstance(dist, tuple) and len(dist) == 2:
+                    low, high = dist
+                    if isinstance(low, int) and isinstance(high, int):
+                        value = int(rng.integers(low, high + 1))
+                    else:
+                        value = float(rng.uniform(low, high))
+                else:
+                    value = list(dist)[int(rng.integers(len(dist)))]
+                params[name] = value.item() if isinstance(value, np.generic) else value
+
+            key = tuple(sorted(params.items()))
+            if key not in seen:
+                seen.add(key)
+                combinations.append(params)
+
+        return combinations
+
+    def run(self, strategy: Union[str, Callable], param_grid: Optional[Dict[str, List[Any]]] = None,
+            combinations: Optional[List[Dict[str, Any]]] = None, vectorized: bool = True,
+            rank_by: str = 'sharpe_ratio', ascending: bool = False,
+            constraint: Optional[Callable[[Dict[str, Any]], bool]] = None,
+            progress_callback: Optional[Callable[[int, int], None]] = None,
+            **backtest_kwargs) -> pd.DataFrame:
+        """
+        Executa o backtest para cada combinação e retorna a tabela ranqueada
+
+        Args:
+            strategy: Nome ('simple_ma', 'rsi') ou função de estratégia (deve ser
+                definida em nível de módulo para ser enviada aos workers)
+            param_grid: Grade de parâmetros (ver ``grid``)
+            combinations: Lista explícita de combinações (ex: ``random_search``)
+            vectorized: Usa ``run_vectorized_backtest`` em vez de ``run_backtest``
+            rank_by: Métrica usada no ranking
+            ascending: Ordem do ranking
+            constraint: Filtro de combinações válidas (ex: curta < longa)
+            progress_callback: Chamada com (concluídas, total) a cada combinação
+            **backtest_kwargs: Repassados ao backtest (start_date, end_date, ...)
+
+        Returns:
+            DataFrame com uma linha por combinação, coluna ``rank`` e métricas
+        """
+        if combinations is None:
+            if param_grid is None:
+                raise ValueError("Informe param_grid ou combinations")
+            combinations = self.grid(param_grid)
+        if constraint is not None:
+            combinations = [params for params in combinations if constraint(params)]
+
+        strategy_func = self._resolve_strategy(strategy, vectorized)
+        total = len(combinations)
+        if total == 0:
+            self.results = pd.DataFrame()
+            return self.results
+
+        workers = min(self.max_workers, total)
+        self.logger.info(f"Iniciando busca de parâmetros: {total} combinações em {workers} processo(s)")
+
+        rows: List[Dict[str, Any]] = []
+        if workers == 1:
+            engine = _build_engine(self.data, self.symbol, self.initial_capital, self.commission)
+            for params in combinations:
+                rows.append(_run_with_engine(engine, strategy_func, vectorized, params, backtest_kwargs))
+                if progress_callback:
+                    progress_callback(len(rows), total)
+        else:
+            with SharedOHLCV(self.data) as shared:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(shared.descriptor, strategy_func, vectorized, self.symbol,
+                              self.initial_capital, self.commission, backtest_kwargs)
+                ) as executor:
+                    # Lotes pequenos o bastante para balancear carga, grandes o bastante
+                    # para amortizar o IPC de backtests vetorizados (milissegundos cada)
+                    chunk_size = max(1, total // (workers * 4))
+                    futures = [executor.submit(_run_chunk, combinations[i:i + chunk_size])
+                               for i in range(0, total, chunk_size)]
+                    for future in as_completed(futures):
+                        rows.extend(future.result())
+                        if progress_callback:
+                            progress_callback(len(rows), total)
+
+        self.results = self._rank(rows, rank_by, ascending)
+        failed = int(self.results['error'].notna().sum())
+        self.logger.info(f"Busca de parâmetros concluída: {total} combinações, {failed} com erro")
+        return self.results
+
+    @staticmethod
+    def _resolve_strategy(strategy: Union[str, Callable], vectorized: bool) -> Callable:
+        """Converte o nome da estratégia na função correspondente"""
+        if callable(strategy):
+            return strategy
+        registry = VECTORIZED_STRATEGIES if vectorized else STRATEGIES
+        if strategy not in registry:
+            raise ValueError(f"Estratégia {strategy} não suportada")
+        return registry[strategy]
+
+    @staticmethod
+    def _rank(rows: List[Dict[str, Any]], rank_by: str, ascending: bool) -> pd.DataFrame:
+        """Ordena a tabela de resultados pela métrica escolhida"""
+        table = pd.DataFrame(rows)
+        if rank_by not in table.columns:
+            raise ValueError(f"Métrica de ranking {rank_by} não disponível")
+        table = table.sort_values(rank_by, ascending=ascending, na_position='last', kind='mergesort')
+        table = table.reset_index(drop=True)
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+        return table
+
+    def best_params(self) -> Dict[str, Any]:
+        """Retorna os parâmetros da melhor combinação da última execução"""
+        if self.results.empty:
+            return {}
+        metric_columns = set(SWEEP_METRICS) | {'rank', 'error'}
+        best = self.results.iloc[0]
+        return {name: (value.item() if isinstance(value, np.generic) else value)
+                for name, value in best.items() if name not in metric_columns}
@@ -4,7 +4,7 @@ Risk Analytics - Métricas avançadas de risco (VaR, CVaR, etc.)
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Union, Tuple, Callable
 from datetime import datetime, timedelta
 import warnings
 from scipy import stats
@@ -12,6 +12,10 @@ from scipy.optimize import minimize
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from .monte_carlo import MonteCarloSimulator
+from .garch import Garch11, garch_variance
+from .streaming_risk import StreamingRiskEngine
+
 warnings.filterwarnings('ignore')
 
 
@@ -23,6 +27,7 @@ class RiskAnalytics:
     def __init__(self):
         self.confidence_levels = [0.90, 0.95, 0.99]
         self.risk_metrics = {}
+        self.garch = Garch11()
     
     def calculate_var(self, returns: pd.Series, confidence_level: float = 0.95, 
                      method: str = 'historical') -> Dict[str, float]:
@@ -174,13 +179,16 @@ class RiskAnalytics:
         }
     
     def calculate_volatility_metrics(self, returns: pd.Series, 
-                                   annualize: bool = True) -> Dict[str, float]:
+                                   annualize: bool = True,
+                                   garch_key: Optional[str] = None) -> Dict[str, float]:
         """
         Calcula métricas de volatilidade
         
         Args:
             returns: Série de retornos
             annualize: Se deve anualizar as métricas
+            garch_key: Identificador (ex.: símbolo) para reaproveitar o ajuste
+                GARCH anterior como ponto de partida
             
         Returns:
             Dict com métricas de volatilidade
@@ -200,10 +208,19 @@ class RiskAnalytics:
         if annualize:
             rolling_vol *= np.sqrt(252)
         
-        # Volatilidade GARCH (simplificada)
-        garch_vol = self._estimate_garch_volatility(clean_returns)
+        # Volatilidade GARCH(1,1) ajustada por máxima verossimilhança
+        garch_fit = self.garch.fit(clean_returns, key=garch_key)
+        if garch_fit is not None:
+            garch_vol = float(garch_fit.forecast(1)[0])
+            garch_long_run_vol = float(np.sqrt(garch_fit.params.long_run_variance))
+            garch_persistence = garch_fit.params.persistence
+        else:
+            garch_vol = self._estimate_garch_volatility(clean_returns)
+            garch_long_run_vol = garch_vol
+            garch_persistence = 0.0
         if annualize:
             garch_vol *= np.sqrt(252)
+            garch_long_run_vol *= np.sqrt(252)
         
         # Downside deviation
         negative_returns = clean_returns[clean_returns < 0]
@@ -223,6 +240,8 @@ class RiskAnalytics:
             'rolling_volatility_mean': rolling_vol.mean(),
             'rolling_volatility_std': rolling_vol.std(),
             'garch_volatility': garch_vol,
+            'garch_long_run_volatility': garch_long_run_vol,
+            'garch_persistence': garch_persistence,
             'downside_deviation': downside_deviation,
             'upside_deviation': upside_deviation,
             'volatility_ratio': upside_deviation / downside_deviation if downside_deviation > 0 else 0,
@@ -233,7 +252,10 @@ class RiskAnalytics:
     def _estimate_garch_volatility(self, returns: pd.Series, 
                                   alpha: float = 0.1, beta: float = 0.8) -> float:
         """
-        Estimativa simples de volatilidade GARCH(1,1)
+        Estimativa de volatilidade GARCH(1,1) com parâmetros fixos
+        
+        Usada quando a série é curta demais para o ajuste por máxima
+        verossimilhança (ver ``Garch11``).
         
         Args:
             returns: Série de retornos
@@ -243,24 +265,14 @@ class RiskAnalytics:
         Returns:
             Volatilidade GARCH estimada
         """
-        # Implementação simplificada do GARCH(1,1)
-        omega = 0.000001  # Termo constante
-        volatilities = []
-        
-        # Volatilidade inicial
-        vol_init = returns.std()
-        volatilities.append(vol_init)
-        
-        for i in range(1, len(returns)):
-            # GARCH(1,1): σ²(t) = ω + α*ε²(t-1) + β*σ²(t-1)
-            prev_return_sq = returns.iloc[i-1] ** 2
-            prev_vol_sq = volatilities[i-1] ** 2
-            
-            vol_sq = omega + alpha * prev_return_sq + beta * prev_vol_sq
-            vol = np.sqrt(max(vol_sq, 0))
-            volatilities.append(vol)
+        values = np.asarray(returns, dtype=float)
+        if len(values) < 2:
+            return float(np.nan_to_num(np.std(values)))
         
-        return np.mean(volatilities)
+        # GARCH(1,1): σ²(t) = ω + α*ε²(t-1) + β*σ²(t-1), partindo da variância amostral
+        omega = 0.000001  # Termo constante
+        variance = garch_variance(values, omega, alpha, beta, initial_variance=values.var(ddof=1))
+        return float(np.mean(np.sqrt(np.maximum(variance, 0))))
     
     def calculate_beta(self, asset_returns: pd.Series, 
                       market_returns: pd.Series) -> Dict[str, float]:
@@ -529,14 +541,31 @@ class RiskAnalytics:
     
     def monte_carlo_simulation(self, returns: pd.Series, 
                              num_simulations: int = 1000,
-                             time_horizon: int = 252) -> Dict[str, Any]:
+                             time_horizon: int = 252,
+                             mode: str = 'normal',
+                             seed: Optional[int] = None,
+                             sample_paths: int = 100,
+                             chunk_size: Optional[int] = None,
+                             block_size: int = 1,
+                             progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
         """
         Simulação Monte Carlo
         
+        As trajetórias são geradas em lotes (ver ``MonteCarloSimulator``); apenas
+        estatísticas resumidas e uma amostra de ``sample_paths`` trajetórias são
+        retornadas em ``simulation_paths``/``sample_final_values`` (os valores finais
+        de todas as trajetórias entram apenas nas estatísticas).
+        
         Args:
             returns: Série de retornos históricos
             num_simulations: Número de simulações
             time_horizon: Horizonte temporal (dias)
+            mode: Modo de geração ('normal', 'gbm', 'bootstrap')
+            seed: Semente do gerador
+            sample_paths: Número de trajetórias completas na amostra
+            chunk_size: Trajetórias por lote (None = automático)
+            block_size: Tamanho do bloco no modo bootstrap
+            progress_callback: Chamada com (trajetórias concluídas, total) a cada lote
             
         Returns:
             Dict com resultados da simulação
@@ -546,52 +575,38 @@ class RiskAnalytics:
         if len(clean_returns) == 0:
             return {}
         
-        # Parâmetros históricos
-        mean_return = clean_returns.mean()
-        volatility = clean_returns.std()
+        simulator = MonteCarloSimulator(clean_returns, mode=mode, seed=seed, block_size=block_size)
+        return simulator.run(
+            num_simulations=num_simulations,
+            time_horizon=time_horizon,
+            sample_paths=sample_paths,
+            chunk_size=chunk_size,
+            progress_callback=progress_callback
+        )
+    
+    def create_streaming_engine(self, prices: Optional[pd.Series] = None,
+                                window: int = 1000, ewma_lambda: float = 0.94) -> StreamingRiskEngine:
+        """
+        Cria um motor de risco incremental com os mesmos níveis de confiança
         
-        # Simulações
-        simulations = []
+        Depois de semeado com o histórico, o motor é atualizado a cada novo valor
+        da carteira e consultado sem reprocessar a série completa.
         
-        for _ in range(num_simulations):
-            # Gerar retornos aleatórios
-            random_returns = np.random.normal(mean_return, volatility, time_horizon)
+        Args:
+            prices: Série de preços ou valores do portfolio para semear o motor (opcional)
+            window: Número de retornos da janela de VaR/ES e volatilidade
+            ewma_lambda: Fator de decaimento da volatilidade EWMA
             
-            # Calcular valor cumulativo
-            cumulative_value = (1 + random_returns).cumprod()
-            simulations.append(cumulative_value)
-        
-        simulations = np.array(simulations)
-        
-        # Análise dos resultados
-        final_values = simulations[:, -1]
-        
-        # Percentis
-        percentiles = [5, 10, 25, 50, 75, 90, 95]
-        percentile_values = np.percentile(final_values, percentiles)
-        
-        # Probabilidade de perda
-        loss_probability = np.mean(final_values < 1) * 100
-        
-        # Expected value
-        expected_value = np.mean(final_values)
-        
-        # VaR da simulação
-        var_95 = np.percentile(final_values, 5)
-        var_99 = np.percentile(final_values, 1)
-        
-        return {
-            'num_simulations': num_simulations,
-            'time_horizon_days': time_horizon,
-            'expected_final_value': expected_value,
-            'expected_return_pct': (expected_value - 1) * 100,
-            'loss_probability_pct': loss_probability,
-            'var_95_pct': (var_95 - 1) * 100,
-            'var_99_pct': (var_99 - 1) * 100,
-            'percentiles': dict(zip(percentiles, percentile_values)),
-            'simulation_paths': simulations,
-            'final_values': final_values
-        }
+        Returns:
+            StreamingRiskEngine
+        """
+        engine = StreamingRiskEngine(
+            window=window, ewma_lambda=ewma_lambda, confidence_levels=self.confidence_levels
+        )
+        if prices is not None:
+            prices = prices.dropna()
+            engine.update_many(prices.to_numpy(dtype=float), prices.index)
+        return engine
     
     def generate_risk_report(self, returns: pd.Series, 
                            prices: Optional[pd.Series] = None,
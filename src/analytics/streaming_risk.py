@@ -0,0 +1,377 @@
+"""
+Streaming Risk - Motor incremental de risco (VaR, CVaR, volatilidade e drawdown)
+
+Mantém o estado de uma janela móvel de retornos e o histórico de drawdown de uma
+carteira, atualizado a cada snapshot ou trade, para que as métricas de risco possam
+ser consultadas a cada tick sem reprocessar toda a série como ``RiskAnalytics``.
+
+- Drawdown: high-water mark, drawdown atual e máximo em O(1) por atualização
+- Volatilidade: média/variância da janela (Welford com remoção) e EWMA (RiskMetrics)
+- VaR/ES históricos: estatísticas de ordem exatas da janela em uma lista ordenada
+  (inserção/remoção por ``bisect``), com a mesma interpolação linear de
+  ``np.percentile`` usada por ``RiskAnalytics.calculate_var``
+"""
+
+import math
+import threading
+from bisect import bisect_right, insort
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from statistics import NormalDist
+from typing import Any, Dict, Hashable, Iterable, Optional, Sequence
+
+
+class StreamingRiskEngine:
+    """
+    Motor de risco incremental para uma carteira (ou estratégia)
+
+    Cada chamada de ``update`` recebe o valor atual da carteira; ``update_return``
+    recebe diretamente o retorno de um trade e avança um índice de patrimônio.
+    As consultas de VaR e volatilidade são O(1); o ES percorre apenas a cauda
+    (``(1 - confiança) · janela`` retornos).
+    """
+
+    # Recalcula média/variância a partir da janela a cada N retornos para evitar deriva numérica
+    RESYNC_EVERY = 10000
+
+    def __init__(self, window: int = 1000, ewma_lambda: float = 0.94,
+                 confidence_levels: Sequence[float] = (0.90, 0.95, 0.99),
+                 periods_per_year: int = 365):
+        """
+        Args:
+            window: Número de retornos mantidos para VaR/ES e volatilidade da janela
+            ewma_lambda: Fator de decaimento da volatilidade EWMA
+            confidence_levels: Níveis de confiança reportados em ``snapshot``
+            periods_per_year: Períodos por ano para anualizar a volatilidade
+        """
+        if window < 2:
+            raise ValueError("A janela precisa ter ao menos 2 retornos")
+        if not 0 < ewma_lambda < 1:
+            raise ValueError("ewma_lambda deve estar entre 0 e 1")
+
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.confidence_levels = tuple(confidence_levels)
+        self.periods_per_year = periods_per_year
+
+        # Janela de retornos (ordem de chegada e ordenada)
+        self._returns = deque()
+        self._sorted = []
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._pushes = 0
+        self.ewma_variance = None
+
+        # Estado de drawdown (histórico completo)
+        self.observations = 0
+        self.last_value = None
+        self.last_timestamp = None
+        self.high_water_mark = None
+        self.high_water_mark_date = None
+        self.current_drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.max_drawdown_date = None
+        self.peak_before_dd = None
+        self.recovery_date = None
+        self.underwater_observations = 0
+        self._max_dd_peak_value = None
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+    def update(self, value: float, timestamp: Optional[datetime] = None) -> None:
+        """
+        Registra um novo valor da carteira (snapshot)
+
+        Args:
+            value: Valor atual da carteira
+            timestamp: Momento do valor (padrão: agora)
+        """
+        value = float(value)
+        if not math.isfinite(value):
+            return
+        timestamp = datetime.now() if timestamp is None else timestamp
+
+        if self.last_value is not None and self.last_value > 0:
+            self._push_return(value / self.last_value - 1)
+        self._update_drawdown(value, timestamp)
+
+    def update_return(self, period_return: float, timestamp: Optional[datetime] = None) -> None:
+        """
+        Registra um retorno (ex.: resultado de um trade)
+
+        O valor da carteira é composto a partir do último valor conhecido (1.0 se
+        ainda não houver), mantendo o drawdown coerente com os retornos.
+
+        Args:
+            period_return: Retorno simples do período (0.01 = 1%)
+            timestamp: Momento do retorno (padrão: agora)
+        """
+        period_return = float(period_return)
+        if not math.isfinite(period_return):
+            return
+        timestamp = datetime.now() if timestamp is None else timestamp
+
+        if self.last_value is None:
+            self._update_drawdown(1.0, timestamp)
+        self._push_return(period_return)
+        self._update_drawdown(self.last_value * (1 + period_return), timestamp)
+
+    def update_many(self, values: Iterable[float], timestamps: Optional[Iterable[datetime]] = None) -> None:
+        """Registra vários valores em ordem cronológica"""
+        if timestamps is None:
+            for value in values:
+                self.update(value)
+        else:
+            for value, timestamp in zip(values, timestamps):
+                self.update(value, timestamp)
+
+    def _push_return(self, r: float) -> None:
+        self._returns.append(r)
+        insort(self._sorted, r)
+        self._welford_add(r)
+
+        if len(self._returns) > self.window:
+            old = self._returns.popleft()
+            del self._sorted[bisect_right(self._sorted, old) - 1]
+            self._welford_remove(old)
+
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            self._resync()
+
+        if self.ewma_variance is None:
+            self.ewma_variance = r * r
+        else:
+            self.ewma_variance = self.ewma_lambda * self.ewma_variance + (1 - self.ewma_lambda) * r * r
+
+    def _welford_add(self, x: float) -> None:
+        n = len(self._returns)
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+
+    def _welford_remove(self, x: float) -> None:
+        n = len(self._returns)
+        delta = x - self._mean
+        self._mean -= delta / n
+        self._m2 = max(self._m2 - delta * (x - self._mean), 0.0)
+
+    def _resync(self) -> None:
+        n = len(self._returns)
+        self._mean = math.fsum(self._returns) / n
+        self._m2 = math.fsum((x - self._mean) ** 2 for x in self._returns)
+
+    def _update_drawdown(self, value: float, timestamp: datetime) -> None:
+        self.observations += 1
+        self.last_value = value
+        self.last_timestamp = timestamp
+
+        if self.high_water_mark is None or value >= self.high_water_mark:
+            self.high_water_mark = value
+            self.high_water_mark_date = timestamp
+
+        self.current_drawdown = (value - self.high_water_mark) / self.high_water_mark if self.high_water_mark else 0.0
+        if self.current_drawdown < 0:
+            self.underwater_observations += 1
+
+        if self.current_drawdown < self.max_drawdown:
+            self.max_drawdown = self.current_drawdown
+            self.max_drawdown_date = timestamp
+            self.peak_before_dd = self.high_water_mark_date
+            self.recovery_date = None
+            self._max_dd_peak_value = self.high_water_mark
+        elif (self.recovery_date is None and self._max_dd_peak_value is not None
+              and timestamp != self.max_drawdown_date and value >= self._max_dd_peak_value):
+            self.recovery_date = timestamp
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    @property
+    def return_count(self) -> int:
+        """Número de retornos na janela"""
+        return len(self._returns)
+
+    @property
+    def mean_return(self) -> float:
+        return self._mean if self._returns else float('nan')
+
+    @property
+    def volatility(self) -> float:
+        """Desvio padrão (ddof=1) dos retornos da janela"""
+        n = len(self._returns)
+        return math.sqrt(self._m2 / (n - 1)) if n > 1 else float('nan')
+
+    @property
+    def ewma_volatility(self) -> float:
+        """Volatilidade EWMA (RiskMetrics)"""
+        return math.sqrt(self.ewma_variance) if self.ewma_variance is not None else float('nan')
+
+    def var(self, confidence_level: float = 0.95, method: str = 'historical') -> float:
+        """
+        Value at Risk da janela (retorno no quantil 1 - confiança)
+
+        Args:
+            confidence_level: Nível de confiança
+            method: 'historical' (quantil empírico) ou 'parametric' (normal)
+
+        Returns:
+            VaR como retorno (negativo para perdas); NaN sem retornos
+        """
+        n = len(self._sorted)
+        if n == 0:
+            return float('nan')
+        alpha = 1 - confidence_level
+
+        if method == 'historical':
+            position = alpha * (n - 1)
+            lower = int(position)
+            upper = min(lower + 1, n - 1)
+            low_value = self._sorted[lower]
+            return low_value + (self._sorted[upper] - low_value) * (position - lower)
+        elif method == 'parametric':
+            std = self.volatility
+            if not std or math.isnan(std):
+                return self._mean
+            return NormalDist(self._mean, std).inv_cdf(alpha)
+        else:
+            raise ValueError(f"Método {method} não reconhecido")
+
+    def expected_shortfall(self, confidence_level: float = 0.95) -> float:
+        """
+        Expected Shortfall (CVaR) histórico: média dos retornos <= VaR
+
+        Args:
+            confidence_level: Nível de confiança
+
+        Returns:
+            CVaR como retorno; NaN sem retornos
+        """
+        var = self.var(confidence_level)
+        if math.isnan(var):
+            return var
+        tail_count = bisect_right(self._sorted, var)
+        if tail_count == 0:
+            return var
+        return math.fsum(islice(self._sorted, tail_count)) / tail_count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Métricas de risco atuais
+
+        Returns:
+            Dict com VaR/CVaR por nível de confiança, volatilidades e drawdown
+        """
+        annualization = math.sqrt(self.periods_per_year)
+        volatility = self.volatility
+
+        var_analysis = {}
+        cvar_analysis = {}
+        for confidence in self.confidence_levels:
+            level = int(round(confidence * 100))
+            var_analysis[f"historical_{level}"] = self.var(confidence, 'historical')
+            var_analysis[f"parametric_{level}"] = self.var(confidence, 'parametric')
+            cvar_analysis[f"cvar_{level}"] = self.expected_shortfall(confidence)
+
+        return _finite({
+            'timestamp': self.last_timestamp,
+            'observations': self.observations,
+            'window_returns': len(self._returns),
+            'portfolio_value': self.last_value,
+            'mean_return': self.mean_return,
+            'var_analysis': var_analysis,
+            'cvar_analysis': cvar_analysis,
+            'volatility': volatility,
+            'annualized_volatility': volatility * annualization,
+            'ewma_volatility': self.ewma_volatility,
+            'annualized_ewma_volatility': self.ewma_volatility * annualization,
+            'drawdown': {
+                'high_water_mark': self.high_water_mark,
+                'high_water_mark_date': self.high_water_mark_date,
+                'current_drawdown': self.current_drawdown,
+                'current_drawdown_pct': self.current_drawdown * 100,
+                'max_drawdown': self.max_drawdown,
+                'max_drawdown_pct': self.max_drawdown * 100,
+                'max_drawdown_date': self.max_drawdown_date,
+                'peak_before_dd': self.peak_before_dd,
+                'recovery_date': self.recovery_date,
+                'underwater_duration': self.underwater_observations,
+                'underwater_percentage': (self.underwater_observations / self.observations * 100
+                                          if self.observations else 0.0)
+            }
+        })
+
+
+def _finite(obj):
+    """Troca NaN (métrica ainda indefinida) por None para serialização em JSON"""
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    return obj
+
+
+class StreamingRiskRegistry:
+    """Registro thread-safe de motores de risco por chave (ex.: id do usuário)"""
+
+    def __init__(self, **engine_kwargs):
+        """
+        Args:
+            **engine_kwargs: Parâmetros repassados a cada ``StreamingRiskEngine``
+        """
+        self.engine_kwargs = engine_kwargs
+        self._engines: Dict[Hashable, StreamingRiskEngine] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> StreamingRiskEngine:
+        """Retorna (criando se necessário) o motor da chave"""
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = StreamingRiskEngine(**self.engine_kwargs)
+                self._engines[key] = engine
+            return engine
+
+    def find(self, key: Hashable) -> Optional[StreamingRiskEngine]:
+        """Retorna o motor da chave, se existir"""
+        with self._lock:
+            return self._engines.get(key)
+
+    def seed(self, key: Hashable, values: Iterable[float],
+             timestamps: Optional[Iterable[datetime]] = None) -> StreamingRiskEngine:
+        """
+        Cria o motor da chave a partir do histórico, se ainda não existir
+
+        Args:
+            key: Chave do motor
+            values: Valores da carteira em ordem cronológica
+            timestamps: Momentos dos valores
+
+        Returns:
+            Motor da chave (o já existente, se outro chamador o criou antes)
+        """
+        engine = StreamingRiskEngine(**self.engine_kwargs)
+        engine.update_many(values, timestamps)
+        with self._lock:
+            return self._engines.setdefault(key, engine)
+
+    def update(self, key: Hashable, value: float, timestamp: Optional[datetime] = None) -> StreamingRiskEngine:
+        """Aplica um novo valor de carteira ao motor da chave"""
+        engine = self.get(key)
+        with self._lock:
+            engine.update(value, timestamp)
+        return engine
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        """Descarta o estado de uma chave (ou de todas, sem argumentos)"""
+        with self._lock:
+            if key is None:
+                self._engines.clear()
+            else:
+                self._engines.pop(key, None)
+
+
+# Motores de risco das carteiras dos usuários (alimentados pelos snapshots)
+portfolio_risk_engines = StreamingRiskRegistry()
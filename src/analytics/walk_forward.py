@@ -0,0 +1,375 @@
+"""
+Walk-Forward - Otimização walk-forward e validação cruzada k-fold purgada de estratégias
+"""
+
+import os
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtesting_engine import BacktestingEngine
+from .parameter_sweep import ParameterSweep, SharedOHLCV, _build_engine
+
+
+# Métricas de teste (fora da amostra) registradas em cada fold
+OOS_METRICS = ['sharpe_ratio', 'total_return_pct', 'max_drawdown_pct', 'num_trades']
+
+# Janela [início, fim) em posições de barra
+Window = Tuple[int, int]
+
+
+def walk_forward_splits(n_bars: int, train_size: int, test_size: int, step: Optional[int] = None,
+                        anchored: bool = False) -> List[Tuple[List[Window], Window]]:
+    """
+    Gera janelas de treino/teste para walk-forward
+
+    Args:
+        n_bars: Número de barras disponíveis
+        train_size: Barras de treino (tamanho inicial se ``anchored``)
+        test_size: Barras de teste
+        step: Avanço entre folds (padrão: ``test_size``)
+        anchored: Se True, o treino sempre começa na primeira barra
+
+    Returns:
+        Lista de (janelas de treino, janela de teste)
+    """
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("train_size e test_size devem ser positivos")
+    if train_size + test_size > n_bars:
+        raise ValueError("Dados insuficientes para uma janela de treino e teste")
+
+    step = step or test_size
+    splits = []
+    train_start, test_start = 0, train_size
+    while test_start + test_size <= n_bars:
+        splits.append(([(0 if anchored else train_start, test_start)], (test_start, test_start + test_size)))
+        train_start += step
+        test_start += step
+    return splits
+
+
+def purged_kfold_splits(n_bars: int, n_splits: int = 5, purge: int = 0,
+                        embargo: int = 0) -> List[Tuple[List[Window], Window]]:
+    """
+    Gera folds k-fold purgados (López de Prado)
+
+    Cada fold testa um bloco contíguo; o treino usa o restante da série, removendo
+    ``purge`` barras antes do teste (rótulos que se sobrepõem ao teste) e
+    ``embargo`` barras depois dele (vazamento por autocorrelação).
+
+    Args:
+        n_bars: Número de barras disponíveis
+        n_splits: Número de folds
+        purge: Barras removidas do treino imediatamente antes do teste
+        embargo: Barras removidas do treino imediatamente depois do teste
+
+    Returns:
+        Lista de (janelas de treino, janela de teste)
+    """
+    if n_splits < 2:
+        raise ValueError("n_splits deve ser pelo menos 2")
+    if n_bars < n_splits:
+        raise ValueError("Dados insuficientes para o número de folds")
+
+    bounds = np.linspace(0, n_bars, n_splits + 1).astype(int)
+    splits = []
+    for test_start, test_end in zip(bounds[:-1], bounds[1:]):
+        train = []
+        if test_start - purge > 0:
+            train.append((0, int(test_start - purge)))
+        if test_end + embargo < n_bars:
+            train.append((int(test_end + embargo), n_bars))
+        splits.append((train, (int(test_start), int(test_end))))
+    return splits
+
+
+def _evaluate_window(engine: BacktestingEngine, target: np.ndarray, window: Window) -> Dict[str, Any]:
+    """Backtest vetorizado de uma janela usando posições-alvo já calculadas"""
+    index = engine.data.index
+    return engine.backtest_positions(target, start_date=index[window[0]], end_date=index[window[1] - 1])
+
+
+def _score_windows(engine: BacktestingEngine, target: np.ndarray, windows: List[Window],
+                   metric: str) -> float:
+    """Métrica média (ponderada pelo tamanho) de uma ou mais janelas de treino"""
+    scores, weights = [], []
+    for window in windows:
+        results = _evaluate_window(engine, target, window)
+        value = results.get(metric, np.nan)
+        if np.isfinite(value):
+            scores.append(value)
+            weights.append(window[1] - window[0])
+    return float(np.average(scores, weights=weights)) if scores else np.nan
+
+
+def _evaluate_fold(engine: BacktestingEngine, targets: np.ndarray, combinations: List[Dict[str, Any]],
+                   fold: int, train: List[Window], test: Window, metric: str,
+                   ascending: bool) -> Dict[str, Any]:
+    """Otimiza os parâmetros no treino e avalia a melhor combinação no teste"""
+    # Sinais cacheados: linha i de ``targets`` é a combinação i sobre todo o histórico
+    scores = np.array([_score_windows(engine, targets[i], train, metric) for i in range(len(combinations))])
+
+    index = engine.data.index
+    row = {
+        'fold': fold,
+        'train_start': index[train[0][0]] if train else None,
+        'train_end': index[train[-1][1] - 1] if train else None,
+        'test_start': index[test[0]],
+        'test_end': index[test[1] - 1]
+    }
+
+    if np.all(np.isnan(scores)):
+        row.update({'params': None, f'is_{metric}': np.nan})
+        row.update({f'oos_{name}': np.nan for name in OOS_METRICS})
+        return row
+
+    ranked = np.where(np.isnan(scores), np.inf if ascending else -np.inf, scores)
+    best = int(np.argmin(ranked) if ascending else np.argmax(ranked))
+    results = _evaluate_window(engine, targets[best], test)
+
+    row.update({'params': dict(combinations[best]), f'is_{metric}': float(scores[best])})
+    row.update({f'oos_{name}': float(results.get(name, np.nan)) for name in OOS_METRICS})
+    return row
+
+
+# Estado de cada processo worker (preenchido em _init_worker)
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(data_descriptor, targets_descriptor, combinations: List[Dict[str, Any]], symbol: str,
+                 initial_capital: float, commission: float, metric: str, ascending: bool):
+    """Inicializador do pool: anexa dados e sinais compartilhados uma vez por processo"""
+    data_shm, data = SharedOHLCV.attach(data_descriptor)
+    name, shape = targets_descriptor
+    targets_shm = shared_memory.SharedMemory(name=name)
+    targets = np.ndarray(shape, dtype=np.float64, buffer=targets_shm.buf)
+    targets.flags.writeable = False
+
+    _worker_state.update({
+        'shm': (data_shm, targets_shm),
+        'engine': _build_engine(data, symbol, initial_capital, commission),
+        'targets': targets,
+        'combinations': combinations,
+        'metric': metric,
+        'ascending': ascending
+    })
+
+
+def _run_fold(fold: int, train: List[Window], test: Window) -> Dict[str, Any]:
+    """Tarefa executada no worker para um fold"""
+    state = _worker_state
+    return _evaluate_fold(state['engine'], state['targets'], state['combinations'],
+                          fold, train, test, state['metric'], state['ascending'])
+
+
+class WalkForwardAnalyzer:
+    """
+    Validação fora da amostra de parâmetros de estratégia
+
+    Em cada fold os parâmetros são otimizados nas janelas de treino e avaliados
+    na janela de teste. Os sinais de cada combinação são calculados uma única vez
+    sobre todo o histórico (os indicadores são causais) e reaproveitados por todos
+    os folds, que rodam em paralelo num pool de processos.
+    """
+
+    def __init__(self, data: pd.DataFrame, symbol: str = "BTCUSDT",
+                 initial_capital: float = 10000.0, commission: float = 0.001,
+                 max_workers: Optional[int] = None):
+        """
+        Inicializa o analisador
+
+        Args:
+            data: DataFrame com dados OHLCV
+            symbol: Símbolo do ativo
+            initial_capital: Capital inicial de cada backtest
+            commission: Comissão por operação
+            max_workers: Número de processos (None = número de CPUs; 1 = no próprio processo)
+        """
+        engine = BacktestingEngine(initial_capital=initial_capital, commission=commission)
+        engine.add_data(data, symbol)
+
+        self.data = engine.data
+        self.symbol = symbol
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger("robot-crypt")
+        self.report: Dict[str, Any] = {}
+
+    def walk_forward(self, strategy: Union[str, Callable], train_size: int, test_size: int,
+                     param_grid: Optional[Dict[str, List[Any]]] = None,
+                     combinations: Optional[List[Dict[str, Any]]] = None, step: Optional[int] = None,
+                     anchored: bool = False, metric: str = 'sharpe_ratio', ascending: bool = False,
+                     constraint: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Dict[str, Any]:
+        """
+        Executa otimização walk-forward
+
+        Args:
+            strategy: Nome ('simple_ma', 'rsi') ou função de sinais vetorizada
+            train_size: Barras de treino
+            test_size: Barras de teste
+            param_grid: Grade de parâmetros
+            combinations: Lista explícita de combinações
+            step: Avanço entre folds (padrão: ``test_size``)
+            anchored: Treino sempre a partir da primeira barra
+            metric: Métrica otimizada no treino
+            ascending: Se True, menor valor da métrica é melhor
+            constraint: Filtro de combinações válidas
+
+        Returns:
+            Relatório de estabilidade (ver ``_build_report``)
+        """
+        splits = walk_forward_splits(len(self.data), train_size, test_size, step, anchored)
+        method = 'anchored_walk_forward' if anchored else 'walk_forward'
+        return self._run(method, splits, strategy, param_grid, combinations, metric, ascending, constraint)
+
+    def purged_kfold(self, strategy: Union[str, Callable], n_splits: int = 5, purge: int = 0,
+                     embargo: int = 0, param_grid: Optional[Dict[str, List[Any]]] = None,
+                     combinations: Optional[List[Dict[str, Any]]] = None, metric: str = 'sharpe_ratio',
+                     ascending: bool = False,
+                     constraint: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Dict[str, Any]:
+        """
+        Executa validação cruzada k-fold purgada
+
+        Args:
+            strategy: Nome ('simple_ma', 'rsi') ou função de sinais vetorizada
+            n_splits: Número de folds
+            purge: Barras removidas do treino antes de cada teste
+            embargo: Barras removidas do treino depois de cada teste
+            param_grid: Grade de parâmetros
+            combinations: Lista explícita de combinações
+            metric: Métrica otimizada no treino
+            ascending: Se True, menor valor da métrica é melhor
+            constraint: Filtro de combinações válidas
+
+        Returns:
+            Relatório de estabilidade (ver ``_build_report``)
+        """
+        splits = purged_kfold_splits(len(self.data), n_splits, purge, embargo)
+        return self._run('purged_kfold', splits, strategy, param_grid, combinations, metric, ascending, constraint)
+
+    def _run(self, method: str, splits: List[Tuple[List[Window], Window]], strategy: Union[str, Callable],
+             param_grid: Optional[Dict[str, List[Any]]], combinations: Optional[List[Dict[str, Any]]],
+             metric: str, ascending: bool,
+             constraint: Optional[Callable[[Dict[str, Any]], bool]]) -> Dict[str, Any]:
+        """Calcula os sinais uma vez e avalia os folds (em paralelo se possível)"""
+        if combinations is None:
+            if param_grid is None:
+                raise ValueError("Informe param_grid ou combinations")
+            combinations = ParameterSweep.grid(param_grid)
+        if constraint is not None:
+            combinations = [params for params in combinations if constraint(params)]
+        if not combinations:
+            raise ValueError("Nenhuma combinação de parâmetros para avaliar")
+
+        signal_strategy = ParameterSweep._resolve_strategy(strategy, vectorized=True)
+        targets = self._compute_targets(signal_strategy, combinations)
+
+        workers = min(self.max_workers, len(splits))
+        self.logger.info(
+            f"Iniciando {method}: {len(splits)} folds x {len(combinations)} combinações em {workers} processo(s)"
+        )
+
+        if workers == 1:
+            engine = _build_engine(self.data, self.symbol, self.initial_capital, self.commission)
+            rows = [_evaluate_fold(engine, targets, combinations, fold, train, test, metric, ascending)
+                    for fold, (train, test) in enumerate(splits)]
+        else:
+            targets_shm = shared_memory.SharedMemory(create=True, size=max(1, targets.nbytes))
+            try:
+                shared_targets = np.ndarray(targets.shape, dtype=np.float64, buffer=targets_shm.buf)
+                shared_targets[:] = targets
+                with SharedOHLCV(self.data) as shared_data:
+                    with ProcessPoolExecutor(
+                        max_workers=workers,
+                        initializer=_init_worker,
+                        initargs=(shared_data.descriptor, (targets_shm.name, targets.shape), combinations,
+                                  self.symbol, self.initial_capital, self.commission, metric, ascending)
+                    ) as executor:
+                        futures = [executor.submit(_run_fold, fold, train, test)
+                                   for fold, (train, test) in enumerate(splits)]
+                        rows = [future.result() for future in futures]
+                del shared_targets
+            finally:
+                targets_shm.close()
+                targets_shm.unlink()
+
+        self.report = self._build_report(method, rows, metric)
+        summary = self.report['summary']
+        self.logger.info(
+            f"{method} concluído: {metric} médio fora da amostra {summary[f'oos_{metric}_mean']:.4f}, "
+            f"eficiência {summary['efficiency_ratio']:.2f}"
+        )
+        return self.report
+
+    def _compute_targets(self, signal_strategy: Callable, combinations: List[Dict[str, Any]]) -> np.ndarray:
+        """Matriz (combinações x barras) com as posições-alvo de cada combinação"""
+        targets = np.empty((len(combinations), len(self.data)), dtype=np.float64)
+        for i, params in enumerate(combinations):
+            target = np.asarray(signal_strategy(self.data, **params), dtype=np.float64)
+            if target.shape[0] != len(self.data):
+                raise ValueError("A estratégia vetorizada deve retornar uma posição por barra")
+            targets[i] = target
+        return targets
+
+    @staticmethod
+    def _build_report(method: str, rows: List[Dict[str, Any]], metric: str) -> Dict[str, Any]:
+        """
+        Agrega os folds em um relatório de estabilidade
+
+        Returns:
+            Dicionário com ``folds`` (DataFrame por fold), ``summary`` (métricas
+            agregadas dentro/fora da amostra) e ``parameter_stability`` (frequência
+            e dispersão dos parâmetros escolhidos)
+        """
+        folds = pd.DataFrame(rows)
+        is_values = folds[f'is_{metric}'].astype(float)
+        oos_values = folds[f'oos_{metric}'].astype(float)
+        oos_returns = folds['oos_total_return_pct'].astype(float)
+
+        is_mean = is_values.mean()
+        oos_mean = oos_values.mean()
+        summary = {
+            'method': method,
+            'metric': metric,
+            'n_folds': len(folds),
+            f'is_{metric}_mean': float(is_mean),
+            f'oos_{metric}_mean': float(oos_mean),
+            f'oos_{metric}_std': float(oos_values.std()) if len(folds) > 1 else 0.0,
+            f'oos_{metric}_median': float(oos_values.median()),
+            # Fração do desempenho de treino preservada fora da amostra
+            'efficiency_ratio': float(oos_mean / is_mean) if is_mean and np.isfinite(is_mean) else np.nan,
+            'oos_positive_folds_pct': float((oos_returns > 0).mean() * 100),
+            'oos_compounded_return_pct': float((np.prod(1 + oos_returns.dropna() / 100) - 1) * 100),
+            'oos_worst_drawdown_pct': float(folds['oos_max_drawdown_pct'].min())
+        }
+
+        chosen = [params for params in folds['params'] if params]
+        stability = {}
+        if chosen:
+            for name in chosen[0]:
+                values = [params[name] for params in chosen]
+                most_common, count = Counter(values).most_common(1)[0]
+                entry = {
+                    'most_common': most_common,
+                    'frequency_pct': count / len(chosen) * 100,
+                    'unique_values': len(set(values))
+                }
+                if all(isinstance(v, (int, float)) for v in values):
+                    entry['mean'] = float(np.mean(values))
+                    entry['std'] = float(np.std(values))
+                stability[name] = entry
+            summary['most_common_params_pct'] = Counter(
+                tuple(sorted(params.items())) for params in chosen
+            ).most_common(1)[0][1] / len(chosen) * 100
+
+        return {
+            'summary': summary,
+            'folds': folds,
+            'parameter_stability': stability
+        }
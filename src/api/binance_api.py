@@ -11,7 +11,10 @@ import os
 import json
 from datetime import datetime
 from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
 from ..utils.utils import format_symbol
+from .binance_weight_limiter import BinanceWeightLimiter
+from .kline_cache import KlineCache
 
 class BinanceAPI:
     """Classe para interagir com a API da Binance"""
@@ -56,6 +59,32 @@ class BinanceAPI:
         else:
             self.logger.debug("Conexão direta (sem proxy)")
         
+        # Sessão HTTP persistente (keep-alive) com pool de conexões reaproveitado
+        # entre chamadas e entre as threads do loop principal
+        self.pool_connections = int(os.environ.get("BINANCE_POOL_CONNECTIONS", "4"))
+        self.pool_maxsize = int(os.environ.get("BINANCE_POOL_MAXSIZE", "16"))
+        self.session = self._create_session()
+        
+        # Limitador de peso de requisições (X-MBX-USED-WEIGHT)
+        self.weight_limiter = BinanceWeightLimiter(
+            weight_limit=int(os.environ.get("BINANCE_WEIGHT_LIMIT", "1200")),
+            safety_margin=float(os.environ.get("BINANCE_WEIGHT_SAFETY_MARGIN", "0.9"))
+        )
+        
+        # Feed WebSocket opcional (BinanceMarketStream) consultado antes da API REST
+        self.market_stream = None
+        
+        # Cache local de velas na frente de /v3/klines. A camada em disco só é
+        # usada quando KLINE_CACHE_DIR é definido (ex.: data/kline_cache)
+        self.kline_cache = None
+        if os.environ.get("KLINE_CACHE_ENABLED", "true").lower() in ["true", "1", "yes", "y"]:
+            cache_dir = os.environ.get("KLINE_CACHE_DIR", "")
+            self.kline_cache = KlineCache(
+                self.fetch_klines,
+                cache_dir=os.path.join(cache_dir, "testnet" if testnet else "production") if cache_dir else None,
+                open_candle_ttl=float(os.environ.get("KLINE_CACHE_OPEN_CANDLE_TTL", "5"))
+            )
+        
         # Log de inicialização com informações parciais da chave para debug
         if self.api_key:
             masked_key = self.api_key[:4] + "..." + self.api_key[-4:]
@@ -64,6 +93,78 @@ class BinanceAPI:
         else:
             self.logger.warning("API Key não fornecida. A maioria das operações não funcionará.")
     
+    def _create_session(self):
+        """Cria a sessão HTTP persistente com pool de conexões ajustado"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,
+            pool_block=False
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Connection': 'keep-alive'
+        })
+        if self.proxies:
+            session.proxies.update(self.proxies)
+        return session
+    
+    def get_pool_stats(self):
+        """Retorna estatísticas do pool de conexões HTTP e do limitador de peso
+        
+        Returns:
+            dict: Conexões abertas, requisições feitas, taxa de reuso e dados do limitador
+        """
+        total_connections = 0
+        total_requests = 0
+        hosts = {}
+        
+        # O mesmo adapter é montado para http:// e https://; conta cada um uma vez
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pool_manager = getattr(adapter, 'poolmanager', None)
+            if pool_manager is None:
+                continue
+            for key in list(pool_manager.pools.keys()):
+                pool = pool_manager.pools.get(key)
+                if pool is None:
+                    continue
+                connections = getattr(pool, 'num_connections', 0)
+                requests_made = getattr(pool, 'num_requests', 0)
+                total_connections += connections
+                total_requests += requests_made
+                hosts[f"{pool.scheme}://{pool.host}"] = {
+                    'connections_created': connections,
+                    'requests': requests_made
+                }
+        
+        reuse_ratio = 1 - (total_connections / total_requests) if total_requests else 0.0
+        
+        return {
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'connections_created': total_connections,
+            'requests': total_requests,
+            'reuse_ratio': round(reuse_ratio, 4),
+            'hosts': hosts,
+            'weight_limiter': self.weight_limiter.get_stats()
+        }
+    
+    def get_kline_cache_stats(self):
+        """Retorna taxa de acerto e bytes economizados pelo cache local de velas
+        
+        Returns:
+            dict: Estatísticas do KlineCache (vazio se o cache estiver desativado)
+        """
+        return self.kline_cache.get_stats() if self.kline_cache is not None else {}
+    
+    def close(self):
+        """Fecha a sessão HTTP e libera as conexões do pool"""
+        self.session.close()
+    
     def _generate_signature(self, params):
         """Gera assinatura para requisições autenticadas"""
         query_string = urlencode(params)
@@ -110,15 +211,23 @@ class BinanceAPI:
                 "testnet": self.testnet
             })
         
+        if method not in ('GET', 'POST', 'DELETE'):
+            raise ValueError(f"Método HTTP não suportado: {method}")
+        
+        # Aguarda orçamento de peso antes de enviar (evita 429 em chamadas paralelas)
+        weight = self.weight_limiter.get_weight(method, endpoint, params)
+        waited = self.weight_limiter.acquire(weight)
+        if waited > 0.5:
+            self._log_structured("debug", f"Requisição aguardou {waited:.2f}s pelo limitador de peso", {
+                "endpoint": endpoint,
+                "weight": weight
+            })
+        
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, proxies=self.proxies, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, params=params, proxies=self.proxies, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, params=params, proxies=self.proxies, timeout=30)
-            else:
-                raise ValueError(f"Método HTTP não suportado: {method}")
+            response = self.session.request(method, url, headers=headers, params=params, timeout=30)
+            
+            # Atualiza o limitador com o peso reportado pelo servidor
+            self.weight_limiter.update_from_headers(response.headers, response.status_code)
             
             # Calcula o tempo de resposta em milissegundos
             elapsed_ms = int((time.time() - start_time) * 1000)
@@ -258,8 +367,38 @@ class BinanceAPI:
                 # Para outros erros, re-levanta a exceção
                 raise
     
+    def attach_market_stream(self, market_stream):
+        """Associa um feed WebSocket de velas (ou None para desassociar)"""
+        self.market_stream = market_stream
+    
     def get_klines(self, symbol, interval, limit=500):
-        """Obtém dados de candlestick (OHLCV)"""
+        """Obtém dados de candlestick (OHLCV)
+        
+        Usa o armazenamento do feed WebSocket quando ele está ativo e possui velas
+        suficientes; caso contrário consulta o cache local de velas, que só busca
+        na API REST a cauda que falta desde a última vela fechada.
+        """
+        if self.market_stream is not None:
+            klines = self.market_stream.get_klines(symbol, interval, limit)
+            if klines is not None:
+                return klines
+        if self.kline_cache is not None:
+            return self.kline_cache.get_klines(symbol, interval, limit)
+        return self.fetch_klines(symbol, interval, limit)
+    
+    def get_indicators(self, symbol, interval):
+        """Indicadores técnicos mantidos incrementalmente pelo feed WebSocket
+        
+        Returns:
+            dict: Mesmo formato de ``TechnicalIndicators.calculate_all_indicators``,
+                  ou None sem feed ativo (o chamador calcula a partir das velas)
+        """
+        if self.market_stream is None:
+            return None
+        return self.market_stream.get_indicators(symbol, interval)
+    
+    def fetch_klines(self, symbol, interval, limit=500):
+        """Obtém dados de candlestick (OHLCV) diretamente da API REST"""
         endpoint = "/v3/klines"
         formatted_symbol = format_symbol(symbol)
         params = {
@@ -373,14 +512,9 @@ class BinanceAPI:
                 url = f"{self.base_url}{endpoint}"
                 start_time = time.time()
                 
-                response = requests.get(
-                    url, 
-                    proxies=self.proxies, 
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                    },
-                    timeout=30
-                )
+                self.weight_limiter.acquire(self.weight_limiter.get_weight('GET', endpoint))
+                response = self.session.get(url, timeout=30)
+                self.weight_limiter.update_from_headers(response.headers, response.status_code)
                 
                 # Calcula tempo de resposta
                 elapsed_ms = int((time.time() - start_time) * 1000)
@@ -471,7 +605,9 @@ class BinanceAPI:
                         }
                     )
                     
-                    response = requests.get(url, headers=headers, params=params, proxies=self.proxies, timeout=30)
+                    self.weight_limiter.acquire(self.weight_limiter.get_weight('GET', endpoint, params))
+                    response = self.session.get(url, headers=headers, params=params, timeout=30)
+                    self.weight_limiter.update_from_headers(response.headers, response.status_code)
                     
                     # Calcula tempo de resposta
                     elapsed_ms = int((time.time() - start_time) * 1000)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Feed de dados de mercado via WebSocket da Binance
+
+Assina streams combinados de kline e bookTicker e mantém um armazenamento de velas
+em memória por (símbolo, intervalo), no mesmo formato retornado pelo endpoint REST
+``/v3/klines``. Em cada (re)conexão as lacunas são preenchidas via REST, de modo que
+as estratégias possam ler as velas do armazenamento em vez de consultar a API.
+
+Cada vela recebida também atualiza um ``IncrementalIndicatorRegistry``, de modo que
+os indicadores técnicos de cada (símbolo, intervalo) ficam prontos em O(1) por vela.
+"""
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+import websockets
+
+from ..analysis.incremental_indicators import IncrementalIndicatorRegistry
+from ..utils.utils import format_symbol
+
+
+STREAM_URLS = {
+    'production': "wss://stream.binance.com:9443",
+    'testnet': "wss://testnet.binance.vision",
+}
+
+# Duração de cada intervalo de kline em milissegundos
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1h': 3_600_000,
+    '2h': 7_200_000,
+    '4h': 14_400_000,
+    '6h': 21_600_000,
+    '8h': 28_800_000,
+    '12h': 43_200_000,
+    '1d': 86_400_000,
+    '3d': 259_200_000,
+    '1w': 604_800_000,
+}
+
+# Limite de velas por requisição REST de backfill
+MAX_BACKFILL_LIMIT = 1000
+
+
+def kline_event_to_rest(k):
+    """Converte o campo ``k`` de um evento de kline para o formato de ``/v3/klines``"""
+    return [
+        int(k['t']), k['o'], k['h'], k['l'], k['c'], k['v'],
+        int(k['T']), k['q'], int(k['n']), k['V'], k['Q'], k.get('B', '0')
+    ]
+
+
+class CandleStore:
+    """Armazenamento thread-safe de velas por (símbolo, intervalo) e de book tickers
+
+    Args:
+        max_candles (int): Número máximo de velas mantidas por (símbolo, intervalo)
+    """
+
+    def __init__(self, max_candles=1000):
+        self.max_candles = max_candles
+        self._lock = threading.Lock()
+        self._candles: Dict[Tuple[str, str], deque] = {}
+        self._book_tickers: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _key(symbol, interval):
+        return format_symbol(symbol).upper(), interval
+
+    def upsert(self, symbol, interval, kline):
+        """Insere uma vela ou substitui a vela aberta com o mesmo horário de abertura"""
+        key = self._key(symbol, interval)
+        with self._lock:
+            candles = self._candles.setdefault(key, deque(maxlen=self.max_candles))
+            if candles and candles[-1][0] == kline[0]:
+                candles[-1] = kline
+            elif not candles or candles[-1][0] < kline[0]:
+                candles.append(kline)
+            else:
+                self._merge_locked(key, [kline])
+
+    def merge(self, symbol, interval, klines):
+        """Mescla um lote de velas (ex: backfill REST), ordenando por horário de abertura"""
+        if not klines:
+            return
+        with self._lock:
+            self._merge_locked(self._key(symbol, interval), klines)
+
+    def _merge_locked(self, key, klines):
+        by_open_time = {candle[0]: candle for candle in self._candles.get(key, ())}
+        for kline in klines:
+            by_open_time[int(kline[0])] = list(kline)
+        ordered = [by_open_time[t] for t in sorted(by_open_time)]
+        self._candles[key] = deque(ordered[-self.max_candles:], maxlen=self.max_candles)
+
+    def get_klines(self, symbol, interval, limit=500):
+        """Retorna as últimas ``limit`` velas ou None se o armazenamento não tiver o suficiente"""
+        with self._lock:
+            candles = self._candles.get(self._key(symbol, interval))
+            if not candles or len(candles) < limit:
+                return None
+            return [list(candle) for candle in list(candles)[-limit:]]
+
+    def last_open_time(self, symbol, interval):
+        """Horário de abertura (ms) da vela mais recente, ou None"""
+        with self._lock:
+            candles = self._candles.get(self._key(symbol, interval))
+            return candles[-1][0] if candles else None
+
+    def count(self, symbol, interval):
+        """Número de velas armazenadas para (símbolo, intervalo)"""
+        with self._lock:
+            return len(self._candles.get(self._key(symbol, interval), ()))
+
+    def update_book_ticker(self, symbol, ticker):
+        """Atualiza o melhor bid/ask de um símbolo"""
+        with self._lock:
+            self._book_tickers[format_symbol(symbol).upper()] = ticker
+
+    def get_book_ticker(self, symbol):
+        """Retorna o último book ticker do símbolo, ou None"""
+        with self._lock:
+            ticker = self._book_tickers.get(format_symbol(symbol).upper())
+            return dict(ticker) if ticker else None
+
+
+class BinanceMarketStream:
+    """Feed de klines/bookTicker via WebSocket com reconexão e backfill via REST
+
+    O cliente roda em uma thread própria com seu event loop; a leitura das velas
+    (``get_klines``) é síncrona e pode ser feita pelas threads do bot.
+
+    Args:
+        rest_client: Cliente com ``fetch_klines(symbol, interval, limit)`` (REST puro)
+        symbols (list): Pares a assinar (ex: ["BTC/USDT", "ETH/USDT"])
+        intervals (list): Intervalos de kline (ex: ["1h", "1d"])
+        book_ticker (bool): Assina também o stream bookTicker de cada par
+        testnet (bool): Usa o endpoint de streams da testnet
+        ws_url (str, optional): URL base dos streams (sobrepõe ``testnet``; útil em testes)
+        history (int): Velas carregadas via REST na primeira conexão
+        max_stale_seconds (float): Sem mensagens por mais que isso, o feed é
+            considerado desatualizado e as leituras caem para a API REST
+        store (CandleStore, optional): Armazenamento compartilhado
+        indicators (IncrementalIndicatorRegistry, optional): Registro de indicadores
+            incrementais atualizado a cada vela (padrão: um registro próprio)
+    """
+
+    def __init__(self, rest_client, symbols, intervals=("1h",), book_ticker=True, testnet=False,
+                 ws_url=None, history=500, max_stale_seconds=60.0, max_backoff=30.0, store=None,
+                 indicators=None):
+        self.rest_client = rest_client
+        self.symbols = [format_symbol(symbol).upper() for symbol in symbols]
+        self.intervals = [interval for interval in intervals if interval in INTERVAL_MS]
+        self.book_ticker = book_ticker
+        self.ws_url = (ws_url or STREAM_URLS['testnet' if testnet else 'production']).rstrip('/')
+        self.history = min(history, MAX_BACKFILL_LIMIT)
+        self.max_stale_seconds = max_stale_seconds
+        self.max_backoff = max_backoff
+        self.store = store or CandleStore(max_candles=max(1000, self.history))
+        self.indicators = indicators if indicators is not None else IncrementalIndicatorRegistry()
+        self.logger = logging.getLogger("robot-crypt")
+
+        self._thread = None
+        self._loop = None
+        self._ws = None
+        self._stop_requested = threading.Event()
+        self._async_stop = None
+        self._ready = threading.Event()
+        self._candle_closed = threading.Event()
+
+        # Estatísticas
+        self.connected = False
+        self.last_message_time = 0.0
+        self.messages_received = 0
+        self.kline_updates = 0
+        self.closed_candles = 0
+        self.reconnects = 0
+        self.backfill_requests = 0
+        self.backfilled_candles = 0
+        self.store_reads = 0
+        self.rest_fallbacks = 0
+
+    @property
+    def stream_names(self) -> List[str]:
+        """Nomes dos streams assinados no stream combinado"""
+        names = []
+        for symbol in self.symbols:
+            lower = symbol.lower()
+            names.extend(f"{lower}@kline_{interval}" for interval in self.intervals)
+            if self.book_ticker:
+                names.append(f"{lower}@bookTicker")
+        return names
+
+    @property
+    def url(self) -> str:
+        return f"{self.ws_url}/stream?streams={'/'.join(self.stream_names)}"
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start(self):
+        """Inicia a thread do feed"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_requested.clear()
+        self._thread = threading.Thread(target=self._thread_main, name="binance-market-stream", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Feed WebSocket iniciado com {len(self.stream_names)} streams")
+
+    def stop(self, timeout=5.0):
+        """Encerra a conexão e aguarda a thread do feed"""
+        self._stop_requested.set()
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._signal_async_stop)
+            except RuntimeError:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+        self.logger.info("Feed WebSocket encerrado")
+
+    def wait_until_ready(self, timeout=None) -> bool:
+        """Aguarda a primeira conexão com backfill concluído"""
+        return self._ready.wait(timeout)
+
+    def wait_for_candle_close(self, timeout) -> bool:
+        """Aguarda até ``timeout`` segundos pelo fechamento de uma vela assinada
+
+        Returns:
+            bool: True se alguma vela fechou desde a última chamada
+        """
+        closed = self._candle_closed.wait(timeout)
+        self._candle_closed.clear()
+        return closed
+
+    def is_healthy(self) -> bool:
+        """Conectado e recebendo mensagens recentemente"""
+        return self.connected and (time.monotonic() - self.last_message_time) <= self.max_stale_seconds
+
+    # ------------------------------------------------------------------
+    # Leitura (threads do bot)
+    # ------------------------------------------------------------------
+    def get_klines(self, symbol, interval, limit=500):
+        """Retorna velas do armazenamento, ou None se o chamador deve usar a API REST"""
+        if interval not in self.intervals or format_symbol(symbol).upper() not in self.symbols:
+            return None
+        klines = self.store.get_klines(symbol, interval, limit) if self.is_healthy() else None
+        if klines is None:
+            self.rest_fallbacks += 1
+        else:
+            self.store_reads += 1
+        return klines
+
+    def get_book_ticker(self, symbol):
+        """Último melhor bid/ask do símbolo, ou None"""
+        return self.store.get_book_ticker(symbol) if self.is_healthy() else None
+
+    def get_indicators(self, symbol, interval):
+        """Indicadores incrementais da vela mais recente (formato de
+        ``TechnicalIndicators.calculate_all_indicators``), ou None se o chamador
+        deve calculá-los a partir das velas
+        """
+        symbol = format_symbol(symbol).upper()
+        if interval not in self.intervals or symbol not in self.symbols or not self.is_healthy():
+            return None
+        return self.indicators.latest_data(symbol, interval) or None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do feed para monitoramento"""
+        return {
+            'connected': self.connected,
+            'healthy': self.is_healthy(),
+            'streams': len(self.stream_names),
+            'messages_received': self.messages_received,
+            'kline_updates': self.kline_updates,
+            'closed_candles': self.closed_candles,
+            'reconnects': self.reconnects,
+            'backfill_requests': self.backfill_requests,
+            'backfilled_candles': self.backfilled_candles,
+            'store_reads': self.store_reads,
+            'rest_fallbacks': self.rest_fallbacks,
+            'last_message_age': round(time.monotonic() - self.last_message_time, 3) if self.last_message_time else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Thread do feed
+    # ------------------------------------------------------------------
+    def _thread_main(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._run())
+        except Exception as e:
+            self.logger.error(f"Erro fatal no feed WebSocket: {str(e)}")
+        finally:
+            loop.close()
+
+    def _signal_async_stop(self):
+        if self._async_stop is not None:
+            self._async_stop.set()
+        if self._ws is not None:
+            asyncio.ensure_future(self._ws.close())
+
+    async def _run(self):
+        self._async_stop = asyncio.Event()
+        backoff = 1.0
+
+        while not self._stop_requested.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=20,
+                                              close_timeout=2, max_size=2 ** 22) as ws:
+                    self._ws = ws
+                    # Mensagens que chegam durante o backfill ficam no buffer do socket
+                    # e são aplicadas depois; upsert é idempotente, então não há lacuna
+                    await asyncio.get_running_loop().run_in_executor(None, self._backfill)
+                    self.connected = True
+                    self.last_message_time = time.monotonic()
+                    self._ready.set()
+                    backoff = 1.0
+                    self.logger.info(f"Feed WebSocket conectado: {len(self.stream_names)} streams")
+
+                    async for message in ws:
+                        self._handle_message(message)
+            except Exception as e:
+                if not self._stop_requested.is_set():
+                    self.logger.warning(f"Conexão do feed WebSocket perdida: {str(e)}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            if self._stop_requested.is_set():
+                break
+
+            self.reconnects += 1
+            self.logger.info(f"Reconectando feed WebSocket em {backoff:.0f}s (tentativa {self.reconnects})")
+            try:
+                await asyncio.wait_for(self._async_stop.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _backfill(self):
+        """Preenche via REST as velas que faltam desde a última vela conhecida"""
+        now_ms = int(time.time() * 1000)
+        for symbol in self.symbols:
+            for interval in self.intervals:
+                last_open = self.store.last_open_time(symbol, interval)
+                if last_open is None:
+                    limit = self.history
+                else:
+                    # +2: a vela conhecida (possivelmente ainda aberta) e a atual
+                    missing = (now_ms - last_open) // INTERVAL_MS[interval] + 2
+                    limit = int(min(max(missing, 2), self.history))
+                try:
+                    klines = self.rest_client.fetch_klines(symbol, interval, limit)
+                    self.backfill_requests += 1
+                except Exception as e:
+                    self.logger.warning(f"Falha no backfill de {symbol} {interval}: {str(e)}")
+                    continue
+                if klines:
+                    self.store.merge(symbol, interval, klines)
+                    self.backfilled_candles += len(klines)
+                    # O motor ignora velas anteriores à aberta e substitui a de mesmo horário
+                    self.indicators.update_many(symbol, interval, sorted(klines, key=lambda k: int(k[0])))
+
+    def _handle_message(self, message):
+        """Aplica uma mensagem do stream combinado ao armazenamento"""
+        self.last_message_time = time.monotonic()
+        self.messages_received += 1
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            return
+
+        data = payload.get('data', payload)
+        stream = payload.get('stream', '')
+
+        if data.get('e') == 'kline':
+            k = data['k']
+            kline = kline_event_to_rest(k)
+            self.store.upsert(k['s'], k['i'], kline)
+            self.indicators.update_many(format_symbol(k['s']).upper(), k['i'], [kline])
+            self.kline_updates += 1
+            if k.get('x'):
+                self.closed_candles += 1
+                self._candle_closed.set()
+        elif stream.endswith('@bookTicker') or ('b' in data and 'a' in data and 's' in data):
+            self.store.update_book_ticker(data['s'], {
+                'bid_price': float(data['b']),
+                'bid_qty': float(data['B']),
+                'ask_price': float(data['a']),
+                'ask_qty': float(data['A']),
+                'update_id': data.get('u'),
+                'received_at': time.time(),
+            })
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Limitador de peso de requisições para a API REST da Binance
+
+A Binance contabiliza um "peso" por requisição (REQUEST_WEIGHT) em janelas de 1 minuto
+e informa o peso já consumido no header ``X-MBX-USED-WEIGHT-1M``. Este módulo mantém um
+token bucket alimentado pelos pesos conhecidos de cada endpoint e recalibrado pelos
+headers da resposta, de modo que chamadores paralelos desacelerem ANTES de receber 429.
+"""
+import time
+import threading
+import logging
+
+
+# Pesos por endpoint (API spot v3). Endpoints cujo peso depende de parâmetros
+# são tratados em BinanceWeightLimiter.get_weight.
+ENDPOINT_WEIGHTS = {
+    ('GET', '/v3/ping'): 1,
+    ('GET', '/v3/time'): 1,
+    ('GET', '/v3/exchangeInfo'): 20,
+    ('GET', '/v3/klines'): 2,
+    ('GET', '/v3/ticker/price'): 2,
+    ('GET', '/v3/ticker/24hr'): 2,
+    ('GET', '/v3/account'): 20,
+    ('GET', '/v3/order'): 4,
+    ('POST', '/v3/order'): 1,
+    ('DELETE', '/v3/order'): 1,
+    ('GET', '/v3/openOrders'): 6,
+    ('GET', '/v3/allOrders'): 20,
+}
+
+DEFAULT_WEIGHT = 1
+
+USED_WEIGHT_HEADERS = ('X-MBX-USED-WEIGHT-1M', 'X-MBX-USED-WEIGHT')
+
+
+class BinanceWeightLimiter:
+    """Token bucket thread-safe guiado pelos pesos dos endpoints da Binance
+
+    Args:
+        weight_limit (int): Limite de peso por minuto da conta/IP
+        safety_margin (float): Fração do limite efetivamente utilizada (0-1)
+        window_seconds (float): Tamanho da janela de contabilização da Binance
+    """
+
+    def __init__(self, weight_limit=1200, safety_margin=0.9, window_seconds=60.0):
+        self.weight_limit = int(weight_limit)
+        self.capacity = max(1.0, self.weight_limit * safety_margin)
+        self.window_seconds = window_seconds
+        self.refill_rate = self.capacity / window_seconds
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        self.logger = logging.getLogger("robot-crypt")
+
+        # Estatísticas
+        self.current_weight = 0
+        self.total_requests = 0
+        self.total_weight = 0
+        self.throttled_requests = 0
+        self.total_wait_time = 0.0
+        self.rate_limit_hits = 0
+
+    @staticmethod
+    def get_weight(method, endpoint, params=None):
+        """Retorna o peso de uma requisição para o endpoint informado"""
+        params = params or {}
+        if endpoint == '/v3/ticker/24hr' and 'symbol' not in params:
+            return 80
+        if endpoint == '/v3/ticker/price' and 'symbol' not in params:
+            return 4
+        if endpoint == '/v3/openOrders' and 'symbol' not in params:
+            return 80
+        return ENDPOINT_WEIGHTS.get((method.upper(), endpoint), DEFAULT_WEIGHT)
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._last_refill = now
+
+    def acquire(self, weight=1):
+        """Reserva ``weight`` tokens, bloqueando até que estejam disponíveis
+
+        Returns:
+            float: Tempo total (segundos) que a chamada ficou aguardando
+        """
+        weight = min(float(weight), self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= weight:
+                    self._tokens -= weight
+                    self.total_requests += 1
+                    self.total_weight += int(weight)
+                    if waited > 0:
+                        self.throttled_requests += 1
+                        self.total_wait_time += waited
+                    return waited
+                else:
+                    wait = (weight - self._tokens) / self.refill_rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, headers, status_code=None):
+        """Recalibra o bucket a partir dos headers de uma resposta da Binance
+
+        O peso informado pelo servidor é autoritativo: se ele indicar mais consumo
+        do que o bucket local contabilizou (outros processos usando o mesmo IP, por
+        exemplo), os tokens disponíveis são reduzidos de acordo.
+        """
+        if headers is None:
+            return
+
+        used = None
+        for header in USED_WEIGHT_HEADERS:
+            value = headers.get(header)
+            if value is not None:
+                try:
+                    used = int(value)
+                    break
+                except (TypeError, ValueError):
+                    continue
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if used is not None:
+                self.current_weight = used
+                self._tokens = min(self._tokens, max(0.0, self.capacity - used))
+
+            if status_code in (418, 429):
+                self.rate_limit_hits += 1
+                retry_after = headers.get('Retry-After')
+                try:
+                    delay = float(retry_after) if retry_after is not None else self.window_seconds
+                except (TypeError, ValueError):
+                    delay = self.window_seconds
+                self._blocked_until = max(self._blocked_until, now + delay)
+                self._tokens = 0.0
+                self.logger.warning(f"Rate limit da Binance atingido ({status_code}); pausando requisições por {delay:.0f}s")
+
+    def get_stats(self):
+        """Retorna estatísticas do limitador para monitoramento"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'weight_limit': self.weight_limit,
+                'capacity': self.capacity,
+                'available_weight': round(self._tokens, 2),
+                'current_weight': self.current_weight,
+                'total_requests': self.total_requests,
+                'total_weight': self.total_weight,
+                'throttled_requests': self.throttled_requests,
+                'total_wait_time': round(self.total_wait_time, 3),
+                'rate_limit_hits': self.rate_limit_hits,
+                'blocked_for': max(0.0, round(self._blocked_until - time.monotonic(), 3)),
+            }
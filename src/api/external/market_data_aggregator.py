@@ -16,6 +16,8 @@ from src.api.external.coinmarketcap_client import CoinMarketCapAPIClient
 from src.api.external.coinmarketcal_client import CoinMarketCalAPIClient
 from src.api.external.cryptopanic_client import CryptoPanicAPIClient
 from src.api.external.news_api_client import NewsAPIClient
+from src.api.external.price_cache import AsyncTTLCache
+from src.contextual_analysis.sentiment_service import dedupe_articles
 from src.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -103,6 +105,23 @@ class MarketDataAggregator:
             'news_api': bool(getattr(settings, 'NEWS_API_KEY', None))
         }
         
+        # Caches for upstream market data (most useful on the shared instance,
+        # see get_shared_aggregator)
+        stale_ttl = getattr(settings, 'MARKET_CACHE_STALE_TTL', 30.0)
+        max_entries = getattr(settings, 'MARKET_CACHE_MAX_ENTRIES', 1024)
+        self.price_cache = AsyncTTLCache(
+            ttl=getattr(settings, 'MARKET_PRICE_CACHE_TTL', 5.0),
+            stale_ttl=stale_ttl,
+            max_entries=max_entries,
+            name="market-prices"
+        )
+        self.historical_cache = AsyncTTLCache(
+            ttl=getattr(settings, 'MARKET_HISTORICAL_CACHE_TTL', 60.0),
+            stale_ttl=stale_ttl,
+            max_entries=max_entries,
+            name="market-historical"
+        )
+        
         logger.info(f"MarketDataAggregator initialized. API status: {self.api_status}")
     
     async def __aenter__(self):
@@ -150,12 +169,22 @@ class MarketDataAggregator:
         """
         Get current prices from available sources.
         
+        Results are served from ``price_cache``; concurrent calls for the same
+        symbols share a single upstream fetch.
+        
         Args:
             symbols: List of trading pair symbols
             
         Returns:
             List of unified market data points
         """
+        prices = await self.price_cache.get_or_fetch(
+            tuple(symbols), lambda: self._fetch_current_prices(symbols)
+        )
+        return list(prices)
+    
+    async def _fetch_current_prices(self, symbols: List[str]) -> List[MarketDataPoint]:
+        """Fetch current prices from the upstream APIs (uncached)."""
         try:
             results = []
             
@@ -227,6 +256,9 @@ class MarketDataAggregator:
         """
         Get historical price data.
         
+        Results are served from ``historical_cache``; concurrent calls for the
+        same symbol and period share a single upstream fetch.
+        
         Args:
             symbol: Trading pair symbol
             days: Number of days of data
@@ -234,6 +266,13 @@ class MarketDataAggregator:
         Returns:
             List of historical data points
         """
+        historical_data = await self.historical_cache.get_or_fetch(
+            (symbol, days), lambda: self._fetch_historical_data(symbol, days)
+        )
+        return list(historical_data)
+    
+    async def _fetch_historical_data(self, symbol: str, days: int) -> List[Dict[str, Any]]:
+        """Fetch historical price data from the upstream APIs (uncached)."""
         try:
             # Try Binance first
             if self.binance_client:
@@ -426,6 +465,10 @@ class MarketDataAggregator:
                 except Exception as e:
                     logger.warning(f"NewsAPI error: {e}")
             
+            # Drop stories reported by both sources (same URL or near-identical title),
+            # keeping the CryptoPanic version with its importance and currencies
+            results = dedupe_articles(results)
+            
             # Sort by published date (most recent first)
             results.sort(key=lambda x: x.published_at, reverse=True)
             
@@ -694,6 +737,59 @@ class MarketDataAggregator:
         except Exception as e:
             logger.warning(f"Error calculating summary metrics: {e}")
             return {"error": "Failed to calculate summary metrics"}
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss metrics of the market data caches.
+        
+        Returns:
+            Cache metrics keyed by cache name
+        """
+        return {
+            "prices": self.price_cache.get_stats(),
+            "historical": self.historical_cache.get_stats()
+        }
+
+
+# App-lifetime shared aggregator
+_shared_aggregator: Optional[MarketDataAggregator] = None
+_shared_aggregator_lock: Optional[asyncio.Lock] = None
+
+
+async def get_shared_aggregator() -> MarketDataAggregator:
+    """
+    Get the app-lifetime aggregator, opening its API clients on first use.
+    
+    Sharing one instance keeps HTTP sessions alive between requests and lets
+    concurrent requests hit the same price/historical caches.
+    
+    Returns:
+        Shared, already entered MarketDataAggregator
+    """
+    global _shared_aggregator, _shared_aggregator_lock
+    
+    if _shared_aggregator is not None:
+        return _shared_aggregator
+    
+    if _shared_aggregator_lock is None:
+        _shared_aggregator_lock = asyncio.Lock()
+    
+    async with _shared_aggregator_lock:
+        if _shared_aggregator is None:
+            aggregator = MarketDataAggregator()
+            await aggregator.__aenter__()
+            _shared_aggregator = aggregator
+    
+    return _shared_aggregator
+
+
+async def close_shared_aggregator():
+    """Close the API clients of the shared aggregator (application shutdown)."""
+    global _shared_aggregator
+    
+    aggregator, _shared_aggregator = _shared_aggregator, None
+    if aggregator is not None:
+        await aggregator.__aexit__(None, None, None)
 
 
 # Convenience functions for easy usage
@@ -710,8 +806,8 @@ async def get_market_overview(symbols: List[str] = None) -> Dict[str, Any]:
     if symbols is None:
         symbols = ["BTC/USDT", "ETH/USDT", "BNB/USDT", "ADA/USDT", "SOL/USDT"]
     
-    async with MarketDataAggregator() as aggregator:
-        return await aggregator.get_comprehensive_market_analysis(symbols)
+    aggregator = await get_shared_aggregator()
+    return await aggregator.get_comprehensive_market_analysis(symbols)
 
 
 async def get_symbol_analysis(symbol: str) -> Dict[str, Any]:
@@ -724,14 +820,14 @@ async def get_symbol_analysis(symbol: str) -> Dict[str, Any]:
     Returns:
         Symbol analysis data
     """
-    async with MarketDataAggregator() as aggregator:
-        analysis = await aggregator.get_comprehensive_market_analysis([symbol])
-        
-        # Add historical data
-        historical = await aggregator.get_historical_data(symbol, 30)
-        analysis["historical_data"] = historical
-        
-        return analysis
+    aggregator = await get_shared_aggregator()
+    analysis = await aggregator.get_comprehensive_market_analysis([symbol])
+    
+    # Add historical data
+    historical = await aggregator.get_historical_data(symbol, 30)
+    analysis["historical_data"] = historical
+    
+    return analysis
 
 
 # Example usage
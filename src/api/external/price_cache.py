@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Async TTL cache with request coalescing for market data.
+
+Concurrent requests for the same key share a single in-flight upstream fetch
+(single-flight). Entries are fresh for ``ttl`` seconds and may then be served
+stale for another ``stale_ttl`` seconds while one background task revalidates
+them (stale-while-revalidate).
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with its freshness deadlines (monotonic clock)."""
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class AsyncTTLCache:
+    """
+    LRU-bounded TTL cache for coroutine results.
+
+    Args:
+        ttl: Seconds an entry is served without revalidation
+        stale_ttl: Extra seconds an expired entry is served while revalidating
+        max_entries: Maximum number of cached keys (least recently used evicted)
+        name: Name used in logs and metrics
+    """
+
+    def __init__(self, ttl: float = 5.0, stale_ttl: float = 30.0,
+                 max_entries: int = 1024, name: str = "cache"):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max(1, max_entries)
+        self.name = name
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        # Metrics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        should_cache: Callable[[Any], bool] = bool
+    ) -> Any:
+        """
+        Return the cached value for ``key`` or fetch it.
+
+        Args:
+            key: Cache key
+            fetcher: Zero-argument coroutine function that loads the value
+            ttl: Per-call override of the fresh period
+            stale_ttl: Per-call override of the stale period
+            should_cache: Predicate deciding whether a fetched value is stored
+                (by default empty results are not cached)
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if now < entry.fresh_until:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    self._start_fetch(key, fetcher, ttl, stale_ttl, should_cache)
+                return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_fetch(key, fetcher, ttl, stale_ttl, should_cache)
+
+        # shield: a cancelled caller must not cancel the fetch shared with others
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key, fetcher, ttl, stale_ttl, should_cache) -> asyncio.Task:
+        """Start the single in-flight fetch for ``key``."""
+        task = asyncio.ensure_future(self._fetch(key, fetcher, ttl, stale_ttl, should_cache))
+        self._inflight[key] = task
+        task.add_done_callback(self._on_fetch_done)
+        return task
+
+    def _on_fetch_done(self, task: asyncio.Task):
+        """Retrieve background errors so unawaited refreshes don't warn."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"{self.name}: fetch failed: {task.exception()}")
+
+    async def _fetch(self, key, fetcher, ttl, stale_ttl, should_cache) -> Any:
+        try:
+            value = await fetcher()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if should_cache(value):
+            now = time.monotonic()
+            fresh_until = now + (self.ttl if ttl is None else ttl)
+            self._entries[key] = CacheEntry(
+                value=value,
+                fresh_until=fresh_until,
+                stale_until=fresh_until + (self.stale_ttl if stale_ttl is None else stale_ttl)
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or every key when ``key`` is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss metrics for monitoring."""
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'refreshes': self.refreshes,
+            'errors': self.errors,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.stale_hits + self.coalesced) / lookups if lookups else 0.0,
+            'upstream_fetches': self.misses + self.refreshes
+        }
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Cache local de velas (OHLCV) em camadas para ``BinanceAPI.get_klines``
+
+Camadas:
+    1. Memória: um buffer circular de velas fechadas por (símbolo, intervalo)
+    2. Disco: um arquivo ``.npy`` colunar (12 colunas x N velas) por (símbolo,
+       intervalo), lido com ``mmap_mode`` apenas na primeira consulta da chave
+
+Regras de invalidação:
+    - Velas fechadas são imutáveis e nunca são rebuscadas.
+    - A vela aberta (a mais recente) é guardada à parte e só é reutilizada por
+      ``open_candle_ttl`` segundos e enquanto seu horário de fechamento não passar.
+    - Se o intervalo desde a última vela fechada for maior que o buscado (lacuna),
+      o histórico da chave é substituído pelo que veio da API.
+
+A cada consulta só a cauda que falta desde a última vela fechada é buscada.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.utils import format_symbol
+from .binance_stream import INTERVAL_MS, MAX_BACKFILL_LIMIT
+
+
+# Colunas do formato /v3/klines
+KLINE_COLUMNS = 12
+
+# Colunas inteiras (horário de abertura, horário de fechamento, número de trades)
+INTEGER_COLUMNS = (0, 6, 8)
+
+
+def _kline_to_row(kline, interval_ms):
+    """Converte uma vela REST em uma linha numérica de 12 colunas"""
+    row = [0.0] * KLINE_COLUMNS
+    for i, value in enumerate(kline[:KLINE_COLUMNS - 1]):
+        row[i] = float(value)
+    if len(kline) <= 6:
+        row[6] = row[0] + interval_ms - 1
+    return row
+
+
+def _row_to_kline(row):
+    """Converte uma linha numérica de volta para o formato REST (preços como string)"""
+    kline = [f"{value:.8f}" for value in row[:KLINE_COLUMNS - 1]]
+    for i in INTEGER_COLUMNS:
+        kline[i] = int(row[i])
+    kline.append("0")
+    return kline
+
+
+class KlineCache:
+    """Cache read-through de velas com buffer em memória e armazenamento em disco
+
+    Args:
+        fetcher (callable): Função ``fetcher(symbol, interval, limit)`` que consulta a API REST
+        cache_dir (str, optional): Diretório do armazenamento em disco (None = só memória)
+        max_candles (int): Velas fechadas mantidas por (símbolo, intervalo)
+        open_candle_ttl (float): Segundos em que a vela aberta pode ser reutilizada
+        close_grace_ms (int): Margem após o fechamento para considerar a vela fechada
+            (tolerância a diferença de relógio com o servidor)
+    """
+
+    def __init__(self, fetcher: Callable[[str, str, int], List[list]], cache_dir: Optional[str] = None,
+                 max_candles: int = MAX_BACKFILL_LIMIT, open_candle_ttl: float = 5.0,
+                 close_grace_ms: int = 2000):
+        self.fetcher = fetcher
+        self.cache_dir = cache_dir
+        self.max_candles = max(1, max_candles)
+        self.open_candle_ttl = open_candle_ttl
+        self.close_grace_ms = close_grace_ms
+        self.logger = logging.getLogger("robot-crypt")
+
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._closed: Dict[Tuple[str, str], deque] = {}
+        self._open: Dict[Tuple[str, str], Tuple[list, float]] = {}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        # Estatísticas
+        self.requests = 0
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.upstream_requests = 0
+        self.candles_served = 0
+        self.candles_from_cache = 0
+        self.candles_fetched = 0
+        self.disk_loads = 0
+        self.disk_writes = 0
+        self.bytes_fetched = 0
+        self.bytes_saved = 0.0
+
+    @staticmethod
+    def _now_ms():
+        return int(time.time() * 1000)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def get_klines(self, symbol, interval, limit=500):
+        """Retorna as últimas ``limit`` velas (incluindo a aberta), como ``/v3/klines``"""
+        if interval not in INTERVAL_MS or limit <= 0 or limit > self.max_candles:
+            self.bypassed += 1
+            return self._fetch(symbol, interval, limit)
+
+        key = (format_symbol(symbol).upper(), interval)
+        with self._key_lock(key):
+            return self._get_locked(key, symbol, interval, limit)
+
+    def _get_locked(self, key, symbol, interval, limit):
+        step = INTERVAL_MS[interval]
+        now_ms = self._now_ms()
+        closed = self._closed_candles(key, interval)
+
+        open_candle, fetched_at = self._open.get(key, (None, 0.0))
+        if open_candle is not None and (open_candle[6] + self.close_grace_ms < now_ms or
+                                        time.monotonic() - fetched_at > self.open_candle_ttl):
+            open_candle = None
+            self._open.pop(key, None)
+
+        # Velas desde a última fechada, incluindo a atual (aberta)
+        missing = (now_ms - (closed[-1][0] + step)) // step + 1 if closed else limit
+        self.requests += 1
+
+        if closed and open_candle is not None and open_candle[0] == closed[-1][0] + step \
+                and len(closed) >= limit - 1:
+            self.hits += 1
+            return self._serve(closed, open_candle, limit, fetched=0)
+
+        if closed and len(closed) + missing >= limit and missing < self.max_candles:
+            # Refaz a última vela fechada para detectar lacunas/diferença de relógio
+            fetch_limit = int(max(missing, 1)) + 1
+            self.partial_hits += 1
+        else:
+            fetch_limit = limit
+            self.misses += 1
+
+        klines = self._fetch(symbol, interval, fetch_limit)
+        if not klines:
+            return klines
+
+        open_candle = self._store(key, interval, klines, now_ms)
+        if len(closed) + (open_candle is not None) < limit and fetch_limit < limit:
+            # O histórico foi descartado por causa de uma lacuna: busca completa
+            self.partial_hits -= 1
+            self.misses += 1
+            klines = self._fetch(symbol, interval, limit)
+            if not klines:
+                return klines
+            open_candle = self._store(key, interval, klines, now_ms)
+
+        return self._serve(closed, open_candle, limit, fetched=len(klines))
+
+    def _serve(self, closed, open_candle, limit, fetched):
+        """Monta a resposta e contabiliza velas e bytes servidos do cache"""
+        candles = list(closed)
+        if open_candle is not None:
+            candles.append(open_candle)
+        result = [list(candle) for candle in candles[-limit:]]
+
+        from_cache = max(0, len(result) - fetched)
+        self.candles_served += len(result)
+        self.candles_from_cache += from_cache
+        if self.candles_fetched:
+            self.bytes_saved += from_cache * self.bytes_fetched / self.candles_fetched
+        return result
+
+    def _fetch(self, symbol, interval, limit):
+        self.upstream_requests += 1
+        klines = self.fetcher(symbol, interval, limit)
+        if klines:
+            self.candles_fetched += len(klines)
+            self.bytes_fetched += len(json.dumps(klines, separators=(',', ':')))
+        return klines
+
+    # ------------------------------------------------------------------
+    # Armazenamento
+    # ------------------------------------------------------------------
+    def _store(self, key, interval, klines, now_ms):
+        """Separa velas fechadas (mescladas ao histórico) da vela aberta
+
+        Returns:
+            list: Vela aberta, ou None se todas as velas retornadas já fecharam
+        """
+        step = INTERVAL_MS[interval]
+        klines = [list(k) if len(k) > 6 else list(k) + [int(k[0]) + step - 1] for k in klines]
+        open_candle = None
+        if klines[-1][6] + self.close_grace_ms >= now_ms:
+            open_candle = klines.pop()
+            self._open[key] = (open_candle, time.monotonic())
+        else:
+            self._open.pop(key, None)
+
+        closed = self._closed[key]
+        last_open = closed[-1][0] if closed else None
+        new = [k for k in klines if last_open is None or k[0] > last_open]
+        if new and last_open is not None and new[0][0] > last_open + step:
+            # Lacuna entre o histórico e o que foi buscado: descarta o histórico antigo
+            closed.clear()
+            new = klines
+        if new:
+            closed.extend(new)
+            self._persist(key, interval, closed)
+        return open_candle
+
+    def _closed_candles(self, key, interval):
+        """Buffer de velas fechadas da chave, carregado do disco na primeira consulta"""
+        closed = self._closed.get(key)
+        if closed is None:
+            closed = deque(self._load(key), maxlen=self.max_candles)
+            self._closed[key] = closed
+        return closed
+
+    def _path(self, key):
+        symbol, interval = key
+        return os.path.join(self.cache_dir, f"{symbol}_{interval}.npy")
+
+    def _load(self, key):
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return []
+        try:
+            columns = np.load(self._path(key), mmap_mode='r')
+            # Só a cauda é lida do disco
+            tail = np.asarray(columns[:, -self.max_candles:]).T
+            self.disk_loads += 1
+            return [_row_to_kline(row) for row in tail.tolist()]
+        except Exception as e:
+            self.logger.warning(f"Cache de velas em disco inválido para {key}: {str(e)}")
+            return []
+
+    def _persist(self, key, interval, closed):
+        if not self.cache_dir:
+            return
+        step = INTERVAL_MS[interval]
+        columns = np.array([_kline_to_row(k, step) for k in closed], dtype=np.float64).T
+        path = self._path(key)
+        tmp_path = None
+        try:
+            # Arquivo temporário único por gravação: instâncias e processos que
+            # compartilham o diretório não escrevem no mesmo arquivo
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(path), suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.ascontiguousarray(columns))
+            os.replace(tmp_path, path)
+            self.disk_writes += 1
+        except OSError as e:
+            self.logger.warning(f"Falha ao gravar cache de velas {key}: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def invalidate(self, symbol=None, interval=None):
+        """Descarta o cache em memória (e em disco) de uma chave, ou de todas"""
+        with self._lock:
+            keys = [k for k in set(self._closed) | set(self._open)
+                    if (symbol is None or k[0] == format_symbol(symbol).upper())
+                    and (interval is None or k[1] == interval)]
+        for key in keys:
+            with self._key_lock(key):
+                self._closed.pop(key, None)
+                self._open.pop(key, None)
+                if self.cache_dir and os.path.exists(self._path(key)):
+                    os.remove(self._path(key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas de acerto e economia de banda"""
+        return {
+            'keys': len(self._closed),
+            'requests': self.requests,
+            'hits': self.hits,
+            'partial_hits': self.partial_hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': self.hits / self.requests if self.requests else 0.0,
+            'candle_hit_rate': self.candles_from_cache / self.candles_served if self.candles_served else 0.0,
+            'upstream_requests': self.upstream_requests,
+            'candles_served': self.candles_served,
+            'candles_from_cache': self.candles_from_cache,
+            'candles_fetched': self.candles_fetched,
+            'bytes_fetched': self.bytes_fetched,
+            'bytes_saved': int(self.bytes_saved),
+            'disk_loads': self.disk_loads,
+            'disk_writes': self.disk_writes,
+        }
@@ -2,7 +2,7 @@
 Analytics API Router - Endpoints para módulo de analytics
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import FileResponse
 from typing import Dict, List, Any, Optional
 import pandas as pd
@@ -10,19 +10,35 @@ import numpy as np
 from datetime import datetime, timedelta
 import io
 import json
+import hashlib
+import asyncio
+import logging
 from pathlib import Path
 
 from ...analytics import (
     AdvancedAnalytics, 
     MLModels, 
-    BacktestingEngine, 
     RiskAnalytics, 
-    ReportGenerator
+    ReportGenerator,
+    ParameterSweep
+)
+from ...analytics.backtesting_engine import STRATEGIES, VECTORIZED_STRATEGIES
+from ...analytics.compute_jobs import (
+    FINISHED_STATUSES,
+    get_compute_job_manager,
+    run_backtest_job,
+    run_monte_carlo_job,
+    run_sweep_job,
+    train_model_job,
+    generate_report_job
 )
 from ...core.database import get_db_connection
 from ...core.security import get_current_user
+from ...core.websocket_manager import websocket_manager
 from ...schemas.user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 # Instâncias dos módulos de analytics
@@ -31,6 +47,14 @@ ml_models = MLModels()
 risk_analytics = RiskAnalytics()
 report_generator = ReportGenerator()
 
+# Backtests, buscas de parâmetros, Monte Carlo, treinamento e relatórios rodam em
+# compute jobs (pool de processos); as atualizações são enviadas pelo WebSocket no
+# loop da API
+_job_updates_loop: Optional[asyncio.AbstractEventLoop] = None
+_job_listener_registered = False
+
+JOB_WAIT_DESCRIPTION = "Segundos aguardando o resultado (vazio = até terminar; 0 = retorna o job imediatamente)"
+
 
 @router.post("/descriptive-statistics")
 async def calculate_descriptive_statistics(
@@ -171,11 +195,11 @@ async def calculate_risk_analysis(
 @router.post("/backtest")
 async def run_backtest(
     backtest_config: Dict[str, Any],
-    background_tasks: BackgroundTasks,
+    wait: Optional[float] = Query(None, ge=0, description=JOB_WAIT_DESCRIPTION),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Executa backtesting de estratégia
+    Executa backtesting de estratégia em um compute job
     """
     try:
         # Obter dados
@@ -184,36 +208,23 @@ async def run_backtest(
         if data.empty:
             raise HTTPException(status_code=404, detail="Dados não encontrados")
         
-        # Configurar engine de backtesting
-        initial_capital = backtest_config.get('initial_capital', 10000)
-        commission = backtest_config.get('commission', 0.001)
-        
-        engine = BacktestingEngine(initial_capital=initial_capital, commission=commission)
-        engine.add_data(data, backtest_config.get('symbol', 'BTCUSDT'))
-        
-        # Definir estratégia (exemplo com média móvel)
         strategy_type = backtest_config.get('strategy', 'simple_ma')
         strategy_params = backtest_config.get('strategy_params', {})
+        vectorized = backtest_config.get('vectorized', False)
         
-        if strategy_type == 'simple_ma':
-            from ...analytics.backtesting_engine import simple_ma_strategy
-            strategy = simple_ma_strategy
-        elif strategy_type == 'rsi':
-            from ...analytics.backtesting_engine import rsi_strategy
-            strategy = strategy
-        else:
+        strategies = VECTORIZED_STRATEGIES if vectorized else STRATEGIES
+        if strategy_type not in strategies:
             raise HTTPException(status_code=400, detail=f"Estratégia {strategy_type} não suportada")
         
-        # Executar backtest
-        results = engine.run_backtest(
-            strategy=strategy,
-            start_date=backtest_config.get('start_date'),
-            end_date=backtest_config.get('end_date'),
-            **strategy_params
+        job = await _submit_job(
+            'backtest', backtest_config, data, run_backtest_job, data, backtest_config,
+            current_user=current_user, wait=wait
         )
+        if job['status'] != 'completed':
+            return _job_submitted_response(job, "job_submitted", "Backtest em execução")
         
         # Converter DataFrames e objetos não serializáveis
-        serializable_results = _make_serializable(results)
+        serializable_results = _make_serializable(get_compute_job_manager().get_result(job['job_id']))
         
         return {
             "status": "success",
@@ -221,86 +232,155 @@ async def run_backtest(
             "metadata": {
                 "strategy": strategy_type,
                 "parameters": strategy_params,
+                "vectorized": vectorized,
+                "job_id": job['job_id'],
+                "cached": job['cached'],
                 "generated_at": datetime.now().isoformat()
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro no backtesting: {str(e)}")
 
 
-@router.post("/ml-models/train")
-async def train_ml_model(
-    training_config: Dict[str, Any],
-    background_tasks: BackgroundTasks,
+@router.post("/backtest/sweep")
+async def run_backtest_sweep(
+    sweep_config: Dict[str, Any],
+    wait: Optional[float] = Query(0, ge=0, description=JOB_WAIT_DESCRIPTION),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Treina modelo de Machine Learning
+    Inicia busca de parâmetros (grid ou aleatória) em um compute job
+    
+    A busca roda em sequência dentro do worker; ``max_workers`` é ignorado.
     """
     try:
         # Obter dados
-        data = await _get_data_from_config(training_config.get('data_config', {}))
+        data = await _get_data_from_config(sweep_config.get('data_config', {}))
         
         if data.empty:
             raise HTTPException(status_code=404, detail="Dados não encontrados")
         
-        # Preparar features
-        target_column = training_config.get('target_column', 'close')
-        feature_columns = training_config.get('feature_columns')
-        lag_features = training_config.get('lag_features', 5)
+        strategy_type = sweep_config.get('strategy', 'simple_ma')
+        vectorized = sweep_config.get('vectorized', True)
         
-        X, y = ml_models.prepare_features(
-            data, 
-            target_column, 
-            feature_columns, 
-            lag_features
+        strategies = VECTORIZED_STRATEGIES if vectorized else STRATEGIES
+        if strategy_type not in strategies:
+            raise HTTPException(status_code=400, detail=f"Estratégia {strategy_type} não suportada")
+        
+        # Combinações: grade completa ou busca aleatória
+        if sweep_config.get('param_grid'):
+            combinations = ParameterSweep.grid(sweep_config['param_grid'])
+        elif sweep_config.get('param_distributions'):
+            # Listas são escolhas discretas; {"min": a, "max": b} vira intervalo
+            distributions = {
+                name: (dist['min'], dist['max']) if isinstance(dist, dict) else dist
+                for name, dist in sweep_config['param_distributions'].items()
+            }
+            combinations = ParameterSweep.random_search(
+                distributions,
+                n_iter=sweep_config.get('n_iter', 50),
+                seed=sweep_config.get('seed')
+            )
+        else:
+            raise HTTPException(status_code=400, detail="Informe param_grid ou param_distributions")
+        
+        # As combinações sorteadas entram na chave do cache (busca aleatória sem seed)
+        job = await _submit_job(
+            'backtest_sweep', {**sweep_config, 'combinations': combinations}, data,
+            run_sweep_job, data, sweep_config, combinations,
+            current_user=current_user, wait=wait
         )
         
-        if len(X) == 0:
-            raise HTTPException(status_code=400, detail="Não foi possível preparar features")
+        if job['status'] == 'completed':
+            return _job_submitted_response(job, "sweep_completed", "Busca de parâmetros concluída",
+                                           total_combinations=len(combinations))
+        return _job_submitted_response(job, "sweep_started", "Busca de parâmetros iniciada em background",
+                                       total_combinations=len(combinations))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na busca de parâmetros: {str(e)}")
+
+
+@router.get("/backtest/sweep/{job_id}")
+async def get_backtest_sweep(
+    job_id: str,
+    limit: int = Query(20, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Consulta status e ranking de uma busca de parâmetros
+    """
+    job = _get_user_job(job_id, current_user)
+    if job['kind'] != 'backtest_sweep':
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    ranking = None
+    if job['status'] == 'completed':
+        results = get_compute_job_manager().get_result(job_id)
+        ranking = results.head(limit).to_dict('records')
+    
+    return {
+        "status": "success",
+        "data": _make_serializable({**job, 'ranking': ranking}),
+        "metadata": {
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
+
+@router.post("/ml-models/train")
+async def train_ml_model(
+    training_config: Dict[str, Any],
+    wait: Optional[float] = Query(None, ge=0, description=JOB_WAIT_DESCRIPTION),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Treina modelo de Machine Learning em um compute job
+    
+    Com tuning de hiperparâmetros o job é apenas submetido (salvo se ``wait`` for informado).
+    """
+    try:
+        # Obter dados
+        data = await _get_data_from_config(training_config.get('data_config', {}))
+        
+        if data.empty:
+            raise HTTPException(status_code=404, detail="Dados não encontrados")
         
-        # Configurações de treinamento
         model_name = training_config.get('model_name', 'random_forest')
-        test_size = training_config.get('test_size', 0.2)
-        cv_folds = training_config.get('cv_folds', 5)
-        feature_selection = training_config.get('feature_selection', True)
         hyperparameter_tuning = training_config.get('hyperparameter_tuning', True)
         
-        # Treinar modelo
-        def train_model_task():
-            performance = ml_models.train_model(
-                X, y,
-                model_name=model_name,
-                test_size=test_size,
-                cv_folds=cv_folds,
-                feature_selection=feature_selection,
-                hyperparameter_tuning=hyperparameter_tuning
+        if wait is None and hyperparameter_tuning:
+            wait = 0
+        
+        job = await _submit_job(
+            'ml_train', training_config, data, train_model_job, data, training_config, ml_models.models_dir,
+            current_user=current_user, wait=wait
+        )
+        if job['status'] != 'completed':
+            return _job_submitted_response(
+                job, "training_started", "Treinamento iniciado em background", model_name=model_name
             )
-            return performance
         
-        # Executar treinamento em background se for demorado
-        if hyperparameter_tuning:
-            background_tasks.add_task(train_model_task)
-            return {
-                "status": "training_started",
-                "message": "Treinamento iniciado em background",
-                "model_name": model_name
-            }
-        else:
-            performance = train_model_task()
-            
-            # Converter objetos não serializáveis
-            serializable_performance = _make_serializable(performance)
-            
-            return {
-                "status": "success",
-                "data": serializable_performance,
-                "metadata": {
-                    "generated_at": datetime.now().isoformat()
-                }
+        # Converter objetos não serializáveis
+        serializable_performance = _make_serializable(get_compute_job_manager().get_result(job['job_id']))
+        
+        return {
+            "status": "success",
+            "data": serializable_performance,
+            "metadata": {
+                "job_id": job['job_id'],
+                "cached": job['cached'],
+                "generated_at": datetime.now().isoformat()
             }
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro no treinamento: {str(e)}")
 
@@ -391,11 +471,13 @@ async def predict_with_model(
 @router.post("/reports/generate")
 async def generate_comprehensive_report(
     report_config: Dict[str, Any],
-    background_tasks: BackgroundTasks,
+    wait: Optional[float] = Query(None, ge=0, description=JOB_WAIT_DESCRIPTION),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Gera relatório completo de analytics
+    Gera relatório completo de analytics em um compute job
+    
+    Para mais de 1000 linhas o job é apenas submetido (salvo se ``wait`` for informado).
     """
     try:
         # Obter dados
@@ -404,46 +486,39 @@ async def generate_comprehensive_report(
         if data.empty:
             raise HTTPException(status_code=404, detail="Dados não encontrados")
         
-        # Configurações do relatório
         title = report_config.get('title', 'Relatório de Analytics')
-        format_type = report_config.get('format', 'html')
-        returns_column = report_config.get('returns_column', 'returns')
-        price_column = report_config.get('price_column', 'close')
-        
-        # Gerar relatório
-        def generate_report_task():
-            return report_generator.generate_comprehensive_report(
-                data=data,
-                returns_column=returns_column,
-                price_column=price_column,
-                title=title,
-                format_type=format_type
+        
+        if wait is None and len(data) > 1000:
+            wait = 0
+        
+        job = await _submit_job(
+            'report', report_config, data, generate_report_job, data, report_config,
+            current_user=current_user, wait=wait
+        )
+        if job['status'] != 'completed':
+            return _job_submitted_response(
+                job, "report_generation_started", "Geração de relatório iniciada em background", title=title
             )
         
-        # Executar geração em background para relatórios grandes
-        if len(data) > 1000:
-            background_tasks.add_task(generate_report_task)
-            return {
-                "status": "report_generation_started",
-                "message": "Geração de relatório iniciada em background",
-                "title": title
-            }
-        else:
-            report_info = generate_report_task()
-            
-            return {
-                "status": "success",
-                "data": {
-                    "report_path": report_info['report_path'],
-                    "format": report_info['format'],
-                    "timestamp": report_info['timestamp']
-                },
-                "metadata": {
-                    "title": title,
-                    "generated_at": datetime.now().isoformat()
-                }
+        report_info = get_compute_job_manager().get_result(job['job_id'])
+        
+        return {
+            "status": "success",
+            "data": {
+                "report_path": report_info['report_path'],
+                "format": report_info['format'],
+                "timestamp": report_info['timestamp']
+            },
+            "metadata": {
+                "title": title,
+                "job_id": job['job_id'],
+                "cached": job['cached'],
+                "generated_at": datetime.now().isoformat()
             }
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na geração do relatório: {str(e)}")
 
@@ -481,10 +556,11 @@ async def download_report(
 @router.post("/monte-carlo")
 async def run_monte_carlo_simulation(
     simulation_config: Dict[str, Any],
+    wait: Optional[float] = Query(None, ge=0, description=JOB_WAIT_DESCRIPTION),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Executa simulação Monte Carlo
+    Executa simulação Monte Carlo em um compute job
     """
     try:
         # Obter dados
@@ -508,12 +584,15 @@ async def run_monte_carlo_simulation(
         num_simulations = simulation_config.get('num_simulations', 1000)
         time_horizon = simulation_config.get('time_horizon', 252)
         
-        # Executar simulação
-        results = risk_analytics.monte_carlo_simulation(
-            returns,
-            num_simulations=num_simulations,
-            time_horizon=time_horizon
+        # Executar simulação (somente resumo + amostra de trajetórias)
+        job = await _submit_job(
+            'monte_carlo', simulation_config, data, run_monte_carlo_job, returns, simulation_config,
+            current_user=current_user, wait=wait
         )
+        if job['status'] != 'completed':
+            return _job_submitted_response(job, "job_submitted", "Simulação Monte Carlo em execução")
+        
+        results = get_compute_job_manager().get_result(job['job_id'])
         
         # Converter arrays numpy para listas para serialização
         serializable_results = _make_serializable(results)
@@ -524,15 +603,178 @@ async def run_monte_carlo_simulation(
             "metadata": {
                 "num_simulations": num_simulations,
                 "time_horizon": time_horizon,
+                "mode": results.get('mode'),
+                "job_id": job['job_id'],
+                "cached": job['cached'],
                 "generated_at": datetime.now().isoformat()
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na simulação Monte Carlo: {str(e)}")
 
 
+@router.get("/jobs")
+async def list_compute_jobs(current_user: User = Depends(get_current_user)):
+    """
+    Lista os compute jobs do usuário
+    """
+    manager = get_compute_job_manager()
+    jobs = manager.list_jobs(owner=current_user.id)
+    
+    return {
+        "status": "success",
+        "data": jobs,
+        "metadata": {
+            "total_jobs": len(jobs),
+            "stats": manager.get_stats(),
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_compute_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Consulta status e progresso de um compute job
+    """
+    return {
+        "status": "success",
+        "data": _get_user_job(job_id, current_user),
+        "metadata": {
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_compute_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retorna o resultado de um compute job concluído
+    """
+    job = _get_user_job(job_id, current_user)
+    if job['status'] != 'completed':
+        raise HTTPException(status_code=409, detail=f"Job {job['status']}: {job['error'] or 'sem resultado'}")
+    
+    return {
+        "status": "success",
+        "data": _make_serializable(get_compute_job_manager().get_result(job_id)),
+        "metadata": {
+            "job_id": job_id,
+            "kind": job['kind'],
+            "cached": job['cached'],
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_compute_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cancela um compute job pendente ou em execução
+    """
+    _get_user_job(job_id, current_user)
+    job = get_compute_job_manager().cancel(job_id)
+    
+    return {
+        "status": "success",
+        "data": job,
+        "metadata": {
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
+
 # Funções auxiliares
+def _on_job_update(job: Dict[str, Any]):
+    """
+    Listener de compute jobs: carrega modelos treinados e envia o progresso pelo WebSocket
+    
+    Pode ser chamado de threads do pool; o envio é agendado no event loop da API.
+    """
+    if job['kind'] == 'ml_train' and job['status'] == 'completed':
+        try:
+            model_id = get_compute_job_manager().get_result(job['job_id'])['model_id']
+            if model_id not in ml_models.models:
+                ml_models.load_model(model_id)
+        except Exception as e:
+            logger.warning(f"Erro ao carregar modelo do job {job['job_id']}: {e}")
+    
+    loop = _job_updates_loop
+    if loop is None or loop.is_closed():
+        return
+    for user_id in job['owners']:
+        asyncio.run_coroutine_threadsafe(websocket_manager.broadcast_job_update(user_id, job), loop)
+
+
+def _data_fingerprint(data: pd.DataFrame) -> str:
+    """SHA-256 do conteúdo do DataFrame (índice, nomes das colunas e valores)"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(column) for column in data.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+async def _submit_job(kind: str, config: Dict[str, Any], data: pd.DataFrame, func, *args,
+                      current_user: User, wait: Optional[float]) -> Dict[str, Any]:
+    """
+    Submete um compute job e aguarda até ``wait`` segundos (None = até terminar)
+    
+    A chave do cache combina a configuração com um hash do conteúdo dos dados
+    (índice, colunas e valores), para que um CSV atualizado não reaproveite
+    resultados antigos.
+    """
+    global _job_updates_loop, _job_listener_registered
+    
+    manager = get_compute_job_manager()
+    _job_updates_loop = asyncio.get_running_loop()
+    if not _job_listener_registered:
+        manager.add_listener(_on_job_update)
+        _job_listener_registered = True
+    
+    cache_config = {
+        'request': config,
+        'data': _data_fingerprint(data)
+    }
+    job = manager.submit(kind, cache_config, func, *args, owner=current_user.id)
+    if job['status'] not in FINISHED_STATUSES and (wait is None or wait > 0):
+        job = await manager.wait(job['job_id'], timeout=wait)
+    
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=500, detail=job['error'])
+    return job
+
+
+def _job_submitted_response(job: Dict[str, Any], status: str, message: str, **extra) -> Dict[str, Any]:
+    """Resposta para jobs ainda não concluídos (consultar em /analytics/jobs/{job_id})"""
+    return {
+        "status": status,
+        "message": message,
+        "job_id": job['job_id'],
+        "job": job,
+        **extra
+    }
+
+
+def _get_user_job(job_id: str, current_user: User) -> Dict[str, Any]:
+    """Estado de um job do usuário (404 se não existir ou for de outro usuário)"""
+    job = get_compute_job_manager().get(job_id)
+    if job is None or current_user.id not in job['owners']:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+
 async def _get_data_from_config(data_config: Dict[str, Any]) -> pd.DataFrame:
     """
     Obtém dados baseado na configuração
@@ -10,7 +10,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 from src.core.config import Settings
 from src.core.logger import logger
-from src.api.external.market_data_aggregator import MarketDataAggregator, get_market_overview, get_symbol_analysis
+from src.api.external.market_data_aggregator import get_shared_aggregator, get_market_overview, get_symbol_analysis
 
 router = APIRouter(prefix="/market", tags=["market"])
 
@@ -33,30 +33,30 @@ async def get_current_price(
         Dictionary containing current price data
     """
     try:
-        async with MarketDataAggregator() as aggregator:
-            prices = await aggregator.get_current_prices([symbol])
-            
-            if not prices:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Price data not found for {symbol}"
-                )
-            
-            price_data = prices[0]
-            
-            return {
-                "symbol": price_data.symbol,
-                "name": price_data.name,
-                "price": price_data.price,
-                "price_change_24h": price_data.price_change_24h,
-                "price_change_percentage_24h": price_data.price_change_percentage_24h,
-                "volume_24h": price_data.volume_24h,
-                "market_cap": price_data.market_cap,
-                "high_24h": price_data.high_24h,
-                "low_24h": price_data.low_24h,
-                "source": price_data.source,
-                "timestamp": price_data.timestamp
-            }
+        aggregator = await get_shared_aggregator()
+        prices = await aggregator.get_current_prices([symbol])
+        
+        if not prices:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Price data not found for {symbol}"
+            )
+        
+        price_data = prices[0]
+        
+        return {
+            "symbol": price_data.symbol,
+            "name": price_data.name,
+            "price": price_data.price,
+            "price_change_24h": price_data.price_change_24h,
+            "price_change_percentage_24h": price_data.price_change_percentage_24h,
+            "volume_24h": price_data.volume_24h,
+            "market_cap": price_data.market_cap,
+            "high_24h": price_data.high_24h,
+            "low_24h": price_data.low_24h,
+            "source": price_data.source,
+            "timestamp": price_data.timestamp
+        }
         
     except HTTPException:
         raise
@@ -84,22 +84,22 @@ async def get_historical_data(
         Dictionary containing historical price data
     """
     try:
-        async with MarketDataAggregator() as aggregator:
-            historical_data = await aggregator.get_historical_data(symbol, days)
-            
-            if not historical_data:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Historical data not found for {symbol}"
-                )
-            
-            return {
-                "symbol": symbol,
-                "days": days,
-                "data": historical_data,
-                "count": len(historical_data),
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        aggregator = await get_shared_aggregator()
+        historical_data = await aggregator.get_historical_data(symbol, days)
+        
+        if not historical_data:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Historical data not found for {symbol}"
+            )
+        
+        return {
+            "symbol": symbol,
+            "days": days,
+            "data": historical_data,
+            "count": len(historical_data),
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
     except HTTPException:
         raise
@@ -125,27 +125,27 @@ async def get_trending_coins(
         Dictionary containing trending coins data
     """
     try:
-        async with MarketDataAggregator() as aggregator:
-            trending_data = await aggregator.get_trending_cryptocurrencies(limit)
-            
-            trending_coins = []
-            for data in trending_data:
-                trending_coins.append({
-                    "symbol": data.symbol,
-                    "name": data.name,
-                    "price": data.price,
-                    "price_change_24h": data.price_change_24h,
-                    "price_change_percentage_24h": data.price_change_percentage_24h,
-                    "volume_24h": data.volume_24h,
-                    "market_cap": data.market_cap,
-                    "source": data.source
-                })
-            
-            return {
-                "trending_coins": trending_coins,
-                "count": len(trending_coins),
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        aggregator = await get_shared_aggregator()
+        trending_data = await aggregator.get_trending_cryptocurrencies(limit)
+        
+        trending_coins = []
+        for data in trending_data:
+            trending_coins.append({
+                "symbol": data.symbol,
+                "name": data.name,
+                "price": data.price,
+                "price_change_24h": data.price_change_24h,
+                "price_change_percentage_24h": data.price_change_percentage_24h,
+                "volume_24h": data.volume_24h,
+                "market_cap": data.market_cap,
+                "source": data.source
+            })
+        
+        return {
+            "trending_coins": trending_coins,
+            "count": len(trending_coins),
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
     except Exception as e:
         logger.error(f"Error fetching trending coins: {str(e)}")
@@ -169,33 +169,33 @@ async def get_market_summary(
         Dictionary containing market summary data
     """
     try:
-        async with MarketDataAggregator() as aggregator:
-            prices = await aggregator.get_current_prices(symbols)
-            
-            market_data = {}
-            for price in prices:
-                market_data[price.symbol] = {
-                    "symbol": price.symbol,
-                    "name": price.name,
-                    "price": price.price,
-                    "price_change_24h": price.price_change_24h,
-                    "price_change_percentage_24h": price.price_change_percentage_24h,
-                    "volume_24h": price.volume_24h,
-                    "market_cap": price.market_cap,
-                    "source": price.source
-                }
-            
-            # Add any symbols that weren't found
-            for symbol in symbols:
-                if symbol not in market_data:
-                    market_data[symbol] = {"error": "Data not available"}
-            
-            return {
-                "market_summary": market_data,
-                "symbols_count": len(symbols),
-                "timestamp": datetime.utcnow().isoformat()
+        aggregator = await get_shared_aggregator()
+        prices = await aggregator.get_current_prices(symbols)
+        
+        market_data = {}
+        for price in prices:
+            market_data[price.symbol] = {
+                "symbol": price.symbol,
+                "name": price.name,
+                "price": price.price,
+                "price_change_24h": price.price_change_24h,
+                "price_change_percentage_24h": price.price_change_percentage_24h,
+                "volume_24h": price.volume_24h,
+                "market_cap": price.market_cap,
+                "source": price.source
             }
         
+        # Add any symbols that weren't found
+        for symbol in symbols:
+            if symbol not in market_data:
+                market_data[symbol] = {"error": "Data not available"}
+        
+        return {
+            "market_summary": market_data,
+            "symbols_count": len(symbols),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
     except Exception as e:
         logger.error(f"Error fetching market summary: {str(e)}")
         raise HTTPException(
@@ -223,31 +223,31 @@ async def get_coin_news(
         # Extract coin symbol from trading pair
         coin_symbol = symbol.split('/')[0] if '/' in symbol else symbol
         
-        async with MarketDataAggregator() as aggregator:
-            news_articles = await aggregator.get_news_analysis([coin_symbol], limit)
-            
-            news_data = []
-            for article in news_articles:
-                news_data.append({
-                    "title": article.title,
-                    "description": article.description,
-                    "url": article.url,
-                    "source": article.source,
-                    "published_at": article.published_at,
-                    "sentiment": article.sentiment,
-                    "sentiment_score": article.sentiment_score,
-                    "importance": article.importance,
-                    "currencies": article.currencies,
-                    "source_type": article.source_type
-                })
-            
-            return {
-                "symbol": symbol,
-                "coin": coin_symbol,
-                "news": news_data,
-                "count": len(news_data),
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        aggregator = await get_shared_aggregator()
+        news_articles = await aggregator.get_news_analysis([coin_symbol], limit)
+        
+        news_data = []
+        for article in news_articles:
+            news_data.append({
+                "title": article.title,
+                "description": article.description,
+                "url": article.url,
+                "source": article.source,
+                "published_at": article.published_at,
+                "sentiment": article.sentiment,
+                "sentiment_score": article.sentiment_score,
+                "importance": article.importance,
+                "currencies": article.currencies,
+                "source_type": article.source_type
+            })
+        
+        return {
+            "symbol": symbol,
+            "coin": coin_symbol,
+            "news": news_data,
+            "count": len(news_data),
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
     except Exception as e:
         logger.error(f"Error fetching news for {symbol}: {str(e)}")
@@ -267,24 +267,24 @@ async def health_check() -> Dict[str, Any]:
     """
     try:
         # Test real API connectivity
-        async with MarketDataAggregator() as aggregator:
-            # Test basic functionality
-            test_prices = await aggregator.get_current_prices(["BTC/USDT"])
-            api_healthy = bool(test_prices)
-            
-            return {
-                "status": "healthy" if api_healthy else "degraded",
-                "api_connectivity": api_healthy,
-                "api_status": aggregator.api_status,
-                "data_sources": {
-                    "binance": aggregator.api_status.get('binance', False),
-                    "coinmarketcap": aggregator.api_status.get('coinmarketcap', False),
-                    "coinmarketcal": aggregator.api_status.get('coinmarketcal', False),
-                    "cryptopanic": aggregator.api_status.get('cryptopanic', False),
-                    "news_api": aggregator.api_status.get('news_api', False)
-                },
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        aggregator = await get_shared_aggregator()
+        # Test basic functionality
+        test_prices = await aggregator.get_current_prices(["BTC/USDT"])
+        api_healthy = bool(test_prices)
+        
+        return {
+            "status": "healthy" if api_healthy else "degraded",
+            "api_connectivity": api_healthy,
+            "api_status": aggregator.api_status,
+            "data_sources": {
+                "binance": aggregator.api_status.get('binance', False),
+                "coinmarketcap": aggregator.api_status.get('coinmarketcap', False),
+                "coinmarketcal": aggregator.api_status.get('coinmarketcal', False),
+                "cryptopanic": aggregator.api_status.get('cryptopanic', False),
+                "news_api": aggregator.api_status.get('news_api', False)
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -316,15 +316,15 @@ async def get_comprehensive_analysis(
         Comprehensive market analysis
     """
     try:
-        async with MarketDataAggregator() as aggregator:
-            analysis = await aggregator.get_comprehensive_market_analysis(
-                symbols=symbols,
-                include_news=include_news,
-                include_events=include_events,
-                include_sentiment=include_sentiment
-            )
-            
-            return analysis
+        aggregator = await get_shared_aggregator()
+        analysis = await aggregator.get_comprehensive_market_analysis(
+            symbols=symbols,
+            include_news=include_news,
+            include_events=include_events,
+            include_sentiment=include_sentiment
+        )
+        
+        return analysis
         
     except Exception as e:
         logger.error(f"Error fetching comprehensive analysis: {str(e)}")
@@ -353,27 +353,27 @@ async def get_sentiment_analysis(
         # Extract coin symbol from trading pair
         coin_symbol = symbol.split('/')[0] if '/' in symbol else symbol
         
-        async with MarketDataAggregator() as aggregator:
-            sentiment = await aggregator.get_sentiment_analysis(coin_symbol, days)
-            
-            if not sentiment:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Sentiment data not found for {symbol}"
-                )
-            
-            return {
-                "symbol": symbol,
-                "coin": coin_symbol,
-                "sentiment": sentiment.sentiment,
-                "sentiment_score": sentiment.sentiment_score,
-                "confidence": sentiment.confidence,
-                "post_count": sentiment.post_count,
-                "sentiment_distribution": sentiment.sentiment_distribution,
-                "analyzed_days": sentiment.analyzed_days,
-                "source": sentiment.source,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        aggregator = await get_shared_aggregator()
+        sentiment = await aggregator.get_sentiment_analysis(coin_symbol, days)
+        
+        if not sentiment:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Sentiment data not found for {symbol}"
+            )
+        
+        return {
+            "symbol": symbol,
+            "coin": coin_symbol,
+            "sentiment": sentiment.sentiment,
+            "sentiment_score": sentiment.sentiment_score,
+            "confidence": sentiment.confidence,
+            "post_count": sentiment.post_count,
+            "sentiment_distribution": sentiment.sentiment_distribution,
+            "analyzed_days": sentiment.analyzed_days,
+            "source": sentiment.source,
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
     except HTTPException:
         raise
@@ -401,28 +401,28 @@ async def get_upcoming_events(
         List of upcoming events
     """
     try:
-        async with MarketDataAggregator() as aggregator:
-            events = await aggregator.get_upcoming_events(days_ahead)
-            
-            events_data = []
-            for event in events[:limit]:
-                events_data.append({
-                    "title": event.title,
-                    "description": event.description,
-                    "date_event": event.date_event,
-                    "source": event.source,
-                    "importance": event.importance,
-                    "currencies": event.currencies,
-                    "category": event.category,
-                    "votes": event.votes
-                })
-            
-            return {
-                "events": events_data,
-                "count": len(events_data),
-                "days_ahead": days_ahead,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        aggregator = await get_shared_aggregator()
+        events = await aggregator.get_upcoming_events(days_ahead)
+        
+        events_data = []
+        for event in events[:limit]:
+            events_data.append({
+                "title": event.title,
+                "description": event.description,
+                "date_event": event.date_event,
+                "source": event.source,
+                "importance": event.importance,
+                "currencies": event.currencies,
+                "category": event.category,
+                "votes": event.votes
+            })
+        
+        return {
+            "events": events_data,
+            "count": len(events_data),
+            "days_ahead": days_ahead,
+            "timestamp": datetime.utcnow().isoformat()
+        }
         
     except Exception as e:
         logger.error(f"Error fetching upcoming events: {str(e)}")
@@ -430,3 +430,19 @@ async def get_upcoming_events(
             status_code=500,
             detail="Failed to fetch upcoming events"
         )
+
+
+@router.get("/cache/stats")
+async def get_market_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit/miss metrics of the shared market data caches.
+    
+    Returns:
+        Dictionary containing cache metrics
+    """
+    aggregator = await get_shared_aggregator()
+    
+    return {
+        "caches": aggregator.get_cache_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
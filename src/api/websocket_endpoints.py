@@ -193,10 +193,16 @@ async def handle_subscription(
             all_assets = await asset_service.get_all_assets()
             assets = [asset.symbol for asset in all_assets]
         
+        # Optional conflation cadence (ms) and multi-symbol batching
+        cadence_ms = data.get("cadence_ms")
+        batch = data.get("batch")
+        
         # Subscribe to each asset
         for asset_symbol in assets:
             subscription_key = f"price:{asset_symbol}"
-            await websocket_manager.subscribe(connection_id, subscription_key)
+            await websocket_manager.subscribe(
+                connection_id, subscription_key, cadence_ms=cadence_ms, batch=batch
+            )
     
     elif subscription_type == "alerts":
         # Subscribe to user alerts
@@ -223,6 +229,11 @@ async def handle_subscription(
         subscription_key = f"orders:user:{user_id}"
         await websocket_manager.subscribe(connection_id, subscription_key)
     
+    elif subscription_type == "jobs":
+        # Subscribe to analytics compute job progress
+        subscription_key = f"jobs:user:{user_id}"
+        await websocket_manager.subscribe(connection_id, subscription_key)
+    
     elif subscription_type == "system":
         # Subscribe to system notifications
         subscription_key = f"system:user:{user_id}"
@@ -284,6 +295,10 @@ async def handle_unsubscription(
         subscription_key = f"orders:user:{user_id}"
         await websocket_manager.unsubscribe(connection_id, subscription_key)
     
+    elif subscription_type == "jobs":
+        subscription_key = f"jobs:user:{user_id}"
+        await websocket_manager.unsubscribe(connection_id, subscription_key)
+    
     elif subscription_type == "system":
         subscription_key = f"system:user:{user_id}"
         await websocket_manager.unsubscribe(connection_id, subscription_key)
@@ -10,16 +10,22 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 
-# Try to import VADER sentiment analyzer
-try:
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-    VADER_AVAILABLE = True
-except ImportError:
-    VADER_AVAILABLE = False
-    logger.warning("VADER sentiment analyzer not available. Install with: pip install vaderSentiment")
+from src.analysis.keyword_matcher import KeywordMatcher, symbol_table
+from src.contextual_analysis.sentiment_service import (
+    VADER_AVAILABLE, get_sentiment_service
+)
 
 logger = logging.getLogger(__name__)
 
+if not VADER_AVAILABLE:
+    logger.warning("VADER sentiment analyzer not available. Install with: pip install vaderSentiment")
+
+# Relevance scoring: weight of each matched category (times its multiplier),
+# bonus for mentioning a requested symbol and minimum score to be relevant
+CATEGORY_RELEVANCE_WEIGHT = 0.2
+SYMBOL_RELEVANCE_BONUS = 0.3
+RELEVANCE_THRESHOLD = 0.3
+
 
 class NewsAnalyzer:
     """
@@ -27,17 +33,17 @@ class NewsAnalyzer:
     Uses VADER sentiment analysis and custom impact scoring
     """
     
-    def __init__(self, news_client=None):
+    def __init__(self, news_client=None, sentiment_service=None):
         """
         Initialize the NewsAnalyzer
         
         Args:
             news_client: Optional news client for fetching news data
+            sentiment_service: Sentiment scorer (default: the shared cached service)
         """
         self.news_client = news_client
-        self.vader_analyzer = None
-        if VADER_AVAILABLE:
-            self.vader_analyzer = SentimentIntensityAnalyzer()
+        self.sentiment_service = sentiment_service or get_sentiment_service()
+        if self.sentiment_service.engine == 'vader':
             logger.info("NewsAnalyzer initialized with VADER sentiment analysis")
         else:
             logger.warning("NewsAnalyzer initialized without VADER - using fallback sentiment analysis")
@@ -63,57 +69,17 @@ class NewsAnalyzer:
             'ethereum': 1.0,
             'binance': 1.0
         }
+        
+        # Category matcher built once (one pass per article)
+        self.keyword_matcher = KeywordMatcher({'category': self.crypto_keywords}, inflected=('category',))
+        self._symbol_matchers: Dict[Tuple[str, ...], KeywordMatcher] = {}
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyze sentiment of text
         
-        Args:
-            text: Text to analyze
-            
-        Returns:
-            Dictionary containing sentiment analysis results
-        """
-        if not text or not isinstance(text, str):
-            return {
-                'sentiment': 'neutral',
-                'compound': 0.0,
-                'positive': 0.0,
-                'negative': 0.0,
-                'neutral': 1.0,
-                'confidence': 0.0
-            }
-        
-        text = text.lower().strip()
-        
-        if self.vader_analyzer:
-            # Use VADER sentiment analysis
-            scores = self.vader_analyzer.polarity_scores(text)
-            
-            # Determine overall sentiment
-            compound = scores['compound']
-            if compound >= 0.05:
-                sentiment = 'positive'
-            elif compound <= -0.05:
-                sentiment = 'negative'
-            else:
-                sentiment = 'neutral'
-                
-            return {
-                'sentiment': sentiment,
-                'compound': compound,
-                'positive': scores['pos'],
-                'negative': scores['neg'],
-                'neutral': scores['neu'],
-                'confidence': abs(compound)
-            }
-        else:
-            # Fallback sentiment analysis using simple keyword matching
-            return self._fallback_sentiment_analysis(text)
-    
-    def _fallback_sentiment_analysis(self, text: str) -> Dict[str, Any]:
-        """
-        Fallback sentiment analysis using keyword matching
+        Scores are cached by normalized text, so the same headline from several
+        sources is only scored once.
         
         Args:
             text: Text to analyze
@@ -121,47 +87,7 @@ class NewsAnalyzer:
         Returns:
             Dictionary containing sentiment analysis results
         """
-        positive_words = ['good', 'great', 'excellent', 'positive', 'bullish', 'up', 'rise', 'gain', 
-                         'profit', 'growth', 'success', 'win', 'strong', 'boost', 'surge', 'rally']
-        negative_words = ['bad', 'terrible', 'negative', 'bearish', 'down', 'fall', 'loss', 'crash',
-                         'decline', 'drop', 'weak', 'dump', 'sell', 'fear', 'panic', 'concern']
-        
-        words = text.lower().split()
-        pos_count = sum(1 for word in words if word in positive_words)
-        neg_count = sum(1 for word in words if word in negative_words)
-        
-        total_sentiment_words = pos_count + neg_count
-        if total_sentiment_words == 0:
-            return {
-                'sentiment': 'neutral',
-                'compound': 0.0,
-                'positive': 0.0,
-                'negative': 0.0,
-                'neutral': 1.0,
-                'confidence': 0.0
-            }
-        
-        pos_ratio = pos_count / total_sentiment_words
-        neg_ratio = neg_count / total_sentiment_words
-        
-        if pos_ratio > neg_ratio:
-            sentiment = 'positive'
-            compound = pos_ratio - neg_ratio
-        elif neg_ratio > pos_ratio:
-            sentiment = 'negative'
-            compound = -(neg_ratio - pos_ratio)
-        else:
-            sentiment = 'neutral'
-            compound = 0.0
-            
-        return {
-            'sentiment': sentiment,
-            'compound': compound,
-            'positive': pos_ratio,
-            'negative': neg_ratio,
-            'neutral': 1.0 - (pos_ratio + neg_ratio),
-            'confidence': abs(compound)
-        }
+        return self.sentiment_service.score(text)
     
     def analyze_news_impact(self, news_items: List[Dict[str, Any]], symbols: List[str] = None) -> Dict[str, Any]:
         """
@@ -181,6 +107,7 @@ class NewsAnalyzer:
         relevant_count = 0
         sentiment_scores = []
         
+        relevant_items = []
         for item in news_items:
             # Get news text (title + content)
             title = item.get('title', '')
@@ -191,13 +118,15 @@ class NewsAnalyzer:
                 continue
                 
             # Check relevance to symbols if specified
-            if symbols:
-                is_relevant = any(symbol.lower() in text.lower() for symbol in symbols)
-                if not is_relevant:
-                    continue
+            if symbols and not self.find_symbols(text, symbols):
+                continue
             
-            # Analyze sentiment
-            sentiment_result = self.analyze_sentiment(text)
+            relevant_items.append((item, text))
+        
+        # Score all relevant texts in one batch (cache hits skip scoring)
+        sentiment_results = self.sentiment_service.score_batch([text for _, text in relevant_items])
+        
+        for (item, _), sentiment_result in zip(relevant_items, sentiment_results):
             sentiment_scores.append(sentiment_result['compound'])
             
             # Calculate impact weight based on source credibility and recency
@@ -263,10 +192,31 @@ class NewsAnalyzer:
         logger.info(f"Extracting key topics from {len(news_items)} news items")
         return []
     
+    def find_symbols(self, text: str, symbols: List[str]) -> List[str]:
+        """
+        Find which of the given symbols are mentioned in the text (whole words only)
+        
+        Args:
+            text: Text to search
+            symbols: Tickers or trading pairs (e.g. "BTC", "ETHUSDT")
+            
+        Returns:
+            Base symbols mentioned, in order of appearance
+        """
+        key = tuple(sorted(symbols))
+        matcher = self._symbol_matchers.get(key)
+        if matcher is None:
+            matcher = self._symbol_matchers[key] = KeywordMatcher({'symbol': symbol_table(symbols)})
+        return matcher.match(text).labels('symbol')
+    
     def classify_news_relevance(self, news_item: Dict[str, Any], symbols: List[str] = None) -> Tuple[bool, float]:
         """
         Classify if a news item is relevant for trading
         
+        Each matched keyword category adds its weight times the category multiplier;
+        mentioning one of ``symbols`` adds a bonus, and when symbols are given an item
+        that mentions none of them is not relevant.
+        
         Args:
             news_item: News item to classify
             symbols: List of symbols to check relevance for
@@ -274,5 +224,19 @@ class NewsAnalyzer:
         Returns:
             Tuple of (is_relevant, relevance_score)
         """
-        logger.info(f"Classifying news relevance for item: {news_item.get('title', 'Unknown')}")
-        return False, 0.0
+        text = f"{news_item.get('title', '')} {news_item.get('content', '')}".strip()
+        if not text:
+            return False, 0.0
+        
+        score = 0.0
+        if symbols:
+            if not self.find_symbols(text, symbols):
+                return False, 0.0
+            score += SYMBOL_RELEVANCE_BONUS
+        
+        matches = self.keyword_matcher.match(text)
+        for category in matches.labels('category'):
+            score += CATEGORY_RELEVANCE_WEIGHT * self.category_multipliers.get(category, 1.0)
+        
+        score = min(1.0, score)
+        return score >= RELEVANCE_THRESHOLD, round(score, 3)
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Sentiment Service
+Content-addressed sentiment scoring shared by every news source
+
+Article text is normalized (Unicode NFKC, collapsed whitespace and, for the
+keyword engine, lowercase) and hashed together with the scoring engine. VADER
+keeps the original case because it boosts ALL-CAPS words. Scores are kept in an in-process LRU
+cache and, optionally, in a persistent store (the ``sentiment_cache`` table of
+``PostgresManager`` when SENTIMENT_STORE_ENABLED is set), so a headline seen via
+CryptoPanic, NewsAPI and the aggregator is scored once. Cache misses are scored
+in batches; large batches go to a process pool (spawned, see
+SENTIMENT_START_METHOD) where each worker keeps its own VADER analyzer.
+
+The module also provides cross-source article deduplication (same URL or
+near-duplicate title).
+"""
+
+import os
+import re
+import hashlib
+import logging
+import multiprocessing
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.analysis.keyword_matcher import KeywordMatcher, tokenize
+
+logger = logging.getLogger(__name__)
+
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    VADER_AVAILABLE = True
+except ImportError:
+    SentimentIntensityAnalyzer = None
+    VADER_AVAILABLE = False
+
+# Keywords for the fallback sentiment analysis
+FALLBACK_SENTIMENT_WORDS = {
+    'positive': ['good', 'great', 'excellent', 'positive', 'bullish', 'up', 'rise', 'gain',
+                 'profit', 'growth', 'success', 'win', 'strong', 'boost', 'surge', 'rally'],
+    'negative': ['bad', 'terrible', 'negative', 'bearish', 'down', 'fall', 'loss', 'crash',
+                 'decline', 'drop', 'weak', 'dump', 'sell', 'fear', 'panic', 'concern']
+}
+
+FALLBACK_MATCHER = KeywordMatcher({'sentiment': FALLBACK_SENTIMENT_WORDS}, inflected=('sentiment',))
+
+NEUTRAL_SENTIMENT = {
+    'sentiment': 'neutral',
+    'compound': 0.0,
+    'positive': 0.0,
+    'negative': 0.0,
+    'neutral': 1.0,
+    'confidence': 0.0
+}
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Trailing " - Source" / " | Source" appended to titles by aggregators like NewsAPI
+TITLE_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+
+
+# Query parameters that only track the referrer and never identify the article
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref', 'ref_src'}
+
+
+def normalize_text(text: str, lowercase: bool = True) -> str:
+    """Normalize text for scoring and hashing (NFKC, single spaces, optionally lowercase)"""
+    if not text:
+        return ""
+    normalized = WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return normalized.lower() if lowercase else normalized
+
+
+def text_hash(normalized_text: str, engine: str) -> str:
+    """SHA-256 key of already normalized text for a scoring engine"""
+    return hashlib.sha256(f"{engine}\0{normalized_text}".encode("utf-8")).hexdigest()
+
+
+def vader_sentiment(analyzer, text: str) -> Dict[str, Any]:
+    """Score text with a VADER analyzer"""
+    scores = analyzer.polarity_scores(text)
+    compound = scores['compound']
+    if compound >= 0.05:
+        sentiment = 'positive'
+    elif compound <= -0.05:
+        sentiment = 'negative'
+    else:
+        sentiment = 'neutral'
+
+    return {
+        'sentiment': sentiment,
+        'compound': compound,
+        'positive': scores['pos'],
+        'negative': scores['neg'],
+        'neutral': scores['neu'],
+        'confidence': abs(compound)
+    }
+
+
+def fallback_sentiment(text: str, matcher: KeywordMatcher = FALLBACK_MATCHER) -> Dict[str, Any]:
+    """Score text by counting positive and negative keywords"""
+    matches = matcher.match(text)
+    pos_count = matches.count('sentiment', 'positive')
+    neg_count = matches.count('sentiment', 'negative')
+
+    total_sentiment_words = pos_count + neg_count
+    if total_sentiment_words == 0:
+        return dict(NEUTRAL_SENTIMENT)
+
+    pos_ratio = pos_count / total_sentiment_words
+    neg_ratio = neg_count / total_sentiment_words
+
+    if pos_ratio > neg_ratio:
+        sentiment = 'positive'
+        compound = pos_ratio - neg_ratio
+    elif neg_ratio > pos_ratio:
+        sentiment = 'negative'
+        compound = -(neg_ratio - pos_ratio)
+    else:
+        sentiment = 'neutral'
+        compound = 0.0
+
+    return {
+        'sentiment': sentiment,
+        'compound': compound,
+        'positive': pos_ratio,
+        'negative': neg_ratio,
+        'neutral': 1.0 - (pos_ratio + neg_ratio),
+        'confidence': abs(compound)
+    }
+
+
+# Per-process VADER analyzer (created on first use in each worker)
+_worker_analyzer = None
+
+
+def _score_chunk(texts: List[str], engine: str) -> List[Dict[str, Any]]:
+    """Score a chunk of normalized texts (runs in the pool workers)"""
+    global _worker_analyzer
+
+    if engine == 'vader':
+        if _worker_analyzer is None:
+            _worker_analyzer = SentimentIntensityAnalyzer()
+        return [vader_sentiment(_worker_analyzer, text) for text in texts]
+    return [fallback_sentiment(text) for text in texts]
+
+
+class SentimentService:
+    """
+    Cached, batched sentiment scoring
+
+    Thread-safe; ``score_batch`` may be called from executor threads while the
+    event loop uses ``ascore_batch``.
+    """
+
+    def __init__(
+        self,
+        cache_size: Optional[int] = None,
+        store=None,
+        use_vader: bool = True,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        parallel_threshold: Optional[int] = None
+    ):
+        """
+        Args:
+            cache_size: Scores kept in the LRU cache (default: SENTIMENT_CACHE_SIZE or 20000)
+            store: Optional persistent store with ``get_sentiment_scores(hashes)`` and
+                ``save_sentiment_scores(scores)`` (e.g. PostgresManager)
+            use_vader: Score with VADER when installed (otherwise keyword fallback)
+            max_workers: Scoring processes (default: SENTIMENT_WORKERS or min(4, CPUs);
+                0 scores everything in the calling thread)
+            batch_size: Texts per task sent to a worker (default: SENTIMENT_BATCH_SIZE or 128)
+            parallel_threshold: Minimum cache misses in one call to use the process pool
+                (default: SENTIMENT_PARALLEL_THRESHOLD or 256)
+        """
+        self.engine = 'vader' if use_vader and VADER_AVAILABLE else 'fallback'
+        self.cache_size = int(cache_size if cache_size is not None
+                              else os.getenv('SENTIMENT_CACHE_SIZE', '20000'))
+        self.store = store
+        if max_workers is None:
+            max_workers = int(os.getenv('SENTIMENT_WORKERS', str(min(4, os.cpu_count() or 1))))
+        # The keyword fallback is cheaper than shipping texts to another process
+        self.max_workers = max(0, int(max_workers)) if self.engine == 'vader' else 0
+        self.batch_size = max(1, int(batch_size or os.getenv('SENTIMENT_BATCH_SIZE', '128')))
+        self.parallel_threshold = int(parallel_threshold if parallel_threshold is not None
+                                      else os.getenv('SENTIMENT_PARALLEL_THRESHOLD', '256'))
+
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._analyzer = SentimentIntensityAnalyzer() if self.engine == 'vader' else None
+
+        self._stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'store_hits': 0,
+            'scored': 0,
+            'scored_in_pool': 0,
+            'duplicates': 0
+        }
+
+    def score(self, text: str) -> Dict[str, Any]:
+        """Score a single text (cached)"""
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Score many texts, computing each distinct text at most once
+
+        Args:
+            texts: Texts to score (empty or non-string items score as neutral)
+
+        Returns:
+            One result dict per input text, in order
+        """
+        # VADER scores case (ALL-CAPS emphasis), so only the keyword engine lowercases
+        lowercase = self.engine != 'vader'
+        normalized = [normalize_text(text, lowercase) if isinstance(text, str) else "" for text in texts]
+        keys = [text_hash(text, self.engine) if text else None for text in normalized]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        with self._lock:
+            self._stats['requests'] += len(keys)
+            for key, text in zip(keys, normalized):
+                if key is None or key in results or key in pending:
+                    if key is not None:
+                        self._stats['duplicates'] += 1
+                    continue
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[key] = cached
+                    self._stats['cache_hits'] += 1
+                else:
+                    pending[key] = text
+
+        if pending and self.store is not None:
+            stored = self._load_from_store(list(pending))
+            for key, scores in stored.items():
+                results[key] = scores
+                del pending[key]
+            with self._lock:
+                self._stats['store_hits'] += len(stored)
+                for key, scores in stored.items():
+                    self._cache_put(key, scores)
+
+        if pending:
+            computed = dict(zip(pending, self._compute(list(pending.values()))))
+            results.update(computed)
+            with self._lock:
+                self._stats['scored'] += len(computed)
+                for key, scores in computed.items():
+                    self._cache_put(key, scores)
+            if self.store is not None:
+                self._save_to_store(computed)
+
+        return [dict(results[key]) if key is not None else dict(NEUTRAL_SENTIMENT) for key in keys]
+
+    async def ascore_batch(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Async ``score_batch`` that keeps scoring and store I/O off the event loop"""
+        import asyncio
+
+        texts = list(texts)
+        return await asyncio.get_running_loop().run_in_executor(None, self.score_batch, texts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache and scoring counters"""
+        with self._lock:
+            requests = self._stats['requests']
+            reused = self._stats['cache_hits'] + self._stats['store_hits'] + self._stats['duplicates']
+            return {
+                **self._stats,
+                'engine': self.engine,
+                'cache_entries': len(self._cache),
+                'reuse_rate': round(reused / requests, 4) if requests else 0.0
+            }
+
+    def clear_cache(self):
+        """Drop the in-process cache (the persistent store is kept)"""
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self):
+        """Stop the scoring processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _compute(self, texts: List[str]) -> List[Dict[str, Any]]:
+        if self.max_workers and len(texts) >= self.parallel_threshold:
+            try:
+                chunks = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+                scored = []
+                for chunk_scores in self._ensure_executor().map(_score_chunk, chunks, [self.engine] * len(chunks)):
+                    scored.extend(chunk_scores)
+                with self._lock:
+                    self._stats['scored_in_pool'] += len(scored)
+                return scored
+            except Exception as e:
+                logger.warning(f"Sentiment process pool failed, scoring inline: {e}")
+
+        if self._analyzer is not None:
+            return [vader_sentiment(self._analyzer, text) for text in texts]
+        return [fallback_sentiment(text) for text in texts]
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers don't inherit the parent's locks, threads or sockets
+                context = multiprocessing.get_context(os.getenv('SENTIMENT_START_METHOD', 'spawn'))
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._executor
+
+    def _cache_put(self, key: str, scores: Dict[str, Any]):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = scores
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _load_from_store(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            return self.store.get_sentiment_scores(keys) or {}
+        except Exception as e:
+            logger.warning(f"Error reading sentiment store: {e}")
+            return {}
+
+    def _save_to_store(self, scores: Dict[str, Dict[str, Any]]):
+        try:
+            self.store.save_sentiment_scores(scores, engine=self.engine)
+        except Exception as e:
+            logger.warning(f"Error writing sentiment store: {e}")
+
+
+def _field(item: Any, name: str) -> Any:
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """
+    Canonical URL for deduplication
+
+    Scheme, "www.", fragment, trailing slash and tracking parameters (``utm_*``,
+    ``fbclid``, ...) are dropped; other query parameters identify the article
+    (e.g. ``news.php?id=1``) and are kept, sorted.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    )
+    canonical = f"{host}{parts.path.rstrip('/')}"
+    return f"{canonical}?{urlencode(query)}" if query else canonical
+
+
+def title_fingerprint(title: Optional[str]) -> frozenset:
+    """Set of lowercase title words, without a trailing " - Source" suffix"""
+    if not title:
+        return frozenset()
+    stripped = TITLE_SOURCE_SUFFIX.sub("", title.strip())
+    tokens = tokenize(stripped.lower())
+    if len(tokens) < 3:
+        tokens = tokenize(title.lower())
+    return frozenset(tokens)
+
+
+def dedupe_articles(articles: Iterable[Any], similarity: float = 0.8,
+                    url_field: str = 'url', title_field: str = 'title') -> List[Any]:
+    """
+    Drop articles already seen via another source
+
+    An article is a duplicate if its normalized URL matches a kept article or its
+    title words overlap a kept title by at least ``similarity`` (Jaccard index).
+    The first occurrence is kept; works with dicts and objects.
+
+    Args:
+        articles: Articles (dicts or objects with ``url``/``title``)
+        similarity: Minimum Jaccard similarity of title words for a near-duplicate
+        url_field: Name of the URL field
+        title_field: Name of the title field
+
+    Returns:
+        Articles without duplicates, in the original order
+    """
+    kept = []
+    seen_urls = set()
+    seen_titles: List[frozenset] = []
+    # word -> indexes in seen_titles, so only titles sharing a word are compared
+    title_index: Dict[str, List[int]] = {}
+
+    for article in articles:
+        url = normalize_url(_field(article, url_field))
+        if url and url in seen_urls:
+            continue
+
+        words = title_fingerprint(_field(article, title_field))
+        if words and _is_near_duplicate(words, seen_titles, title_index, similarity):
+            continue
+
+        kept.append(article)
+        if url:
+            seen_urls.add(url)
+        if words:
+            for word in words:
+                title_index.setdefault(word, []).append(len(seen_titles))
+            seen_titles.append(words)
+
+    return kept
+
+
+def _is_near_duplicate(words: frozenset, seen_titles: List[frozenset],
+                       title_index: Dict[str, List[int]], similarity: float) -> bool:
+    candidates = set()
+    for word in words:
+        candidates.update(title_index.get(word, ()))
+    for index in candidates:
+        other = seen_titles[index]
+        # Jaccard can't reach the threshold if the sizes differ too much
+        if min(len(words), len(other)) < similarity * max(len(words), len(other)):
+            continue
+        if len(words & other) >= similarity * len(words | other):
+            return True
+    return False
+
+
+# App-lifetime shared service
+_shared_service: Optional[SentimentService] = None
+_shared_service_lock = threading.Lock()
+
+
+def _create_store():
+    """``PostgresManager`` (pool mode) for the shared service, if SENTIMENT_STORE_ENABLED"""
+    if os.getenv('SENTIMENT_STORE_ENABLED', 'false').lower() not in ('true', '1', 'yes', 'y'):
+        return None
+    try:
+        from src.database.postgres_manager import PostgresManager
+        # Scoring runs in executor threads, so the store must not share one cursor
+        return PostgresManager(use_pool=True)
+    except Exception as e:
+        logger.warning(f"Sentiment store unavailable, using the in-process cache only: {e}")
+        return None
+
+
+def get_sentiment_service() -> SentimentService:
+    """Shared sentiment service, so every analyzer reuses the same cache"""
+    global _shared_service
+
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = SentimentService(store=_create_store())
+    return _shared_service
+
+
+def shutdown_sentiment_service():
+    """Stop the shared service's scoring processes and store (called on app shutdown)"""
+    global _shared_service
+
+    with _shared_service_lock:
+        service, _shared_service = _shared_service, None
+    if service is not None:
+        service.shutdown()
+        if service.store is not None:
+            service.store.disconnect()
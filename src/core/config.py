@@ -196,6 +196,38 @@ class Settings(BaseSettings):
         default=60,
         description="Limite de requisições por minuto"
     )
+    RATE_LIMIT_BACKEND: str = Field(
+        default="memory",
+        description="Armazenamento do rate limit: 'memory' (por worker) ou 'redis' (compartilhado)"
+    )
+    RATE_LIMIT_REDIS_URL: Optional[str] = Field(
+        default=None,
+        description="URL do Redis usado pelo rate limit compartilhado"
+    )
+    RATE_LIMIT_MAX_KEYS: int = Field(
+        default=100000,
+        description="Número máximo de clientes rastreados pelo rate limit local (LRU)"
+    )
+    RATE_LIMIT_ROUTE_COSTS: str = Field(
+        default="/analytics/*=5",
+        description="Custo por rota no rate limit, ex.: '/analytics/*=5,/market/*=1'"
+    )
+    MARKET_PRICE_CACHE_TTL: float = Field(
+        default=5.0,
+        description="Tempo (segundos) em que um preço de mercado em cache é considerado atual"
+    )
+    MARKET_HISTORICAL_CACHE_TTL: float = Field(
+        default=60.0,
+        description="Tempo (segundos) em que dados históricos em cache são considerados atuais"
+    )
+    MARKET_CACHE_STALE_TTL: float = Field(
+        default=30.0,
+        description="Tempo extra (segundos) em que dados vencidos ainda são servidos enquanto são revalidados"
+    )
+    MARKET_CACHE_MAX_ENTRIES: int = Field(
+        default=1024,
+        description="Número máximo de chaves no cache de dados de mercado"
+    )
     
     # === CONFIGURAÇÕES DE LOGGING ===
     LOG_LEVEL: str = Field(
@@ -330,7 +362,35 @@ class Config:
         trading_interval = os.environ.get("TRADING_INTERVAL", "5m")
         self.check_interval = self._convert_interval_to_seconds(trading_interval)
         self.max_trades_per_day = 3  # Máximo de 3 trades por dia (conforme plano)
-        
+
+        # Modo de varredura dos pares a cada ciclo: "sequential" (padrão) ou "concurrent"
+        scan_mode = os.environ.get("SCAN_MODE", "sequential").lower()
+        self.scan_mode = scan_mode if scan_mode in ["sequential", "concurrent"] else "sequential"
+        self.scan_max_workers = int(os.environ.get("SCAN_MAX_WORKERS", "8"))
+        # Sem POSTGRES_USE_POOL as estratégias compartilham a conexão única do
+        # PostgresManager, então só uma análise pode rodar por vez
+        if os.environ.get("POSTGRES_USE_POOL", "false").lower() not in ["true", "1", "yes", "y"]:
+            self.scan_max_workers = 1
+        self.scan_requests_per_second = float(os.environ.get("SCAN_REQUESTS_PER_SECOND", "10"))
+
+        # Enriquecimento de IA em segundo plano: análises e sentimento por par são
+        # recalculados por um worker e lidos pelas estratégias aprimoradas sem bloquear.
+        # O worker usa um PostgresManager próprio em modo pool (independe de POSTGRES_USE_POOL)
+        self.ai_enrichment_enabled = os.environ.get("AI_ENRICHMENT_ENABLED", "true").lower() in ["true", "1", "yes", "y"]
+        self.ai_enrichment_concurrency = int(os.environ.get("AI_ENRICHMENT_CONCURRENCY", "2"))
+
+        # Modelo de volatilidade do gerenciador de risco adaptativo: "std" (padrão) ou "garch"
+        volatility_model = os.environ.get("VOLATILITY_MODEL", "std").lower()
+        self.volatility_model = volatility_model if volatility_model in ["std", "garch"] else "std"
+
+        # Feed WebSocket de klines/bookTicker (velas lidas da memória em vez da API REST)
+        self.use_market_stream = os.environ.get("USE_MARKET_STREAM", "false").lower() in ["true", "1", "yes", "y"]
+        self.market_stream_intervals = [
+            interval.strip() for interval in os.environ.get("MARKET_STREAM_INTERVALS", "1h,1d").split(",")
+            if interval.strip()
+        ]
+        self.market_stream_history = int(os.environ.get("MARKET_STREAM_HISTORY", "500"))
+
         # Carrega configurações de notificação do Telegram
         self.telegram_bot_token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
         self.telegram_chat_id = os.environ.get("TELEGRAM_CHAT_ID", "")
@@ -1,14 +1,63 @@
 """
 Signal handling for graceful shutdown and other signal-based operations.
 """
+import atexit
 import signal
 import sys
 import threading
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional
 
 from .logging_setup import logger
 
 
+# Callbacks run once on graceful shutdown (signal or interpreter exit)
+_shutdown_callbacks: List[Callable[[], None]] = []
+_shutdown_lock = threading.Lock()
+
+
+def register_shutdown_callback(callback: Callable[[], None]):
+    """
+    Register a callback to run on graceful shutdown.
+    
+    Callbacks run in reverse registration order when a shutdown signal is
+    handled by SignalHandler or when the interpreter exits.
+    
+    Args:
+        callback (Callable): Function without arguments
+    """
+    with _shutdown_lock:
+        if callback not in _shutdown_callbacks:
+            _shutdown_callbacks.append(callback)
+
+
+def unregister_shutdown_callback(callback: Callable[[], None]):
+    """
+    Remove a previously registered shutdown callback.
+    
+    Args:
+        callback (Callable): Callback to remove
+    """
+    with _shutdown_lock:
+        if callback in _shutdown_callbacks:
+            _shutdown_callbacks.remove(callback)
+
+
+def run_shutdown_callbacks():
+    """Run and clear all registered shutdown callbacks."""
+    with _shutdown_lock:
+        callbacks = list(reversed(_shutdown_callbacks))
+        _shutdown_callbacks.clear()
+    
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error in shutdown callback {callback!r}: {e}")
+
+
+atexit.register(run_shutdown_callbacks)
+
+
 class SignalHandler:
     """
     Signal handler for managing graceful shutdowns and other signal-based operations.
@@ -60,6 +109,7 @@ class SignalHandler:
         """
         logger.info(f"Received shutdown signal {signum}, initiating graceful shutdown")
         self.shutdown_event.set()
+        run_shutdown_callbacks()
     
     def wait_for_shutdown(self, timeout: Optional[float] = None) -> bool:
         """
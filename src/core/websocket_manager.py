@@ -5,10 +5,13 @@ This module provides WebSocket connection management and broadcasting capabiliti
 for real-time updates including price data, alerts, and portfolio changes.
 """
 
+import os
 import json
+import time
 import asyncio
 import logging
-from typing import Dict, List, Set, Optional, Any
+from collections import deque, Counter
+from typing import Dict, List, Set, Optional, Any, Iterable
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
@@ -18,6 +21,15 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
+# Políticas para consumidores lentos (fila de envio da conexão cheia)
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "disconnect")
+
+# Prefixo das assinaturas de preço (conflacionadas por símbolo)
+PRICE_SUBSCRIPTION_PREFIX = "price:"
+
+# Quantidade de amostras de latência mantidas para as estatísticas de fan-out
+LATENCY_SAMPLES = 1024
+
 
 class MessageType(str, Enum):
     """WebSocket message types."""
@@ -36,6 +48,7 @@ class MessageType(str, Enum):
     ORDER_CANCELLED = "order_cancelled"
     PERFORMANCE_UPDATE = "performance_update"
     RISK_ALERT = "risk_alert"
+    JOB_UPDATE = "job_update"
     HEARTBEAT = "heartbeat"
     SUBSCRIPTION_SUCCESS = "subscription_success"
     SUBSCRIPTION_ERROR = "subscription_error"
@@ -76,6 +89,13 @@ class ConnectionInfo:
     subscriptions: Set[str]
     connected_at: datetime
     last_heartbeat: datetime
+    send_queue: Optional[asyncio.Queue] = None
+    writer_task: Optional[asyncio.Task] = None
+    messages_sent: int = 0
+    messages_dropped: int = 0
+    closing: bool = False
+    price_cadence_ms: int = 0
+    price_batching: bool = False
     
     def __post_init__(self):
         if self.connected_at is None:
@@ -85,9 +105,38 @@ class ConnectionInfo:
 
 
 class WebSocketManager:
-    """Manages WebSocket connections and broadcasting."""
+    """
+    Manages WebSocket connections and broadcasting.
+
+    Each connection owns a bounded send queue drained by its own writer task,
+    so broadcasts serialize a message once and never wait on a slow client.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        send_queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+        price_conflation_ms: Optional[int] = None,
+        price_cadences: Optional[Iterable[int]] = None
+    ):
+        """
+        Args:
+            send_queue_size: Maximum queued messages per connection
+                (default: WEBSOCKET_SEND_QUEUE_SIZE or 256)
+            slow_consumer_policy: What to do when a connection's queue is full:
+                "drop_oldest" discards its oldest pending message, "disconnect"
+                closes the connection (default: WEBSOCKET_SLOW_CONSUMER_POLICY)
+            send_timeout: Seconds a single send may take before the connection
+                is considered dead (default: WEBSOCKET_SEND_TIMEOUT or 10)
+            price_conflation_ms: Default cadence at which price updates are
+                flushed, keeping only the latest tick per symbol; 0 forwards
+                every tick (default: WEBSOCKET_PRICE_CONFLATION_MS or 250)
+            price_cadences: Cadences clients may pick; a requested cadence is
+                snapped to the closest one, which bounds the number of flush
+                tasks (default: WEBSOCKET_PRICE_CADENCES_MS or "0,100,250,1000",
+                plus the default cadence)
+        """
         # Active connections: connection_id -> ConnectionInfo
         self._connections: Dict[str, ConnectionInfo] = {}
         
@@ -108,6 +157,53 @@ class WebSocketManager:
         self.heartbeat_interval = 30  # seconds
         self.connection_timeout = 300  # seconds
         self.max_connections_per_user = 5
+        self.send_queue_size = int(
+            send_queue_size or os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "256")
+        )
+        self.slow_consumer_policy = (
+            slow_consumer_policy or os.getenv("WEBSOCKET_SLOW_CONSUMER_POLICY", "drop_oldest")
+        ).lower()
+        if self.slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(
+                f"Invalid slow consumer policy: {self.slow_consumer_policy} "
+                f"(expected one of {', '.join(SLOW_CONSUMER_POLICIES)})"
+            )
+        self.send_timeout = float(send_timeout or os.getenv("WEBSOCKET_SEND_TIMEOUT", "10"))
+        if price_conflation_ms is None:
+            price_conflation_ms = int(os.getenv("WEBSOCKET_PRICE_CONFLATION_MS", "250"))
+        self.price_conflation_ms = max(0, int(price_conflation_ms))
+        if price_cadences is None:
+            price_cadences = [
+                value for value in os.getenv("WEBSOCKET_PRICE_CADENCES_MS", "0,100,250,1000").split(",")
+                if value.strip()
+            ]
+        self.price_cadences = sorted(
+            {max(0, int(value)) for value in price_cadences} | {self.price_conflation_ms}
+        )
+        
+        # Price conflation: symbol -> (sequence, latest payload data)
+        self._latest_prices: Dict[str, tuple] = {}
+        self._price_sequence = 0
+        # Connections per price cadence and one flush task per cadence
+        self._price_cadence_counts: Counter = Counter()
+        self._price_flush_tasks: Dict[int, asyncio.Task] = {}
+        
+        # Disconnects scheduled by the fan-out path (kept referenced until done)
+        self._pending_disconnects: Set[asyncio.Task] = set()
+        
+        # Fan-out counters
+        self._fanout_stats = {
+            "broadcasts": 0,
+            "messages_enqueued": 0,
+            "messages_sent": 0,
+            "messages_dropped": 0,
+            "slow_consumer_disconnects": 0,
+            "send_errors": 0,
+            "price_ticks": 0,
+            "price_messages": 0,
+        }
+        self._fanout_latency_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._delivery_latency_ms = deque(maxlen=LATENCY_SAMPLES)
         
         logger.info("WebSocket Manager initialized")
     
@@ -141,11 +237,18 @@ class WebSocketManager:
                 user_id=user_id,
                 subscriptions=set(),
                 connected_at=datetime.utcnow(),
-                last_heartbeat=datetime.utcnow()
+                last_heartbeat=datetime.utcnow(),
+                send_queue=asyncio.Queue(maxsize=self.send_queue_size),
+                price_cadence_ms=self.price_conflation_ms
             )
+            self._price_cadence_counts[self.price_conflation_ms] += 1
+            self._ensure_price_flush(self.price_conflation_ms)
             
-            # Store connection
+            # Store connection and start its writer
             self._connections[connection_id] = connection_info
+            connection_info.writer_task = asyncio.create_task(
+                self._connection_writer(connection_id, connection_info)
+            )
             
             # Add to user connections
             if user_id not in self._user_connections:
@@ -185,6 +288,13 @@ class WebSocketManager:
             
             connection_info = self._connections[connection_id]
             user_id = connection_info.user_id
+            connection_info.closing = True
+            self._price_cadence_counts[connection_info.price_cadence_ms] -= 1
+            
+            # Stop the writer (unless it is the one disconnecting)
+            writer_task = connection_info.writer_task
+            if writer_task and writer_task is not asyncio.current_task():
+                writer_task.cancel()
             
             # Remove from subscriptions
             for subscription_key in connection_info.subscriptions:
@@ -211,16 +321,33 @@ class WebSocketManager:
             
             logger.info(f"WebSocket connection closed: {connection_id} for user {user_id}")
     
-    async def subscribe(self, connection_id: str, subscription_key: str) -> bool:
+    async def subscribe(
+        self,
+        connection_id: str,
+        subscription_key: str,
+        cadence_ms: Optional[int] = None,
+        batch: Optional[bool] = None
+    ) -> bool:
         """
         Subscribe a connection to a specific data stream.
         
+        Price subscriptions are conflated: the connection receives at most
+        one update per symbol every ``cadence_ms``, carrying the latest tick.
+        The cadence and batching apply to all price subscriptions of the
+        connection.
+        
         Args:
             connection_id: The connection ID
             subscription_key: The subscription key (e.g., "price:BTC", "alerts:user:123")
+            cadence_ms: Price update cadence for this connection; 0 forwards
+                every tick, other values are snapped to the closest allowed
+                cadence (default: keep the current cadence)
+            batch: Send all symbols updated in a flush as one PRICE_UPDATE
+                frame with a "prices" list (default: keep the current setting)
             
         Returns:
-            True if subscription was successful, False otherwise
+            True if subscription was successful, False otherwise (including
+            a ``cadence_ms`` that is not a number)
         """
         async with self._connection_lock:
             if connection_id not in self._connections:
@@ -228,9 +355,29 @@ class WebSocketManager:
             
             connection_info = self._connections[connection_id]
             
+            if cadence_ms is not None and subscription_key.startswith(PRICE_SUBSCRIPTION_PREFIX):
+                try:
+                    cadence_ms = self._resolve_price_cadence(cadence_ms)
+                except ValueError as e:
+                    await self._send_to_connection(
+                        connection_id,
+                        WebSocketMessage(
+                            type=MessageType.SUBSCRIPTION_ERROR,
+                            data={"subscription": subscription_key, "error": str(e)},
+                            user_id=connection_info.user_id
+                        )
+                    )
+                    return False
+            
             # Add to connection subscriptions
             connection_info.subscriptions.add(subscription_key)
             
+            if subscription_key.startswith(PRICE_SUBSCRIPTION_PREFIX):
+                if cadence_ms is not None:
+                    self._set_price_cadence(connection_info, cadence_ms)
+                if batch is not None:
+                    connection_info.price_batching = bool(batch)
+            
             # Add to subscription mapping
             if subscription_key not in self._subscriptions:
                 self._subscriptions[subscription_key] = set()
@@ -287,22 +434,36 @@ class WebSocketManager:
             asset_symbol: The asset symbol (e.g., "BTC", "ETH")
             price_data: Price data dictionary
         """
-        subscription_key = f"price:{asset_symbol}"
+        subscription_key = f"{PRICE_SUBSCRIPTION_PREFIX}{asset_symbol}"
+        
+        data = {
+            "asset_symbol": asset_symbol,
+            "price": price_data.get("price"),
+            "change_24h": price_data.get("change_24h"),
+            "change_percentage_24h": price_data.get("change_percentage_24h"),
+            "volume_24h": price_data.get("volume_24h"),
+            "market_cap": price_data.get("market_cap"),
+            "updated_at": price_data.get("updated_at", datetime.utcnow().isoformat())
+        }
         
-        message = WebSocketMessage(
-            type=MessageType.PRICE_UPDATE,
-            data={
-                "asset_symbol": asset_symbol,
-                "price": price_data.get("price"),
-                "change_24h": price_data.get("change_24h"),
-                "change_percentage_24h": price_data.get("change_percentage_24h"),
-                "volume_24h": price_data.get("volume_24h"),
-                "market_cap": price_data.get("market_cap"),
-                "updated_at": price_data.get("updated_at", datetime.utcnow().isoformat())
-            }
-        )
+        self._fanout_stats["price_ticks"] += 1
         
-        await self._broadcast_to_subscribers(subscription_key, message)
+        # Conflated subscribers pick up the latest tick on their next flush
+        self._price_sequence += 1
+        self._latest_prices[asset_symbol] = (self._price_sequence, data)
+        
+        # Subscribers with cadence 0 get every tick immediately
+        if self._price_cadence_counts[0] <= 0 or subscription_key not in self._subscriptions:
+            return
+        
+        realtime_ids = [
+            connection_id
+            for connection_id in self._subscriptions[subscription_key]
+            if self._connections[connection_id].price_cadence_ms == 0
+        ]
+        if realtime_ids:
+            self._fanout_stats["price_messages"] += 1
+            self._fan_out(realtime_ids, self._price_message([asset_symbol]))
     
     async def broadcast_alert_notification(self, user_id: int, alert_data: Dict[str, Any]):
         """
@@ -410,6 +571,33 @@ class WebSocketManager:
         
         await self._broadcast_to_subscribers(subscription_key, message)
     
+    async def broadcast_job_update(self, user_id: int, job_data: Dict[str, Any]):
+        """
+        Broadcast analytics compute job status/progress to a specific user.
+        
+        Args:
+            user_id: The user ID
+            job_data: Job state dictionary (without the result)
+        """
+        subscription_key = f"jobs:user:{user_id}"
+        
+        message = WebSocketMessage(
+            type=MessageType.JOB_UPDATE,
+            data={
+                "job_id": job_data.get("job_id"),
+                "kind": job_data.get("kind"),
+                "status": job_data.get("status"),
+                "progress": job_data.get("progress"),
+                "stage": job_data.get("stage"),
+                "cached": job_data.get("cached", False),
+                "error": job_data.get("error"),
+                "finished_at": job_data.get("finished_at")
+            },
+            user_id=user_id
+        )
+        
+        await self._broadcast_to_subscribers(subscription_key, message)
+    
     async def send_to_user(self, user_id: int, message: WebSocketMessage):
         """
         Send a message to all connections of a specific user.
@@ -422,10 +610,7 @@ class WebSocketManager:
             return
         
         message.user_id = user_id
-        connection_ids = self._user_connections[user_id].copy()
-        
-        for connection_id in connection_ids:
-            await self._send_to_connection(connection_id, message)
+        self._fan_out(self._user_connections[user_id].copy(), message)
     
     async def get_connection_stats(self) -> Dict[str, Any]:
         """
@@ -455,33 +640,179 @@ class WebSocketManager:
                 "total_subscriptions": total_subscriptions,
                 "connections_per_user": connections_per_user,
                 "subscription_stats": subscription_stats,
+                "fanout": self.get_fanout_stats(),
                 "uptime": (datetime.utcnow() - self._connections[next(iter(self._connections))].connected_at).total_seconds() if self._connections else 0
             }
     
-    async def _send_to_connection(self, connection_id: str, message: WebSocketMessage):
+    def _resolve_price_cadence(self, cadence_ms: Any) -> int:
         """
-        Send a message to a specific connection.
+        Map a client-requested cadence to the closest allowed cadence.
         
         Args:
-            connection_id: The connection ID
-            message: The message to send
+            cadence_ms: Requested cadence in milliseconds
+            
+        Returns:
+            Allowed cadence (ties go to the slower one)
+            
+        Raises:
+            ValueError: If the value is not a number
         """
-        if connection_id not in self._connections:
-            return
+        try:
+            if isinstance(cadence_ms, bool):
+                raise TypeError
+            requested = int(cadence_ms)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Invalid cadence_ms: {cadence_ms!r}") from None
+        return min(self.price_cadences, key=lambda allowed: (abs(allowed - requested), -allowed))
+    
+    def _set_price_cadence(self, connection_info: ConnectionInfo, cadence_ms: int):
+        """
+        Move a connection to a price cadence, starting that cadence's flush task.
         
-        connection_info = self._connections[connection_id]
+        Args:
+            connection_info: The connection
+            cadence_ms: New cadence in milliseconds (0 = every tick)
+        """
+        self._price_cadence_counts[connection_info.price_cadence_ms] -= 1
+        connection_info.price_cadence_ms = cadence_ms
+        self._price_cadence_counts[cadence_ms] += 1
+        self._ensure_price_flush(cadence_ms)
+    
+    def _ensure_price_flush(self, cadence_ms: int):
+        """Start the flush task for a cadence if it is not running."""
+        if cadence_ms > 0 and cadence_ms not in self._price_flush_tasks:
+            self._price_flush_tasks[cadence_ms] = asyncio.create_task(self._price_flush_loop(cadence_ms))
+    
+    def _price_message(self, symbols: List[str], batched: bool = False) -> WebSocketMessage:
+        """
+        Build a PRICE_UPDATE message from the latest data of the given symbols.
         
-        if connection_info.websocket.client_state != WebSocketState.CONNECTED:
-            await self.disconnect(connection_id)
-            return
+        Args:
+            symbols: Symbols to include
+            batched: Wrap the updates in a "prices" list (one frame, many symbols)
+        """
+        if batched:
+            data = {"prices": [self._latest_prices[symbol][1] for symbol in symbols]}
+        else:
+            data = self._latest_prices[symbols[0]][1]
+        return WebSocketMessage(type=MessageType.PRICE_UPDATE, data=data)
+    
+    async def _price_flush_loop(self, cadence_ms: int):
+        """
+        Flush conflated price updates for connections on one cadence.
+        
+        Every ``cadence_ms`` each symbol updated since the previous flush is
+        sent once, serialized once per distinct set of symbols. The task
+        ends when no connection uses the cadence any more.
         
+        Args:
+            cadence_ms: Flush cadence in milliseconds
+        """
+        last_sequence = self._price_sequence
         try:
-            await connection_info.websocket.send_text(json.dumps(message.to_dict()))
-        except WebSocketDisconnect:
-            await self.disconnect(connection_id)
+            while self._price_cadence_counts[cadence_ms] > 0:
+                await asyncio.sleep(cadence_ms / 1000)
+                
+                dirty = [
+                    symbol for symbol, (sequence, _) in self._latest_prices.items()
+                    if sequence > last_sequence
+                ]
+                last_sequence = self._price_sequence
+                if dirty:
+                    self._flush_prices(cadence_ms, dirty)
         except Exception as e:
-            logger.error(f"Error sending message to connection {connection_id}: {e}")
-            await self.disconnect(connection_id)
+            logger.error(f"Error in price flush loop ({cadence_ms} ms): {e}")
+        finally:
+            if self._price_flush_tasks.get(cadence_ms) is asyncio.current_task():
+                del self._price_flush_tasks[cadence_ms]
+    
+    def _flush_prices(self, cadence_ms: int, symbols: List[str]):
+        """
+        Send the latest data of updated symbols to connections on a cadence.
+        
+        Args:
+            cadence_ms: Cadence being flushed
+            symbols: Symbols updated since the previous flush
+        """
+        per_symbol: Dict[str, List[str]] = {}
+        batched: Dict[str, List[str]] = {}
+        
+        for symbol in symbols:
+            subscribers = self._subscriptions.get(f"{PRICE_SUBSCRIPTION_PREFIX}{symbol}", ())
+            for connection_id in subscribers:
+                connection_info = self._connections.get(connection_id)
+                if connection_info is None or connection_info.price_cadence_ms != cadence_ms:
+                    continue
+                if connection_info.price_batching:
+                    batched.setdefault(connection_id, []).append(symbol)
+                else:
+                    per_symbol.setdefault(symbol, []).append(connection_id)
+        
+        for symbol, connection_ids in per_symbol.items():
+            self._fanout_stats["price_messages"] += 1
+            self._fan_out(connection_ids, self._price_message([symbol]))
+        
+        # Connections with the same symbol set share one batched frame
+        frames: Dict[tuple, List[str]] = {}
+        for connection_id, connection_symbols in batched.items():
+            frames.setdefault(tuple(connection_symbols), []).append(connection_id)
+        for frame_symbols, connection_ids in frames.items():
+            self._fanout_stats["price_messages"] += 1
+            self._fan_out(connection_ids, self._price_message(list(frame_symbols), batched=True))
+    
+    def get_fanout_stats(self) -> Dict[str, Any]:
+        """
+        Get broadcast fan-out statistics.
+        
+        Returns:
+            Dictionary with queue depth, drop and latency counters
+        """
+        depths = [
+            info.send_queue.qsize()
+            for info in self._connections.values()
+            if info.send_queue is not None
+        ]
+        
+        return {
+            **self._fanout_stats,
+            "queue_depth": sum(depths),
+            "max_queue_depth": max(depths) if depths else 0,
+            "send_queue_size": self.send_queue_size,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "price_conflation_ms": self.price_conflation_ms,
+            "price_cadences": {
+                cadence: count for cadence, count in self._price_cadence_counts.items() if count > 0
+            },
+            "fanout_latency_ms": self._latency_summary(self._fanout_latency_ms),
+            "delivery_latency_ms": self._latency_summary(self._delivery_latency_ms),
+        }
+    
+    @staticmethod
+    def _latency_summary(samples: Iterable[float]) -> Dict[str, float]:
+        """Summarize latency samples as avg/p99/max in milliseconds."""
+        ordered = sorted(samples)
+        if not ordered:
+            return {"avg": 0.0, "p99": 0.0, "max": 0.0}
+        
+        p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+        return {
+            "avg": round(sum(ordered) / len(ordered), 3),
+            "p99": round(ordered[p99_index], 3),
+            "max": round(ordered[-1], 3),
+        }
+    
+    async def _send_to_connection(self, connection_id: str, message: WebSocketMessage):
+        """
+        Send a message to a specific connection.
+        
+        The message is queued for the connection's writer task, so this
+        returns without waiting for the client.
+        
+        Args:
+            connection_id: The connection ID
+            message: The message to send
+        """
+        self._fan_out([connection_id], message)
     
     async def _broadcast_to_subscribers(self, subscription_key: str, message: WebSocketMessage):
         """
@@ -494,10 +825,111 @@ class WebSocketManager:
         if subscription_key not in self._subscriptions:
             return
         
-        connection_ids = self._subscriptions[subscription_key].copy()
+        self._fan_out(self._subscriptions[subscription_key].copy(), message)
+    
+    def _fan_out(self, connection_ids: Iterable[str], message: WebSocketMessage) -> int:
+        """
+        Serialize a message once and queue it for each connection.
+        
+        Args:
+            connection_ids: Target connection IDs
+            message: The message to send
+            
+        Returns:
+            Number of connections the message was queued for
+        """
+        started = time.perf_counter()
+        payload = json.dumps(message.to_dict())
+        enqueued_at = time.monotonic()
         
+        queued = 0
         for connection_id in connection_ids:
-            await self._send_to_connection(connection_id, message)
+            if self._enqueue(connection_id, payload, enqueued_at):
+                queued += 1
+        
+        self._fanout_stats["broadcasts"] += 1
+        self._fanout_latency_ms.append((time.perf_counter() - started) * 1000)
+        return queued
+    
+    def _enqueue(self, connection_id: str, payload: str, enqueued_at: float) -> bool:
+        """
+        Put a serialized message on a connection's send queue.
+        
+        When the queue is full the slow consumer policy applies: either the
+        oldest pending message is dropped or the connection is closed.
+        
+        Args:
+            connection_id: The connection ID
+            payload: Serialized JSON message
+            enqueued_at: Monotonic time the message was serialized
+            
+        Returns:
+            True if the message was queued
+        """
+        connection_info = self._connections.get(connection_id)
+        if connection_info is None or connection_info.closing or connection_info.send_queue is None:
+            return False
+        
+        send_queue = connection_info.send_queue
+        if send_queue.full():
+            if self.slow_consumer_policy == "disconnect":
+                logger.warning(f"Disconnecting slow WebSocket consumer {connection_id}")
+                self._fanout_stats["slow_consumer_disconnects"] += 1
+                self._schedule_disconnect(connection_id)
+                return False
+            
+            send_queue.get_nowait()
+            connection_info.messages_dropped += 1
+            self._fanout_stats["messages_dropped"] += 1
+        
+        send_queue.put_nowait((payload, enqueued_at))
+        self._fanout_stats["messages_enqueued"] += 1
+        return True
+    
+    def _schedule_disconnect(self, connection_id: str):
+        """Disconnect a connection in the background without blocking the fan-out."""
+        connection_info = self._connections.get(connection_id)
+        if connection_info is not None:
+            connection_info.closing = True
+        
+        task = asyncio.create_task(self.disconnect(connection_id))
+        self._pending_disconnects.add(task)
+        task.add_done_callback(self._pending_disconnects.discard)
+    
+    async def _connection_writer(self, connection_id: str, connection_info: ConnectionInfo):
+        """
+        Drain a connection's send queue onto its WebSocket.
+        
+        Args:
+            connection_id: The connection ID
+            connection_info: The connection being written to
+        """
+        websocket = connection_info.websocket
+        send_queue = connection_info.send_queue
+        
+        while True:
+            payload, enqueued_at = await send_queue.get()
+            
+            if websocket.client_state != WebSocketState.CONNECTED:
+                await self.disconnect(connection_id)
+                return
+            
+            try:
+                await asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except WebSocketDisconnect:
+                await self.disconnect(connection_id)
+                return
+            except Exception as e:
+                logger.error(f"Error sending message to connection {connection_id}: {e}")
+                self._fanout_stats["send_errors"] += 1
+                await self.disconnect(connection_id)
+                return
+            
+            connection_info.messages_sent += 1
+            self._fanout_stats["messages_sent"] += 1
+            self._delivery_latency_ms.append((time.monotonic() - enqueued_at) * 1000)
     
     async def _heartbeat_loop(self):
         """Background task to send heartbeat messages."""
@@ -512,9 +944,7 @@ class WebSocketManager:
                 )
                 
                 # Send heartbeat to all connections
-                connection_ids = list(self._connections.keys())
-                for connection_id in connection_ids:
-                    await self._send_to_connection(connection_id, heartbeat_message)
+                self._fan_out(list(self._connections.keys()), heartbeat_message)
                 
             except Exception as e:
                 logger.error(f"Error in heartbeat loop: {e}")
@@ -552,6 +982,9 @@ class WebSocketManager:
             self._cleanup_task.cancel()
         if self._heartbeat_task:
             self._heartbeat_task.cancel()
+        for task in list(self._price_flush_tasks.values()):
+            task.cancel()
+        self._price_flush_tasks.clear()
         
         # Close all connections
         connection_ids = list(self._connections.keys())
@@ -2,18 +2,88 @@
 """
 Módulo para gerenciar a conexão e operações com o PostgreSQL
 """
+import io
+import inspect
 import logging
 import os
 import json
+import time
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from functools import wraps
 import psycopg2
-from psycopg2 import sql
-from psycopg2.extras import Json, DictCursor
+from psycopg2 import sql, pool as pg_pool, extensions as pg_extensions
+from psycopg2.extras import Json, DictCursor, execute_values
+
+from .write_behind import WriteBehindWriter, build_row, insert_rows
+
+# Colunas gravadas pelo caminho em lote de price_history (mesma ordem das tuplas)
+PRICE_HISTORY_COLUMNS = (
+    'symbol', 'open_price', 'high_price', 'low_price', 'close_price', 'volume',
+    'quote_asset_volume', 'number_of_trades', 'taker_buy_base_volume',
+    'taker_buy_quote_volume', 'timestamp', 'interval'
+)
+
+# SET do upsert: OHLCV sempre vem do lote; as colunas extras (None em entradas
+# dict) só substituem o valor gravado quando foram informadas
+PRICE_HISTORY_UPSERT_SET = ", ".join(
+    [f"{column} = EXCLUDED.{column}" for column in PRICE_HISTORY_COLUMNS[1:6]]
+    + [f"{column} = COALESCE(EXCLUDED.{column}, price_history.{column})"
+       for column in PRICE_HISTORY_COLUMNS[6:10]]
+)
+
+
+def uses_connection(method):
+    """Reserva uma conexão do pool para a thread atual durante a chamada
+    
+    No modo legado (conexão única) a chamada é feita diretamente. Chamadas
+    aninhadas reutilizam a conexão já reservada pela thread.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.use_pool:
+            return method(self, *args, **kwargs)
+        if self._pool is None and not self.connect():
+            # Sem pool disponível: o método falha e trata o erro como no modo legado
+            return method(self, *args, **kwargs)
+        with self.connection():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def deferred_write(record_type):
+    """Enfileira a gravação no WriteBehindWriter, quando ativo, em vez de gravar na hora
+    
+    Com a gravação write-behind ativa o método retorna True assim que o registro
+    é enfileirado (o ID do registro não fica disponível).
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.write_behind is None:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+            return self.write_behind.submit(record_type, **arguments)
+        return wrapper
+    return decorator
+
 
 class PostgresManager:
     """Classe para gerenciar conexão e operações com o PostgreSQL"""
     
-    def __init__(self, connection_string=None, max_retries=3, retry_delay=1):
+    # Modo legado (conexão única) e gravação síncrona por padrão
+    use_pool = False
+    _pool = None
+    write_behind = None
+    
+    def __init__(self, connection_string=None, max_retries=3, retry_delay=1,
+                 use_pool=None, pool_min=None, pool_max=None):
         """
         Inicializa o gerenciador de PostgreSQL
         
@@ -22,18 +92,51 @@ class PostgresManager:
                                    Se None, tentará usar variáveis de ambiente.
             max_retries (int): Número máximo de tentativas de reconexão
             retry_delay (int): Tempo inicial de espera entre tentativas (segundos)
+            use_pool (bool): Usa um pool de conexões thread-safe em vez da conexão
+                             única (None = variável POSTGRES_USE_POOL)
+            pool_min (int): Conexões mantidas abertas no pool (POSTGRES_POOL_MIN)
+            pool_max (int): Máximo de conexões simultâneas (POSTGRES_POOL_MAX)
         """
         self.logger = logging.getLogger("robot-crypt")
-        self.conn = None
-        self.cursor = None
         self.connection_string = connection_string
         self.max_retries = max_retries  # Número máximo de tentativas de reconexão
         self.retry_delay = retry_delay  # Tempo inicial de espera entre tentativas (segundos)
         
+        # Modo pool: cada chamada retira uma conexão própria do pool, de modo que
+        # threads diferentes (loop do bot, scanner, ML) não compartilham cursor
+        if use_pool is None:
+            use_pool = os.environ.get("POSTGRES_USE_POOL", "false").lower() in ["true", "1", "yes", "y"]
+        self.use_pool = use_pool
+        self.pool_min = pool_min if pool_min is not None else int(os.environ.get("POSTGRES_POOL_MIN", "1"))
+        self.pool_max = pool_max if pool_max is not None else int(os.environ.get("POSTGRES_POOL_MAX", "10"))
+        self.pool_timeout = float(os.environ.get("POSTGRES_POOL_TIMEOUT", "30"))
+        # Conexões ociosas por mais que isso são testadas (SELECT 1) ao serem retiradas
+        self.pool_health_check_interval = float(os.environ.get("POSTGRES_POOL_HEALTH_CHECK_INTERVAL", "30"))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_slots = None
+        self._local = threading.local()
+        self._last_used = {}
+        self._stats_lock = threading.Lock()
+        self.pool_stats = {
+            'checkouts': 0,
+            'health_checks': 0,
+            'discarded': 0,
+            'timeouts': 0,
+            'wait_time_total': 0.0
+        }
+        
+        self.conn = None
+        self.cursor = None
+        
         # Se não foi fornecida string de conexão, tenta obter das variáveis de ambiente
         if not self.connection_string:
             self.connection_string = self._get_connection_string_from_env()
         
+        # Gravação write-behind de sinais, logs, análises, notificações e indicadores
+        if os.environ.get("POSTGRES_WRITE_BEHIND", "false").lower() in ["true", "1", "yes", "y"]:
+            self.enable_write_behind()
+        
         try:
             self._setup_tables()
             self.logger.info("PostgresManager inicializado com sucesso")
@@ -41,6 +144,33 @@ class PostgresManager:
             self.logger.error(f"Erro ao inicializar PostgresManager: {str(e)}")
             self.logger.error("O armazenamento em PostgreSQL não estará disponível")
     
+    # No modo pool, conn/cursor referem-se à conexão reservada pela thread atual
+    @property
+    def conn(self):
+        if self.use_pool:
+            return getattr(self._local, 'conn', None)
+        return self.__dict__.get('_conn')
+    
+    @conn.setter
+    def conn(self, value):
+        if self.use_pool:
+            self._local.conn = value
+        else:
+            self.__dict__['_conn'] = value
+    
+    @property
+    def cursor(self):
+        if self.use_pool:
+            return getattr(self._local, 'cursor', None)
+        return self.__dict__.get('_cursor')
+    
+    @cursor.setter
+    def cursor(self, value):
+        if self.use_pool:
+            self._local.cursor = value
+        else:
+            self.__dict__['_cursor'] = value
+    
     def _get_connection_string_from_env(self):
         """
         Obtém a string de conexão das variáveis de ambiente
@@ -61,14 +191,14 @@ class PostgresManager:
         return f"postgresql://{user}:{password}@{host}:{port}/{db}"
     
     def connect(self):
-        """Conecta ao PostgreSQL com retentativas"""
-        import time
-        
+        """Conecta ao PostgreSQL com retentativas (no modo pool, cria o pool)"""
         retries = 0
         last_exception = None
         
         while retries < self.max_retries:
             try:
+                if self.use_pool:
+                    return self._create_pool()
                 if not self.conn or self.conn.closed:
                     self.conn = psycopg2.connect(self.connection_string)
                     self.cursor = self.conn.cursor(cursor_factory=DictCursor)
@@ -86,13 +216,250 @@ class PostgresManager:
         return False
     
     def disconnect(self):
-        """Desconecta do PostgreSQL"""
+        """Desconecta do PostgreSQL (no modo pool, fecha todas as conexões do pool)"""
+        if self.use_pool:
+            # Registros pendentes precisam do pool para serem gravados
+            self.disable_write_behind()
+            with self._pool_lock:
+                if self._pool is not None:
+                    self._pool.closeall()
+                    self._pool = None
+                    self._last_used.clear()
+            self.logger.info("Pool de conexões PostgreSQL encerrado")
+            return
         if self.cursor:
             self.cursor.close()
         if self.conn:
             self.conn.close()
         self.logger.info("Conexão com PostgreSQL encerrada")
     
+    # =============================================
+    # Pool de conexões
+    # =============================================
+    
+    def _create_pool(self):
+        """Cria o pool de conexões (idempotente)"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = pg_pool.ThreadedConnectionPool(
+                    self.pool_min, self.pool_max, self.connection_string
+                )
+                self._pool_slots = threading.BoundedSemaphore(self.pool_max)
+                self.logger.info(
+                    f"Pool de conexões PostgreSQL criado (min={self.pool_min}, max={self.pool_max})"
+                )
+        return True
+    
+    def _count(self, name, amount=1):
+        """Incrementa um contador de pool_stats (chamado por várias threads)"""
+        with self._stats_lock:
+            self.pool_stats[name] += amount
+    
+    def _checkout(self):
+        """Retira uma conexão saudável do pool, aguardando se todas estiverem em uso"""
+        start = time.monotonic()
+        if not self._pool_slots.acquire(timeout=self.pool_timeout):
+            self._count('timeouts')
+            raise pg_pool.PoolError(f"Nenhuma conexão livre no pool após {self.pool_timeout}s")
+        self._count('wait_time_total', time.monotonic() - start)
+        
+        try:
+            for _ in range(self.pool_max + 1):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    self._count('checkouts')
+                    return conn
+                self._count('discarded')
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+            raise psycopg2.OperationalError("Não foi possível obter uma conexão saudável do pool")
+        except Exception:
+            self._pool_slots.release()
+            raise
+    
+    def _release(self, conn, close=False, suspect=False):
+        """Devolve a conexão ao pool (o pool desfaz transações abertas)
+        
+        Conexões marcadas como suspeitas não contam como usadas agora: a
+        próxima retirada faz o SELECT 1 antes de entregá-las.
+        """
+        try:
+            if close or conn.closed:
+                self._last_used.pop(id(conn), None)
+                self._count('discarded')
+            elif suspect:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            if self._pool is not None:
+                self._pool.putconn(conn, close=close or bool(conn.closed))
+        finally:
+            self._pool_slots.release()
+    
+    def _is_healthy(self, conn):
+        """Verifica a conexão na retirada; SELECT 1 só se ficou ociosa por muito tempo"""
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.pool_health_check_interval:
+            return True
+        self._count('health_checks')
+        try:
+            with conn.cursor() as check_cursor:
+                check_cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            self.logger.warning("Conexão do pool PostgreSQL inativa; descartando")
+            return False
+    
+    @contextmanager
+    def connection(self):
+        """
+        Context manager que reserva uma conexão para a thread atual
+        
+        No modo pool a conexão é retirada na entrada e devolvida na saída, e
+        ``self.conn``/``self.cursor`` passam a apontar para ela dentro do bloco.
+        Blocos aninhados na mesma thread reutilizam a conexão. No modo legado
+        retorna a conexão única.
+        
+        Yields:
+            connection: Conexão psycopg2
+        """
+        if not self.use_pool:
+            self._check_and_reconnect()
+            yield self.conn
+            return
+        
+        if self._pool is None and not self.connect():
+            raise psycopg2.OperationalError("Pool de conexões PostgreSQL indisponível")
+        
+        if getattr(self._local, 'conn', None) is not None:
+            yield self._local.conn
+            return
+        
+        conn = self._checkout()
+        self._local.conn = conn
+        self._local.cursor = conn.cursor(cursor_factory=DictCursor)
+        broken = False
+        suspect = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            cursor = self._local.cursor
+            self._local.conn = None
+            self._local.cursor = None
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            # Os métodos decorados tratam as próprias exceções, então a falha
+            # é detectada pelo estado da conexão: fechada ou sem status é
+            # descartada; transação com erro volta ao pool para ser testada
+            if not broken:
+                broken, suspect = self._connection_state(conn)
+            self._release(conn, close=broken, suspect=suspect)
+    
+    @staticmethod
+    def _connection_state(conn):
+        """Classifica a conexão devolvida
+        
+        Returns:
+            tuple: (quebrada, suspeita)
+        """
+        if conn.closed:
+            return True, False
+        try:
+            status = conn.get_transaction_status()
+        except Exception:
+            return True, False
+        if status == pg_extensions.TRANSACTION_STATUS_UNKNOWN:
+            return True, False
+        return False, status == pg_extensions.TRANSACTION_STATUS_INERROR
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager que fornece um cursor (DictCursor) em uma transação
+        
+        Faz commit ao final do bloco ou rollback em caso de exceção.
+        
+        Yields:
+            cursor: Cursor com resultados acessíveis por nome de coluna
+        """
+        with self.connection() as conn:
+            try:
+                yield self.cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def get_pool_stats(self):
+        """
+        Retorna estatísticas do pool de conexões
+        
+        Returns:
+            dict: Configuração, conexões em uso e contadores de retirada/descarte
+        """
+        in_use = 0
+        if self._pool is not None:
+            in_use = len(getattr(self._pool, '_used', {}))
+        with self._stats_lock:
+            stats = dict(self.pool_stats)
+        return {
+            'enabled': self.use_pool,
+            'pool_min': self.pool_min,
+            'pool_max': self.pool_max,
+            'in_use': in_use,
+            **stats
+        }
+    
+    # =============================================
+    # Gravação write-behind
+    # =============================================
+    
+    def enable_write_behind(self, **options):
+        """
+        Ativa a gravação em segundo plano de telemetria
+        
+        save_trading_signal, save_log, save_analysis, save_notification e
+        save_technical_indicator passam a apenas enfileirar os registros, que são
+        gravados em lote por uma thread (ver WriteBehindWriter).
+        
+        Args:
+            **options: Sobrepõe max_queue, batch_size, flush_interval,
+                       overflow_policy, spill_path e block_timeout
+        
+        Returns:
+            WriteBehindWriter: O gravador iniciado
+        """
+        if self.write_behind is not None:
+            return self.write_behind
+        
+        settings = {
+            'max_queue': int(os.environ.get("WRITE_BEHIND_MAX_QUEUE", "10000")),
+            'batch_size': int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "500")),
+            'flush_interval': float(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", "1.0")),
+            'overflow_policy': os.environ.get("WRITE_BEHIND_OVERFLOW_POLICY", "drop_oldest").lower(),
+            'spill_path': os.environ.get("WRITE_BEHIND_SPILL_PATH") or None,
+        }
+        settings.update(options)
+        
+        self.write_behind = WriteBehindWriter(self, **settings)
+        self.write_behind.start()
+        return self.write_behind
+    
+    def disable_write_behind(self, timeout=10.0):
+        """Grava os registros pendentes e volta à gravação síncrona"""
+        writer, self.write_behind = self.write_behind, None
+        if writer is not None:
+            writer.close(timeout)
+    
+    @uses_connection
     def execute_query(self, query, params=None, fetch_one=False, fetch_all=False):
         """Executa uma query genérica"""
         self._check_and_reconnect()
@@ -128,6 +495,7 @@ class PostgresManager:
         if not self.conn or self.conn.closed:
             self.connect()
     
+    @uses_connection
     def _setup_tables(self):
         """Configura as tabelas necessárias no banco de dados"""
         if not self.connect():
@@ -511,6 +879,16 @@ class PostgresManager:
                 )
             """)
             
+            # Cache persistente de sentimento por hash do texto normalizado
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    text_hash CHAR(64) PRIMARY KEY,
+                    engine VARCHAR(20) NOT NULL,
+                    scores JSONB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
             # Índices para as novas tabelas
             self.cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_market_data_symbol_timestamp 
@@ -540,6 +918,8 @@ class PostgresManager:
             self.logger.error(f"Erro ao configurar tabelas no PostgreSQL: {str(e)}")
             return False
     
+    @deferred_write('notification')
+    @uses_connection
     def save_notification(self, notification_type, title, message, telegram_sent=False):
         """
         Salva uma notificação no banco de dados
@@ -572,6 +952,8 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar notificação no PostgreSQL: {str(e)}")
             return None
     
+    @deferred_write('log')
+    @uses_connection
     def save_log(self, log_type, message, details=None, level='INFO', timestamp=None):
         """
         Salva um log no banco de dados
@@ -614,6 +996,8 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar log no PostgreSQL: {str(e)}")
             return None
     
+    @deferred_write('analysis')
+    @uses_connection
     def save_analysis(self, symbol, analysis_type, data):
         """
         Salva uma análise de mercado no banco de dados
@@ -645,6 +1029,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar análise no PostgreSQL: {str(e)}")
             return None
     
+    @uses_connection
     def save_trade(self, symbol, operation_type, entry_price, quantity, 
                  stop_loss=None, take_profit=None, strategy=None, additional_data=None):
         """
@@ -689,6 +1074,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar trade no PostgreSQL: {str(e)}")
             return None
     
+    @uses_connection
     def update_trade_exit(self, trade_id, exit_price, profit_loss, profit_loss_percentage):
         """
         Atualiza uma operação de trade com os dados de saída
@@ -729,6 +1115,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao atualizar trade no PostgreSQL: {str(e)}")
             return False
     
+    @uses_connection
     def get_recent_notifications(self, limit=10):
         """
         Obtém as notificações mais recentes
@@ -756,6 +1143,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter notificações: {str(e)}")
             return []
     
+    @uses_connection
     def get_recent_analysis(self, symbol=None, analysis_type=None, limit=10):
         """
         Obtém as análises mais recentes, opcionalmente filtradas por símbolo ou tipo
@@ -809,6 +1197,69 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter análises: {str(e)}")
             return []
     
+    @uses_connection
+    def get_sentiment_scores(self, text_hashes):
+        """
+        Obtém scores de sentimento já calculados pelo hash do texto
+        
+        Args:
+            text_hashes (list): Hashes gerados por ``sentiment_service.text_hash``
+        
+        Returns:
+            dict: Mapeamento hash -> scores (apenas os hashes encontrados)
+        """
+        if not text_hashes:
+            return {}
+        
+        self._check_and_reconnect()
+        
+        try:
+            self.cursor.execute(
+                "SELECT text_hash, scores FROM sentiment_cache WHERE text_hash = ANY(%s)",
+                (list(text_hashes),)
+            )
+            return {row['text_hash']: row['scores'] for row in self.cursor.fetchall()}
+        except Exception as e:
+            self.conn.rollback()
+            self.logger.error(f"Erro ao obter cache de sentimento: {str(e)}")
+            return {}
+    
+    @uses_connection
+    def save_sentiment_scores(self, scores, engine='vader'):
+        """
+        Salva scores de sentimento em lote (hashes já existentes são ignorados)
+        
+        Args:
+            scores (dict): Mapeamento hash -> scores
+            engine (str): Mecanismo que calculou os scores
+        
+        Returns:
+            int: Número de scores enviados ao banco
+        """
+        if not scores:
+            return 0
+        
+        self._check_and_reconnect()
+        
+        try:
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO sentiment_cache (text_hash, engine, scores)
+                VALUES %s
+                ON CONFLICT (text_hash) DO NOTHING
+                """,
+                [(text_hash, engine, Json(value)) for text_hash, value in scores.items()],
+                page_size=1000
+            )
+            self.conn.commit()
+            return len(scores)
+        except Exception as e:
+            self.conn.rollback()
+            self.logger.error(f"Erro ao salvar cache de sentimento: {str(e)}")
+            return 0
+    
+    @uses_connection
     def get_open_trades(self):
         """
         Obtém as operações de trade abertas
@@ -833,6 +1284,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter operações abertas: {str(e)}")
             return []
     
+    @uses_connection
     def get_closed_trades(self, limit=50, symbol=None):
         """
         Obtém as operações de trade fechadas
@@ -870,6 +1322,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter operações fechadas: {str(e)}")
             return []
     
+    @uses_connection
     def save_price_history(self, symbol, ohlcv_data, interval="1h"):
         """
         Salva dados de preço histórico OHLCV (Open, High, Low, Close, Volume)
@@ -949,14 +1402,23 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar dados de preço para {symbol}: {str(e)}")
             return False
     
-    def save_price_history_batch(self, symbol, ohlcv_data_list, interval="1h"):
+    @uses_connection
+    def save_price_history_batch(self, symbol, ohlcv_data_list, interval="1h", use_copy=None):
         """
         Salva múltiplos pontos de dados de preço histórico OHLCV em lote
         
+        Todo o lote é gravado em uma única transação com upsert
+        (INSERT ... ON CONFLICT (symbol, interval, timestamp) DO UPDATE). Lotes
+        grandes são enviados via COPY para uma tabela temporária de staging e
+        mesclados com um único INSERT ... SELECT.
+        
         Args:
             symbol (str): O par de moedas (ex: 'BTCUSDT')
-            ohlcv_data_list (list): Lista de dicionários com dados OHLCV
+            ohlcv_data_list (list): Lista de dicionários com dados OHLCV ou lista de
+                                    klines no formato bruto da Binance
             interval (str): Intervalo do candle (ex: '1h', '15m', '1d')
+            use_copy (bool): Força (True) ou desativa (False) o uso de COPY. Se None,
+                             COPY é usado a partir de PRICE_HISTORY_COPY_THRESHOLD linhas
             
         Returns:
             int: Número de registros salvos com sucesso
@@ -965,22 +1427,141 @@ class PostgresManager:
         
         if not ohlcv_data_list:
             return 0
-            
+        
+        try:
+            rows = self._normalize_price_rows(symbol, ohlcv_data_list, interval)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            self.logger.error(f"Dados de preço inválidos para {symbol}: {str(e)}")
+            return 0
+        
+        if use_copy is None:
+            use_copy = len(rows) >= int(os.environ.get("PRICE_HISTORY_COPY_THRESHOLD", "5000"))
+        
         try:
+            if use_copy:
+                self._copy_price_rows(rows)
+            else:
+                execute_values(
+                    self.cursor,
+                    f"""
+                    INSERT INTO price_history ({", ".join(PRICE_HISTORY_COLUMNS)})
+                    VALUES %s
+                    ON CONFLICT (symbol, interval, timestamp) DO UPDATE SET {PRICE_HISTORY_UPSERT_SET}
+                    """,
+                    rows,
+                    page_size=1000
+                )
+            
+            self.conn.commit()
+            self.logger.info(f"Salvos {len(rows)}/{len(ohlcv_data_list)} dados de preço para {symbol} em lote")
+            return len(rows)
+            
+        except psycopg2.errors.InvalidColumnReference:
+            # Sem índice único (tabela legada com duplicatas): cai para o caminho linha a linha
+            self.conn.rollback()
+            self.logger.warning("price_history sem índice único; usando gravação linha a linha")
             count = 0
-            # Usar transação para inserções em lote
-            for ohlcv_data in ohlcv_data_list:
+            for row in rows:
+                ohlcv_data = {
+                    'open_time': row[10],
+                    'open': row[1],
+                    'high': row[2],
+                    'low': row[3],
+                    'close': row[4],
+                    'volume': row[5]
+                }
                 if self.save_price_history(symbol, ohlcv_data, interval):
                     count += 1
-                    
-            self.logger.info(f"Salvos {count}/{len(ohlcv_data_list)} dados de preço para {symbol}")
             return count
-            
         except Exception as e:
             self.conn.rollback()
             self.logger.error(f"Erro ao salvar lote de dados de preço: {str(e)}")
             return 0
+    
+    @staticmethod
+    def _normalize_price_rows(symbol, ohlcv_data_list, interval):
+        """
+        Converte dicionários OHLCV ou klines brutas da Binance em tuplas na ordem de
+        PRICE_HISTORY_COLUMNS, mantendo apenas a última ocorrência de cada timestamp
+        (um mesmo comando ON CONFLICT não pode atualizar a mesma linha duas vezes)
+        """
+        def to_timestamp(value):
+            if isinstance(value, (int, float)):
+                return datetime.fromtimestamp(value / 1000)
+            return value
+        
+        def optional(value, cast):
+            return cast(value) if value is not None else None
+        
+        rows = {}
+        for item in ohlcv_data_list:
+            if isinstance(item, dict):
+                timestamp = to_timestamp(item['open_time'])
+                row = (
+                    symbol,
+                    float(item['open']),
+                    float(item['high']),
+                    float(item['low']),
+                    float(item['close']),
+                    float(item['volume']),
+                    optional(item.get('quote_asset_volume'), float),
+                    optional(item.get('number_of_trades'), int),
+                    optional(item.get('taker_buy_base_volume'), float),
+                    optional(item.get('taker_buy_quote_volume'), float),
+                    timestamp,
+                    interval
+                )
+            else:
+                # Formato da Binance: [open_time, open, high, low, close, volume, close_time,
+                # quote_asset_volume, number_of_trades, taker_buy_base, taker_buy_quote, ignore]
+                timestamp = to_timestamp(int(item[0]))
+                extra = len(item) >= 11
+                row = (
+                    symbol,
+                    float(item[1]),
+                    float(item[2]),
+                    float(item[3]),
+                    float(item[4]),
+                    float(item[5]),
+                    float(item[7]) if extra else None,
+                    int(item[8]) if extra else None,
+                    float(item[9]) if extra else None,
+                    float(item[10]) if extra else None,
+                    timestamp,
+                    interval
+                )
+            rows[timestamp] = row
+        
+        return list(rows.values())
+    
+    def _copy_price_rows(self, rows):
+        """Grava as linhas via COPY em tabela temporária e mescla com upsert único"""
+        self.cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS price_history_staging
+            (LIKE price_history INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+        """)
+        
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(
+                "\\N" if value is None
+                else value.isoformat() if isinstance(value, datetime)
+                else str(value)
+                for value in row
+            ))
+            buffer.write("\n")
+        buffer.seek(0)
+        
+        columns = ", ".join(PRICE_HISTORY_COLUMNS)
+        self.cursor.copy_expert(f"COPY price_history_staging ({columns}) FROM STDIN", buffer)
+        
+        self.cursor.execute(f"""
+            INSERT INTO price_history ({columns})
+            SELECT {columns} FROM price_history_staging
+            ON CONFLICT (symbol, interval, timestamp) DO UPDATE SET {PRICE_HISTORY_UPSERT_SET}
+        """)
             
+    @uses_connection
     def get_price_history(self, symbol, interval="1h", limit=100, start_time=None, end_time=None):
         """
         Obtém dados de preço histórico
@@ -1043,6 +1624,8 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter dados de preço para {symbol}: {str(e)}")
             return []
     
+    @deferred_write('technical_indicator')
+    @uses_connection
     def save_technical_indicator(self, symbol, indicator_type, values, interval="1h", timestamp=None):
         """
         Salva dados de indicadores técnicos
@@ -1094,6 +1677,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar indicador {indicator_type} para {symbol}: {str(e)}")
             return False
     
+    @uses_connection
     def get_technical_indicators(self, symbol=None, indicator_type=None, interval="1h", limit=100):
         """
         Obtém dados de indicadores técnicos
@@ -1146,6 +1730,8 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter indicadores técnicos: {str(e)}")
             return []
     
+    @deferred_write('trading_signal')
+    @uses_connection
     def save_trading_signal(self, symbol, signal_type, strength, price, source, reasoning=None, indicators_data=None):
         """
         Salva um sinal de trading gerado
@@ -1192,6 +1778,43 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar sinal de trading para {symbol}: {str(e)}")
             return None
             
+    @uses_connection
+    def save_batch(self, record_type, records):
+        """
+        Salva vários registros de um mesmo tipo em um único INSERT de várias linhas
+        
+        Com a gravação write-behind ativa os registros são apenas enfileirados.
+        
+        Args:
+            record_type (str): Tipo do registro ('trading_signal', 'analysis', 'log',
+                'notification' ou 'technical_indicator')
+            records (list): Dicionários com os argumentos do método save_* correspondente
+                (ex.: symbol, signal_type, strength... para 'trading_signal')
+            
+        Returns:
+            int: Quantidade de registros gravados (ou enfileirados); 0 em caso de erro
+        """
+        if not records:
+            return 0
+        
+        if self.write_behind is not None:
+            return sum(1 for record in records if self.write_behind.submit(record_type, **record))
+        
+        self._check_and_reconnect()
+        
+        try:
+            now = datetime.now()
+            insert_rows(self.cursor, record_type, [build_row(record_type, record, now) for record in records])
+            self.conn.commit()
+            
+            self.logger.info(f"{len(records)} registros '{record_type}' salvos em lote")
+            return len(records)
+        except Exception as e:
+            self.conn.rollback()
+            self.logger.error(f"Erro ao salvar lote de '{record_type}' no PostgreSQL: {str(e)}")
+            return 0
+    
+    @uses_connection
     def update_signal_executed(self, signal_id):
         """
         Marca um sinal de trading como executado
@@ -1225,6 +1848,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao atualizar sinal {signal_id}: {str(e)}")
             return False
     
+    @uses_connection
     def get_trading_signals(self, symbol=None, signal_type=None, executed=None, limit=50):
         """
         Obtém sinais de trading
@@ -1277,6 +1901,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter sinais de trading: {str(e)}")
             return []
     
+    @uses_connection
     def save_app_state(self, state_data):
         """
         Salva o estado da aplicação no PostgreSQL
@@ -1370,6 +1995,7 @@ class PostgresManager:
             self.register_failure()
             return None
     
+    @uses_connection
     def update_daily_stats(self, stats):
         """
         Atualiza ou insere estatísticas diárias
@@ -1475,6 +2101,7 @@ class PostgresManager:
     # Funções para histórico detalhado de transações
     # =============================================
     
+    @uses_connection
     def record_transaction(self, transaction_data):
         """
         Registra uma transação completa no histórico
@@ -1618,6 +2245,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao registrar transação: {str(e)}")
             return None
     
+    @uses_connection
     def get_transaction_history(self, symbol=None, start_date=None, end_date=None, operation_type=None, limit=100):
         """
         Obtém o histórico de transações, opcionalmente filtrado
@@ -1675,6 +2303,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter histórico de transações: {str(e)}")
             return []
     
+    @uses_connection
     def calculate_performance_metrics(self, period_type, start_date, end_date):
         """
         Calcula métricas de performance para um período específico
@@ -1921,6 +2550,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao calcular métricas de performance: {str(e)}")
             return None
     
+    @uses_connection
     def save_capital_update(self, balance, change_amount=None, change_percentage=None, trade_id=None, event_type='trade', notes=None):
         """
         Registra uma atualização no capital do bot
@@ -1957,6 +2587,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao registrar atualização de capital: {str(e)}")
             return None
             
+    @uses_connection
     def get_capital_history(self, start_date=None, end_date=None, limit=100):
         """
         Obtém o histórico de capital
@@ -2006,6 +2637,8 @@ class PostgresManager:
     
     def ensure_connection(self):
         """Garante que a conexão com o banco está ativa ou reconecta"""
+        if self.use_pool:
+            return self._check_and_reconnect()
         if not self._is_connection_alive():
             self.logger.info("Reconectando ao PostgreSQL...")
             # Fecha conexões anteriores que possam estar em estado inválido
@@ -2035,6 +2668,10 @@ class PostgresManager:
         """
         import time
         
+        # No modo pool a saúde das conexões é verificada na retirada, não a cada query
+        if self.use_pool:
+            return self._pool is not None or self.connect()
+        
         if self._is_connection_alive():
             return True
         
@@ -2106,6 +2743,7 @@ class PostgresManager:
         if hasattr(self, '_failure_count'):
             self._failure_count = 0
     
+    @uses_connection
     def load_last_app_state(self):
         """
         Loads the last application state from the PostgreSQL database
@@ -2130,6 +2768,7 @@ class PostgresManager:
     # Métodos para Asset Balances
     # =============================================
     
+    @uses_connection
     def save_asset_balances(self, user_id, balances_data, total_balance_usdt=0, total_balance_brl=0):
         """
         Salva os saldos de ativos do usuário
@@ -2195,6 +2834,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao salvar saldos de ativos: {str(e)}")
             return False
     
+    @uses_connection
     def get_user_asset_balances(self, user_id, snapshot_date=None, active_only=True):
         """
         Obtém os saldos de ativos de um usuário
@@ -2238,6 +2878,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter saldos de ativos: {str(e)}")
             return []
     
+    @uses_connection
     def get_user_total_balance(self, user_id, snapshot_date=None):
         """
         Obtém o saldo total da carteira do usuário
@@ -2285,6 +2926,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter saldo total: {str(e)}")
             return {'total_balance_usdt': 0.0, 'total_balance_brl': 0.0, 'snapshot_date': None}
     
+    @uses_connection
     def get_portfolio_evolution(self, user_id, days=30):
         """
         Obtém a evolução do portfólio do usuário nos últimos dias
@@ -2320,6 +2962,7 @@ class PostgresManager:
             self.logger.error(f"Erro ao obter evolução do portfólio: {str(e)}")
             return []
     
+    @uses_connection
     def get_top_assets_by_value(self, user_id, limit=10, snapshot_date=None):
         """
         Obtém os ativos com maior valor na carteira
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Gravação assíncrona (write-behind) de telemetria no PostgreSQL
+
+Sinais, logs, análises, notificações e indicadores técnicos são colocados em uma
+fila limitada e gravados por uma thread em segundo plano com INSERTs de várias
+linhas (``execute_values``), quando a fila atinge ``batch_size`` registros ou a
+cada ``flush_interval`` segundos. Quem registra nunca espera pelo banco, exceto
+com a política de estouro ``block``.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+
+# Políticas para fila cheia
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'spill')
+
+# Tipos de registro: tabela, colunas (coluna -> argumento do método save_* do
+# PostgresManager; None = horário do enfileiramento), colunas JSONB e conflito
+RECORD_TYPES = {
+    'notification': {
+        'table': 'notifications',
+        'columns': (('type', 'notification_type'), ('title', 'title'), ('message', 'message'),
+                    ('telegram_sent', 'telegram_sent'), ('created_at', None)),
+        'json_columns': (),
+        'conflict': '',
+    },
+    'log': {
+        'table': 'trading_logs',
+        'columns': (('log_type', 'log_type'), ('message', 'message'), ('details', 'details'),
+                    ('level', 'level'), ('timestamp', 'timestamp')),
+        'json_columns': (),
+        'conflict': '',
+    },
+    'analysis': {
+        'table': 'market_analysis',
+        'columns': (('symbol', 'symbol'), ('analysis_type', 'analysis_type'), ('data', 'data'),
+                    ('created_at', None)),
+        'json_columns': ('data',),
+        'conflict': '',
+    },
+    'trading_signal': {
+        'table': 'trading_signals',
+        'columns': (('symbol', 'symbol'), ('signal_type', 'signal_type'), ('strength', 'strength'),
+                    ('price', 'price'), ('source', 'source'), ('reasoning', 'reasoning'),
+                    ('indicators_data', 'indicators_data'), ('timestamp', None)),
+        'json_columns': ('indicators_data',),
+        'conflict': '',
+    },
+    'technical_indicator': {
+        'table': 'technical_indicators',
+        'columns': (('symbol', 'symbol'), ('indicator_type', 'indicator_type'), ('values', 'values'),
+                    ('timestamp', 'timestamp'), ('interval', 'interval')),
+        'json_columns': ('values',),
+        'conflict': ' ON CONFLICT (symbol, indicator_type, timestamp, interval) DO UPDATE SET values = EXCLUDED.values',
+        # Chave única: a última gravação do lote prevalece
+        'unique': ('symbol', 'indicator_type', 'timestamp', 'interval'),
+    },
+}
+
+# Colunas de horário preenchidas com o momento do enfileiramento quando ausentes
+TIMESTAMP_COLUMNS = ('timestamp', 'created_at')
+
+
+def build_row(record_type, arguments, now=None):
+    """Monta a linha de um registro a partir dos argumentos do método save_*
+
+    Args:
+        record_type (str): Chave de RECORD_TYPES
+        arguments (dict): Argumentos do método save_* correspondente
+        now (datetime, opcional): Valor das colunas de horário não informadas
+
+    Returns:
+        tuple: Valores na ordem das colunas de RECORD_TYPES
+    """
+    now = now or datetime.now()
+    row = []
+    for column, argument in RECORD_TYPES[record_type]['columns']:
+        value = arguments.get(argument) if argument else None
+        if value is None and column in TIMESTAMP_COLUMNS:
+            value = now
+        row.append(value)
+    return tuple(row)
+
+
+def insert_rows(cursor, record_type, rows):
+    """Grava linhas de um tipo de registro com um único INSERT de várias linhas
+
+    Args:
+        cursor: Cursor psycopg2 (o commit fica a cargo de quem chama)
+        record_type (str): Chave de RECORD_TYPES
+        rows (list): Linhas montadas por ``build_row``
+    """
+    spec = RECORD_TYPES[record_type]
+    columns = [column for column, _ in spec['columns']]
+    if 'unique' in spec:
+        key_indexes = [columns.index(c) for c in spec['unique']]
+        rows = list({tuple(row[i] for i in key_indexes): row for row in rows}.values())
+    json_indexes = [columns.index(c) for c in spec['json_columns']]
+    if json_indexes:
+        rows = [
+            tuple(Json(v) if i in json_indexes and v is not None else v for i, v in enumerate(row))
+            for row in rows
+        ]
+    execute_values(
+        cursor,
+        f"INSERT INTO {spec['table']} ({', '.join(columns)}) VALUES %s{spec['conflict']}",
+        rows,
+        page_size=len(rows)
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class WriteBehindWriter:
+    """Fila limitada de registros gravados em lote por uma thread em segundo plano
+
+    Args:
+        manager: PostgresManager usado para obter conexões (pool ou conexão própria)
+        max_queue (int): Capacidade da fila em memória
+        batch_size (int): Registros que disparam uma gravação imediata
+        flush_interval (float): Intervalo máximo (s) entre gravações
+        overflow_policy (str): 'block' (espera espaço), 'drop_oldest' (descarta o
+            registro mais antigo) ou 'spill' (grava o excedente em arquivo JSONL
+            local, reprocessado quando o banco voltar a ter folga)
+        spill_path (str): Arquivo usado pela política 'spill'
+        block_timeout (float): Espera máxima da política 'block' antes de descartar
+    """
+
+    def __init__(self, manager, max_queue=10000, batch_size=500, flush_interval=1.0,
+                 overflow_policy='drop_oldest', spill_path=None, block_timeout=5.0):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de estouro inválida: {overflow_policy}")
+
+        self.manager = manager
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path or os.path.join("data", "write_behind_spill.jsonl")
+        self.block_timeout = block_timeout
+        self.logger = logging.getLogger("robot-crypt")
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._stopping = False
+        self._thread = None
+        self._conn = None
+        self._spill_lock = threading.Lock()
+
+        # Estatísticas
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'blocked': 0,
+            'errors': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start(self):
+        """Inicia a thread de gravação e registra o flush no encerramento"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="postgres-write-behind", daemon=True)
+        self._thread.start()
+
+        try:
+            from ..core.signal_handlers import register_shutdown_callback
+            register_shutdown_callback(self.close)
+        except Exception as e:
+            self.logger.warning(f"Flush write-behind no encerramento não registrado: {str(e)}")
+        self.logger.info(
+            f"Gravação write-behind iniciada (fila={self.max_queue}, lote={self.batch_size}, "
+            f"intervalo={self.flush_interval}s, estouro={self.overflow_policy})"
+        )
+
+    def close(self, timeout=10.0):
+        """Grava tudo o que estiver na fila e encerra a thread"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+        try:
+            from ..core.signal_handlers import unregister_shutdown_callback
+            unregister_shutdown_callback(self.close)
+        except Exception:
+            pass
+        self.logger.info(f"Gravação write-behind encerrada: {self.get_stats()}")
+
+    def flush(self, timeout=10.0):
+        """Solicita gravação imediata e aguarda a fila esvaziar
+
+        Returns:
+            bool: True se a fila foi esvaziada dentro do prazo
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._queue or self._flush_requested:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._thread is None:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    # ------------------------------------------------------------------
+    # Enfileiramento (chamado pelo caminho crítico)
+    # ------------------------------------------------------------------
+    def submit(self, record_type, **arguments):
+        """Enfileira um registro sem acessar o banco
+
+        Args:
+            record_type (str): Chave de RECORD_TYPES
+            **arguments: Argumentos do método save_* correspondente
+
+        Returns:
+            bool: True se o registro foi enfileirado (ou gravado no arquivo de spill)
+        """
+        record = (record_type, build_row(record_type, arguments))
+
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                if self.overflow_policy == 'drop_oldest':
+                    self._queue.popleft()
+                    self.stats['dropped'] += 1
+                elif self.overflow_policy == 'spill':
+                    self._spill([record])
+                    return True
+                else:
+                    self.stats['blocked'] += 1
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._queue) >= self.max_queue:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats['dropped'] += 1
+                            return False
+                        self._condition.wait(remaining)
+
+            self._queue.append(record)
+            self.stats['enqueued'] += 1
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+        return True
+
+    # ------------------------------------------------------------------
+    # Thread de gravação
+    # ------------------------------------------------------------------
+    def _run(self):
+        failures = 0
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._queue) < self.batch_size and not self._stopping
+                       and not self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                stopping = self._stopping
+                # Há espaço na fila: libera produtores bloqueados
+                self._condition.notify_all()
+
+            if batch:
+                try:
+                    self._write(batch)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    self.stats['errors'] += 1
+                    self.logger.error(f"Erro na gravação write-behind de {len(batch)} registros: {str(e)}")
+                    self._requeue(batch)
+                    if stopping and failures >= 3:
+                        self._spill(self._drain())
+                        break
+                    time.sleep(min(30, 0.5 * (2 ** (failures - 1))))
+                    continue
+            elif not stopping:
+                self._replay_spill()
+
+            with self._condition:
+                if not self._queue:
+                    self._flush_requested = False
+                    self._condition.notify_all()
+                if self._stopping and not self._queue:
+                    break
+
+    def _drain(self):
+        with self._condition:
+            records = list(self._queue)
+            self._queue.clear()
+            self._flush_requested = False
+            self._condition.notify_all()
+        return records
+
+    def _requeue(self, batch):
+        """Devolve um lote que falhou ao início da fila (respeitando a capacidade)"""
+        with self._condition:
+            space = self.max_queue - len(self._queue)
+            keep, overflow = batch[:space], batch[space:]
+            self._queue.extendleft(reversed(keep))
+        if overflow:
+            if self.overflow_policy == 'spill':
+                self._spill(overflow)
+            else:
+                self.stats['dropped'] += len(overflow)
+
+    def _write(self, batch):
+        """Grava um lote com um INSERT de várias linhas por tabela, em uma transação"""
+        groups = {}
+        for record_type, row in batch:
+            groups.setdefault(record_type, []).append(row)
+
+        with self._cursor() as cursor:
+            for record_type, rows in groups.items():
+                insert_rows(cursor, record_type, rows)
+
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+
+    def _cursor(self):
+        """Cursor transacional: do pool do PostgresManager ou de uma conexão própria
+
+        No modo de conexão única a thread usa uma conexão exclusiva para não
+        compartilhar o cursor do PostgresManager com o loop do bot.
+        """
+        if getattr(self.manager, 'use_pool', False):
+            return self.manager.transaction()
+        return _OwnConnectionTransaction(self)
+
+    # ------------------------------------------------------------------
+    # Spill em arquivo local
+    # ------------------------------------------------------------------
+    def _spill(self, records):
+        if not records:
+            return
+        with self._spill_lock:
+            try:
+                os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    for record_type, row in records:
+                        f.write(json.dumps([record_type, list(row)], default=_json_default))
+                        f.write("\n")
+                self.stats['spilled'] += len(records)
+            except OSError as e:
+                self.stats['dropped'] += len(records)
+                self.logger.error(f"Falha ao gravar spill write-behind: {str(e)}")
+
+    def _replay_spill(self):
+        """Reenfileira registros do arquivo de spill quando a fila está vazia"""
+        if self.overflow_policy != 'spill' or not os.path.exists(self.spill_path):
+            return
+        with self._spill_lock:
+            replay_path = f"{self.spill_path}.replay"
+            try:
+                os.replace(self.spill_path, replay_path)
+                with open(replay_path, encoding='utf-8') as f:
+                    records = [json.loads(line) for line in f if line.strip()]
+                os.remove(replay_path)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Falha ao ler spill write-behind: {str(e)}")
+                return
+
+        with self._condition:
+            space = self.max_queue - len(self._queue)
+            self._queue.extend((record_type, tuple(row)) for record_type, row in records[:space])
+        self.stats['replayed'] += min(space, len(records))
+        if len(records) > space:
+            self._spill([(record_type, tuple(row)) for record_type, row in records[space:]])
+
+    def get_stats(self):
+        """Estatísticas da fila e das gravações"""
+        with self._condition:
+            queued = len(self._queue)
+        return {'queued': queued, 'overflow_policy': self.overflow_policy, **self.stats}
+
+
+class _OwnConnectionTransaction:
+    """Transação em uma conexão exclusiva da thread de gravação (modo sem pool)"""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def __enter__(self):
+        writer = self.writer
+        if writer._conn is None or writer._conn.closed:
+            writer._conn = psycopg2.connect(writer.manager.connection_string)
+        self.cursor = writer._conn.cursor()
+        return self.cursor
+
+    def __exit__(self, exc_type, exc, tb):
+        conn = self.writer._conn
+        try:
+            if exc_type is None:
+                conn.commit()
+            else:
+                conn.rollback()
+        except psycopg2.Error:
+            # Conexão inutilizável: será recriada na próxima gravação
+            self.writer._conn = None
+            raise
+        finally:
+            self.cursor.close()
+        return False
@@ -19,6 +19,7 @@ from src.middleware.security_headers import (
     RateLimitMiddleware, 
     SecurityMonitoringMiddleware
 )
+from src.middleware.rate_limit import create_rate_limit_store
 
 from src.core.config import settings
 from src.database.database import Base, get_database
@@ -51,6 +52,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     
     # Cleanup
     logger.info("Shutting down Robot-Crypt API...")
+    
+    # Close shared market data clients
+    try:
+        from src.api.external.market_data_aggregator import close_shared_aggregator
+        await close_shared_aggregator()
+    except Exception as e:
+        logger.error(f"Error closing market data aggregator: {e}")
+    
+    # Stop the analytics compute job pool
+    try:
+        from src.analytics.compute_jobs import shutdown_compute_job_manager
+        shutdown_compute_job_manager(wait=False)
+    except Exception as e:
+        logger.error(f"Error stopping analytics compute jobs: {e}")
+    
+    # Stop the sentiment scoring processes
+    try:
+        from src.contextual_analysis.sentiment_service import shutdown_sentiment_service
+        shutdown_sentiment_service()
+    except Exception as e:
+        logger.error(f"Error stopping sentiment service: {e}")
 
 
 # Create FastAPI app
@@ -66,7 +88,17 @@ app = FastAPI(
 # Add security middlewares (order matters!)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(SecurityMonitoringMiddleware)
-app.add_middleware(RateLimitMiddleware, calls=settings.RATE_LIMIT_PER_MINUTE, period=60)
+app.add_middleware(
+    RateLimitMiddleware,
+    calls=settings.RATE_LIMIT_PER_MINUTE,
+    period=60,
+    store=create_rate_limit_store(
+        settings.RATE_LIMIT_BACKEND,
+        settings.RATE_LIMIT_REDIS_URL,
+        settings.RATE_LIMIT_MAX_KEYS
+    ),
+    route_costs=settings.RATE_LIMIT_ROUTE_COSTS
+)
 
 # Add trusted host middleware
 if not settings.DEBUG:
@@ -0,0 +1,231 @@
+"""
+GCRA rate limiting stores for Robot-Crypt API.
+
+O limitador usa o Generic Cell Rate Algorithm: cada chave guarda apenas o
+"theoretical arrival time" (TAT), um float, em vez da lista de timestamps.
+Isso mantém memória constante por cliente e custo O(1) por requisição.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def gcra_update(
+    tat: Optional[float],
+    now: float,
+    emission_interval: float,
+    tolerance: float,
+    cost: float
+) -> Tuple[bool, Optional[float], float]:
+    """
+    Apply one GCRA decision.
+
+    Args:
+        tat: Stored theoretical arrival time (None for an unknown key)
+        now: Current time in seconds
+        emission_interval: Seconds "paid" per unit of cost (period / calls)
+        tolerance: Burst tolerance in seconds (normally the period)
+        cost: Cost of the request in units
+
+    Returns:
+        (allowed, new_tat, wait) where new_tat is None when the request is
+        rejected (state unchanged) and wait is the Retry-After in seconds if
+        rejected or the remaining budget in seconds if allowed
+    """
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + emission_interval * cost
+    allow_at = new_tat - tolerance
+
+    if now < allow_at:
+        return False, None, allow_at - now
+    return True, new_tat, tolerance - (new_tat - now)
+
+
+class InMemoryRateLimitStore:
+    """
+    In-process GCRA store with LRU eviction.
+
+    Guarda um float por chave e descarta as chaves menos usadas acima de
+    ``max_keys``. Chaves ociosas (TAT no passado) equivalem a chaves ausentes,
+    então a remoção nunca concede orçamento extra a um cliente ativo.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self.evictions = 0
+
+    async def consume(self, key: str, cost: float, emission_interval: float,
+                      tolerance: float) -> Tuple[bool, float]:
+        """
+        Consume ``cost`` units from the key's budget.
+
+        Args:
+            key: Rate limit key (e.g. client IP)
+            cost: Request cost in units
+            emission_interval: Seconds per unit
+            tolerance: Burst tolerance in seconds
+
+        Returns:
+            (allowed, seconds) — Retry-After if rejected, remaining budget otherwise
+        """
+        return self.consume_sync(key, cost, emission_interval, tolerance, time.time())
+
+    def consume_sync(self, key: str, cost: float, emission_interval: float,
+                     tolerance: float, now: float) -> Tuple[bool, float]:
+        """Synchronous version of :meth:`consume` with an explicit clock."""
+        allowed, new_tat, seconds = gcra_update(
+            self._tats.get(key), now, emission_interval, tolerance, cost
+        )
+
+        if allowed:
+            self._tats[key] = new_tat
+            self._tats.move_to_end(key)
+            while len(self._tats) > self.max_keys:
+                self._tats.popitem(last=False)
+                self.evictions += 1
+
+        return allowed, seconds
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class RedisRateLimitStore:
+    """
+    Shared GCRA store backed by Redis, so every uvicorn worker enforces one budget.
+
+    A decisão roda num script Lua atômico usando o relógio do Redis; cada
+    chave expira quando seu TAT passa. Se o Redis falhar, o limite é aplicado
+    localmente (por worker) até a conexão voltar.
+    """
+
+    SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if tat == nil or tat < now then
+    tat = now
+end
+local new_tat = tat + emission_interval * cost
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(tolerance - (new_tat - now))}
+"""
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "ratelimit:",
+                 fallback: Optional[InMemoryRateLimitStore] = None):
+        """
+        Args:
+            url: Redis URL (ignored if ``client`` is given)
+            client: Existing redis.asyncio client
+            prefix: Key prefix
+            fallback: Local store used while Redis is unavailable
+        """
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ImportError("O pacote 'redis' é necessário para o rate limit compartilhado")
+            client = redis_asyncio.from_url(url)
+
+        self.client = client
+        self.prefix = prefix
+        self.fallback = fallback or InMemoryRateLimitStore()
+        self.errors = 0
+        self._script = None
+
+    async def consume(self, key: str, cost: float, emission_interval: float,
+                      tolerance: float) -> Tuple[bool, float]:
+        """See :meth:`InMemoryRateLimitStore.consume`."""
+        try:
+            if self._script is None:
+                self._script = self.client.register_script(self.SCRIPT)
+            allowed, seconds = await self._script(
+                keys=[self.prefix + key], args=[emission_interval, tolerance, cost]
+            )
+            return bool(int(allowed)), float(seconds)
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1 or self.errors % 100 == 0:
+                logger.warning(f"Rate limit Redis indisponível, usando limite local: {e}")
+            return await self.fallback.consume(key, cost, emission_interval, tolerance)
+
+
+def create_rate_limit_store(backend: str = "memory", redis_url: Optional[str] = None,
+                            max_keys: int = 100000):
+    """
+    Build the configured rate limit store.
+
+    Args:
+        backend: "memory" (per worker) or "redis" (shared by all workers)
+        redis_url: Redis URL for the shared backend
+        max_keys: LRU capacity of the local store
+
+    Returns:
+        Rate limit store
+    """
+    local_store = InMemoryRateLimitStore(max_keys=max_keys)
+    if backend == "redis":
+        if not redis_url:
+            logger.warning("RATE_LIMIT_BACKEND=redis sem RATE_LIMIT_REDIS_URL; usando limite local")
+            return local_store
+        return RedisRateLimitStore(url=redis_url, fallback=local_store)
+    return local_store
+
+
+def parse_route_costs(value) -> Dict[str, float]:
+    """
+    Parse route cost weights.
+
+    Args:
+        value: Dict or string like "/analytics/*=5,/market/*=1"
+
+    Returns:
+        Mapping of path prefix to cost
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        items = value.items()
+    else:
+        items = (item.split("=", 1) for item in str(value).split(",") if "=" in item)
+
+    return {
+        prefix.strip().rstrip("*").rstrip("/") or "/": float(cost)
+        for prefix, cost in items
+    }
+
+
+def route_cost(path: str, route_costs: Dict[str, float], default: float = 1.0) -> float:
+    """
+    Return the cost of a request path; the longest matching prefix wins.
+
+    Args:
+        path: Request path
+        route_costs: Mapping from :func:`parse_route_costs`
+        default: Cost of unmatched paths
+
+    Returns:
+        Request cost in units
+    """
+    best_length = -1
+    cost = default
+    for prefix, prefix_cost in route_costs.items():
+        if (path == prefix or path.startswith(prefix + "/") or prefix == "/") and len(prefix) > best_length:
+            best_length = len(prefix)
+            cost = prefix_cost
+    return cost
@@ -1,12 +1,14 @@
 """
 Security headers middleware for Robot-Crypt API.
 """
+import math
 import time
-from collections import defaultdict
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 
+from src.middleware.rate_limit import InMemoryRateLimitStore, parse_route_costs, route_cost
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,37 +44,53 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware."""
+    """
+    Rate limiting middleware using GCRA (constant memory per client).
+    
+    Allows ``calls`` units per ``period`` seconds per client IP, with bursts
+    up to the full budget. Routes can cost more than one unit.
+    """
     
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    def __init__(self, app, calls: int = 100, period: int = 60, store=None,
+                 route_costs=None, max_keys: int = 100000):
+        """
+        Args:
+            app: ASGI app
+            calls: Budget in units per period
+            period: Period in seconds
+            store: Shared or local rate limit store (default: in-process LRU)
+            route_costs: Path prefix costs, e.g. {"/analytics/*": 5}
+            max_keys: LRU capacity of the default in-process store
+        """
         super().__init__(app)
         self.calls = calls
         self.period = period
-        self.clients = defaultdict(list)
+        self.emission_interval = period / calls
+        self.store = store or InMemoryRateLimitStore(max_keys=max_keys)
+        self.route_costs = parse_route_costs(route_costs)
     
     async def dispatch(self, request: Request, call_next):
         client_ip = self._get_client_ip(request)
-        now = time.time()
-        
-        # Limpar entradas antigas
-        self.clients[client_ip] = [
-            timestamp for timestamp in self.clients[client_ip]
-            if now - timestamp < self.period
-        ]
+        cost = route_cost(request.url.path, self.route_costs)
         
-        # Verificar limite
-        if len(self.clients[client_ip]) >= self.calls:
+        # Verificar limite (um único TAT por cliente)
+        allowed, seconds = await self.store.consume(
+            client_ip, cost, self.emission_interval, self.period
+        )
+        if not allowed:
             logger.warning(f"Rate limit exceeded for IP: {client_ip}")
             return Response(
                 content='{"detail": "Rate limit exceeded"}',
                 status_code=429,
-                headers={"Content-Type": "application/json"}
+                headers={
+                    "Content-Type": "application/json",
+                    "Retry-After": str(max(1, math.ceil(seconds)))
+                }
             )
         
-        # Adicionar timestamp atual
-        self.clients[client_ip].append(now)
-        
         response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(self.calls)
+        response.headers["X-RateLimit-Remaining"] = str(max(0, int(seconds / self.emission_interval)))
         return response
     
     def _get_client_ip(self, request: Request) -> str:
@@ -64,6 +64,10 @@ class AdaptiveRiskManager:
         self.consecutive_loss_threshold = 3  # Quantidade de perdas consecutivas para trigger
         self.profit_target_volatility_factor = 1.5  # Fator para ajuste de alvos baseado em volatilidade
         
+        # Modelo de volatilidade: desvio padrão simples ou GARCH(1,1) com warm start por símbolo
+        self.volatility_model = getattr(self.config, "volatility_model", "std")
+        self.garch = None  # Garch11, criado sob demanda
+        
         # Carrega histórico de operações
         self.trade_history = {}  # Será preenchido sob demanda
         
@@ -136,12 +140,14 @@ class AdaptiveRiskManager:
         
         return history
 
-    def calculate_market_volatility(self, symbol, klines=None):
+    def calculate_market_volatility(self, symbol, klines=None, method=None):
         """Calcula a volatilidade recente do mercado para um símbolo
         
         Args:
             symbol (str): Símbolo do par de trading
             klines (list, optional): Dados de velas, se já disponíveis
+            method (str, optional): "std" ou "garch" (padrão: self.volatility_model).
+                Com "garch" retorna a volatilidade prevista para o próximo período
             
         Returns:
             float: Percentual de volatilidade diária média
@@ -153,20 +159,23 @@ class AdaptiveRiskManager:
                 self.logger.warning(f"Dados insuficientes para calcular volatilidade de {symbol}")
                 return 0.05  # Valor padrão de volatilidade (5%)
             
-            # Extrair preços de fechamento
-            closes = [float(k[4]) for k in klines]
-            
-            # Calcular retornos diários
-            returns = []
-            for i in range(1, len(closes)):
-                daily_return = (closes[i] - closes[i-1]) / closes[i-1]
-                returns.append(daily_return)
-            
-            # Calcular desvio padrão dos retornos (volatilidade)
-            if not returns:
-                return 0.05
-                
-            volatility = np.std(returns)
+            # Extrair preços de fechamento e calcular retornos
+            closes = np.array([float(k[4]) for k in klines])
+            returns = np.diff(closes) / closes[:-1]
+            
+            method = method or self.volatility_model
+            volatility = None
+            if method == "garch":
+                if self.garch is None:
+                    from ..analytics.garch import Garch11
+                    self.garch = Garch11()
+                forecast = self.garch.forecast(returns, horizon=1, key=symbol)
+                if forecast is not None:
+                    volatility = float(forecast[0])
+            
+            # Desvio padrão dos retornos (ou fallback se o GARCH não pôde ser ajustado)
+            if volatility is None:
+                volatility = np.std(returns)
             
             # Converter para percentual diário
             daily_volatility = volatility * 100
@@ -119,6 +119,11 @@ class PortfolioService:
 
         await self.db.commit()
         await self.db.refresh(db_snapshot)
+
+        # Keep the live risk engine in step with the new snapshot (once it has been seeded)
+        registry = self._risk_engines()
+        if registry.find(db_snapshot.user_id) is not None:
+            registry.update(db_snapshot.user_id, db_snapshot.current_market_value, db_snapshot.created_at)
         return db_snapshot
 
     async def update_portfolio_snapshot(
@@ -406,6 +411,37 @@ class PortfolioService:
             }
         }
 
+    @staticmethod
+    def _risk_engines():
+        """Registry of per-user streaming risk engines (imported lazily: heavy analytics package)."""
+        from src.analytics.streaming_risk import portfolio_risk_engines
+        return portfolio_risk_engines
+
+    async def get_live_risk_engine(self, user_id: int):
+        """
+        Get the user's streaming risk engine, seeding it from snapshot history on first use.
+
+        Afterwards every new snapshot updates the engine in O(1), so risk metrics
+        are read from its state instead of rescanning the history.
+        """
+        registry = self._risk_engines()
+        engine = registry.find(user_id)
+        if engine is not None:
+            return engine
+
+        result = await self.db.execute(
+            select(PortfolioSnapshot.current_market_value, PortfolioSnapshot.created_at)
+            .where(PortfolioSnapshot.user_id == user_id)
+            .order_by(desc(PortfolioSnapshot.created_at))
+            .limit(registry.engine_kwargs.get("window", 1000) + 1)
+        )
+        history = list(reversed(result.all()))
+        return registry.seed(
+            user_id,
+            [row.current_market_value for row in history],
+            [row.created_at for row in history]
+        )
+
     async def get_portfolio_risk_assessment(self, user_id: int) -> Dict[str, Any]:
         """Get portfolio risk metrics including VaR, volatility, and concentration risk."""
         # Get the latest snapshot
@@ -441,6 +477,8 @@ class PortfolioService:
                         "allocation_percentage": asset.allocation_percentage
                     })
 
+        live_engine = await self.get_live_risk_engine(user_id)
+
         return {
             "status": "success",
             "data": {
@@ -454,7 +492,8 @@ class PortfolioService:
                 "risk_metrics": {
                     "diversification_score": 100 - concentration_risk,
                     "risk_reward_ratio": latest_snapshot.sharpe_ratio if latest_snapshot.sharpe_ratio else 0
-                }
+                },
+                "live_risk": live_engine.snapshot()
             }
         }
 
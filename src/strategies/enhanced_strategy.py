@@ -20,6 +20,8 @@ if str(project_root) not in sys.path:
 from utils.utils import format_symbol
 from analysis.symbol_analyzer import SymbolAnalyzer, analyze_symbol
 from strategies.strategy import TradingStrategy, ScalpingStrategy, SwingTradingStrategy
+from trading.ai_enrichment import AIEnrichmentWorker, EnrichmentBoard
+from database.postgres_manager import PostgresManager
 from ai import LLMNewsAnalyzer, HybridPricePredictor, AdvancedPatternDetector
 
 logger = logging.getLogger("robot-crypt")
@@ -34,9 +36,10 @@ class EnhancedTradingStrategy(TradingStrategy):
         """Inicializa a estratégia aprimorada"""
         super().__init__(config, binance_api)
         
-        # Inicializa o analisador de símbolos
+        # Inicializa o analisador de símbolos com a API da estratégia, para que ele
+        # use as velas e os indicadores mantidos pelo feed WebSocket quando ativo
         try:
-            self.symbol_analyzer = SymbolAnalyzer()
+            self.symbol_analyzer = SymbolAnalyzer(binance_client=binance_api)
             self.analysis_enabled = True
             self.logger.info("Sistema de Análise Inteligente inicializado com sucesso")
         except Exception as e:
@@ -69,8 +72,57 @@ class EnhancedTradingStrategy(TradingStrategy):
             'analysis_limit': 100,            # Número de candles para análise
             'use_ai_signals': True,           # Se deve usar sinais da IA
             'combine_with_traditional': True, # Se deve combinar com análise tradicional
-            'risk_adjustment': True           # Se deve ajustar risco baseado na análise
+            'risk_adjustment': True,          # Se deve ajustar risco baseado na análise
+            'ai_refresh_interval': 300,       # Segundos entre recálculos da análise de cada par
+            'ai_max_staleness': 900           # Idade máxima (s) de uma análise usada na decisão
         }
+        
+        # Análises do ciclo calculadas em lote por prefetch_ai_analysis
+        self._prefetched_analysis = {}
+        self._prefetched_at = 0.0
+        
+        # Enriquecimento em segundo plano (iniciado no primeiro prefetch_ai_analysis)
+        self.ai_board = EnrichmentBoard()
+        self.ai_enrichment = None
+        self._enrichment_db = None
+    
+    def prefetch_ai_analysis(self, symbols: List[str]) -> int:
+        """
+        Executa a análise inteligente de todos os pares do ciclo em lote
+        
+        Com o enriquecimento em segundo plano ativo (AI_ENRICHMENT_ENABLED), apenas
+        atualiza os pares observados pelo worker e não bloqueia; o worker executa o
+        mesmo ``analyze_symbols`` em lote. Caso contrário, o lote roda aqui e as
+        análises atendem ``get_ai_analysis`` (ex: em ``analyze_market`` e depois em
+        ``execute_buy``) até expirarem após ``ai_max_staleness`` segundos.
+        
+        Args:
+            symbols: Símbolos dos pares de trading
+            
+        Returns:
+            Número de símbolos com análise disponível
+        """
+        self._prefetched_analysis = {}
+        self._prefetched_at = 0.0
+        if not self.analysis_enabled or not self.symbol_analyzer or not symbols:
+            return 0
+        
+        if self.start_ai_enrichment(symbols):
+            max_age = self.analysis_config['ai_max_staleness']
+            return sum(1 for symbol in symbols if self.ai_board.get(symbol, 'analysis', max_age) is not None)
+        
+        try:
+            analyses = self.symbol_analyzer.analyze_symbols(
+                symbols=list(symbols),
+                timeframe=self.analysis_config['timeframe'],
+                limit=self.analysis_config['analysis_limit']
+            )
+            self._prefetched_analysis = {symbol: analysis for symbol, analysis in analyses.items() if analysis}
+            self._prefetched_at = time.time()
+            return len(self._prefetched_analysis)
+        except Exception as e:
+            self.logger.error(f"Erro na análise inteligente em lote: {str(e)}")
+            return 0
     
     def get_ai_analysis(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
@@ -85,6 +137,23 @@ class EnhancedTradingStrategy(TradingStrategy):
         if not self.analysis_enabled or not self.symbol_analyzer:
             return None
         
+        # Com o worker ativo a decisão nunca espera pela análise: usa o último
+        # resultado publicado, se ainda válido
+        if self.ai_enrichment is not None:
+            analysis = self.ai_board.get(symbol, 'analysis', self.analysis_config['ai_max_staleness'])
+            if analysis is None:
+                self.logger.info(f"Análise IA de {symbol} ainda não disponível ou expirada")
+            return analysis
+        
+        if time.time() - self._prefetched_at <= self.analysis_config['ai_max_staleness']:
+            analysis = self._prefetched_analysis.get(symbol)
+            if analysis:
+                return analysis
+        
+        return self._compute_ai_analysis(symbol)
+    
+    def _compute_ai_analysis(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Executa a análise inteligente completa do símbolo (bloqueante)"""
         try:
             self.logger.info(f"Executando análise inteligente para {symbol}")
             
@@ -106,6 +175,64 @@ class EnhancedTradingStrategy(TradingStrategy):
             self.logger.error(f"Erro na análise inteligente de {symbol}: {str(e)}")
             return None
     
+    def start_ai_enrichment(self, symbols: List[str]) -> bool:
+        """
+        Inicia (uma vez) o worker de enriquecimento e define os pares observados
+        
+        O worker recalcula em lote (``analyze_symbols``) a análise inteligente dos
+        pares vencidos no seu próprio ritmo. A análise do worker usa um
+        ``PostgresManager`` próprio em modo pool, de modo que suas threads nunca
+        compartilham a conexão e o cursor usados pelo loop principal.
+        
+        Args:
+            symbols: Pares a observar
+            
+        Returns:
+            True se o enriquecimento em segundo plano está ativo
+        """
+        if not getattr(self.config, 'ai_enrichment_enabled', True) or not self.analysis_enabled:
+            return False
+        
+        if self.ai_enrichment is None:
+            try:
+                analyzer = SymbolAnalyzer(
+                    postgres_manager=PostgresManager(use_pool=True),
+                    binance_client=self.symbol_analyzer.binance
+                )
+                
+                def analyze_batch(batch_symbols):
+                    return analyzer.analyze_symbols(
+                        symbols=batch_symbols,
+                        timeframe=self.analysis_config['timeframe'],
+                        limit=self.analysis_config['analysis_limit']
+                    )
+                
+                worker = AIEnrichmentWorker(
+                    {'analysis': analyze_batch},
+                    {'analysis': self.analysis_config['ai_refresh_interval']},
+                    board=self.ai_board,
+                    max_concurrency=getattr(self.config, 'ai_enrichment_concurrency', 2),
+                    batch_kinds=('analysis',)
+                )
+                worker.start()
+            except Exception as e:
+                self.logger.error(f"Erro ao iniciar enriquecimento de IA: {str(e)}")
+                return False
+            self.ai_enrichment = worker
+            self._enrichment_db = analyzer.db
+        
+        self.ai_enrichment.watch(symbols)
+        return True
+    
+    def stop_ai_enrichment(self):
+        """Encerra o worker de enriquecimento (volta à análise síncrona)"""
+        if self.ai_enrichment is not None:
+            self.ai_enrichment.stop()
+            self.ai_enrichment = None
+        if self._enrichment_db is not None:
+            self._enrichment_db.disconnect()
+            self._enrichment_db = None
+    
     def extract_ai_signals(self, analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Extrai sinais relevantes da análise IA
@@ -258,7 +385,9 @@ class EnhancedScalpingStrategy(EnhancedTradingStrategy, ScalpingStrategy):
             'timeframe': '15m',           # Timeframe mais curto para scalping
             'min_confidence_threshold': 0.75,  # Maior confiança para scalping
             'use_volume_analysis': True,  # Importante para scalping
-            'use_volatility_analysis': True
+            'use_volatility_analysis': True,
+            'ai_refresh_interval': 120,   # Velas de 15m: análise recente importa mais
+            'ai_max_staleness': 450
         })
     
     def analyze_market(self, symbol, notifier=None):
@@ -471,7 +600,9 @@ class EnhancedSwingTradingStrategy(EnhancedTradingStrategy, SwingTradingStrategy
             'min_confidence_threshold': 0.65,  # Confiança moderada para swing
             'use_pattern_analysis': True, # Importante para swing trading
             'use_opportunity_analysis': True,
-            'analysis_limit': 200        # Mais dados para análise de médio prazo
+            'analysis_limit': 200,       # Mais dados para análise de médio prazo
+            'ai_refresh_interval': 900,  # Velas de 4h mudam devagar
+            'ai_max_staleness': 3600
         })
     
     def analyze_market(self, symbol, notifier=None):
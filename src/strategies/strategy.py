@@ -41,6 +41,26 @@ class TradingStrategy:
         
         return self.trades_today < self.config.max_trades_per_day
     
+    def trading_allowed(self):
+        """Verifica o limite diário de trades e a pausa após 2 prejuízos consecutivos"""
+        if not self.check_trade_limit():
+            self.logger.info(f"Limite diário de trades atingido ({self.config.max_trades_per_day})")
+            return False
+        
+        # Regra de ouro: pausa após 2 prejuízos consecutivos
+        if self.consecutive_losses >= 2:
+            self.logger.warning(f"Pausando operações após {self.consecutive_losses} prejuízos consecutivos")
+            return False
+        
+        return True
+    
+    def current_price(self, symbol):
+        """Obtém o preço atual do par pela API (None se indisponível)"""
+        price_data = self.binance.get_ticker_price(symbol.replace('/', ''))
+        if not price_data:
+            return None
+        return float(price_data['price'])
+    
     def record_trade(self):
         """Registra um novo trade no contador diário"""
         self.trades_today += 1
@@ -203,14 +223,8 @@ class ScalpingStrategy(TradingStrategy):
         - Vende com lucro de 2-3%
         - Stop loss em 0.5% abaixo do suporte
         """
-        # Verifica limite diário de trades
-        if not self.check_trade_limit():
-            self.logger.info(f"Limite diário de trades atingido ({self.config.max_trades_per_day})")
-            return False, None, None
-            
-        # Verifica se tivemos 2 prejuízos consecutivos (regra de ouro)
-        if self.consecutive_losses >= 2:
-            self.logger.warning(f"Pausando operações após {self.consecutive_losses} prejuízos consecutivos")
+        # Limite diário de trades e pausa após 2 prejuízos consecutivos (regra de ouro)
+        if not self.trading_allowed():
             return False, None, None
         
         # Obtém dados de suporte/resistência
@@ -705,14 +719,8 @@ class SwingTradingStrategy(TradingStrategy):
             symbol (str): O par de moedas para análise
             notifier (TelegramNotifier, optional): Notificador Telegram para enviar alertas
         """
-        # Verifica limite diário de trades
-        if not self.check_trade_limit():
-            self.logger.info(f"Limite diário de trades atingido ({self.config.max_trades_per_day})")
-            return False, None, None
-        
-        # Verifica se tivemos 2 prejuízos consecutivos (regra de ouro)
-        if self.consecutive_losses >= 2:
-            self.logger.warning(f"Pausando operações após {self.consecutive_losses} prejuízos consecutivos")
+        # Limite diário de trades e pausa após 2 prejuízos consecutivos (regra de ouro)
+        if not self.trading_allowed():
             return False, None, None
         
         # Formata o símbolo corretamente para a API
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Enriquecimento de IA em segundo plano para as estratégias aprimoradas
+
+Análises inteligentes (``SymbolAnalyzer``) e sentimento de notícias/LLM levam
+segundos por par. Em vez de rodá-las dentro de ``analyze_market``, um worker
+próprio as recalcula para cada símbolo observado no seu ritmo (intervalo por tipo
+de análise) e com concorrência limitada, publicando o último resultado com
+horário em um quadro em memória. As estratégias leem o quadro sem bloquear e
+descartam resultados mais velhos que o limite de validade, de modo que a decisão
+roda na velocidade dos dados de mercado e não na do LLM.
+
+O worker tem seu próprio event loop (em uma thread): tarefas assíncronas (ex:
+``NewsIntegrator``) rodam nele e tarefas síncronas em um pool de threads. Tipos
+em lote (``batch_kinds``) recebem de uma vez todos os símbolos vencidos (ex:
+``SymbolAnalyzer.analyze_symbols``) e nunca têm duas execuções simultâneas.
+"""
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class EnrichmentEntry:
+    """Último resultado publicado para um (símbolo, tipo)"""
+    value: Any
+    updated_at: float
+    duration: float = 0.0
+
+    @property
+    def age(self) -> float:
+        """Segundos desde a publicação"""
+        return time.time() - self.updated_at
+
+
+class EnrichmentBoard:
+    """Quadro em memória com o último resultado de cada (símbolo, tipo)
+
+    Thread-safe; leituras nunca esperam por cálculo.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], EnrichmentEntry] = {}
+        self._lock = threading.Lock()
+        self.stats = {'published': 0, 'hits': 0, 'stale': 0, 'misses': 0}
+
+    def publish(self, symbol: str, kind: str, value: Any, duration: float = 0.0):
+        """Publica um resultado, substituindo o anterior"""
+        entry = EnrichmentEntry(value=value, updated_at=time.time(), duration=duration)
+        with self._lock:
+            self._entries[(symbol, kind)] = entry
+            self.stats['published'] += 1
+
+    def get_entry(self, symbol: str, kind: str) -> Optional[EnrichmentEntry]:
+        """Último resultado com horário, independentemente da idade"""
+        with self._lock:
+            return self._entries.get((symbol, kind))
+
+    def get(self, symbol: str, kind: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Último resultado, ou None se não houver ou for mais velho que ``max_age`` segundos"""
+        with self._lock:
+            entry = self._entries.get((symbol, kind))
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if max_age is not None and entry.age > max_age:
+                self.stats['stale'] += 1
+                return None
+            self.stats['hits'] += 1
+            return entry.value
+
+    def discard(self, symbols: Iterable[str]):
+        """Remove os resultados dos símbolos que deixaram de ser observados"""
+        symbols = set(symbols)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in symbols]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de leitura e idade de cada resultado"""
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': {
+                    f"{symbol}:{kind}": round(entry.age, 1)
+                    for (symbol, kind), entry in self._entries.items()
+                }
+            }
+
+
+class AIEnrichmentWorker:
+    """Recalcula análises de IA dos símbolos observados em segundo plano
+
+    Args:
+        tasks (dict): Tipo -> função ``task(symbol)`` (síncrona ou ``async``); o retorno
+            é publicado no quadro (None não é publicado)
+        intervals (dict): Tipo -> segundos entre recálculos de cada símbolo
+        board (EnrichmentBoard, optional): Quadro onde os resultados são publicados
+        max_concurrency (int): Cálculos simultâneos (todos os tipos somados)
+        retry_delay (float): Espera máxima antes de tentar de novo após uma falha
+        poll_interval (float): Intervalo de verificação de tarefas vencidas
+        batch_kinds (iterable): Tipos cuja função recebe a lista de símbolos vencidos
+            e retorna um dict símbolo -> resultado
+    """
+
+    def __init__(self, tasks: Dict[str, Callable[[Any], Any]], intervals: Dict[str, float],
+                 board: Optional[EnrichmentBoard] = None, max_concurrency: int = 2,
+                 retry_delay: float = 60.0, poll_interval: float = 1.0,
+                 batch_kinds: Iterable[str] = ()):
+        self.tasks = dict(tasks)
+        self.batch_kinds = set(batch_kinds) & set(self.tasks)
+        self.intervals = {kind: float(intervals.get(kind, 300.0)) for kind in self.tasks}
+        self.board = board or EnrichmentBoard()
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger("robot-crypt")
+
+        self._symbols: Tuple[str, ...] = ()
+        self._next_run: Dict[Tuple[str, str], float] = {}
+        self._running = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self.stats = {'runs': 0, 'published': 0, 'empty': 0, 'errors': 0, 'total_time': 0.0}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Inicia a thread do worker e registra a parada no encerramento"""
+        if self.is_running:
+            return
+        self._stopping = False
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._thread_main, args=(ready,),
+                                        name="ai-enrichment", daemon=True)
+        self._thread.start()
+        ready.wait(5.0)
+
+        try:
+            from src.core.signal_handlers import register_shutdown_callback
+            register_shutdown_callback(self.stop)
+        except Exception as e:
+            self.logger.warning(f"Parada do enriquecimento de IA no encerramento não registrada: {str(e)}")
+        self.logger.info(
+            f"Enriquecimento de IA em segundo plano iniciado (tipos={list(self.tasks)}, "
+            f"concorrência={self.max_concurrency}, intervalos={self.intervals})"
+        )
+
+    def stop(self, timeout: float = 10.0):
+        """Encerra o worker (cálculos em andamento não são publicados)"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake()
+        self._thread.join(timeout)
+        self._thread = None
+
+        try:
+            from src.core.signal_handlers import unregister_shutdown_callback
+            unregister_shutdown_callback(self.stop)
+        except Exception:
+            pass
+        self.logger.info(f"Enriquecimento de IA encerrado: {self.get_stats()}")
+
+    def watch(self, symbols: Iterable[str]):
+        """Define os símbolos observados; os novos são calculados imediatamente"""
+        symbols = tuple(dict.fromkeys(symbols))
+        with self._lock:
+            removed = set(self._symbols) - set(symbols)
+            self._symbols = symbols
+            for key in [key for key in self._next_run if key[0] in removed]:
+                del self._next_run[key]
+        if removed:
+            self.board.discard(removed)
+        self._wake()
+
+    def refresh(self, symbol: str, kind: Optional[str] = None):
+        """Antecipa o recálculo de um símbolo (todos os tipos ou só ``kind``)"""
+        with self._lock:
+            for task_kind in ([kind] if kind else self.tasks):
+                self._next_run[(symbol, task_kind)] = 0.0
+        self._wake()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Execuções, falhas, tempo médio e estado do quadro"""
+        with self._lock:
+            runs = self.stats['runs']
+            return {
+                **self.stats,
+                'avg_time': self.stats['total_time'] / runs if runs else 0.0,
+                'symbols': len(self._symbols),
+                'in_flight': len(self._running),
+                'board': self.board.get_stats()
+            }
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def _wake(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass
+
+    def _thread_main(self, ready: threading.Event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        ready.set()
+        try:
+            loop.run_until_complete(self._run())
+        except Exception as e:
+            self.logger.error(f"Erro no loop de enriquecimento de IA: {str(e)}")
+        finally:
+            self._loop = None
+            loop.close()
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ai-enrichment")
+        pending = set()
+        try:
+            while not self._stopping:
+                batches = {}
+                for symbol, kind in self._due():
+                    if kind in self.batch_kinds:
+                        batches.setdefault(kind, []).append(symbol)
+                        continue
+                    self._spawn(pending, self._refresh(symbol, kind, semaphore, executor))
+                for kind, symbols in batches.items():
+                    self._spawn(pending, self._refresh_batch(symbols, kind, semaphore, executor))
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _spawn(pending, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    def _due(self):
+        """(símbolo, tipo) vencidos e sem cálculo em andamento, em ordem de atraso
+
+        Um tipo em lote só volta a vencer quando o lote anterior termina.
+        """
+        now = time.monotonic()
+        with self._lock:
+            busy_batches = {kind for _, kind in self._running if kind in self.batch_kinds}
+            due = [
+                (self._next_run.get((symbol, kind), 0.0), symbol, kind)
+                for symbol in self._symbols
+                for kind in self.tasks
+                if kind not in busy_batches and (symbol, kind) not in self._running
+                and self._next_run.get((symbol, kind), 0.0) <= now
+            ]
+            due.sort()
+            for _, symbol, kind in due:
+                self._running.add((symbol, kind))
+        return [(symbol, kind) for _, symbol, kind in due]
+
+    async def _execute(self, kind: str, argument: Any, semaphore: asyncio.Semaphore, executor):
+        """Executa a tarefa do tipo; retorna (resultado ou None em caso de falha, duração)"""
+        task = self.tasks[kind]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(task):
+                    value = await task(argument)
+                else:
+                    value = await asyncio.get_running_loop().run_in_executor(executor, task, argument)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                value = None
+                with self._lock:
+                    self.stats['errors'] += 1
+                self.logger.error(f"Erro no enriquecimento de IA ({kind}) para {argument}: {str(e)}")
+            return value, time.perf_counter() - start
+
+    async def _refresh(self, symbol: str, kind: str, semaphore: asyncio.Semaphore, executor):
+        try:
+            value, duration = await self._execute(kind, symbol, semaphore, executor)
+        except asyncio.CancelledError:
+            self._release([symbol], kind, None)
+            raise
+        self._finish(symbol, kind, value, duration)
+
+    async def _refresh_batch(self, symbols, kind: str, semaphore: asyncio.Semaphore, executor):
+        try:
+            results, duration = await self._execute(kind, list(symbols), semaphore, executor)
+        except asyncio.CancelledError:
+            self._release(symbols, kind, None)
+            raise
+        results = results if isinstance(results, dict) else {}
+        for symbol in symbols:
+            self._finish(symbol, kind, results.get(symbol) or None, duration / len(symbols))
+
+    def _finish(self, symbol: str, kind: str, value: Any, duration: float):
+        """Contabiliza, publica e agenda o próximo cálculo de um (símbolo, tipo)"""
+        delay = self.intervals[kind]
+        if value is None:
+            # Falha ou resultado vazio: tenta de novo mais cedo
+            delay = min(delay, self.retry_delay)
+
+        with self._lock:
+            self.stats['runs'] += 1
+            self.stats['total_time'] += duration
+            still_watched = symbol in self._symbols
+            if value is None:
+                self.stats['empty'] += 1
+            elif still_watched:
+                self.stats['published'] += 1
+        if value is not None and still_watched and not self._stopping:
+            self.board.publish(symbol, kind, value, duration)
+
+        self._release([symbol], kind, delay)
+
+    def _release(self, symbols, kind: str, delay: Optional[float]):
+        """Libera os (símbolo, tipo) e agenda o próximo cálculo (None = sem agendar)"""
+        with self._lock:
+            for symbol in symbols:
+                self._running.discard((symbol, kind))
+                if delay is not None and symbol in self._symbols:
+                    self._next_run[(symbol, kind)] = time.monotonic() + delay
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Varredura concorrente de mercado para o loop principal do Robot-Crypt
+
+Executa ``strategy.analyze_market`` para todos os pares de um ciclo em paralelo
+(pool de threads limitado), respeitando um orçamento de requisições compartilhado.
+A execução de ordens NÃO acontece aqui: o loop principal continua processando os
+sinais de forma serializada, na mesma ordem da lista de pares.
+
+As estratégias gravam no PostgresManager durante a análise; com mais de uma thread
+ele precisa estar em modo pool (POSTGRES_USE_POOL), já que a conexão única do modo
+legado não pode ser compartilhada. ``Config`` limita SCAN_MAX_WORKERS a 1 sem o pool.
+
+Como todos os pares são analisados antes de qualquer ordem, cada sinal é revalidado
+no loop serializado (``MarketScanner.confirm_signal``): o limite diário de trades e a
+pausa após prejuízos consecutivos só mudam quando ordens são executadas, e o preço
+capturado na varredura pode estar defasado.
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RequestBudget:
+    """Orçamento de requisições compartilhado entre as threads de análise
+
+    Limita o ritmo com que novas análises de pares são iniciadas (intervalo mínimo
+    entre inícios) e o número de análises simultâneas em andamento.
+    """
+
+    def __init__(self, requests_per_second: float = 10.0, max_in_flight: int = 8):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._semaphore = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.total_wait_time = 0.0
+
+    def acquire(self):
+        """Bloqueia até existir vaga e o próximo slot de tempo estar disponível"""
+        self._semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+            wait = slot - now
+            if wait > 0:
+                self.total_wait_time += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self):
+        """Libera a vaga ocupada por uma análise"""
+        self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+@dataclass
+class PairScanResult:
+    """Resultado da análise de um par em um ciclo de varredura"""
+    pair: str
+    should_trade: bool = False
+    action: Optional[str] = None
+    price: Optional[float] = None
+    latency: float = 0.0
+    error: Optional[BaseException] = None
+
+    @property
+    def signal(self) -> Tuple[bool, Optional[str], Optional[float]]:
+        """Tupla no mesmo formato retornado por ``analyze_market``"""
+        return self.should_trade, self.action, self.price
+
+
+@dataclass
+class ScanCycleStats:
+    """Métricas de um ciclo de varredura"""
+    started_at: datetime
+    wall_time: float = 0.0
+    pairs_scanned: int = 0
+    errors: int = 0
+    budget_wait_time: float = 0.0
+    pair_latencies: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.pair_latencies.values())
+        return {
+            'started_at': self.started_at.isoformat(),
+            'wall_time': self.wall_time,
+            'pairs_scanned': self.pairs_scanned,
+            'errors': self.errors,
+            'budget_wait_time': self.budget_wait_time,
+            'avg_pair_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+            'max_pair_latency': latencies[-1] if latencies else 0.0,
+            'pair_latencies': dict(self.pair_latencies),
+        }
+
+
+class MarketScanner:
+    """Analisa todos os pares de um ciclo em paralelo
+
+    Args:
+        strategy: Estratégia com método ``analyze_market(pair, notifier=None)``
+        max_workers (int): Número máximo de análises simultâneas
+        requests_per_second (float): Ritmo máximo de início de análises
+    """
+
+    def __init__(self, strategy, max_workers: int = 8, requests_per_second: float = 10.0):
+        self.strategy = strategy
+        self.max_workers = max(1, int(max_workers))
+        self.requests_per_second = requests_per_second
+        self.logger = logging.getLogger("robot-crypt")
+        self.last_cycle_stats: Optional[ScanCycleStats] = None
+
+    def _analyze_pair(self, pair: str, budget: RequestBudget, notifier=None) -> PairScanResult:
+        """Analisa um único par dentro do orçamento compartilhado"""
+        with budget:
+            start = time.perf_counter()
+            try:
+                should_trade, action, price = self.strategy.analyze_market(pair, notifier=notifier)
+                return PairScanResult(
+                    pair=pair,
+                    should_trade=should_trade,
+                    action=action,
+                    price=price,
+                    latency=time.perf_counter() - start
+                )
+            except Exception as e:
+                return PairScanResult(pair=pair, latency=time.perf_counter() - start, error=e)
+
+    def confirm_signal(self, result: PairScanResult) -> Tuple[bool, Optional[str], Optional[float]]:
+        """Revalida um sinal da varredura imediatamente antes da execução da ordem
+
+        Reaplica ``strategy.trading_allowed()`` (limite diário e prejuízos consecutivos,
+        atualizados pelas ordens já executadas no ciclo) e busca o preço atual com
+        ``strategy.current_price(pair)``.
+
+        Args:
+            result (PairScanResult): Resultado da varredura do par
+
+        Returns:
+            tuple: (should_trade, action, price) a ser usado na execução
+        """
+        if not result.should_trade:
+            return result.signal
+
+        trading_allowed = getattr(self.strategy, 'trading_allowed', None)
+        if trading_allowed is not None and not trading_allowed():
+            self.logger.info(f"Sinal de {result.action} para {result.pair} descartado: limites de risco atingidos no ciclo")
+            return False, None, None
+
+        current_price = getattr(self.strategy, 'current_price', None)
+        if current_price is None:
+            return result.signal
+        price = current_price(result.pair)
+        if price is None:
+            self.logger.warning(f"Sinal de {result.action} para {result.pair} descartado: preço atual indisponível")
+            return False, None, None
+        return True, result.action, price
+
+    def scan(self, pairs: List[str], notifier=None) -> Dict[str, PairScanResult]:
+        """Executa a análise de todos os pares e retorna os resultados por par
+
+        Exceções levantadas por ``analyze_market`` são capturadas e devolvidas em
+        ``PairScanResult.error`` para que o chamador aplique o mesmo tratamento do
+        modo sequencial.
+
+        Args:
+            pairs (list): Pares a analisar (ex: ["BTC/USDT", "ETH/USDT"])
+            notifier (TelegramNotifier, optional): Repassado para ``analyze_market``
+
+        Returns:
+            dict: Mapeamento par -> PairScanResult, na ordem de ``pairs``
+        """
+        stats = ScanCycleStats(started_at=datetime.now())
+        budget = RequestBudget(self.requests_per_second, self.max_workers)
+        cycle_start = time.perf_counter()
+
+        results: Dict[str, PairScanResult] = {}
+        if pairs:
+            workers = min(self.max_workers, len(pairs))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="market-scan") as executor:
+                futures = [executor.submit(self._analyze_pair, pair, budget, notifier) for pair in pairs]
+                for pair, future in zip(pairs, futures):
+                    results[pair] = future.result()
+
+        stats.wall_time = time.perf_counter() - cycle_start
+        stats.pairs_scanned = len(results)
+        stats.errors = sum(1 for r in results.values() if r.error is not None)
+        stats.budget_wait_time = budget.total_wait_time
+        stats.pair_latencies = {pair: r.latency for pair, r in results.items()}
+        self.last_cycle_stats = stats
+
+        summary = stats.to_dict()
+        self.logger.info(
+            f"Varredura concorrente de {stats.pairs_scanned} pares concluída em {stats.wall_time:.2f}s "
+            f"(latência média: {summary['avg_pair_latency']:.2f}s, máx: {summary['max_pair_latency']:.2f}s, "
+            f"erros: {stats.errors}, workers: {self.max_workers})"
+        )
+        return results
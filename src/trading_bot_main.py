@@ -24,6 +24,11 @@ if __name__ == '__main__':
     sys.path.insert(0, str(project_root))
 
 from src.tools.health_monitor import check_system_health, log_process_tree
+from src.trading.market_scanner import MarketScanner
+from src.api.binance_stream import BinanceMarketStream
+from src.analytics.streaming_risk import StreamingRiskEngine
+# Importado antes do registro dos handlers do bot, que continuam valendo
+from src.core.signal_handlers import run_shutdown_callbacks
 
 # Importações do pacote src
 from src import (
@@ -676,6 +681,28 @@ def main():
         }
         logger.info("Iniciando com novas estatísticas - Nenhum estado anterior encontrado")
     
+    # Feed WebSocket de velas: as estratégias passam a ler klines da memória
+    market_stream = None
+    if config.use_market_stream and not config.simulation_mode:
+        try:
+            market_stream = BinanceMarketStream(
+                binance, pairs,
+                intervals=config.market_stream_intervals,
+                testnet=config.use_testnet,
+                history=config.market_stream_history
+            )
+            market_stream.start()
+            binance.attach_market_stream(market_stream)
+            if not market_stream.wait_until_ready(timeout=30):
+                logger.warning("Feed WebSocket ainda não conectado; usando API REST até a conexão")
+        except Exception as e:
+            logger.error(f"Erro ao iniciar feed WebSocket, usando apenas API REST: {str(e)}")
+            market_stream = None
+    
+    # Risco da carteira atualizado a cada trade (VaR, ES, volatilidade e drawdown em O(1))
+    risk_engine = StreamingRiskEngine()
+    risk_engine.update(stats['current_capital'])
+    
     # Contador para salvar estado periodicamente
     state_save_counter = 0
     
@@ -704,6 +731,13 @@ def main():
                     logger.info(f"Capital atual: R${stats['current_capital']:.2f} ({return_percent:+.2f}%)")
                     logger.info(f"Trades totais: {stats['total_trades']}")
                     
+                    live_risk = risk_engine.snapshot()
+                    if live_risk['var_analysis'].get('historical_95') is not None:
+                        logger.info(f"VaR 95%: {live_risk['var_analysis']['historical_95'] * 100:.2f}% | "
+                                    f"ES 95%: {live_risk['cvar_analysis']['cvar_95'] * 100:.2f}%")
+                    logger.info(f"Drawdown atual: {live_risk['drawdown']['current_drawdown_pct']:.2f}% | "
+                                f"Máximo: {live_risk['drawdown']['max_drawdown_pct']:.2f}%")
+                    
                     if stats['total_trades'] > 0:
                         win_rate = (stats['winning_trades'] / stats['total_trades']) * 100
                         logger.info(f"Win rate: {win_rate:.2f}%")
@@ -785,6 +819,24 @@ def main():
             else:
                 logger.info(f"📊 Usando estratégia tradicional: {strategy_type}")
             
+            # Análise inteligente de todos os pares em lote (uma busca paralela de candles,
+            # indicadores em uma única passada e uma gravação por tabela) ou, com o
+            # enriquecimento em segundo plano ativo, apenas atualização dos pares observados
+            if hasattr(strategy, 'prefetch_ai_analysis'):
+                prefetched = strategy.prefetch_ai_analysis(pairs[:])
+                logger.info(f"Análise inteligente disponível para {prefetched}/{len(pairs)} pares")
+            
+            # No modo concorrente, a análise de todos os pares é feita em paralelo antes
+            # do loop; a execução de ordens abaixo continua serializada, par a par
+            scan_results = {}
+            if getattr(config, 'scan_mode', 'sequential') == 'concurrent' and hasattr(strategy, 'analyze_market'):
+                scanner = MarketScanner(
+                    strategy,
+                    max_workers=config.scan_max_workers,
+                    requests_per_second=config.scan_requests_per_second
+                )
+                scan_results = scanner.scan(pairs[:], notifier=notifier)
+            
             # Analisa cada par em sequência
             pair_count = 0
             for pair in pairs[:]:  # Cria uma cópia para poder modificar a lista durante o loop
@@ -798,14 +850,24 @@ def main():
                         logger.error(f"Estratégia não tem método 'analyze_market'. Tipo: {type(strategy)}")
                         continue
                     
-                    # Registra início da análise deste par específico
-                    pair_analysis_start = datetime.now()
-                    
-                    # Analisa mercado e executa ordens conforme a estratégia
-                    should_trade, action, price = strategy.analyze_market(pair, notifier=notifier)
-                    
-                    # Registra resultado da análise
-                    pair_analysis_duration = (datetime.now() - pair_analysis_start).total_seconds()
+                    if pair in scan_results:
+                        # Usa o resultado da varredura concorrente (erros são relançados aqui
+                        # para receberem o mesmo tratamento do modo sequencial)
+                        scan_result = scan_results[pair]
+                        if scan_result.error is not None:
+                            raise scan_result.error
+                        # Limites de risco e preço revalidados após as ordens já executadas no ciclo
+                        should_trade, action, price = scanner.confirm_signal(scan_result)
+                        pair_analysis_duration = scan_result.latency
+                    else:
+                        # Registra início da análise deste par específico
+                        pair_analysis_start = datetime.now()
+                        
+                        # Analisa mercado e executa ordens conforme a estratégia
+                        should_trade, action, price = strategy.analyze_market(pair, notifier=notifier)
+                        
+                        # Registra resultado da análise
+                        pair_analysis_duration = (datetime.now() - pair_analysis_start).total_seconds()
                     logger.info(f"Análise de {pair} concluída em {pair_analysis_duration:.2f}s - Resultado: {action if should_trade else 'sem ação'}")
                     
                     if should_trade:
@@ -838,6 +900,7 @@ def main():
                                 current_balance = config.get_balance(binance.get_account_info())
                                 stats['current_capital'] = current_balance
                                 stats['profit_history'].append(profit_percent)
+                                risk_engine.update(current_balance)
                                 
                                 # Registra transação no PostgreSQL se disponível
                                 if pg_db:
@@ -922,7 +985,9 @@ def main():
                     continue  # Pula para o próximo par
                 
                 # Pequena pausa entre análises para não sobrecarregar a API
-                time.sleep(0.5)
+                # (no modo concorrente o ritmo já é controlado pelo MarketScanner)
+                if not scan_results:
+                    time.sleep(0.5)
             
             # Registra o fim da análise
             analysis_end_time = datetime.now()
@@ -936,7 +1001,16 @@ def main():
             if len(pairs) > 0:
                 avg_time_per_pair = analysis_duration / len(pairs)
                 logger.info(f"Tempo médio por par analisado: {avg_time_per_pair:.2f} segundos")
-            
+
+            # Eficiência do cache local de velas
+            if hasattr(binance, 'get_kline_cache_stats'):
+                cache_stats = binance.get_kline_cache_stats()
+                if cache_stats:
+                    logger.info(
+                        f"Cache de velas: {cache_stats['candle_hit_rate']:.1%} das velas servidas localmente, "
+                        f"{cache_stats['bytes_saved'] / 1024:.1f} KB economizados"
+                    )
+
             # Calcula próximo ciclo de análise previsto
             next_analysis_time = datetime.now() + timedelta(seconds=config.check_interval)
             logger.info(f"Próximo ciclo de análise previsto para: {next_analysis_time.strftime('%H:%M:%S')} (em {config.check_interval} segundos)")
@@ -1038,11 +1112,17 @@ def main():
                     logger.info(f"Próxima análise prevista para: {(datetime.now() + timedelta(seconds=config.check_interval)).strftime('%H:%M:%S')}")
                     
                     # Em vez de um único sleep longo, usamos vários curtos para verificar SHOULD_EXIT
+                    # (com o feed WebSocket, o fechamento de uma vela antecipa o próximo ciclo)
                     for _ in range(config.check_interval):
                         if SHOULD_EXIT:
                             logger.info("Sinal de encerramento detectado durante espera. Interrompendo ciclo...")
                             break
-                        time.sleep(1)
+                        if market_stream is not None:
+                            if market_stream.wait_for_candle_close(1):
+                                logger.info("Nova vela fechada no feed WebSocket. Antecipando próxima análise...")
+                                break
+                        else:
+                            time.sleep(1)
                 
                 except requests.exceptions.RequestException as e:
                     consecutive_errors += 1
@@ -1139,6 +1219,10 @@ def main():
     finally:
         logger.info("Finalizando Robot-Crypt Bot")
         
+        if market_stream is not None:
+            binance.attach_market_stream(None)
+            market_stream.stop()
+        
         # Salva estado atual antes de finalizar (para possível recuperação)
         try:
             # Prepara o estado para ser salvo
@@ -1182,6 +1266,9 @@ def main():
         except Exception as save_error:
             logger.error(f"Erro ao salvar estado: {str(save_error)}")
         
+        # Grava registros pendentes da fila write-behind (sinais, logs, análises)
+        run_shutdown_callbacks()
+        
         # Notifica finalização via Telegram
         if notifier:
             notifier.notify_status("Robot-Crypt finalizado!")
@@ -0,0 +1,172 @@
+"""Test suite for AI LLM response cache module."""
+
+import asyncio
+
+import pytest
+
+from src.ai.llm_cache import LLMResponseCache, env_number, make_cache_key
+
+
+class FakeProvider:
+    """Local stand-in for an LLM provider that counts calls."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def complete(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"content": f"answer {self.calls}", "tokens_used": 150, "cost_estimate": 0.0045}
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are an analyst"},
+    {"role": "user", "content": "Analyze BTC"}
+]
+
+
+class TestMakeCacheKey:
+    """Test cases for make_cache_key."""
+
+    def test_whitespace_does_not_change_key(self):
+        """Test that indentation and line breaks in prompts are ignored."""
+        indented = [
+            {"role": "system", "content": "  You are\n        an analyst "},
+            {"role": "user", "content": "Analyze   BTC"}
+        ]
+        assert make_cache_key("openai", "gpt-4", 0.1, MESSAGES) == make_cache_key("openai", "gpt-4", 0.1, indented)
+
+    def test_request_parameters_are_part_of_key(self):
+        """Test that provider, model, temperature and max_tokens separate entries."""
+        base = make_cache_key("openai", "gpt-4", 0.1, MESSAGES)
+        assert base != make_cache_key("gemini", "gpt-4", 0.1, MESSAGES)
+        assert base != make_cache_key("openai", "gpt-4-turbo", 0.1, MESSAGES)
+        assert base != make_cache_key("openai", "gpt-4", 0.7, MESSAGES)
+        assert base != make_cache_key("openai", "gpt-4", 0.1, MESSAGES, max_tokens=200)
+
+
+class TestLLMResponseCache:
+    """Test cases for LLMResponseCache against a fake provider."""
+
+    def test_memory_hit_within_ttl_and_cost_saved(self):
+        """Test that a fresh answer is reused and its cost counted as saved."""
+        cache = LLMResponseCache(max_entries=8)
+        provider = FakeProvider()
+
+        async def run():
+            first = await cache.get_or_create("k", 60, provider.complete)
+            second = await cache.get_or_create("k", 60, provider.complete)
+            return first, second
+
+        (payload1, source1), (payload2, source2) = asyncio.run(run())
+
+        assert (source1, source2) == ("miss", "memory")
+        assert payload1 == payload2
+        assert provider.calls == 1
+        stats = cache.get_stats()
+        assert stats["tokens_saved"] == 150
+        assert stats["cost_saved"] == pytest.approx(0.0045)
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl_is_per_caller(self):
+        """Test that a caller with a shorter TTL does not accept an older answer."""
+        cache = LLMResponseCache(max_entries=8)
+        provider = FakeProvider()
+
+        async def run():
+            await cache.get_or_create("k", 600, provider.complete)
+            await asyncio.sleep(0.05)
+            strict = await cache.get_or_create("k", 0.01, provider.complete)
+            no_cache = await cache.get_or_create("k", 0, provider.complete)
+            return strict, no_cache
+
+        strict, no_cache = asyncio.run(run())
+
+        assert strict[1] == "miss"
+        assert no_cache[1] == "miss"
+        assert provider.calls == 3
+
+    def test_inflight_requests_are_coalesced(self):
+        """Test that identical concurrent prompts share one provider call."""
+        cache = LLMResponseCache(max_entries=0)
+        provider = FakeProvider(delay=0.05)
+
+        async def run():
+            return await asyncio.gather(*[cache.get_or_create("k", 0, provider.complete) for _ in range(5)])
+
+        results = asyncio.run(run())
+
+        assert provider.calls == 1
+        assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["miss"]
+        assert cache.get_stats()["inflight"] == 0
+
+    def test_errors_propagate_to_waiters_and_are_not_cached(self):
+        """Test that a failed call fails every waiter and the next call retries."""
+        cache = LLMResponseCache(max_entries=8)
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            raise RuntimeError("provider down")
+
+        async def run():
+            return await asyncio.gather(
+                cache.get_or_create("k", 60, failing),
+                cache.get_or_create("k", 60, failing),
+                return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(calls) == 1
+        payload, source = asyncio.run(cache.get_or_create("k", 60, FakeProvider().complete))
+        assert source == "miss"
+
+    def test_lru_eviction(self):
+        """Test that the memory layer keeps only the most recent entries."""
+        cache = LLMResponseCache(max_entries=2)
+        provider = FakeProvider()
+
+        async def run():
+            for key in ("a", "b", "c"):
+                await cache.get_or_create(key, 60, provider.complete)
+            return await cache.get_or_create("a", 60, provider.complete)
+
+        _, source = asyncio.run(run())
+
+        assert source == "miss"
+        assert cache.get_stats()["memory_entries"] == 2
+
+    def test_disk_store_survives_restart(self, tmp_path):
+        """Test that a new cache instance reads answers persisted by an earlier one."""
+        first = LLMResponseCache(max_entries=8, cache_dir=str(tmp_path))
+        asyncio.run(first.get_or_create("k", 60, FakeProvider().complete))
+        first.close()
+
+        second = LLMResponseCache(max_entries=8, cache_dir=str(tmp_path))
+        provider = FakeProvider()
+        payload, source = asyncio.run(second.get_or_create("k", 60, provider.complete))
+
+        assert source == "disk"
+        assert payload["content"] == "answer 1"
+        assert provider.calls == 0
+
+        second.invalidate("k")
+        second._memory.clear()
+        assert asyncio.run(second.get_or_create("k", 60, provider.complete))[1] == "miss"
+        second.close()
+
+    def test_from_env_ignores_invalid_numbers(self, monkeypatch):
+        """Test that malformed LLM_CACHE_* values fall back to the defaults."""
+        monkeypatch.setenv("LLM_CACHE_SIZE", "lots")
+        monkeypatch.setenv("LLM_CACHE_MAX_AGE", "forever")
+        monkeypatch.setenv("LLM_CACHE_DIR", "")
+
+        cache = LLMResponseCache.from_env()
+
+        assert cache.max_entries == 512
+        assert cache.max_age == 86400.0
+        assert env_number("LLM_CACHE_MAX_AGE", 60.0) == 60.0
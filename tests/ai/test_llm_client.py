@@ -12,6 +12,7 @@ from src.ai.llm_client import (
     LLMResponse,
     get_llm_client
 )
+from src.ai.llm_cache import LLMResponseCache
 
 
 class TestLLMResponse:
@@ -457,6 +458,68 @@ class TestLLMClient:
         with pytest.raises(Exception, match="API Error"):
             await client.chat("Test message")
     
+    def _fake_openai(self, content='{"status": "ok"}', delay=0.0):
+        """Local fake OpenAI client that counts completions."""
+        async def create(**kwargs):
+            await asyncio.sleep(delay)
+            message = Mock(content=content)
+            return Mock(
+                choices=[Mock(message=message, finish_reason="stop")],
+                usage=Mock(prompt_tokens=100, completion_tokens=50, total_tokens=150)
+            )
+        
+        fake = Mock()
+        fake.chat.completions.create = AsyncMock(side_effect=create)
+        return fake
+    
+    @pytest.mark.asyncio
+    async def test_chat_cache_ttl_reuses_response(self):
+        """Test that a repeated prompt within cache_ttl is served from the cache."""
+        client = LLMClient(provider="openai", response_cache=LLMResponseCache(max_entries=8))
+        client.openai_client = self._fake_openai()
+        client.model = "gpt-4"
+        
+        first = await client.chat("Analyze BTC", system_prompt="You are an analyst", cache_ttl=60)
+        second = await client.chat("Analyze   BTC", system_prompt="You are an analyst", cache_ttl=60)
+        uncached = await client.chat("Analyze BTC", system_prompt="You are an analyst")
+        
+        assert client.openai_client.chat.completions.create.call_count == 2
+        assert first.metadata["cache"] == "miss"
+        assert second.metadata["cache"] == "memory"
+        assert uncached.metadata["cache"] == "miss"
+        assert second.content == first.content
+        assert second.tokens_used == 150
+        
+        stats = client.get_cache_stats()
+        assert stats["memory_hits"] == 1
+        assert stats["cost_saved"] == pytest.approx(client._calculate_cost("openai", 100, 50))
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_prompts_are_coalesced(self):
+        """Test that identical in-flight prompts make a single provider call."""
+        client = LLMClient(provider="openai", response_cache=LLMResponseCache(max_entries=8))
+        client.openai_client = self._fake_openai(delay=0.05)
+        client.model = "gpt-4"
+        
+        results = await asyncio.gather(*[client.analyze_json("Test prompt") for _ in range(3)])
+        
+        assert results == [{"status": "ok"}] * 3
+        assert client.openai_client.chat.completions.create.call_count == 1
+        assert client.get_cache_stats()["coalesced"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_unparseable_json_is_not_cached(self):
+        """Test that an invalid JSON answer is dropped from the cache."""
+        client = LLMClient(provider="openai", response_cache=LLMResponseCache(max_entries=8))
+        client.openai_client = self._fake_openai(content="not json")
+        client.model = "gpt-4"
+        
+        for _ in range(2):
+            with pytest.raises(json.JSONDecodeError):
+                await client.analyze_json("Test prompt", cache_ttl=60)
+        
+        assert client.openai_client.chat.completions.create.call_count == 2
+    
     def test_invalid_provider(self):
         """Test initialization with invalid provider."""
         with pytest.raises(ValueError, match="Provider invalid_provider not available"):
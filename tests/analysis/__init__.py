@@ -0,0 +1 @@
+# Analysis module tests
@@ -0,0 +1,105 @@
+"""Test suite for analysis incremental_indicators module."""
+
+import math
+
+import pytest
+
+from src.analysis.technical_indicators import TechnicalIndicators
+from src.analysis.incremental_indicators import (
+    IncrementalIndicatorEngine,
+    IncrementalIndicatorRegistry
+)
+from tests.analysis.test_technical_indicators import make_klines
+
+
+def assert_latest_data_close(expected, actual, path=""):
+    """Recursively compare two latest_data dicts within float tolerance."""
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual), path
+        for key in expected:
+            if key != 'calculated_at':
+                assert_latest_data_close(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), path
+        for a, b in zip(expected, actual):
+            assert_latest_data_close(a, b, path)
+    elif isinstance(expected, float):
+        if math.isnan(expected):
+            assert math.isnan(actual), path
+        else:
+            assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9), path
+    else:
+        assert expected == actual, path
+
+
+class TestIncrementalIndicatorEngine:
+    """Test cases for IncrementalIndicatorEngine."""
+
+    def test_matches_batch_after_warmup(self):
+        """Test streaming values match the batch calculation on every new candle."""
+        klines = make_klines(420)
+        engine = IncrementalIndicatorEngine.from_klines(klines[:300], "BTCUSDT", "1m")
+
+        assert_latest_data_close(TechnicalIndicators.calculate_all_indicators(klines[:300]), engine.latest_data())
+        for i in range(300, 420):
+            engine.update(klines[i])
+            assert_latest_data_close(TechnicalIndicators.calculate_all_indicators(klines[:i + 1]), engine.latest_data())
+
+    def test_updated_open_candle_replaces_last_value(self):
+        """Test that an update with the same open_time replaces the open candle."""
+        klines = make_klines(260)
+        engine = IncrementalIndicatorEngine.from_klines(klines)
+
+        updated = list(klines[-1])
+        updated[4] = f"{float(updated[4]) + 2.5:.8f}"
+        updated[2] = f"{float(updated[4]) + 0.5:.8f}"
+        engine.update(updated)
+
+        assert engine.candle_count == 260
+        assert_latest_data_close(
+            TechnicalIndicators.calculate_all_indicators(klines[:-1] + [updated]),
+            engine.latest_data()
+        )
+
+    def test_older_candle_is_ignored(self):
+        """Test that out-of-order candles do not change the state."""
+        klines = make_klines(30)
+        engine = IncrementalIndicatorEngine.from_klines(klines)
+        assert engine.update(klines[5]) is False
+        assert engine.candle_count == 30
+
+    def test_requires_two_candles(self):
+        """Test latest_data is empty until there is a previous candle."""
+        engine = IncrementalIndicatorEngine()
+        assert engine.latest_data() == {}
+        engine.update(make_klines(1)[0])
+        assert engine.latest_data() == {}
+
+    def test_short_history_matches_batch_nans(self):
+        """Test indicators still warming up are NaN like the batch version."""
+        klines = make_klines(60)
+        engine = IncrementalIndicatorEngine.from_klines(klines)
+        assert_latest_data_close(TechnicalIndicators.calculate_all_indicators(klines), engine.latest_data())
+        assert math.isnan(engine.latest_data()['indicators']['moving_averages']['sma_200'])
+
+
+class TestIncrementalIndicatorRegistry:
+    """Test cases for IncrementalIndicatorRegistry."""
+
+    def test_engines_are_keyed_by_symbol_and_interval(self):
+        """Test one engine per (symbol, interval)."""
+        registry = IncrementalIndicatorRegistry()
+        assert registry.get("BTCUSDT", "1m") is registry.get("BTCUSDT", "1m")
+        assert registry.get("BTCUSDT", "1m") is not registry.get("BTCUSDT", "5m")
+
+        klines = make_klines(3)
+        for kline in klines:
+            latest = registry.update("ETHUSDT", "1m", kline)
+        assert latest['price']['close'] == float(klines[-1][4])
+
+        registry.update_many("SOLUSDT", "1m", klines)
+        assert registry.latest_data("SOLUSDT", "1m")['price'] == latest['price']
+        assert registry.latest_data("ADAUSDT", "1m") == {}
+
+        registry.reset("ETHUSDT", "1m")
+        assert registry.get("ETHUSDT", "1m").candle_count == 0
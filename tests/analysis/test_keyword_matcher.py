@@ -0,0 +1,115 @@
+"""Test suite for analysis keyword_matcher module."""
+
+from unittest.mock import MagicMock
+
+from src.analysis.external_data_analyzer import ExternalDataAnalyzer
+from src.analysis.keyword_matcher import KeywordMatcher, inflections, symbol_table, tokenize
+
+
+class TestKeywordMatcher:
+    """Test cases for KeywordMatcher."""
+
+    def setup_method(self):
+        """Build a matcher over category, sentiment and ticker tables."""
+        self.matcher = KeywordMatcher(
+            {
+                'category': {
+                    'regulation': ['sec', 'regulation', 'crypto law'],
+                    'technology': ['layer 2', 'hash rate', 'fork']
+                },
+                'sentiment': {
+                    'positive': ['up', 'rally', 'surge'],
+                    'negative': ['down', 'sell-off']
+                },
+                'ticker': {'ETH': ['ETH'], 'LINK': ['LINK']}
+            },
+            case_sensitive=('ticker',)
+        )
+
+    def test_tokenize_splits_on_punctuation(self):
+        """Test that hyphens, '$' and punctuation separate words."""
+        assert tokenize("$BTC sell-off, layer-2!") == ['BTC', 'sell', 'off', 'layer', '2']
+        assert tokenize("") == []
+
+    def test_matches_whole_words_only(self):
+        """Test that keywords do not match inside other words."""
+        matches = self.matcher.match("Support for Ethics update; SECurity news")
+
+        assert matches.count('sentiment', 'positive') == 0
+        assert matches.labels('ticker') == []
+        assert matches.labels('category') == []
+
+    def test_single_pass_over_all_tables(self):
+        """Test category hits, polarity counts and tickers from one match call."""
+        matches = self.matcher.match(
+            "SEC regulation sparks sell-off, then ETH rally on Layer 2 news; rally continues up"
+        )
+
+        assert matches.labels('category') == ['regulation', 'technology']
+        assert matches.count('category', 'regulation', distinct=True) == 2
+        assert matches.count('sentiment', 'positive') == 3
+        assert matches.count('sentiment', 'positive', distinct=True) == 2
+        assert matches.count('sentiment', 'negative') == 1
+        assert matches.labels('ticker') == ['ETH']
+        assert matches.token_count == 15
+
+    def test_case_sensitive_tables(self):
+        """Test that case-sensitive tables only match the exact spelling."""
+        assert self.matcher.match("click the link").labels('ticker') == []
+        assert self.matcher.match("LINK and eth").labels('ticker') == ['LINK']
+
+    def test_phrase_needs_all_tokens(self):
+        """Test that multi-word keywords require the full sequence."""
+        matches = self.matcher.match("new crypto rules and a hash of the rate")
+
+        assert matches.labels('category') == []
+
+    def test_symbol_table_uses_base_asset_and_names(self):
+        """Test that trading pairs map to their base asset and known coin names."""
+        table = symbol_table(['BTCUSDT', 'eth/usdt', 'XYZ'])
+
+        assert table == {'BTC': ['BTC', 'bitcoin'], 'ETH': ['ETH', 'ethereum'], 'XYZ': ['XYZ']}
+        matcher = KeywordMatcher({'symbol': table})
+        assert matcher.match("Bitcoin and xyz climb").labels('symbol') == ['BTC', 'XYZ']
+
+    def test_inflected_tables_match_word_forms(self):
+        """Test that inflected tables catch plurals, tenses and gerunds but not other words."""
+        matcher = KeywordMatcher(
+            {
+                'sentiment': {'negative': ['crash', 'fall', 'loss', 'drop'], 'positive': ['up', 'rally']},
+                'event': {'economic': ['interest rate']}
+            },
+            inflected=('sentiment', 'event')
+        )
+
+        matches = matcher.match("Ether crashes, prices falling and losses mount as interest rates rise")
+        assert matches.count('sentiment', 'negative') == 3
+        assert matches.count('sentiment', 'negative', distinct=True) == 3
+        assert matches.labels('event') == ['economic']
+
+        matches = matcher.match("Support update: prices fell, then dropped; ETH rallies")
+        assert matches.count('sentiment', 'negative') == 2
+        assert matches.count('sentiment', 'positive') == 1
+
+    def test_tables_without_inflection_stay_exact(self):
+        """Test that inflection is opt-in per table."""
+        assert self.matcher.match("prices surged").count('sentiment', 'positive') == 0
+
+    def test_inflections(self):
+        """Test regular, doubled-consonant and irregular English word forms."""
+        assert {'crashes', 'crashed', 'crashing'} <= inflections('crash')
+        assert {'dropped', 'dropping', 'drops'} <= inflections('drop')
+        assert {'rallies', 'rallied'} <= inflections('rally')
+        assert {'fell', 'falling'} <= inflections('fall')
+        assert inflections('2') == set()
+
+
+class TestExternalDataAnalyzerSentiment:
+    """Regression tests for the news sentiment of ExternalDataAnalyzer."""
+
+    def test_inflected_headline_keeps_polarity(self):
+        """Test that inflected words still count, as with the old substring matching."""
+        analyzer = ExternalDataAnalyzer(config=MagicMock())
+
+        assert analyzer._analyze_sentiment("Ether crashes, prices falling and losses mount") == -1.0
+        assert analyzer._analyze_sentiment("Bitcoin rallies as adoption grows") == 1.0
@@ -0,0 +1,201 @@
+"""Test suite for contextual_analysis sentiment_service module."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.contextual_analysis.sentiment_service import (
+    VADER_AVAILABLE,
+    SentimentService,
+    dedupe_articles,
+    get_sentiment_service,
+    normalize_text,
+    normalize_url,
+    text_hash
+)
+import src.contextual_analysis.sentiment_service as sentiment_module
+
+
+class FakeStore:
+    """In-memory stand-in for the PostgresManager sentiment_cache methods."""
+
+    def __init__(self):
+        self.rows = {}
+        self.reads = 0
+
+    def get_sentiment_scores(self, text_hashes):
+        self.reads += 1
+        return {key: self.rows[key] for key in text_hashes if key in self.rows}
+
+    def save_sentiment_scores(self, scores, engine='vader'):
+        self.rows.update(scores)
+        return len(scores)
+
+
+class TestSentimentService:
+    """Test cases for SentimentService with the keyword engine."""
+
+    def setup_method(self):
+        """Service scoring inline with the keyword fallback."""
+        self.service = SentimentService(cache_size=2, use_vader=False, max_workers=0)
+
+    def test_normalization_makes_hash_content_addressed(self):
+        """Test that case and whitespace do not change the cache key."""
+        assert normalize_text("  Bitcoin\n RALLY\tcontinues ") == "bitcoin rally continues"
+        assert text_hash(normalize_text("Bitcoin  Rally"), 'vader') == text_hash("bitcoin rally", 'vader')
+        assert text_hash("bitcoin rally", 'vader') != text_hash("bitcoin rally", 'fallback')
+
+    def test_batch_scores_each_distinct_text_once(self):
+        """Test duplicates in a batch and repeated calls reuse the same score."""
+        results = self.service.score_batch([
+            "Bitcoin rally continues", "bitcoin  RALLY continues", "Market crash and panic", ""
+        ])
+
+        assert [r['sentiment'] for r in results] == ['positive', 'positive', 'negative', 'neutral']
+        assert self.service.score("BITCOIN rally continues")['compound'] == results[0]['compound']
+
+        stats = self.service.get_stats()
+        assert stats['scored'] == 2
+        assert stats['duplicates'] == 1
+        assert stats['cache_hits'] == 1
+
+    def test_results_are_copies(self):
+        """Test that callers cannot mutate cached scores."""
+        self.service.score("strong rally")['sentiment'] = 'changed'
+        assert self.service.score("strong rally")['sentiment'] == 'positive'
+
+    def test_lru_eviction(self):
+        """Test that the cache keeps only the most recently used entries."""
+        self.service.score_batch(["gain", "loss", "rally"])
+        assert self.service.get_stats()['cache_entries'] == 2
+
+    def test_persistent_store_is_read_before_scoring(self):
+        """Test that scores written by one service are reused by another."""
+        store = FakeStore()
+        first = SentimentService(store=store, use_vader=False, max_workers=0)
+        first.score_batch(["ETF approval boosts growth", "exchange hack causes fear"])
+        assert len(store.rows) == 2
+
+        second = SentimentService(store=store, use_vader=False, max_workers=0)
+        results = second.score_batch(["etf approval boosts growth", "New fork proposal"])
+
+        stats = second.get_stats()
+        assert stats['store_hits'] == 1
+        assert stats['scored'] == 1
+        assert results[0]['sentiment'] == 'positive'
+        assert len(store.rows) == 3
+
+
+    def test_fallback_counts_inflected_words(self):
+        """Test that the keyword engine scores inflected headlines."""
+        result = self.service.score("Ether crashes, prices falling and losses mount")
+
+        assert result['sentiment'] == 'negative'
+        assert result['negative'] == 1.0
+
+    @pytest.mark.skipif(not VADER_AVAILABLE, reason="vaderSentiment not installed")
+    def test_vader_scores_original_case(self):
+        """Test that VADER keeps ALL-CAPS emphasis and case variants get their own entry."""
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+        service = SentimentService(use_vader=True, max_workers=0)
+        expected = SentimentIntensityAnalyzer().polarity_scores("Bitcoin is GREAT!!!")['compound']
+
+        assert service.score("Bitcoin  is GREAT!!!")['compound'] == expected
+        assert service.score("bitcoin is great!!!")['compound'] < expected
+
+
+    @pytest.mark.skipif(not VADER_AVAILABLE, reason="vaderSentiment not installed")
+    def test_process_pool_uses_spawn(self, monkeypatch):
+        """Test that large batches are scored in spawned (not forked) workers."""
+        monkeypatch.delenv('SENTIMENT_START_METHOD', raising=False)
+        service = SentimentService(use_vader=True, max_workers=1, parallel_threshold=2)
+        try:
+            results = service.score_batch(["Bitcoin is great", "Exchange hack is terrible"])
+            assert service.get_stats()['scored_in_pool'] == 2
+            assert service._executor._mp_context.get_start_method() == 'spawn'
+            assert results[0]['compound'] > 0 > results[1]['compound']
+        finally:
+            service.shutdown()
+
+
+class TestSharedSentimentService:
+    """Test cases for the app-wide service."""
+
+    def setup_method(self):
+        sentiment_module.shutdown_sentiment_service()
+
+    def teardown_method(self):
+        sentiment_module.shutdown_sentiment_service()
+
+    def test_store_is_opt_in(self, monkeypatch):
+        """Test that the shared service has no store unless SENTIMENT_STORE_ENABLED is set."""
+        monkeypatch.delenv('SENTIMENT_STORE_ENABLED', raising=False)
+        assert get_sentiment_service().store is None
+
+    def test_store_enabled_uses_pooled_postgres_manager(self, monkeypatch):
+        """Test that SENTIMENT_STORE_ENABLED wires a pooled PostgresManager as the store."""
+        created = []
+
+        class FakeManager(FakeStore):
+            def __init__(self, use_pool=None):
+                super().__init__()
+                self.use_pool = use_pool
+                self.disconnected = False
+                created.append(self)
+
+            def disconnect(self):
+                self.disconnected = True
+
+        monkeypatch.setenv('SENTIMENT_STORE_ENABLED', 'true')
+        monkeypatch.setattr('src.database.postgres_manager.PostgresManager', FakeManager)
+
+        service = get_sentiment_service()
+        assert service.store is created[0] and created[0].use_pool is True
+
+        sentiment_module.shutdown_sentiment_service()
+        assert created[0].disconnected
+
+
+class TestDedupeArticles:
+    """Test cases for cross-source article deduplication."""
+
+    def test_normalize_url(self):
+        """Test that tracking parameters, scheme and 'www.' are ignored."""
+        assert normalize_url("https://www.CoinDesk.com/markets/btc/?utm_source=x#top") == \
+            normalize_url("http://coindesk.com/markets/btc")
+        assert normalize_url(None) == ""
+
+    def test_normalize_url_keeps_identifying_query(self):
+        """Test that article ids in the query string are not collapsed."""
+        assert normalize_url("https://site.com/news.php?id=1") != normalize_url("https://site.com/news.php?id=2")
+        assert normalize_url("https://site.com/news.php?id=1&utm_medium=rss&fbclid=abc") == \
+            normalize_url("http://www.site.com/news.php?id=1")
+        articles = [{'title': 'First story', 'url': 'https://site.com/news.php?id=1'},
+                    {'title': 'Another unrelated item', 'url': 'https://site.com/news.php?id=2'}]
+        assert dedupe_articles(articles) == articles
+
+    def test_same_url_or_near_duplicate_title(self):
+        """Test that the first occurrence of a story is kept across sources."""
+        articles = [
+            {'title': 'Bitcoin hits new all-time high above $100k', 'url': 'https://a.com/btc-ath'},
+            {'title': 'Different headline', 'url': 'https://www.a.com/btc-ath?ref=feed'},
+            {'title': 'Bitcoin Hits New All-Time High Above $100K - CoinDesk', 'url': 'https://b.com/x'},
+            {'title': 'Ethereum upgrade goes live', 'url': None},
+            {'title': 'Bitcoin hits new low', 'url': None}
+        ]
+
+        kept = dedupe_articles(articles)
+
+        assert [a['title'] for a in kept] == [
+            'Bitcoin hits new all-time high above $100k',
+            'Ethereum upgrade goes live',
+            'Bitcoin hits new low'
+        ]
+
+    def test_works_with_objects(self):
+        """Test that dataclass-like articles are supported."""
+        articles = [SimpleNamespace(title='Same News Title', url=None),
+                    SimpleNamespace(title='Same News Title', url=None)]
+
+        assert len(dedupe_articles(articles)) == 1
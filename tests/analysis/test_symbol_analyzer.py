@@ -0,0 +1,109 @@
+"""Test suite for SymbolAnalyzer batch analysis."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.analysis.symbol_analyzer import SymbolAnalyzer
+
+
+def make_market_data(n=100, seed=0):
+    """Build price history rows as returned by PostgresManager.get_price_history."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    start = datetime(2024, 1, 1)
+    return [{
+        'open_time': start + timedelta(hours=i),
+        'open': float(c - 0.3), 'high': float(c + 1.0), 'low': float(c - 1.0),
+        'close': float(c), 'volume': float(1000 + i)
+    } for i, c in enumerate(close)]
+
+
+@pytest.fixture
+def analyzer():
+    """SymbolAnalyzer with mocked database and exchange clients."""
+    history = {"BTCUSDT": make_market_data(seed=1), "ETHUSDT": make_market_data(seed=2)}
+    db = MagicMock()
+    db.get_price_history.side_effect = lambda symbol, timeframe, limit: history.get(symbol, [])
+    db.save_batch.side_effect = lambda record_type, records: len(records)
+    db.save_analysis.return_value = 1
+    db.save_trading_signal.return_value = 1
+
+    binance = MagicMock()
+    binance.get_klines.side_effect = lambda symbol, timeframe, limit: (
+        make_market_data(seed=3) if symbol == "SOLUSDT" else []
+    )
+    return SymbolAnalyzer(postgres_manager=db, binance_client=binance)
+
+
+class TestAnalyzeSymbols:
+    """Test cases for SymbolAnalyzer.analyze_symbols."""
+
+    def test_same_shape_as_analyze_symbol(self, analyzer):
+        """Test per-symbol results keep the analyze_symbol dict shape."""
+        results = analyzer.analyze_symbols(["BTCUSDT", "ETHUSDT"])
+        single = analyzer.analyze_symbol("BTCUSDT")
+
+        assert set(results) == {"BTCUSDT", "ETHUSDT"}
+        assert set(results["BTCUSDT"]) == set(single)
+        assert results["BTCUSDT"]['market_data']['technical_indicators']['indicators']['rsi'] == \
+            single['market_data']['technical_indicators']['indicators']['rsi']
+        assert [s.signal_type for s in results["BTCUSDT"]['signals']] == \
+            [s.signal_type for s in single['signals']]
+
+    def test_writes_one_batch_per_table(self, analyzer):
+        """Test analyses and signals are written with a single save_batch each."""
+        analyzer.db.save_analysis.reset_mock()
+        results = analyzer.analyze_symbols(["BTCUSDT", "ETHUSDT"])
+
+        calls = {call.args[0]: call.args[1] for call in analyzer.db.save_batch.call_args_list}
+        assert len(analyzer.db.save_batch.call_args_list) <= 2
+        assert [record['symbol'] for record in calls['analysis']] == ["BTCUSDT", "ETHUSDT"]
+        signal_count = sum(len(results[s]['signals']) for s in results)
+        assert len(calls.get('trading_signal', [])) == signal_count
+        analyzer.db.save_analysis.assert_not_called()
+        analyzer.db.save_trading_signal.assert_not_called()
+
+    def test_missing_symbols_fetched_from_api(self, analyzer):
+        """Test symbols absent from the database are fetched from the API and cached."""
+        results = analyzer.analyze_symbols(["BTCUSDT", "SOLUSDT", "UNKNOWN"])
+
+        assert results["SOLUSDT"]['symbol'] == "SOLUSDT"
+        assert results["UNKNOWN"] == {}
+        fetched = sorted(call.args[0] for call in analyzer.binance.get_klines.call_args_list)
+        assert fetched == ["SOLUSDT", "UNKNOWN"]
+        analyzer.db.save_price_history_batch.assert_called_once()
+
+    def test_mixed_database_and_raw_api_batch(self, analyzer):
+        """Test raw Binance klines from the API are normalized and one bad symbol is dropped alone."""
+        start = int(datetime(2024, 1, 1).timestamp() * 1000)
+        raw = [[start + i * 3_600_000, str(row['open']), str(row['high']), str(row['low']),
+                str(row['close']), str(row['volume']), start + (i + 1) * 3_600_000 - 1]
+               for i, row in enumerate(make_market_data(seed=4))]
+        api = {"NEWUSDT": raw, "BADUSDT": [["not", "a", "kline"]]}
+        analyzer.binance.get_klines.side_effect = lambda symbol, timeframe, limit: api.get(symbol, [])
+
+        results = analyzer.analyze_symbols(["BTCUSDT", "NEWUSDT", "BADUSDT"])
+
+        assert results["BTCUSDT"]['symbol'] == "BTCUSDT"
+        assert results["NEWUSDT"]['symbol'] == "NEWUSDT"
+        assert results["NEWUSDT"]['market_data']['raw_data'][0]['open_time'] == datetime(2024, 1, 1)
+        assert results["BADUSDT"] == {}
+
+    def test_streamed_indicators_skip_the_full_recompute(self, analyzer):
+        """Test indicators kept by the WebSocket feed are used and only the rest is recomputed."""
+        streamed = analyzer.technical.calculate_all_indicators(analyzer._to_klines(make_market_data(seed=9)))
+        analyzer.binance.get_indicators.side_effect = lambda symbol, timeframe: (
+            streamed if symbol == "BTCUSDT" else None
+        )
+        analyzer.technical = MagicMock(wraps=analyzer.technical)
+
+        results = analyzer.analyze_symbols(["BTCUSDT", "ETHUSDT"])
+        single = analyzer.analyze_symbol("BTCUSDT")
+
+        assert results["BTCUSDT"]['market_data']['technical_indicators'] is streamed
+        assert single['market_data']['technical_indicators'] is streamed
+        assert list(analyzer.technical.calculate_all_indicators_batch.call_args[0][0]) == ["ETHUSDT"]
+        analyzer.technical.calculate_all_indicators.assert_not_called()
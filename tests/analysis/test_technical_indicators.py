@@ -0,0 +1,126 @@
+"""Test suite for analysis technical_indicators module."""
+
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.technical_indicators import TechnicalIndicators
+
+
+def make_klines(n=300, start_ms=1_700_000_000_000, step_ms=60_000, seed=7):
+    """Build Binance style klines with a random walk close."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    klines = []
+    for i in range(n):
+        open_time = start_ms + i * step_ms
+        c = close[i]
+        klines.append([open_time, f"{c - 0.3:.8f}", f"{c + 1.0:.8f}", f"{c - 1.0:.8f}", f"{c:.8f}",
+                       f"{1000 + i:.8f}", open_time + step_ms - 1, "0", 1, "0", "0", "0"])
+    return klines
+
+
+def reference_prepare_data(klines):
+    """Row-by-row loader used before the columnar implementation."""
+    data = [{
+        'timestamp': datetime.fromtimestamp(int(k[0]) / 1000),
+        'open': float(k[1]), 'high': float(k[2]), 'low': float(k[3]),
+        'close': float(k[4]), 'volume': float(k[5])
+    } for k in klines]
+    return pd.DataFrame(data).set_index('timestamp')
+
+
+class TestPrepareData:
+    """Test cases for TechnicalIndicators.prepare_data."""
+
+    def test_matches_row_based_loader(self):
+        """Test columnar loader returns the same frame as the row based one."""
+        klines = make_klines()
+        pd.testing.assert_frame_equal(TechnicalIndicators.prepare_data(klines), reference_prepare_data(klines))
+
+    def test_accepts_numpy_array(self):
+        """Test numeric ndarray input."""
+        klines = make_klines(50)
+        array = np.array([[k[0], *map(float, k[1:6])] for k in klines])
+        pd.testing.assert_frame_equal(TechnicalIndicators.prepare_data(array), reference_prepare_data(klines))
+
+    def test_reuses_preallocated_buffer(self):
+        """Test that the returned frame is a view on the caller's buffer."""
+        buffer = TechnicalIndicators.allocate_buffer(500)
+        df = TechnicalIndicators.prepare_data(make_klines(300), out=buffer)
+        assert len(df) == 300
+        assert np.shares_memory(df.to_numpy(), buffer)
+        assert df['close'].dtype == np.float64
+
+    def test_empty_input(self):
+        """Test empty input returns an empty frame."""
+        assert TechnicalIndicators.prepare_data([]).empty
+
+    def test_window_across_dst_change(self, monkeypatch):
+        """Test local timestamps stay correct when the window crosses a DST switch."""
+        if not hasattr(time, "tzset"):
+            pytest.skip("tzset not available")
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            # 2023-03-12 06:00 UTC .. 08:00 UTC crosses the 07:00 UTC switch
+            klines = make_klines(12, start_ms=1_678_600_800_000, step_ms=600_000)
+            pd.testing.assert_frame_equal(TechnicalIndicators.prepare_data(klines), reference_prepare_data(klines))
+        finally:
+            monkeypatch.delenv("TZ")
+            time.tzset()
+
+    def test_window_across_two_dst_changes(self, monkeypatch):
+        """Test a window whose first and last candles share an offset but whose middle does not."""
+        if not hasattr(time, "tzset"):
+            pytest.skip("tzset not available")
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            # Daily candles over 2023: EST at both ends, EDT from March to November
+            klines = make_klines(365, start_ms=1_672_531_200_000, step_ms=86_400_000)
+            pd.testing.assert_frame_equal(TechnicalIndicators.prepare_data(klines), reference_prepare_data(klines))
+        finally:
+            monkeypatch.delenv("TZ")
+            time.tzset()
+
+    def test_calculate_all_indicators_uses_loader(self):
+        """Test full indicator pipeline still produces the latest data dict."""
+        result = TechnicalIndicators.calculate_all_indicators(make_klines(300))
+        assert set(result['indicators']) == {
+            'rsi', 'macd', 'bollinger_bands', 'stochastic', 'moving_averages', 'atr'
+        }
+        assert 'technical_signals' in result
+
+
+class TestCalculateAllIndicatorsBatch:
+    """Test cases for the symbol x time panel indicator pass."""
+
+    def test_matches_single_symbol_results(self):
+        """Test each symbol gets the same dict as calculate_all_indicators."""
+        klines_by_symbol = {
+            "BTCUSDT": make_klines(250, seed=1),
+            "ETHUSDT": make_klines(120, seed=2),
+            "XRPUSDT": make_klines(30, seed=3),
+        }
+        batch = TechnicalIndicators.calculate_all_indicators_batch(klines_by_symbol)
+
+        assert list(batch) == list(klines_by_symbol)
+        for symbol, klines in klines_by_symbol.items():
+            expected = TechnicalIndicators.calculate_all_indicators(klines)
+            expected.pop('calculated_at')
+            batch[symbol].pop('calculated_at')
+            # json.dumps compares NaN moving averages of short series as equal
+            assert json.dumps(batch[symbol], default=str) == json.dumps(expected, default=str)
+
+    def test_short_series_return_empty(self):
+        """Test symbols without enough candles get an empty dict."""
+        batch = TechnicalIndicators.calculate_all_indicators_batch({
+            "BTCUSDT": make_klines(50), "NEWUSDT": make_klines(1), "EMPTY": []
+        })
+        assert batch["BTCUSDT"]
+        assert batch["NEWUSDT"] == {} and batch["EMPTY"] == {}
@@ -0,0 +1,157 @@
+"""Test suite for the analytics compute job manager."""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.compute_jobs import (
+    ComputeJobManager,
+    config_hash,
+    report_progress,
+    run_sweep_job
+)
+
+
+def _square(x):
+    return x * x
+
+
+def _sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+def _steps_with_progress(steps, delay):
+    for step in range(steps):
+        report_progress(step / steps, 'steps')
+        time.sleep(delay)
+    return steps
+
+
+@pytest.fixture
+def manager():
+    """Manager with a single worker process."""
+    manager = ComputeJobManager(max_workers=1, cache_size=8, cache_ttl=60)
+    yield manager
+    manager.shutdown()
+
+
+def _wait(manager, job_id, timeout=30):
+    return asyncio.run(manager.wait(job_id, timeout=timeout))
+
+
+class TestComputeJobManager:
+    """Test cases for ComputeJobManager."""
+
+    def test_config_hash_ignores_key_order(self):
+        """Test that the cache key does not depend on dict ordering."""
+        assert config_hash('backtest', {'a': 1, 'b': [1, 2]}) == config_hash('backtest', {'b': [1, 2], 'a': 1})
+        assert config_hash('backtest', {'a': 1}) != config_hash('monte_carlo', {'a': 1})
+
+    def test_identical_request_is_served_from_cache(self, manager):
+        """Test that a finished job's result answers the same config instantly."""
+        job = manager.submit('square', {'x': 7}, _square, 7, owner=1)
+        done = _wait(manager, job['job_id'])
+        assert done['status'] == 'completed' and not done['cached']
+        assert manager.get_result(job['job_id']) == 49
+
+        cached = manager.submit('square', {'x': 7}, _square, 7, owner=2)
+        assert cached['status'] == 'completed' and cached['cached']
+        assert cached['job_id'] != job['job_id']
+        assert manager.get_result(cached['job_id']) == 49
+        assert manager.get_stats()['cache_hits'] == 1
+
+    def test_inflight_requests_are_coalesced(self, manager):
+        """Test that identical in-flight requests share one job and notify every owner."""
+        first = manager.submit('sleep', {'v': 1}, _sleep_and_return, 0.5, 'a', owner=1)
+        second = manager.submit('sleep', {'v': 1}, _sleep_and_return, 0.5, 'a', owner=2)
+
+        assert second['job_id'] == first['job_id']
+        assert second['owners'] == [1, 2]
+        assert _wait(manager, first['job_id'])['status'] == 'completed'
+        assert [job['job_id'] for job in manager.list_jobs(owner=2)] == [first['job_id']]
+
+    def test_cancel_pending_job(self, manager):
+        """Test that a queued job can be cancelled before it starts."""
+        blocker = manager.submit('sleep', {'v': 'blocker'}, _sleep_and_return, 0.5, 'a')
+        queued = manager.submit('sleep', {'v': 'queued'}, _sleep_and_return, 0.5, 'b')
+
+        cancelled = manager.cancel(queued['job_id'])
+        assert cancelled['status'] == 'cancelled'
+        assert _wait(manager, blocker['job_id'])['status'] == 'completed'
+        assert manager.get(queued['job_id'])['status'] == 'cancelled'
+        with pytest.raises(ValueError):
+            manager.get_result(queued['job_id'])
+
+        # Um novo pedido idêntico não se junta ao job cancelado
+        retry = manager.submit('sleep', {'v': 'queued'}, _sleep_and_return, 0.01, 'b')
+        assert retry['job_id'] != queued['job_id']
+        assert _wait(manager, retry['job_id'])['status'] == 'completed'
+
+    def test_cancel_running_job_frees_the_worker(self, manager):
+        """Test that a running job stops at its next report_progress after cancel."""
+        running = manager.submit('steps', {'v': 1}, _steps_with_progress, 200, 0.05)
+        deadline = time.monotonic() + 30
+        while manager.get(running['job_id'])['progress'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        assert manager.cancel(running['job_id'])['status'] == 'cancelled'
+        start = time.monotonic()
+        follow_up = manager.submit('square', {'x': 5}, _square, 5)
+        assert _wait(manager, follow_up['job_id'])['status'] == 'completed'
+        assert time.monotonic() - start < 5
+        assert manager.get(running['job_id'])['status'] == 'cancelled'
+
+    def test_failed_job_reports_error_and_is_not_cached(self, manager):
+        """Test that exceptions in the worker mark the job as failed."""
+        job = manager.submit('fail', {}, _fail)
+        done = _wait(manager, job['job_id'])
+
+        assert done['status'] == 'failed'
+        assert 'boom' in done['error']
+        assert manager.submit('fail', {}, _fail)['status'] == 'pending'
+
+    def test_listeners_receive_state_changes(self, manager):
+        """Test that listeners see submission and completion without the result."""
+        updates = []
+        manager.add_listener(updates.append)
+
+        job = manager.submit('square', {'x': 3}, _square, 3, owner=1)
+        _wait(manager, job['job_id'])
+
+        assert updates[0]['status'] == 'pending'
+        assert updates[-1]['status'] == 'completed'
+        assert all('result' not in update for update in updates)
+
+    def test_report_progress_outside_job_is_noop(self):
+        """Test that report_progress can be called outside a worker."""
+        report_progress(0.5, 'stage')
+
+    def test_sweep_job_runs_sequentially(self, manager, monkeypatch):
+        """Test that a parameter sweep runs as a job without a nested process pool."""
+        def no_nested_pool(*args, **kwargs):
+            raise AssertionError("nested pool")
+
+        monkeypatch.setattr('src.analytics.parameter_sweep.ProcessPoolExecutor', no_nested_pool)
+        prices = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0.001, 0.02, 60)))
+        data = pd.DataFrame({'open': prices, 'high': prices * 1.01, 'low': prices * 0.99,
+                             'close': prices, 'volume': 1000.0},
+                            index=pd.date_range('2023-01-01', periods=60, freq='D'))
+        combinations = [{'short_window': 3, 'long_window': 10}, {'short_window': 5, 'long_window': 20}]
+        config = {'strategy': 'simple_ma', 'max_workers': 512}
+
+        # In-process run: the patch above fails if the sweep opens its own pool
+        assert list(run_sweep_job(data, config, combinations)['rank']) == [1, 2]
+
+        job = manager.submit('backtest_sweep', config, run_sweep_job, data, config, combinations, owner=1)
+        done = _wait(manager, job['job_id'])
+
+        assert done['status'] == 'completed'
+        assert list(manager.get_result(job['job_id'])['rank']) == [1, 2]
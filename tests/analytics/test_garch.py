@@ -0,0 +1,84 @@
+"""Test suite for analytics garch module."""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.garch import Garch11, garch_variance
+from src.analytics.risk_analytics import RiskAnalytics
+
+
+def simulate_garch(n, omega=1e-6, alpha=0.1, beta=0.85, seed=0):
+    """Simulate a GARCH(1,1) return series."""
+    rng = np.random.default_rng(seed)
+    returns = np.empty(n)
+    variance = omega / (1 - alpha - beta)
+    for t in range(n):
+        returns[t] = np.sqrt(variance) * rng.standard_normal()
+        variance = omega + alpha * returns[t] ** 2 + beta * variance
+    return returns
+
+
+class TestGarch11:
+    """Test cases for the GARCH(1,1) estimator."""
+
+    def test_recursion_matches_reference_loop(self):
+        """Test that the filtered recursion equals the element-wise definition."""
+        residuals = np.random.default_rng(1).normal(0, 0.01, 500)
+        omega, alpha, beta = 2e-6, 0.12, 0.8
+
+        expected = [residuals.var()]
+        for t in range(1, len(residuals)):
+            expected.append(omega + alpha * residuals[t - 1] ** 2 + beta * expected[-1])
+
+        np.testing.assert_allclose(garch_variance(residuals, omega, alpha, beta), expected)
+
+    def test_mle_recovers_parameters(self):
+        """Test that MLE fitting recovers simulated parameters."""
+        fit = Garch11().fit(simulate_garch(5000))
+
+        assert fit.converged
+        assert fit.params.alpha == pytest.approx(0.1, abs=0.04)
+        assert fit.params.beta == pytest.approx(0.85, abs=0.06)
+        assert fit.params.persistence < 1
+        assert len(fit.conditional_volatility) == 5000
+
+    def test_forecast_converges_to_long_run_volatility(self):
+        """Test multi-step forecasts decay toward the long-run volatility."""
+        fit = Garch11().fit(simulate_garch(2000))
+        forecast = fit.forecast(500)
+        long_run = np.sqrt(fit.params.long_run_variance)
+
+        assert forecast.shape == (500,)
+        assert abs(forecast[-1] - long_run) < abs(forecast[0] - long_run) + 1e-12
+        assert forecast[-1] == pytest.approx(long_run, rel=0.01)
+
+    def test_warm_start_and_batch_fit(self):
+        """Test batch fitting per symbol and warm starts on refit."""
+        garch = Garch11()
+        returns = pd.DataFrame({
+            "BTCUSDT": simulate_garch(1500, seed=2),
+            "ETHUSDT": simulate_garch(1500, alpha=0.05, beta=0.9, seed=3),
+        })
+        returns.loc[:10, "ETHUSDT"] = np.nan
+
+        fits = garch.fit_many({**returns, "NEWUSDT": [0.01] * 5})
+        assert fits["NEWUSDT"] is None
+        assert fits["ETHUSDT"].n_obs == 1489
+        assert set(garch._warm_starts) == {"BTCUSDT", "ETHUSDT"}
+
+        start = time.perf_counter()
+        refit = garch.fit(returns["BTCUSDT"], key="BTCUSDT")
+        assert time.perf_counter() - start < 1
+        assert refit.params.alpha == pytest.approx(fits["BTCUSDT"].params.alpha, rel=1e-3)
+
+    def test_risk_analytics_uses_garch(self):
+        """Test that volatility metrics report the GARCH forecast."""
+        returns = pd.Series(simulate_garch(1000, seed=4))
+        metrics = RiskAnalytics().calculate_volatility_metrics(returns, annualize=False)
+
+        assert 0 < metrics['garch_persistence'] < 1
+        assert metrics['garch_volatility'] > 0
+        assert metrics['garch_long_run_volatility'] == pytest.approx(returns.std(), rel=0.05)
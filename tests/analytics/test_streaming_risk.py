@@ -0,0 +1,106 @@
+"""Test suite for the streaming portfolio risk engine."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.risk_analytics import RiskAnalytics
+from src.analytics.streaming_risk import StreamingRiskEngine, StreamingRiskRegistry
+
+
+@pytest.fixture
+def prices():
+    """Portfolio values following a seeded random walk."""
+    rng = np.random.default_rng(11)
+    values = 1000 * np.cumprod(1 + rng.normal(0.0005, 0.02, 600))
+    return pd.Series(values, index=pd.date_range("2024-01-01", periods=600, freq="D"))
+
+
+class TestStreamingRiskEngine:
+    """Test cases for StreamingRiskEngine."""
+
+    def test_matches_batch_risk_analytics(self, prices):
+        """Test VaR, CVaR, volatility and drawdown against the batch calculations."""
+        analytics = RiskAnalytics()
+        engine = analytics.create_streaming_engine(prices, window=1000)
+        returns = prices.pct_change()
+
+        for confidence in (0.90, 0.95, 0.99):
+            expected_var = analytics.calculate_var(returns, confidence)
+            assert engine.var(confidence) == pytest.approx(expected_var['var'])
+            assert engine.expected_shortfall(confidence) == pytest.approx(expected_var['expected_shortfall'])
+            assert engine.expected_shortfall(confidence) == pytest.approx(
+                analytics.calculate_cvar(returns, confidence)['cvar']
+            )
+            assert engine.var(confidence, 'parametric') == pytest.approx(
+                analytics.calculate_var(returns, confidence, 'parametric')['var']
+            )
+
+        assert engine.volatility == pytest.approx(returns.std())
+        drawdown = analytics.calculate_maximum_drawdown(prices)
+        assert engine.max_drawdown == pytest.approx(drawdown['max_drawdown'])
+        assert engine.current_drawdown == pytest.approx(drawdown['current_drawdown'])
+        assert engine.max_drawdown_date == drawdown['max_drawdown_date']
+        assert engine.peak_before_dd == drawdown['peak_before_dd']
+        assert engine.underwater_observations == drawdown['underwater_duration']
+
+    def test_rolling_window_evicts_old_returns(self, prices):
+        """Test that window metrics only cover the last ``window`` returns."""
+        engine = StreamingRiskEngine(window=100)
+        engine.update_many(prices.to_numpy(), prices.index)
+        recent = prices.pct_change().iloc[-100:]
+
+        assert engine.return_count == 100
+        assert engine.var(0.95) == pytest.approx(np.percentile(recent, 5))
+        assert engine.mean_return == pytest.approx(recent.mean())
+        assert engine.volatility == pytest.approx(recent.std())
+
+    def test_ewma_volatility(self):
+        """Test the RiskMetrics EWMA recursion."""
+        engine = StreamingRiskEngine(ewma_lambda=0.9)
+        for r in (0.01, -0.02, 0.03):
+            engine.update_return(r)
+
+        expected = 0.01 ** 2
+        for r in (-0.02, 0.03):
+            expected = 0.9 * expected + 0.1 * r ** 2
+        assert engine.ewma_volatility == pytest.approx(math.sqrt(expected))
+        assert engine.last_value == pytest.approx(1.01 * 0.98 * 1.03)
+
+    def test_snapshot_is_json_safe_when_empty(self):
+        """Test undefined metrics are reported as None instead of NaN."""
+        engine = StreamingRiskEngine()
+        engine.update(100.0)
+        snapshot = engine.snapshot()
+
+        assert snapshot['var_analysis']['historical_95'] is None
+        assert snapshot['volatility'] is None
+        assert snapshot['drawdown']['max_drawdown'] == 0.0
+
+    def test_recovery_date(self):
+        """Test recovery is recorded when the value regains the drawdown peak."""
+        engine = StreamingRiskEngine()
+        engine.update_many([100, 110, 90, 100, 111], range(5))
+
+        assert engine.max_drawdown == pytest.approx(90 / 110 - 1)
+        assert engine.peak_before_dd == 1
+        assert engine.recovery_date == 4
+        assert engine.current_drawdown == 0.0
+
+
+class TestStreamingRiskRegistry:
+    """Test cases for StreamingRiskRegistry."""
+
+    def test_seed_keeps_existing_engine(self):
+        """Test that seeding twice keeps the first engine."""
+        registry = StreamingRiskRegistry(window=10)
+        first = registry.seed(1, [100, 101, 99])
+        second = registry.seed(1, [5, 6])
+
+        assert second is first and first.observations == 3
+        registry.update(1, 98)
+        assert registry.find(1).observations == 4
+        registry.reset(1)
+        assert registry.find(1) is None
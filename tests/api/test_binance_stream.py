@@ -0,0 +1,230 @@
+"""
+Tests for the Binance WebSocket market stream and candle store
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+import websockets
+
+from src.api.binance_stream import BinanceMarketStream, CandleStore, INTERVAL_MS
+
+
+HOUR = INTERVAL_MS['1h']
+
+
+def make_kline(open_time, close="100.0", interval_ms=HOUR):
+    """REST-format kline"""
+    return [open_time, "99.0", "101.0", "98.0", close, "10.0",
+            open_time + interval_ms - 1, "1000.0", 5, "5.0", "500.0", "0"]
+
+
+def kline_message(symbol, interval, open_time, close, closed=False):
+    """Combined-stream kline event"""
+    return json.dumps({
+        "stream": f"{symbol.lower()}@kline_{interval}",
+        "data": {
+            "e": "kline", "E": open_time, "s": symbol,
+            "k": {
+                "t": open_time, "T": open_time + INTERVAL_MS[interval] - 1, "s": symbol, "i": interval,
+                "o": "99.0", "c": close, "h": "101.0", "l": "98.0", "v": "10.0", "n": 5,
+                "x": closed, "q": "1000.0", "V": "5.0", "Q": "500.0", "B": "0"
+            }
+        }
+    })
+
+
+class FakeRestClient:
+    """Fake REST client recording backfill requests"""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    def fetch_klines(self, symbol, interval, limit=500):
+        self.calls.append((symbol, interval, limit))
+        return [list(c) for c in self.candles[-limit:]]
+
+
+class FakeBinanceServer:
+    """Local combined-stream server that replays queued messages"""
+
+    def __init__(self):
+        self.paths = []
+        self.connections = []
+        self.queue = asyncio.Queue()
+        self.server = None
+
+    async def handler(self, ws):
+        self.paths.append(ws.request.path)
+        self.connections.append(ws)
+        closed = asyncio.ensure_future(ws.wait_closed())
+        while True:
+            message = asyncio.ensure_future(self.queue.get())
+            done, _ = await asyncio.wait({message, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed in done:
+                message.cancel()
+                return
+            await ws.send(message.result())
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def wait_for(condition, timeout=5.0):
+    """Poll ``condition`` from the test loop while the stream thread works"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestCandleStore:
+    """Test CandleStore"""
+
+    def test_upsert_replaces_open_candle_and_appends(self):
+        """Test that updates to the open candle replace it in place"""
+        store = CandleStore(max_candles=3)
+        store.upsert("BTC/USDT", "1h", make_kline(0, "1"))
+        store.upsert("BTCUSDT", "1h", make_kline(0, "2"))
+        assert store.count("BTC/USDT", "1h") == 1
+
+        for i in range(1, 4):
+            store.upsert("BTC/USDT", "1h", make_kline(i * HOUR, str(i)))
+
+        klines = store.get_klines("BTC/USDT", "1h", 3)
+        assert [k[0] for k in klines] == [HOUR, 2 * HOUR, 3 * HOUR]
+        assert store.get_klines("BTC/USDT", "1h", 4) is None
+
+    def test_merge_fills_gap_in_order(self):
+        """Test that backfilled candles are merged by open time"""
+        store = CandleStore()
+        store.upsert("ETHUSDT", "1h", make_kline(0))
+        store.upsert("ETHUSDT", "1h", make_kline(3 * HOUR, "live"))
+        store.merge("ETHUSDT", "1h", [make_kline(i * HOUR) for i in range(1, 3)])
+
+        klines = store.get_klines("ETHUSDT", "1h", 4)
+        assert [k[0] for k in klines] == [0, HOUR, 2 * HOUR, 3 * HOUR]
+        assert klines[-1][4] == "live"
+
+
+class TestBinanceMarketStream:
+    """Test BinanceMarketStream against a local fake server"""
+
+    @pytest.mark.asyncio
+    async def test_backfill_live_updates_and_book_ticker(self):
+        """Test initial backfill, kline updates and bookTicker parsing"""
+        now = int(time.time() * 1000) // HOUR * HOUR
+        rest = FakeRestClient([make_kline(now - i * HOUR) for i in range(10, -1, -1)])
+
+        async with FakeBinanceServer() as server:
+            stream = BinanceMarketStream(rest, ["BTC/USDT"], intervals=["1h"], ws_url=server.url, history=5)
+            stream.start()
+            try:
+                await wait_for(stream._ready.is_set)
+                assert server.paths == ["/stream?streams=btcusdt@kline_1h/btcusdt@bookTicker"]
+                assert rest.calls == [("BTCUSDT", "1h", 5)]
+
+                await server.queue.put(kline_message("BTCUSDT", "1h", now, "123.0"))
+                await server.queue.put(json.dumps({
+                    "stream": "btcusdt@bookTicker",
+                    "data": {"u": 1, "s": "BTCUSDT", "b": "122.9", "B": "1.5", "a": "123.1", "A": "2.0"}
+                }))
+                await wait_for(lambda: stream.messages_received >= 2)
+
+                klines = stream.get_klines("BTC/USDT", "1h", 5)
+                assert len(klines) == 5
+                assert klines[-1][0] == now and klines[-1][4] == "123.0"
+                assert stream.get_book_ticker("BTCUSDT")["ask_price"] == 123.1
+
+                # Indicators are kept up to date from the backfill and live candles
+                assert stream.get_indicators("BTC/USDT", "1h")["price"]["close"] == 123.0
+                assert stream.indicators.get("BTCUSDT", "1h").candle_count == 5
+                assert stream.get_indicators("BTC/USDT", "4h") is None
+
+                # Not enough candles or unsubscribed interval: caller falls back to REST
+                assert stream.get_klines("BTC/USDT", "1h", 50) is None
+                assert stream.get_klines("BTC/USDT", "4h", 5) is None
+
+                await server.queue.put(kline_message("BTCUSDT", "1h", now, "124.0", closed=True))
+                assert await asyncio.to_thread(stream.wait_for_candle_close, 5)
+            finally:
+                await asyncio.to_thread(stream.stop)
+
+        assert not stream.connected
+
+    @pytest.mark.asyncio
+    async def test_reconnect_backfills_only_the_gap(self):
+        """Test that a dropped connection reconnects and requests only missing candles"""
+        now = int(time.time() * 1000) // HOUR * HOUR
+        rest = FakeRestClient([make_kline(now - i * HOUR) for i in range(20, -1, -1)])
+
+        async with FakeBinanceServer() as server:
+            stream = BinanceMarketStream(rest, ["ETHUSDT"], intervals=["1h"], book_ticker=False,
+                                         ws_url=server.url, history=10, max_backoff=0.1)
+            stream.start()
+            try:
+                await wait_for(stream._ready.is_set)
+                await server.connections[0].close()
+
+                await wait_for(lambda: len(rest.calls) == 2 and stream.connected)
+                assert stream.reconnects == 1
+                # Last candle is the current one: refetch it plus the next
+                assert rest.calls[1] == ("ETHUSDT", "1h", 2)
+                assert stream.get_stats()["backfill_requests"] == 2
+            finally:
+                await asyncio.to_thread(stream.stop)
+
+    def test_stale_feed_falls_back_to_rest(self):
+        """Test that reads return None when the feed is not connected or stale"""
+        stream = BinanceMarketStream(FakeRestClient([]), ["BTCUSDT"], intervals=["1h"], max_stale_seconds=1)
+        stream.store.merge("BTCUSDT", "1h", [make_kline(i * HOUR) for i in range(5)])
+
+        assert stream.get_klines("BTCUSDT", "1h", 5) is None
+
+        stream.connected = True
+        stream.last_message_time = time.monotonic()
+        assert len(stream.get_klines("BTCUSDT", "1h", 5)) == 5
+
+        stream.last_message_time -= 10
+        assert stream.get_klines("BTCUSDT", "1h", 5) is None
+        assert stream.get_stats()["rest_fallbacks"] == 2
+
+
+class TestBinanceAPIStreamIntegration:
+    """Test that BinanceAPI.get_klines prefers the attached stream"""
+
+    def test_get_klines_uses_stream_then_rest(self, monkeypatch):
+        """Test stream-first reads with REST fallback"""
+        from src.api.binance_api import BinanceAPI
+
+        rest_calls = []
+        monkeypatch.setattr(BinanceAPI, "fetch_klines",
+                            lambda self, s, i, l=500: rest_calls.append((s, i, l)) or ["rest"])
+        monkeypatch.setenv("KLINE_CACHE_ENABLED", "false")
+        api = BinanceAPI("key", "secret", testnet=True)
+
+        class StubStream:
+            def __init__(self, result):
+                self.result = result
+
+            def get_klines(self, symbol, interval, limit):
+                return self.result
+
+        api.attach_market_stream(StubStream([["ws"]]))
+        assert api.get_klines("BTC/USDT", "1h", 1) == [["ws"]]
+        assert rest_calls == []
+
+        api.attach_market_stream(StubStream(None))
+        assert api.get_klines("BTC/USDT", "1h", 1) == ["rest"]
+        assert rest_calls == [("BTC/USDT", "1h", 1)]
@@ -0,0 +1,95 @@
+"""Test suite for Binance weight limiter and pooled BinanceAPI session."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.api.binance_api import BinanceAPI
+from src.api.binance_weight_limiter import BinanceWeightLimiter
+
+
+class _FakeBinanceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    used_weight = 0
+
+    def do_GET(self):
+        _FakeBinanceHandler.used_weight += 2
+        body = json.dumps([[0, "1", "2", "0.5", "1.5", "10"]]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(_FakeBinanceHandler.used_weight))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_binance_server():
+    _FakeBinanceHandler.used_weight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeBinanceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api"
+    server.shutdown()
+    server.server_close()
+
+
+class TestBinanceWeightLimiter:
+    """Test cases for BinanceWeightLimiter."""
+
+    def test_endpoint_weights(self):
+        """Test weight lookup including parameter dependent endpoints."""
+        assert BinanceWeightLimiter.get_weight("GET", "/v3/klines", {"symbol": "BTCUSDT"}) == 2
+        assert BinanceWeightLimiter.get_weight("GET", "/v3/ticker/24hr", {}) == 80
+        assert BinanceWeightLimiter.get_weight("GET", "/v3/ticker/24hr", {"symbol": "BTCUSDT"}) == 2
+        assert BinanceWeightLimiter.get_weight("GET", "/v3/unknown") == 1
+
+    def test_acquire_blocks_when_bucket_empty(self):
+        """Test that callers wait once the budget is exhausted."""
+        limiter = BinanceWeightLimiter(weight_limit=10, safety_margin=1.0, window_seconds=1.0)
+        assert limiter.acquire(10) == 0.0
+        start = time.perf_counter()
+        limiter.acquire(2)
+        assert time.perf_counter() - start >= 0.15
+        assert limiter.get_stats()["throttled_requests"] == 1
+
+    def test_headers_reduce_available_weight(self):
+        """Test that server reported weight is authoritative."""
+        limiter = BinanceWeightLimiter(weight_limit=1000, safety_margin=1.0)
+        limiter.update_from_headers({"X-MBX-USED-WEIGHT-1M": "900"}, 200)
+        stats = limiter.get_stats()
+        assert stats["current_weight"] == 900
+        assert stats["available_weight"] <= 101
+
+    def test_429_blocks_until_retry_after(self):
+        """Test that a 429 response pauses new requests."""
+        limiter = BinanceWeightLimiter(weight_limit=1000)
+        limiter.update_from_headers({"Retry-After": "0.2"}, 429)
+        assert limiter.get_stats()["rate_limit_hits"] == 1
+        assert limiter.acquire(1) >= 0.15
+
+
+class TestBinanceAPIPooling:
+    """Test cases for the pooled session in BinanceAPI."""
+
+    def test_connections_are_reused(self, fake_binance_server):
+        """Test that consecutive requests reuse one keep-alive connection."""
+        api = BinanceAPI("k" * 16, "s" * 16, testnet=True)
+        api.base_url = fake_binance_server
+
+        for _ in range(5):
+            assert api.get_klines("BTCUSDT", "1m", 1)
+
+        stats = api.get_pool_stats()
+        assert stats["requests"] == 5
+        assert stats["connections_created"] == 1
+        assert stats["reuse_ratio"] == pytest.approx(0.8)
+        assert stats["weight_limiter"]["current_weight"] == 10
+        assert stats["weight_limiter"]["total_weight"] == 10
+        api.close()
@@ -0,0 +1,111 @@
+"""
+Tests for the tiered OHLCV cache behind BinanceAPI.get_klines
+"""
+
+import time
+
+import pytest
+
+from src.api.kline_cache import KlineCache
+from src.api.binance_stream import INTERVAL_MS
+
+
+HOUR = INTERVAL_MS['1h']
+
+
+class FakeExchange:
+    """Fake /v3/klines backed by a controllable clock"""
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+        self.calls = []
+
+    def candle(self, open_time):
+        close = f"{100 + (open_time // HOUR) % 50}.00000000"
+        if open_time + HOUR - 1 >= self.now_ms:
+            close = f"{self.now_ms % 1000}.00000000"  # open candle keeps changing
+        return [open_time, "99.00000000", "101.00000000", "98.00000000", close, "10.00000000",
+                open_time + HOUR - 1, "1000.00000000", 5, "5.00000000", "500.00000000", "0"]
+
+    def __call__(self, symbol, interval, limit):
+        self.calls.append(limit)
+        current = self.now_ms // HOUR * HOUR
+        return [self.candle(current - i * HOUR) for i in range(limit - 1, -1, -1)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze KlineCache's wall clock"""
+    exchange = FakeExchange(now_ms=1_700_000_000_000 // HOUR * HOUR + HOUR // 2)
+    monkeypatch.setattr(KlineCache, "_now_ms", staticmethod(lambda: exchange.now_ms))
+    return exchange
+
+
+class TestKlineCache:
+    """Test KlineCache"""
+
+    def test_repeated_reads_hit_memory(self, clock):
+        """Test that overlapping requests in one cycle are served from cache"""
+        cache = KlineCache(clock)
+
+        first = cache.get_klines("BTC/USDT", "1h", 100)
+        assert first == clock("BTCUSDT", "1h", 100)
+        clock.calls.clear()
+
+        assert cache.get_klines("BTCUSDT", "1h", 24) == first[-24:]
+        assert cache.get_klines("BTC/USDT", "1h", 11) == first[-11:]
+        assert clock.calls == []
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2 and stats["misses"] == 1
+        assert stats["bytes_saved"] > 0
+
+    def test_open_candle_expires_and_only_tail_is_fetched(self, clock):
+        """Test open-candle TTL and tail-only refresh after new candles close"""
+        cache = KlineCache(clock, open_candle_ttl=0.0)
+        cache.get_klines("ETHUSDT", "1h", 50)
+
+        # Open candle expired: refetch it plus the last closed candle
+        time.sleep(0.01)
+        cache.get_klines("ETHUSDT", "1h", 50)
+        assert clock.calls[-1] == 2
+
+        # Three hours later: three closed candles and the new open one are missing
+        clock.now_ms += 3 * HOUR
+        result = cache.get_klines("ETHUSDT", "1h", 50)
+        assert clock.calls[-1] == 5
+        assert result == clock("ETHUSDT", "1h", 50)
+        assert cache.get_stats()["partial_hits"] == 2
+
+    def test_insufficient_history_and_gaps_trigger_full_fetch(self, clock):
+        """Test that larger requests and long gaps refetch the full window"""
+        cache = KlineCache(clock)
+        cache.get_klines("BTCUSDT", "1h", 10)
+        cache.get_klines("BTCUSDT", "1h", 30)
+        assert clock.calls == [10, 30]
+
+        clock.now_ms += 2000 * HOUR
+        assert cache.get_klines("BTCUSDT", "1h", 30) == clock("BTCUSDT", "1h", 30)
+        assert clock.calls[2] == 30
+
+    def test_disk_store_survives_restart(self, clock, tmp_path):
+        """Test that closed candles are reloaded from the memory-mapped store"""
+        KlineCache(clock, cache_dir=str(tmp_path)).get_klines("BTCUSDT", "1h", 200)
+        assert [p.name for p in tmp_path.iterdir()] == ["BTCUSDT_1h.npy"]
+
+        clock.calls.clear()
+        restarted = KlineCache(clock, cache_dir=str(tmp_path))
+        result = restarted.get_klines("BTCUSDT", "1h", 200)
+
+        assert clock.calls == [2]
+        assert restarted.get_stats()["disk_loads"] == 1
+        assert result == clock("BTCUSDT", "1h", 200)
+
+    def test_empty_response_is_not_cached(self, clock):
+        """Test that invalid symbols (empty REST response) are passed through"""
+        calls = []
+        cache = KlineCache(lambda s, i, l: calls.append(l) or [])
+
+        assert cache.get_klines("FOO/BAR", "1h", 10) == []
+        assert cache.get_klines("FOO/BAR", "1h", 10) == []
+        assert len(calls) == 2
@@ -0,0 +1,173 @@
+"""
+Tests for the async TTL cache and the shared MarketDataAggregator
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.external.price_cache import AsyncTTLCache
+from src.api.external import market_data_aggregator as mda
+
+
+class CountingFetcher:
+    """Fake upstream that counts calls and can be slowed down"""
+
+    def __init__(self, delay=0.0, value="v"):
+        self.calls = 0
+        self.delay = delay
+        self.value = value
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"{self.value}{self.calls}"
+
+
+class TestAsyncTTLCache:
+    """Test AsyncTTLCache"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit(self):
+        """Test that fresh entries are served without refetching"""
+        cache = AsyncTTLCache(ttl=60)
+        fetcher = CountingFetcher()
+
+        assert await cache.get_or_fetch("BTC", fetcher) == "v1"
+        assert await cache.get_or_fetch("BTC", fetcher) == "v1"
+
+        assert fetcher.calls == 1
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesce(self):
+        """Test that concurrent misses share one upstream fetch"""
+        cache = AsyncTTLCache(ttl=60)
+        fetcher = CountingFetcher(delay=0.05)
+
+        results = await asyncio.gather(*[cache.get_or_fetch("BTC", fetcher) for _ in range(20)])
+
+        assert results == ["v1"] * 20
+        assert fetcher.calls == 1
+        assert cache.get_stats()["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        """Test that expired entries are served while one refresh runs"""
+        cache = AsyncTTLCache(ttl=0.01, stale_ttl=60)
+        fetcher = CountingFetcher(delay=0.02)
+
+        assert await cache.get_or_fetch("BTC", fetcher) == "v1"
+        await asyncio.sleep(0.02)
+
+        # Stale value returned immediately, single background refresh
+        start = time.monotonic()
+        stale = await asyncio.gather(*[cache.get_or_fetch("BTC", fetcher) for _ in range(5)])
+        assert time.monotonic() - start < 0.02
+        assert stale == ["v1"] * 5
+
+        await asyncio.sleep(0.05)
+        assert fetcher.calls == 2
+        assert cache.get_stats()["refreshes"] == 1
+        assert await cache.get_or_fetch("BTC", fetcher) == "v2"
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_refetched(self):
+        """Test that entries past the stale window block on a new fetch"""
+        cache = AsyncTTLCache(ttl=0.01, stale_ttl=0.0)
+        fetcher = CountingFetcher()
+
+        await cache.get_or_fetch("BTC", fetcher)
+        await asyncio.sleep(0.02)
+
+        assert await cache.get_or_fetch("BTC", fetcher) == "v2"
+        assert cache.get_stats()["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_and_empty_results_not_cached(self):
+        """Test that failures propagate to all waiters and empty values are not stored"""
+        cache = AsyncTTLCache(ttl=60)
+        failing = AsyncMock(side_effect=RuntimeError("upstream down"))
+
+        results = await asyncio.gather(
+            cache.get_or_fetch("BTC", failing), cache.get_or_fetch("BTC", failing),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert failing.await_count == 1
+
+        empty = AsyncMock(return_value=[])
+        await cache.get_or_fetch("ETH", empty)
+        await cache.get_or_fetch("ETH", empty)
+        assert empty.await_count == 2
+        assert cache.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        """Test that a cancelled request leaves the shared fetch running"""
+        cache = AsyncTTLCache(ttl=60)
+        fetcher = CountingFetcher(delay=0.05)
+
+        first = asyncio.ensure_future(cache.get_or_fetch("BTC", fetcher))
+        second = asyncio.ensure_future(cache.get_or_fetch("BTC", fetcher))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "v1"
+        assert fetcher.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test that the least recently used key is evicted"""
+        cache = AsyncTTLCache(ttl=60, max_entries=2)
+
+        for key in ("A", "B"):
+            await cache.get_or_fetch(key, CountingFetcher(value=key))
+        await cache.get_or_fetch("A", CountingFetcher())
+        await cache.get_or_fetch("C", CountingFetcher(value="C"))
+
+        assert cache.get_stats()["evictions"] == 1
+        assert await cache.get_or_fetch("A", CountingFetcher(value="new")) == "A1"
+        assert await cache.get_or_fetch("B", CountingFetcher(value="new")) == "new1"
+
+
+class TestSharedMarketDataAggregator:
+    """Test the app-lifetime MarketDataAggregator"""
+
+    @pytest.mark.asyncio
+    async def test_shared_instance_and_cached_prices(self):
+        """Test that the singleton is entered once and coalesces price fetches"""
+        point = mda.MarketDataPoint(
+            symbol="BTC/USDT", name="BTC", price=50000.0, price_change_24h=1.0,
+            price_change_percentage_24h=0.1, volume_24h=10.0, market_cap=None,
+            source="binance", timestamp="2024-01-01T00:00:00"
+        )
+
+        async def slow_fetch(symbols):
+            await asyncio.sleep(0.02)
+            return [point]
+
+        with patch.object(mda.MarketDataAggregator, "__aenter__", autospec=True) as enter, \
+             patch.object(mda.MarketDataAggregator, "__aexit__", new=AsyncMock()) as exit_:
+            enter.side_effect = lambda self: self
+
+            aggregators = await asyncio.gather(*[mda.get_shared_aggregator() for _ in range(5)])
+            aggregator = aggregators[0]
+            assert all(a is aggregator for a in aggregators)
+            assert enter.call_count == 1
+
+            with patch.object(aggregator, "_fetch_current_prices", side_effect=slow_fetch) as fetch:
+                prices = await asyncio.gather(*[aggregator.get_current_prices(["BTC/USDT"]) for _ in range(10)])
+
+            assert all(p == [point] for p in prices)
+            assert fetch.call_count == 1
+            assert aggregator.get_cache_stats()["prices"]["coalesced"] == 9
+
+            await mda.close_shared_aggregator()
+            exit_.assert_awaited_once()
+            assert mda._shared_aggregator is None
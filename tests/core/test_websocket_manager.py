@@ -0,0 +1,214 @@
+"""
+Tests for the WebSocket manager fan-out path
+"""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from fastapi.websockets import WebSocketState
+
+from src.core.websocket_manager import WebSocketManager, WebSocketMessage, MessageType
+
+
+class FakeWebSocket:
+    """WebSocket stand-in that records sent frames and can stall sends"""
+
+    def __init__(self, blocked=False):
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblocked.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=None):
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+def price_message(price):
+    return WebSocketMessage(type=MessageType.PRICE_UPDATE, data={"price": price})
+
+
+async def settle():
+    """Let writer tasks drain their queues"""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def manager():
+    ws_manager = WebSocketManager(send_queue_size=3, slow_consumer_policy="drop_oldest")
+    yield ws_manager
+    await ws_manager.shutdown()
+
+
+class TestWebSocketFanOut:
+    """Test serialize-once fan-out with per-connection send queues"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_serializes_once(self, manager, monkeypatch):
+        """Test that a broadcast is serialized once for every subscriber"""
+        sockets = [FakeWebSocket() for _ in range(5)]
+        for i, ws in enumerate(sockets):
+            connection_id = await manager.connect(ws, user_id=i)
+            await manager.subscribe(connection_id, "price:BTC")
+        await settle()
+
+        calls = []
+        original = WebSocketMessage.to_dict
+        monkeypatch.setattr(WebSocketMessage, "to_dict", lambda self: calls.append(1) or original(self))
+
+        await manager._broadcast_to_subscribers("price:BTC", price_message(100))
+        await settle()
+
+        assert len(calls) == 1
+        assert all(ws.sent[-1]["data"]["price"] == 100 for ws in sockets)
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_does_not_delay_others(self, manager):
+        """Test that a stalled client drops its oldest messages while others keep up"""
+        fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+        fast_id = await manager.connect(fast, user_id=1)
+        slow_id = await manager.connect(slow, user_id=2)
+        for connection_id in (fast_id, slow_id):
+            manager._connections[connection_id].subscriptions.add("price:ETH")
+            manager._subscriptions.setdefault("price:ETH", set()).add(connection_id)
+        await settle()
+
+        for price in range(10):
+            await asyncio.wait_for(manager._broadcast_to_subscribers("price:ETH", price_message(price)), 1)
+        await settle()
+
+        assert [m["data"]["price"] for m in fast.sent[1:]] == list(range(10))
+
+        stats = manager.get_fanout_stats()
+        assert stats["messages_dropped"] > 0
+        assert stats["max_queue_depth"] == 3
+
+        slow.unblocked.set()
+        await settle()
+        # The slow client receives the newest prices once it catches up
+        assert slow.sent[-1]["data"]["price"] == 9
+        assert manager._connections[slow_id].messages_dropped == stats["messages_dropped"]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_closes_slow_consumer(self):
+        """Test that the disconnect policy closes a client whose queue is full"""
+        ws_manager = WebSocketManager(send_queue_size=2, slow_consumer_policy="disconnect")
+        slow = FakeWebSocket(blocked=True)
+        connection_id = await ws_manager.connect(slow, user_id=1)
+        await ws_manager.subscribe(connection_id, "system:all")
+
+        for i in range(5):
+            await ws_manager.broadcast_system_notification({"title": str(i)})
+        await settle()
+
+        assert connection_id not in ws_manager._connections
+        assert slow.client_state == WebSocketState.DISCONNECTED
+        assert ws_manager.get_fanout_stats()["slow_consumer_disconnects"] == 1
+        await ws_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_stats_report_latency(self, manager):
+        """Test that fan-out and delivery latency are reported in connection stats"""
+        connection_id = await manager.connect(FakeWebSocket(), user_id=7)
+        await manager.send_to_user(7, price_message(1))
+        await settle()
+
+        stats = await manager.get_connection_stats()
+        fanout = stats["fanout"]
+        assert fanout["messages_sent"] == 2
+        assert fanout["queue_depth"] == 0
+        assert fanout["fanout_latency_ms"]["max"] >= 0
+        assert fanout["delivery_latency_ms"]["avg"] >= 0
+        assert manager._connections[connection_id].messages_sent == 2
+
+    def test_invalid_policy_rejected(self):
+        """Test that unknown slow consumer policies are rejected"""
+        with pytest.raises(ValueError):
+            WebSocketManager(slow_consumer_policy="ignore")
+
+
+class TestPriceConflation:
+    """Test per-symbol price conflation"""
+
+    @pytest.mark.asyncio
+    async def test_latest_tick_per_symbol_on_cadence(self):
+        """Test that bursts of ticks collapse to the latest price per flush"""
+        ws_manager = WebSocketManager(price_conflation_ms=20)
+        ws = FakeWebSocket()
+        connection_id = await ws_manager.connect(ws, user_id=1)
+        await ws_manager.subscribe(connection_id, "price:BTC")
+        await ws_manager.subscribe(connection_id, "price:ETH")
+        await settle()
+        ws.sent.clear()
+
+        for price in range(100):
+            await ws_manager.broadcast_price_update("BTC", {"price": price})
+        await ws_manager.broadcast_price_update("ETH", {"price": 7})
+        await asyncio.sleep(0.06)
+
+        prices = {m["data"]["asset_symbol"]: m["data"]["price"] for m in ws.sent}
+        assert prices == {"BTC": 99, "ETH": 7}
+        assert len(ws.sent) == 2
+
+        stats = ws_manager.get_fanout_stats()
+        assert stats["price_ticks"] == 101 and stats["price_messages"] == 2
+        await ws_manager.shutdown()
+        assert not ws_manager._price_flush_tasks
+
+    @pytest.mark.asyncio
+    async def test_subscriber_cadence_and_batching(self):
+        """Test per-connection cadence choice, batching and realtime passthrough"""
+        ws_manager = WebSocketManager(price_conflation_ms=1000, price_cadences=(0, 20))
+        realtime, batched = FakeWebSocket(), FakeWebSocket()
+        realtime_id = await ws_manager.connect(realtime, user_id=1)
+        batched_id = await ws_manager.connect(batched, user_id=2)
+        await ws_manager.subscribe(realtime_id, "price:BTC", cadence_ms=0)
+        for symbol in ("BTC", "ETH"):
+            await ws_manager.subscribe(batched_id, f"price:{symbol}", cadence_ms=20, batch=True)
+        await settle()
+        realtime.sent.clear()
+        batched.sent.clear()
+
+        for price in range(3):
+            await ws_manager.broadcast_price_update("BTC", {"price": price})
+            await ws_manager.broadcast_price_update("ETH", {"price": price * 10})
+        await asyncio.sleep(0.06)
+
+        assert [m["data"]["price"] for m in realtime.sent] == [0, 1, 2]
+        assert len(batched.sent) == 1
+        frame = {p["asset_symbol"]: p["price"] for p in batched.sent[0]["data"]["prices"]}
+        assert frame == {"BTC": 2, "ETH": 20}
+        assert ws_manager.get_fanout_stats()["price_cadences"] == {0: 1, 20: 1}
+
+        # The default cadence has no connections left, so its flush task ends
+        await asyncio.sleep(1.05)
+        assert set(ws_manager._price_flush_tasks) == {20}
+        await ws_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_client_cadence_is_snapped_or_rejected(self):
+        """Test that clients cannot start arbitrary flush loops"""
+        ws_manager = WebSocketManager(price_conflation_ms=250, price_cadences=(0, 100, 1000))
+        ws = FakeWebSocket()
+        connection_ids = [await ws_manager.connect(ws, user_id=i) for i in range(3)]
+
+        assert await ws_manager.subscribe(connection_ids[0], "price:BTC", cadence_ms=1)
+        assert await ws_manager.subscribe(connection_ids[1], "price:BTC", cadence_ms="40000")
+        assert not await ws_manager.subscribe(connection_ids[2], "price:BTC", cadence_ms="fast")
+        await settle()
+
+        assert ws_manager.get_fanout_stats()["price_cadences"] == {0: 1, 1000: 1, 250: 1}
+        assert set(ws_manager._price_flush_tasks) <= {250, 1000}
+        assert ws.sent[-1]["type"] == "subscription_error"
+        assert "price:BTC" not in ws_manager._connections[connection_ids[2]].subscriptions
+        await ws_manager.shutdown()
@@ -0,0 +1 @@
+# Database module tests
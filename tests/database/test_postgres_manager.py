@@ -0,0 +1,241 @@
+"""Test suite for PostgresManager batch persistence paths."""
+
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg2 import extensions as pg_extensions
+
+from src.database.postgres_manager import PostgresManager, PRICE_HISTORY_COLUMNS
+
+
+def make_manager():
+    """Build a PostgresManager without touching a real database."""
+    manager = PostgresManager.__new__(PostgresManager)
+    manager.logger = MagicMock()
+    manager.conn = MagicMock(closed=False)
+    manager.cursor = MagicMock()
+    manager.connection_string = "postgresql://test"
+    manager.max_retries = 1
+    manager.retry_delay = 0
+    return manager
+
+
+def binance_kline(open_time, close):
+    return [open_time, "1.0", "2.0", "0.5", str(close), "10.0", open_time + 59999,
+            "15.0", 7, "4.0", "6.0", "0"]
+
+
+class TestPriceHistoryBatch:
+    """Test cases for save_price_history_batch."""
+
+    def test_normalize_binance_klines_and_dedup(self):
+        """Test raw klines become typed rows and duplicate timestamps keep the last one."""
+        klines = [binance_kline(1_700_000_000_000, 1.5), binance_kline(1_700_000_000_000, 1.7),
+                  binance_kline(1_700_000_060_000, 1.8)]
+        rows = PostgresManager._normalize_price_rows("BTCUSDT", klines, "1m")
+
+        assert len(rows) == 2
+        assert len(rows[0]) == len(PRICE_HISTORY_COLUMNS)
+        assert rows[0][4] == 1.7
+        assert rows[0][7] == 7
+        assert isinstance(rows[0][10], datetime)
+        assert rows[0][11] == "1m"
+
+    def test_normalize_dicts(self):
+        """Test dictionary input keeps optional columns empty."""
+        rows = PostgresManager._normalize_price_rows("BTCUSDT", [{
+            'open_time': datetime(2024, 1, 1), 'open': 1, 'high': 2, 'low': 0.5,
+            'close': 1.5, 'volume': 3
+        }], "1h")
+        assert rows[0][6] is None and rows[0][7] is None
+
+    def test_batch_uses_single_statement_and_commit(self):
+        """Test the batch path upserts all rows in one transaction."""
+        manager = make_manager()
+        klines = [binance_kline(1_700_000_000_000 + i * 60_000, 1.0 + i) for i in range(1000)]
+
+        with patch('src.database.postgres_manager.execute_values') as execute_values:
+            saved = manager.save_price_history_batch("BTCUSDT", klines, "1m", use_copy=False)
+
+        assert saved == 1000
+        execute_values.assert_called_once()
+        query = execute_values.call_args[0][1]
+        assert "ON CONFLICT (symbol, interval, timestamp) DO UPDATE" in query
+        assert "close_price = EXCLUDED.close_price" in query
+        assert "COALESCE(EXCLUDED.number_of_trades, price_history.number_of_trades)" in query
+        assert len(execute_values.call_args[0][2]) == 1000
+        manager.conn.commit.assert_called_once()
+
+    def test_batch_copy_path(self):
+        """Test the COPY path stages rows and merges them with one upsert."""
+        manager = make_manager()
+        klines = [binance_kline(1_700_000_000_000 + i * 60_000, 1.0) for i in range(3)]
+
+        saved = manager.save_price_history_batch("BTCUSDT", klines, "1m", use_copy=True)
+
+        assert saved == 3
+        copy_sql, buffer = manager.cursor.copy_expert.call_args[0]
+        assert copy_sql.startswith("COPY price_history_staging")
+        assert len(buffer.getvalue().splitlines()) == 3
+        merge_sql = manager.cursor.execute.call_args[0][0]
+        assert "ON CONFLICT (symbol, interval, timestamp)" in merge_sql
+        manager.conn.commit.assert_called_once()
+
+
+class FakePool:
+    """In-memory stand-in for psycopg2's ThreadedConnectionPool."""
+
+    def __init__(self, minconn, maxconn, dsn, delay=0.0):
+        self.maxconn = maxconn
+        self.delay = delay
+        self.created = []
+        self.idle = []
+        self._used = {}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def _new_connection(self):
+        conn = MagicMock(closed=0)
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = [len(self.created) + 1]
+
+        def execute(*args, **kwargs):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(self.delay)
+            with self.lock:
+                self.active -= 1
+
+        cursor.execute.side_effect = execute
+        self.created.append(conn)
+        return conn
+
+    def getconn(self):
+        with self.lock:
+            conn = self.idle.pop() if self.idle else self._new_connection()
+            self._used[id(conn)] = conn
+            return conn
+
+    def putconn(self, conn, close=False):
+        with self.lock:
+            self._used.pop(id(conn))
+            if close:
+                conn.closed = 1
+            else:
+                self.idle.append(conn)
+
+    def closeall(self):
+        for conn in self.idle:
+            conn.closed = 1
+
+
+@pytest.fixture
+def pooled_manager():
+    """PostgresManager in pool mode backed by FakePool."""
+    pools = []
+
+    def make_pool(minconn, maxconn, dsn):
+        pools.append(FakePool(minconn, maxconn, dsn, delay=0.02))
+        return pools[-1]
+
+    with patch('src.database.postgres_manager.pg_pool.ThreadedConnectionPool', side_effect=make_pool):
+        manager = PostgresManager("postgresql://test", use_pool=True, pool_min=1, pool_max=3)
+        yield manager, pools[0]
+        manager.disconnect()
+
+
+class TestConnectionPool:
+    """Test cases for the pooled PostgresManager mode."""
+
+    def test_concurrent_calls_use_separate_connections(self, pooled_manager):
+        """Test that threads never share a connection and the pool bound is respected."""
+        manager, pool = pooled_manager
+        seen = []
+
+        def worker(i):
+            seen.append(manager.save_notification("status", f"t{i}", "msg"))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert None not in seen
+        assert len(pool.created) <= 3
+        assert pool.peak <= 3 and pool.peak > 1
+        assert pool._used == {}
+        assert manager.get_pool_stats()["checkouts"] == 10  # setup + 9 calls
+
+    def test_health_check_on_checkout_only(self, pooled_manager):
+        """Test that recently used connections skip the SELECT 1 probe."""
+        manager, pool = pooled_manager
+        checks = manager.get_pool_stats()["health_checks"]
+
+        for _ in range(5):
+            manager.fetch_all("SELECT * FROM trades")
+
+        assert manager.get_pool_stats()["health_checks"] == checks
+
+        manager.pool_health_check_interval = 0
+        manager.fetch_one("SELECT 1")
+        assert manager.get_pool_stats()["health_checks"] == checks + 1
+
+    def test_closed_connection_is_discarded(self, pooled_manager):
+        """Test that a dead pooled connection is replaced on checkout."""
+        manager, pool = pooled_manager
+        pool.idle[0].closed = 1
+
+        manager.fetch_all("SELECT * FROM trades")
+
+        assert len(pool.created) == 2
+        assert manager.get_pool_stats()["discarded"] == 1
+
+    def test_swallowed_failure_is_not_returned_as_healthy(self, pooled_manager):
+        """Test that a call that left its transaction failed forces SELECT 1, and a lost one is discarded."""
+        manager, pool = pooled_manager
+        conn = pool.idle[0]
+        checks = manager.get_pool_stats()["health_checks"]
+
+        conn.get_transaction_status.return_value = pg_extensions.TRANSACTION_STATUS_INERROR
+        manager.fetch_all("SELECT * FROM trades")
+        conn.get_transaction_status.return_value = pg_extensions.TRANSACTION_STATUS_IDLE
+        manager.fetch_all("SELECT * FROM trades")
+        assert manager.get_pool_stats()["health_checks"] == checks + 1
+
+        conn.get_transaction_status.return_value = pg_extensions.TRANSACTION_STATUS_UNKNOWN
+        manager.fetch_all("SELECT * FROM trades")
+        assert conn.closed
+        assert manager.get_pool_stats()["discarded"] == 1
+
+    def test_nested_calls_share_one_checkout(self, pooled_manager):
+        """Test that blocks on the same thread reuse the reserved connection."""
+        manager, pool = pooled_manager
+        before = manager.get_pool_stats()["checkouts"]
+
+        with manager.connection() as conn:
+            assert manager.conn is conn
+            manager.fetch_all("SELECT * FROM trades")
+            manager.save_log("trading", "nested")
+
+        assert manager.get_pool_stats()["checkouts"] == before + 1
+        assert manager.conn is None
+
+    def test_transaction_commits_and_rolls_back(self, pooled_manager):
+        """Test the transaction context manager."""
+        manager, pool = pooled_manager
+
+        with manager.transaction() as cursor:
+            cursor.execute("UPDATE trades SET status = 'closed'")
+        conn = pool.idle[-1]
+        conn.commit.assert_called()
+
+        with pytest.raises(ValueError):
+            with manager.transaction():
+                raise ValueError("boom")
+        conn.rollback.assert_called()
@@ -0,0 +1,182 @@
+"""Test suite for the write-behind telemetry writer."""
+
+import json
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.database.postgres_manager import PostgresManager
+from src.database.write_behind import WriteBehindWriter
+
+
+class FakeManager:
+    """Pooled-manager stand-in that records committed batches."""
+
+    use_pool = True
+
+    def __init__(self, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+        self.commits = 0
+
+    @contextmanager
+    def transaction(self):
+        if self.fail:
+            raise RuntimeError("database down")
+        time.sleep(self.delay)
+        yield MagicMock()
+        self.commits += 1
+
+
+@pytest.fixture
+def inserts():
+    """Capture execute_values calls as (table, rows)."""
+    calls = []
+
+    def fake_execute_values(cursor, query, rows, page_size=None):
+        calls.append((query.split()[2], list(rows), query))
+
+    with patch('src.database.write_behind.execute_values', side_effect=fake_execute_values):
+        yield calls
+
+
+class TestWriteBehindWriter:
+    """Test cases for WriteBehindWriter."""
+
+    def test_batches_by_size_with_multi_row_inserts(self, inserts):
+        """Test that a full batch is written as one INSERT per table."""
+        manager = FakeManager()
+        writer = WriteBehindWriter(manager, batch_size=4, flush_interval=60)
+        writer.start()
+        try:
+            for i in range(2):
+                writer.submit('trading_signal', symbol="BTCUSDT", signal_type="buy", strength=0.8,
+                              price=100.0 + i, source="technical", indicators_data={"rsi": 30})
+                writer.submit('log', log_type="trading", message=f"m{i}", level="INFO")
+
+            deadline = time.monotonic() + 2
+            while writer.get_stats()["written"] < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            writer.close()
+
+        assert manager.commits == 1
+        tables = {table: rows for table, rows, _ in inserts}
+        assert len(tables["trading_signals"]) == 2
+        assert len(tables["trading_logs"]) == 2
+        # Timestamp captured at enqueue time, JSON columns wrapped
+        signal_row = tables["trading_signals"][0]
+        assert signal_row[-1] is not None
+        assert signal_row[6].adapted == {"rsi": 30}
+
+    def test_flushes_on_interval_and_close(self, inserts):
+        """Test time-based flush and final flush on close."""
+        writer = WriteBehindWriter(FakeManager(), batch_size=100, flush_interval=0.05)
+        writer.start()
+        writer.submit('notification', notification_type="status", title="t", message="m",
+                      telegram_sent=False)
+        time.sleep(0.2)
+        assert writer.get_stats()["written"] == 1
+
+        writer.submit('analysis', symbol="ETHUSDT", analysis_type="technical", data={"a": 1})
+        writer.close()
+        assert writer.get_stats()["written"] == 2
+        assert writer.get_stats()["queued"] == 0
+
+    def test_indicator_upsert_deduplicates_batch(self, inserts):
+        """Test that repeated indicator keys keep the last value in one upsert."""
+        writer = WriteBehindWriter(FakeManager(), batch_size=10, flush_interval=60)
+        writer.start()
+        ts = "2024-01-01T00:00:00"
+        for value in (1, 2):
+            writer.submit('technical_indicator', symbol="BTCUSDT", indicator_type="RSI",
+                          values={"v": value}, timestamp=ts, interval="1h")
+        writer.close()
+
+        table, rows, query = inserts[0]
+        assert table == "technical_indicators"
+        assert len(rows) == 1 and rows[0][2].adapted == {"v": 2}
+        assert "ON CONFLICT" in query
+
+    def test_drop_oldest_policy(self):
+        """Test that a full queue discards the oldest record without blocking."""
+        writer = WriteBehindWriter(FakeManager(), max_queue=3, overflow_policy='drop_oldest')
+        for i in range(5):
+            assert writer.submit('log', log_type="t", message=str(i))
+
+        stats = writer.get_stats()
+        assert stats["queued"] == 3 and stats["dropped"] == 2
+        assert [row[1] for _, row in writer._queue] == ["2", "3", "4"]
+
+    def test_block_policy_waits_for_space(self, inserts):
+        """Test that producers block until the writer frees space."""
+        writer = WriteBehindWriter(FakeManager(delay=0.05), max_queue=2, batch_size=2,
+                                   flush_interval=60, overflow_policy='block')
+        writer.start()
+        try:
+            start = time.monotonic()
+            for i in range(6):
+                assert writer.submit('log', log_type="t", message=str(i))
+            assert time.monotonic() - start > 0.02
+        finally:
+            writer.close()
+        assert writer.get_stats()["written"] == 6
+
+    def test_spill_and_replay(self, inserts, tmp_path):
+        """Test that overflow spills to disk and is replayed once the queue drains."""
+        spill = tmp_path / "spill.jsonl"
+        writer = WriteBehindWriter(FakeManager(), max_queue=2, batch_size=100, flush_interval=0.05,
+                                   overflow_policy='spill', spill_path=str(spill))
+        for i in range(5):
+            writer.submit('log', log_type="t", message=str(i))
+
+        assert writer.get_stats()["spilled"] == 3
+        assert [json.loads(line)[1][1] for line in spill.read_text().splitlines()] == ["2", "3", "4"]
+
+        writer.start()
+        deadline = time.monotonic() + 2
+        while writer.get_stats()["written"] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.close()
+
+        assert writer.get_stats()["replayed"] == 3
+        assert not spill.exists()
+
+    def test_failed_batches_are_requeued(self, inserts):
+        """Test that database errors keep records queued instead of losing them."""
+        manager = FakeManager(fail=True)
+        writer = WriteBehindWriter(manager, batch_size=1, flush_interval=0.01)
+        writer.start()
+        writer.submit('log', log_type="t", message="keep")
+        time.sleep(0.1)
+        assert writer.get_stats()["errors"] >= 1
+        assert writer.get_stats()["written"] == 0
+
+        manager.fail = False
+        assert writer.flush(timeout=5)
+        writer.close()
+        assert writer.get_stats()["written"] == 1
+
+
+class TestPostgresManagerWriteBehind:
+    """Test that PostgresManager save_* methods enqueue instead of writing."""
+
+    def test_save_methods_enqueue(self):
+        """Test that enabled write-behind queues the row instead of the inline INSERT."""
+        manager = PostgresManager.__new__(PostgresManager)
+        manager.logger = MagicMock()
+        manager.conn = MagicMock(closed=False)
+        manager.cursor = MagicMock()
+        manager.write_behind = WriteBehindWriter(FakeManager(), batch_size=100, flush_interval=60)
+
+        assert manager.save_trading_signal("BTCUSDT", "buy", 0.9, 100.0, "technical") is True
+        assert manager.save_log("trading", "hello") is True
+
+        manager.cursor.execute.assert_not_called()
+        (signal_type, signal), (log_type, log) = list(manager.write_behind._queue)
+        assert signal_type == 'trading_signal'
+        assert signal[:6] == ("BTCUSDT", "buy", 0.9, 100.0, "technical", None)
+        assert log_type == 'log'
+        assert log[:2] == ("trading", "hello") and log[3] == "INFO"
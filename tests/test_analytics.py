@@ -17,9 +17,15 @@ from analytics import (
     MLModels,
     BacktestingEngine,
     RiskAnalytics,
-    ReportGenerator
+    ReportGenerator,
+    ParameterSweep,
+    WalkForwardAnalyzer
 )
-from analytics.backtesting_engine import OrderType, simple_ma_strategy, rsi_strategy
+from analytics.backtesting_engine import (
+    OrderType, simple_ma_strategy, rsi_strategy, simple_ma_signals, rsi_signals
+)
+from analytics.parameter_sweep import SharedOHLCV
+from analytics.walk_forward import walk_forward_splits, purged_kfold_splits
 
 
 @pytest.fixture
@@ -262,12 +268,46 @@ class TestRiskAnalytics:
         assert 'expected_final_value' in mc_results
         assert 'loss_probability_pct' in mc_results
         assert 'simulation_paths' in mc_results
-        assert 'final_values' in mc_results
+        assert 'sample_final_values' in mc_results
         
         # Verificar dimensões
         assert mc_results['num_simulations'] == 100
         assert mc_results['time_horizon_days'] == 50
-        assert len(mc_results['final_values']) == 100
+        assert len(mc_results['sample_final_values']) == 100
+    
+    @pytest.mark.parametrize("mode", ['normal', 'gbm', 'bootstrap'])
+    def test_monte_carlo_modes_summary(self, returns_data, mode):
+        """Teste dos modos de simulação com retorno apenas de resumo e amostra"""
+        risk = RiskAnalytics()
+        mc_results = risk.monte_carlo_simulation(
+            returns_data, num_simulations=2000, time_horizon=30, mode=mode,
+            seed=1, sample_paths=10, block_size=5
+        )
+        
+        assert mc_results['mode'] == mode
+        assert mc_results['simulation_paths'].shape == (10, 30)
+        assert len(mc_results['sample_final_values']) == 10
+        assert mc_results['var_99_pct'] <= mc_results['var_95_pct']
+        assert mc_results['cvar_95_pct'] <= mc_results['var_95_pct']
+        assert 0 <= mc_results['loss_probability_pct'] <= 100
+        assert mc_results['max_drawdown_percentiles_pct'][50] <= 0
+    
+    def test_monte_carlo_reproducible_across_chunks(self, returns_data):
+        """Teste de reprodutibilidade com semente e independência do tamanho do lote"""
+        risk = RiskAnalytics()
+        chunked = risk.monte_carlo_simulation(returns_data, 1000, 20, seed=7, chunk_size=33)
+        single = risk.monte_carlo_simulation(returns_data, 1000, 20, seed=7)
+        
+        assert chunked['percentiles'] == single['percentiles']
+        assert chunked['expected_final_value'] == pytest.approx(single['expected_final_value'])
+        np.testing.assert_allclose(chunked['simulation_paths'], single['simulation_paths'])
+    
+    def test_monte_carlo_invalid_mode(self, returns_data):
+        """Teste de modo de simulação inválido"""
+        risk = RiskAnalytics()
+        
+        with pytest.raises(ValueError):
+            risk.monte_carlo_simulation(returns_data, mode='invalid')
     
     def test_stress_testing(self, returns_data):
         """Teste de stress testing"""
@@ -362,6 +402,37 @@ class TestBacktestingEngine:
         
         assert results['initial_capital'] == 10000
     
+    @pytest.mark.parametrize("strategy,signals,params", [
+        (simple_ma_strategy, simple_ma_signals, {'short_window': 5, 'long_window': 10}),
+        (rsi_strategy, rsi_signals, {'rsi_period': 7, 'oversold': 40, 'overbought': 60}),
+    ])
+    def test_vectorized_backtest_matches_event_driven(self, sample_data, strategy, signals, params):
+        """Teste de equivalência entre backtest vetorizado e por barra"""
+        engine = BacktestingEngine(initial_capital=10000)
+        engine.add_data(sample_data, "BTCUSDT")
+        
+        expected = engine.run_backtest(strategy, start_date='2023-01-15', **params)
+        expected_trades = [(t.timestamp, t.order_type) for t in engine.trades]
+        results = engine.run_vectorized_backtest(signals, start_date='2023-01-15', **params)
+        
+        assert results['num_trades'] == expected['num_trades'] > 0
+        assert [(t.timestamp, t.order_type) for t in engine.trades] == expected_trades
+        assert results['final_value'] == pytest.approx(expected['final_value'], rel=1e-9)
+        assert results['sharpe_ratio'] == pytest.approx(expected['sharpe_ratio'], rel=1e-6)
+        pd.testing.assert_frame_equal(
+            results['portfolio_history'][['portfolio_value', 'cash']],
+            expected['portfolio_history'][['portfolio_value', 'cash']],
+            check_exact=False, rtol=1e-9, check_freq=False
+        )
+    
+    def test_vectorized_backtest_invalid_signal_length(self, sample_data):
+        """Teste de estratégia vetorizada com tamanho inválido"""
+        engine = BacktestingEngine(initial_capital=10000)
+        engine.add_data(sample_data, "BTCUSDT")
+        
+        with pytest.raises(ValueError):
+            engine.run_vectorized_backtest(lambda data: np.ones(len(data) - 1))
+    
     def test_get_portfolio_value(self, sample_data):
         """Teste de cálculo do valor do portfolio"""
         engine = BacktestingEngine(initial_capital=10000)
@@ -378,6 +449,140 @@ class TestBacktestingEngine:
         assert portfolio_value != 10000  # Deve ter mudado
 
 
+class TestParameterSweep:
+    """Testes para ParameterSweep"""
+    
+    def test_grid(self):
+        """Teste de geração da grade de parâmetros"""
+        combinations = ParameterSweep.grid({'short_window': [5, 10], 'long_window': [20, 30, 40]})
+        
+        assert len(combinations) == 6
+        assert {'short_window': 10, 'long_window': 40} in combinations
+    
+    def test_random_search_reproducible(self):
+        """Teste de busca aleatória reprodutível e sem repetições"""
+        distributions = {'rsi_period': (5, 30), 'oversold': [20, 25, 30], 'overbought': (65.0, 80.0)}
+        
+        first = ParameterSweep.random_search(distributions, n_iter=15, seed=7)
+        second = ParameterSweep.random_search(distributions, n_iter=15, seed=7)
+        
+        assert first == second
+        assert len(first) == 15
+        assert len({tuple(sorted(p.items())) for p in first}) == 15
+        assert all(5 <= p['rsi_period'] <= 30 and isinstance(p['rsi_period'], int) for p in first)
+    
+    def test_shared_ohlcv_roundtrip(self, sample_data):
+        """Teste de dados OHLCV em memória compartilhada"""
+        with SharedOHLCV(sample_data) as shared:
+            shm, frame = SharedOHLCV.attach(shared.descriptor)
+            try:
+                pd.testing.assert_frame_equal(
+                    frame, sample_data[['open', 'high', 'low', 'close', 'volume']], check_freq=False
+                )
+                assert not frame['close'].to_numpy().flags.writeable
+            finally:
+                del frame
+                shm.close()
+    
+    def test_run_ranked_results(self, sample_data):
+        """Teste de tabela ranqueada no próprio processo"""
+        sweep = ParameterSweep(sample_data, max_workers=1)
+        results = sweep.run(
+            'simple_ma',
+            param_grid={'short_window': [3, 5, 8], 'long_window': [5, 10, 20]},
+            constraint=lambda p: p['short_window'] < p['long_window']
+        )
+        
+        assert len(results) == 7
+        assert list(results['rank']) == list(range(1, 8))
+        assert results['sharpe_ratio'].is_monotonic_decreasing
+        assert {'max_drawdown_pct', 'total_return_pct'} <= set(results.columns)
+        
+        # Linha do ranking confere com um backtest isolado
+        best = sweep.best_params()
+        engine = BacktestingEngine(initial_capital=10000)
+        engine.add_data(sample_data)
+        expected = engine.run_vectorized_backtest(simple_ma_signals, **best)
+        assert results.iloc[0]['final_value'] == pytest.approx(expected['final_value'])
+    
+    def test_run_process_pool_matches_serial(self, sample_data):
+        """Teste de equivalência entre pool de processos e execução serial"""
+        grid = {'rsi_period': [5, 7, 14], 'oversold': [30, 40]}
+        progress = []
+        
+        serial = ParameterSweep(sample_data, max_workers=1).run('rsi', param_grid=grid)
+        parallel = ParameterSweep(sample_data, max_workers=2).run(
+            'rsi', param_grid=grid, progress_callback=lambda done, total: progress.append((done, total))
+        )
+        
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert progress[-1] == (6, 6)
+    
+    def test_run_unknown_strategy(self, sample_data):
+        """Teste de estratégia inexistente"""
+        sweep = ParameterSweep(sample_data, max_workers=1)
+        
+        with pytest.raises(ValueError):
+            sweep.run('unknown', param_grid={'x': [1]})
+
+
+class TestWalkForwardAnalyzer:
+    """Testes para WalkForwardAnalyzer"""
+    
+    def test_walk_forward_splits(self):
+        """Teste de janelas walk-forward (rolantes e ancoradas)"""
+        rolling = walk_forward_splits(100, train_size=40, test_size=20)
+        anchored = walk_forward_splits(100, train_size=40, test_size=20, anchored=True)
+        
+        assert rolling == [([(0, 40)], (40, 60)), ([(20, 60)], (60, 80)), ([(40, 80)], (80, 100))]
+        assert [train for train, _ in anchored] == [[(0, 40)], [(0, 60)], [(0, 80)]]
+        
+        with pytest.raises(ValueError):
+            walk_forward_splits(50, train_size=40, test_size=20)
+    
+    def test_purged_kfold_splits(self):
+        """Teste de purga e embargo em torno do bloco de teste"""
+        splits = purged_kfold_splits(100, n_splits=4, purge=5, embargo=3)
+        
+        assert [test for _, test in splits] == [(0, 25), (25, 50), (50, 75), (75, 100)]
+        assert splits[0][0] == [(28, 100)]
+        assert splits[1][0] == [(0, 20), (53, 100)]
+        assert splits[3][0] == [(0, 70)]
+    
+    def test_walk_forward_report(self, sample_data):
+        """Teste do relatório walk-forward e da avaliação fora da amostra"""
+        analyzer = WalkForwardAnalyzer(sample_data, max_workers=1)
+        report = analyzer.walk_forward(
+            'simple_ma', train_size=40, test_size=20,
+            param_grid={'short_window': [3, 5], 'long_window': [10, 15]}
+        )
+        
+        folds = report['folds']
+        assert len(folds) == 3
+        assert report['summary']['n_folds'] == 3
+        assert set(report['parameter_stability']) == {'short_window', 'long_window'}
+        
+        # O resultado de teste de cada fold confere com um backtest isolado na janela
+        engine = BacktestingEngine(initial_capital=10000)
+        engine.add_data(sample_data)
+        for _, fold in folds.iterrows():
+            expected = engine.run_vectorized_backtest(
+                simple_ma_signals, start_date=fold['test_start'], end_date=fold['test_end'], **fold['params']
+            )
+            assert fold['oos_total_return_pct'] == pytest.approx(expected['total_return_pct'])
+    
+    def test_purged_kfold_parallel_matches_serial(self, sample_data):
+        """Teste de equivalência entre folds em paralelo e em série"""
+        params = dict(n_splits=3, purge=5, embargo=2,
+                      param_grid={'rsi_period': [5, 7], 'oversold': [35, 45]})
+        
+        serial = WalkForwardAnalyzer(sample_data, max_workers=1).purged_kfold('rsi', **params)
+        parallel = WalkForwardAnalyzer(sample_data, max_workers=2).purged_kfold('rsi', **params)
+        
+        pd.testing.assert_frame_equal(serial['folds'], parallel['folds'])
+        assert serial['summary'] == parallel['summary']
+
+
 class TestMLModels:
     """Testes para MLModels"""
     
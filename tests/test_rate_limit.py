@@ -0,0 +1,124 @@
+"""
+Tests for the GCRA rate limiting middleware and stores.
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middleware.rate_limit import (
+    InMemoryRateLimitStore,
+    RedisRateLimitStore,
+    gcra_update,
+    parse_route_costs,
+    route_cost,
+)
+from src.middleware.security_headers import RateLimitMiddleware
+
+
+class FakeRedis:
+    """In-process stand-in for a shared Redis running the GCRA script."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.tats = {}
+
+    def register_script(self, script):
+        async def run(keys, args):
+            if self.fail:
+                raise ConnectionError("redis down")
+            allowed, new_tat, seconds = gcra_update(
+                self.tats.get(keys[0]), time.time(), *[float(a) for a in args]
+            )
+            if allowed:
+                self.tats[keys[0]] = new_tat
+            return [int(allowed), str(seconds)]
+        return run
+
+
+def make_client(**options):
+    app = FastAPI()
+
+    @app.get("/market/price")
+    async def price():
+        return {"ok": True}
+
+    @app.get("/analytics/report")
+    async def report():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, **options)
+    return TestClient(app)
+
+
+class TestGCRA:
+    """Test the GCRA decision and in-memory store."""
+
+    def test_burst_then_steady_rate(self):
+        """Test that the full budget is available as a burst and then refills linearly."""
+        store = InMemoryRateLimitStore()
+        results = [store.consume_sync("ip", 1, 1.0, 10.0, now=100.0)[0] for _ in range(11)]
+        assert results == [True] * 10 + [False]
+
+        allowed, retry_after = store.consume_sync("ip", 1, 1.0, 10.0, now=100.0)
+        assert not allowed and retry_after == pytest.approx(1.0)
+        assert store.consume_sync("ip", 1, 1.0, 10.0, now=101.0)[0]
+
+    def test_lru_eviction_bounds_memory(self):
+        """Test that one float per key is kept and idle keys are evicted."""
+        store = InMemoryRateLimitStore(max_keys=100)
+        for i in range(1000):
+            store.consume_sync(f"10.0.{i // 256}.{i % 256}", 1, 1.0, 10.0, now=100.0)
+
+        assert len(store) == 100
+        assert store.evictions == 900
+
+    def test_route_costs(self):
+        """Test that the longest matching prefix sets the cost."""
+        costs = parse_route_costs("/analytics/*=5, /analytics/cheap=2,/market/*=1")
+        assert route_cost("/analytics/report", costs) == 5
+        assert route_cost("/analytics/cheap/x", costs) == 2
+        assert route_cost("/analyticsx", costs) == 1
+        assert route_cost("/users/me", costs, default=1.5) == 1.5
+
+
+class TestRateLimitMiddleware:
+    """Test RateLimitMiddleware."""
+
+    def test_limit_and_retry_after(self):
+        """Test that requests over budget get 429 with Retry-After."""
+        client = make_client(calls=3, period=60)
+        statuses = [client.get("/market/price").status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+        response = client.get("/market/price")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_route_weights(self):
+        """Test that /analytics requests consume more of the budget."""
+        client = make_client(calls=10, period=60, route_costs={"/analytics/*": 5})
+        assert client.get("/analytics/report").headers["X-RateLimit-Remaining"] == "5"
+        assert client.get("/analytics/report").status_code == 200
+        assert client.get("/analytics/report").status_code == 429
+        assert client.get("/market/price").status_code == 429
+
+    def test_shared_store_across_workers(self):
+        """Test that two workers sharing a store enforce one budget."""
+        shared = RedisRateLimitStore(client=FakeRedis())
+        worker_a = make_client(calls=4, period=60, store=shared)
+        worker_b = make_client(calls=4, period=60, store=shared)
+
+        statuses = [(worker_a if i % 2 else worker_b).get("/market/price").status_code for i in range(5)]
+        assert statuses == [200, 200, 200, 200, 429]
+
+    def test_shared_store_falls_back_to_local(self):
+        """Test that a Redis outage falls back to the local limiter."""
+        shared = RedisRateLimitStore(client=FakeRedis(fail=True))
+        client = make_client(calls=2, period=60, store=shared)
+
+        statuses = [client.get("/market/price").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        assert shared.errors == 3
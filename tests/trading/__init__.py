@@ -0,0 +1 @@
+# Trading module tests
@@ -0,0 +1,163 @@
+"""Test suite for trading ai_enrichment module."""
+
+import asyncio
+import threading
+import time
+
+from src.trading.ai_enrichment import AIEnrichmentWorker, EnrichmentBoard
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class SlowAnalyzer:
+    """Blocking 'analysis' that records concurrency."""
+
+    def __init__(self, delay=0.05, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, symbol):
+        with self.lock:
+            self.calls.append(symbol)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if symbol in self.fail:
+                raise RuntimeError(f"falha em {symbol}")
+            return {'symbol': symbol, 'signals': []}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestEnrichmentBoard:
+    """Test cases for EnrichmentBoard."""
+
+    def test_get_applies_staleness_cutoff(self):
+        """Test that results older than max_age are not returned."""
+        board = EnrichmentBoard()
+        board.publish('BTC/USDT', 'analysis', {'score': 1})
+
+        assert board.get('BTC/USDT', 'analysis', max_age=60) == {'score': 1}
+        board.get_entry('BTC/USDT', 'analysis').updated_at -= 120
+        assert board.get('BTC/USDT', 'analysis', max_age=60) is None
+        assert board.get('BTC/USDT', 'analysis') == {'score': 1}
+        assert board.get('ETH/USDT', 'analysis') is None
+
+        stats = board.get_stats()
+        assert (stats['hits'], stats['stale'], stats['misses']) == (2, 1, 1)
+
+
+class TestAIEnrichmentWorker:
+    """Test cases for AIEnrichmentWorker."""
+
+    def test_publishes_results_with_bounded_concurrency(self):
+        """Test that every watched symbol is computed in the background within the limit."""
+        analyzer = SlowAnalyzer()
+        worker = AIEnrichmentWorker({'analysis': analyzer}, {'analysis': 60}, max_concurrency=2)
+        worker.start()
+        try:
+            symbols = [f"P{i}/USDT" for i in range(6)]
+            worker.watch(symbols)
+
+            assert _wait_for(lambda: all(worker.board.get(s, 'analysis') for s in symbols))
+            assert analyzer.max_active <= 2
+            assert sorted(analyzer.calls) == sorted(symbols)
+        finally:
+            worker.stop()
+
+    def test_reads_never_block_on_computation(self):
+        """Test that a reader gets None immediately while the analysis is running."""
+        analyzer = SlowAnalyzer(delay=0.5)
+        worker = AIEnrichmentWorker({'analysis': analyzer}, {'analysis': 60})
+        worker.start()
+        try:
+            worker.watch(['BTC/USDT'])
+            start = time.perf_counter()
+            assert worker.board.get('BTC/USDT', 'analysis') is None
+            assert time.perf_counter() - start < 0.05
+            assert _wait_for(lambda: worker.board.get('BTC/USDT', 'analysis') is not None)
+        finally:
+            worker.stop()
+
+    def test_async_tasks_share_the_worker_loop(self):
+        """Test that coroutine tasks run on one event loop owned by the worker."""
+        loops = set()
+
+        async def sentiment(symbol):
+            loops.add(id(asyncio.get_running_loop()))
+            await asyncio.sleep(0.01)
+            return {'sentiment_label': 'neutral'}
+
+        worker = AIEnrichmentWorker({'sentiment': sentiment}, {'sentiment': 60})
+        worker.start()
+        try:
+            worker.watch(['BTC/USDT', 'ETH/USDT'])
+            assert _wait_for(lambda: worker.get_stats()['published'] == 2)
+            assert len(loops) == 1
+        finally:
+            worker.stop()
+
+    def test_failures_retry_sooner_and_unwatched_symbols_are_dropped(self):
+        """Test retry_delay after an error and cleanup when a symbol leaves the watch list."""
+        analyzer = SlowAnalyzer(delay=0.0, fail={'BAD/USDT'})
+        worker = AIEnrichmentWorker({'analysis': analyzer}, {'analysis': 60}, retry_delay=0.05,
+                                    poll_interval=0.01)
+        worker.start()
+        try:
+            worker.watch(['BTC/USDT', 'BAD/USDT'])
+            assert _wait_for(lambda: worker.get_stats()['errors'] >= 3)
+            assert analyzer.calls.count('BTC/USDT') == 1
+
+            worker.watch(['BAD/USDT'])
+            assert worker.board.get_entry('BTC/USDT', 'analysis') is None
+        finally:
+            worker.stop()
+
+    def test_batch_kind_receives_due_symbols_in_one_call(self):
+        """Test that a batch task gets all due symbols at once and never overlaps."""
+        batches = []
+        active = []
+
+        def analyze_symbols(symbols):
+            active.append(1)
+            assert len(active) == 1
+            batches.append(sorted(symbols))
+            time.sleep(0.05)
+            active.pop()
+            return {symbol: {'symbol': symbol} for symbol in symbols if symbol != 'BAD/USDT'}
+
+        worker = AIEnrichmentWorker({'analysis': analyze_symbols}, {'analysis': 60}, max_concurrency=4,
+                                    retry_delay=60, poll_interval=0.01, batch_kinds=('analysis',))
+        worker.start()
+        try:
+            worker.watch(['BTC/USDT', 'ETH/USDT', 'BAD/USDT'])
+            assert _wait_for(lambda: worker.get_stats()['runs'] == 3)
+
+            assert batches == [['BAD/USDT', 'BTC/USDT', 'ETH/USDT']]
+            assert worker.board.get('ETH/USDT', 'analysis') == {'symbol': 'ETH/USDT'}
+            assert worker.board.get('BAD/USDT', 'analysis') is None
+            assert worker.get_stats()['empty'] == 1
+        finally:
+            worker.stop()
+
+    def test_stop_is_idempotent(self):
+        """Test that stopping twice (signal handler and caller) is safe."""
+        worker = AIEnrichmentWorker({'analysis': SlowAnalyzer()}, {'analysis': 60})
+        worker.start()
+        assert worker.is_running
+        worker.stop()
+        worker.stop()
+        assert not worker.is_running
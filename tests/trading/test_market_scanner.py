@@ -0,0 +1,156 @@
+"""Test suite for trading market_scanner module."""
+
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.strategies.strategy import TradingStrategy
+from src.trading.market_scanner import MarketScanner, RequestBudget, PairScanResult
+
+
+class FakeStrategy:
+    """Strategy stub that records concurrency while 'fetching' data."""
+
+    def __init__(self, delay=0.05, fail_pairs=()):
+        self.delay = delay
+        self.fail_pairs = set(fail_pairs)
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def analyze_market(self, pair, notifier=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if pair in self.fail_pairs:
+                raise RuntimeError(f"falha em {pair}")
+            return True, "buy", 1.0
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class LimitedStrategy(TradingStrategy):
+    """Strategy using the real daily-limit and loss rules with a moving price."""
+
+    def __init__(self, max_trades_per_day):
+        super().__init__(SimpleNamespace(max_trades_per_day=max_trades_per_day), binance_api=None)
+        self.price = 1.0
+        self.executed = []
+
+    def current_price(self, symbol):
+        return self.price
+
+    def analyze_market(self, pair, notifier=None):
+        if not self.trading_allowed():
+            return False, None, None
+        return True, "buy", self.price
+
+    def execute_buy(self, symbol, price):
+        self.executed.append((symbol, price))
+        self.record_trade()
+        return True, {}
+
+
+class TestMarketScanner:
+    """Test cases for MarketScanner."""
+
+    def test_scan_runs_pairs_in_parallel(self):
+        """Test that pairs are analyzed concurrently and results keep pair order."""
+        strategy = FakeStrategy(delay=0.1)
+        pairs = [f"P{i}/USDT" for i in range(8)]
+        scanner = MarketScanner(strategy, max_workers=8, requests_per_second=1000)
+
+        start = time.perf_counter()
+        results = scanner.scan(pairs)
+        elapsed = time.perf_counter() - start
+
+        assert list(results.keys()) == pairs
+        assert elapsed < 0.1 * len(pairs) / 2
+        assert strategy.max_active > 1
+        assert all(r.signal == (True, "buy", 1.0) for r in results.values())
+
+    def test_scan_respects_max_workers(self):
+        """Test that the in-flight limit is never exceeded."""
+        strategy = FakeStrategy(delay=0.02)
+        scanner = MarketScanner(strategy, max_workers=2, requests_per_second=1000)
+        scanner.scan([f"P{i}/USDT" for i in range(6)])
+        assert strategy.max_active <= 2
+
+    def test_scan_captures_errors_and_stats(self):
+        """Test that errors are returned per pair and cycle stats are recorded."""
+        strategy = FakeStrategy(delay=0.0, fail_pairs={"BAD/USDT"})
+        scanner = MarketScanner(strategy, max_workers=4, requests_per_second=1000)
+        results = scanner.scan(["BTC/USDT", "BAD/USDT"])
+
+        assert isinstance(results["BAD/USDT"].error, RuntimeError)
+        assert results["BTC/USDT"].error is None
+
+        stats = scanner.last_cycle_stats.to_dict()
+        assert stats["pairs_scanned"] == 2
+        assert stats["errors"] == 1
+        assert set(stats["pair_latencies"]) == {"BTC/USDT", "BAD/USDT"}
+
+    def test_confirm_signal_applies_limits_hit_mid_cycle(self):
+        """Test that signals computed before the daily limit was reached are not executed."""
+        strategy = LimitedStrategy(max_trades_per_day=1)
+        scanner = MarketScanner(strategy, max_workers=3)
+        results = scanner.scan(["BTC/USDT", "ETH/USDT", "SOL/USDT"])
+        assert all(r.should_trade for r in results.values())
+
+        strategy.price = 1.5
+        for pair, result in results.items():
+            should_trade, action, price = scanner.confirm_signal(result)
+            if should_trade:
+                strategy.execute_buy(pair, price)
+
+        assert strategy.executed == [("BTC/USDT", 1.5)]
+
+    def test_confirm_signal_pauses_after_consecutive_losses(self):
+        """Test the two-losses pause and a missing price both drop the signal."""
+        strategy = LimitedStrategy(max_trades_per_day=10)
+        scanner = MarketScanner(strategy)
+        result = PairScanResult(pair="BTC/USDT", should_trade=True, action="sell", price=1.0)
+
+        strategy.price = None
+        assert scanner.confirm_signal(result) == (False, None, None)
+        strategy.price = 2.0
+        assert scanner.confirm_signal(result) == (True, "sell", 2.0)
+        strategy.consecutive_losses = 2
+        assert scanner.confirm_signal(result) == (False, None, None)
+
+    def test_request_budget_paces_starts(self):
+        """Test that the shared budget spaces out analysis starts."""
+        budget = RequestBudget(requests_per_second=20, max_in_flight=10)
+        start = time.perf_counter()
+        for _ in range(5):
+            with budget:
+                pass
+        assert time.perf_counter() - start >= 4 / 20 * 0.9
+
+    def test_request_budget_counts_wait_from_all_threads(self):
+        """Test that concurrent acquirers all add their wait to the shared counter."""
+        budget = RequestBudget(requests_per_second=50, max_in_flight=8)
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            with budget:
+                pass
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Starts are 20 ms apart: 0 + 20 + ... + 140 ms of waiting in total
+        assert budget.total_wait_time == pytest.approx(0.56, abs=0.05)
+
+    def test_pair_scan_result_default_signal(self):
+        """Test default result has no trade signal."""
+        assert PairScanResult(pair="BTC/USDT").signal == (False, None, None)